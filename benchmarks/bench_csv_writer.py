@@ -0,0 +1,66 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_csv_writer.py - DataFrame.to_csv vs. the parallel block writer
+Writes the derived_computed_columns output of synthetic data as plain and
+gzip CSV, once with to_csv and once with parallel_csv.write_csv_parallel for
+each worker count, checks the decoded bytes match and reports MB/s of CSV
+text written and the speed-up over to_csv.
+Run with: python benchmarks/bench_csv_writer.py --rows 2000000 --jobs 1 2 4 8
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_feature_spec      import best_time
+from datagen                 import synthetic_frame
+from derive_computed_columns import derive_computed_columns
+from parallel_csv            import DEFAULT_BLOCK_ROWS, write_csv_parallel
+
+
+def decoded(path: str) -> bytes:
+    """The CSV text of a plain or gzip file."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return f.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    df = derive_computed_columns(synthetic_frame(args.rows), None)
+    text_mb = len(df.to_csv(index=False).encode()) / 1024 ** 2
+    print(f"{args.rows:,} rows, {len(df.columns)} columns, {text_mb:.1f} MB of CSV text, "
+          f"{os.cpu_count()} CPUs\n")
+    print(f"{'output':<10}{'writer':<16}{'seconds':>10}{'MB/s':>9}{'speed-up':>10}{'file (MB)':>11}")
+
+    with tempfile.TemporaryDirectory(prefix="group6_bench_") as tmp:
+        for suffix in (".csv", ".csv.gz"):
+            reference = os.path.join(tmp, "to_csv" + suffix)
+            baseline = best_time(lambda: df.to_csv(reference, index=False), args.repeat)
+            expected = decoded(reference)
+            rows = [("to_csv", baseline, reference)]
+            for jobs in sorted(set(args.jobs)):
+                path = os.path.join(tmp, f"parallel{jobs}{suffix}")
+                write = lambda: write_csv_parallel(df, path, jobs, block_rows=args.block_rows)
+                seconds = best_time(write, args.repeat)
+                if decoded(path) != expected:
+                    raise AssertionError(f"{path} does not decode to the to_csv output")
+                rows.append((f"parallel x{jobs}", seconds, path))
+            for writer, seconds, path in rows:
+                print(f"{suffix:<10}{writer:<16}{seconds:>10.2f}{text_mb / seconds:>9.1f}"
+                      f"{baseline / seconds:>9.2f}x{os.path.getsize(path) / 1024 ** 2:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
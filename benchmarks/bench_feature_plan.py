@@ -0,0 +1,56 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_feature_plan.py - Planned feature requests vs. the full feature table
+Writes synthetic data to a CSV, then times reading it and computing the full
+feature table (every stage on every column) against reading and computing
+only what each feature request needs, and reports the columns each one read.
+Run with: python benchmarks/bench_feature_plan.py --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_feature_spec import best_time
+from datagen            import write_synthetic_csv
+from feature_plan       import compute_features, plan_features
+from feature_table      import build_feature_table
+from main               import shared_input_dtypes
+from pipeline_io        import read_columns, read_input
+
+# Feature requests timed against the full table
+REQUESTS = [
+    ['is_anomaly', 'age_group'],
+    ['is_recent_hire'],
+    ['salary_level', 'salary_range', 'dept'],
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="group6_bench_") as tmp:
+        path = write_synthetic_csv(os.path.join(tmp, "data.csv"), args.rows)
+        header = read_columns(path)
+        full = best_time(lambda: build_feature_table(read_input(path, dtypes=shared_input_dtypes())),
+                         args.repeat)
+
+        print(f"{args.rows:,} rows\n")
+        print(f"{'request':<40}{'computed':>9}{'read':>7}{'seconds':>10}{'speed-up':>10}")
+        print(f"{'full feature table':<40}{'all':>9}{len(header):>7}{full:>10.3f}{1:>9.2f}x")
+        for features in REQUESTS:
+            plan = plan_features(features)
+            seconds = best_time(lambda: compute_features(path, None, features), args.repeat)
+            print(f"{' '.join(features):<40}{len(plan.steps):>9}{len(plan.inputs) + 1:>7}"
+                  f"{seconds:>10.3f}{full / seconds:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_feature_table.py - One wide feature table vs. five separate outputs
+Computes every feature once on the same synthetic data, then measures the
+bytes written and the write time of the five-file layout and of the
+consolidated table, for each output format.
+Run with: python benchmarks/bench_feature_table.py --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_feature_spec import best_time
+from datagen            import synthetic_frame
+from feature_table      import build_feature_table
+from main               import OUTPUT_FILES, STAGES
+from pipeline_io        import compact_dtypes, pa, with_format, write_frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    df = compact_dtypes(synthetic_frame(args.rows))
+    five = {name: stage(df, None) for name, stage in STAGES.items()}
+    table, _ = build_feature_table(df)
+
+    formats = ["csv"] + (["parquet", "feather"] if pa is not None else [])
+    print(f"{args.rows:,} rows, {len(table.columns)} table columns\n")
+    print(f"{'format':<10}{'layout':<14}{'bytes':>16}{'write (s)':>12}")
+    with tempfile.TemporaryDirectory(prefix="group6_bench_") as tmp:
+        for fmt in formats:
+            paths = {name: with_format(os.path.join(tmp, os.path.basename(path)), fmt)
+                     for name, path in OUTPUT_FILES.items()}
+            table_path = with_format(os.path.join(tmp, "features.csv"), fmt)
+
+            five_s = best_time(lambda: [write_frame(five[name], paths[name]) for name in STAGES],
+                               args.repeat)
+            table_s = best_time(lambda: write_frame(table, table_path), args.repeat)
+            five_bytes = sum(os.path.getsize(path) for path in paths.values())
+            table_bytes = os.path.getsize(table_path)
+
+            print(f"{fmt:<10}{'five files':<14}{five_bytes:>16,}{five_s:>12.3f}")
+            print(f"{fmt:<10}{'one table':<14}{table_bytes:>16,}{table_s:>12.3f}"
+                  f"   ({table_bytes / five_bytes:.0%} of the bytes, "
+                  f"{table_s / five_s:.0%} of the write time)")
+
+
+if __name__ == "__main__":
+    main()
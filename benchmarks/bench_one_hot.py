@@ -0,0 +1,56 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_one_hot.py - Dense vs. sparse vs. hashed one-hot encoding
+Encodes synthetic data whose department column has a growing number of
+distinct values, once into dense int8 columns, once into sparse columns and
+once into a fixed number of hashed sparse columns, and reports the time and
+the memory of the encoded frame. Dense encoding is skipped once its matrix
+would pass --dense-limit.
+Run with: python benchmarks/bench_one_hot.py --rows 1000000 --cardinality 10 1000 20000
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_feature_spec          import best_time
+from datagen                     import synthetic_frame
+from encode_categorical_features import encode_categorical_features, fit_categorical_encoder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cardinality", type=int, nargs="+", default=[10, 1_000, 20_000])
+    parser.add_argument("--buckets", type=int, default=1024)
+    parser.add_argument("--dense-limit", type=float, default=4.0,
+                        help="largest dense one-hot matrix to build, in GB")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print(f"{args.rows:,} rows, {args.buckets} hash buckets\n")
+    print(f"{'departments':>12}  {'encoding':<10}{'columns':>9}{'seconds':>10}{'memory (MB)':>13}")
+    for cardinality in args.cardinality:
+        df = synthetic_frame(args.rows, cardinality={'department': cardinality})
+        df['department'] = df['department'].astype('category')
+        encoders = {'vocabulary': fit_categorical_encoder(df),
+                    'hashed'    : fit_categorical_encoder(df, hash_buckets={'department': args.buckets})}
+        runs = [('sparse', 'vocabulary', True), ('hashed', 'hashed', True)]
+        if args.rows * (cardinality + 1) / 1024 ** 3 <= args.dense_limit:
+            runs.insert(0, ('dense', 'vocabulary', False))
+
+        for label, encoder, sparse in runs:
+            encode = lambda: encode_categorical_features(df, None, encoder=encoders[encoder],
+                                                         sparse=sparse)
+            seconds = best_time(encode, args.repeat)
+            encoded = encode().filter(like='dept_')
+            memory_mb = encoded.memory_usage(index=False).sum() / 1024 ** 2
+            print(f"{cardinality:>12,}  {label:<10}{len(encoded.columns):>9,}{seconds:>10.3f}"
+                  f"{memory_mb:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
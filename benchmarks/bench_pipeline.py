@@ -0,0 +1,206 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_pipeline.py - Throughput, memory and output size of the pipeline
+Times each of the 5 processing functions and run_pipeline end to end on seeded
+synthetic CSVs, saves the results as JSON and can flag regressions against a
+saved baseline.
+Run with: python benchmarks/bench_pipeline.py --rows 10000 1000000 --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datagen import (
+    DEFAULT_CARDINALITY, parse_cardinality, resolve_cardinality, write_synthetic_csv,
+)
+from main    import OUTPUT_FILES, STAGES, run_pipeline
+from metrics import peak_rss_bytes
+
+# Row counts benchmarked when none are given
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+
+# Name of the end-to-end benchmark, next to the stage names
+PIPELINE = "run_pipeline"
+
+# Relative slowdown (or memory growth) tolerated before compare flags it
+DEFAULT_TOLERANCE = 0.10
+
+RESULTS_VERSION = 1
+
+
+def _measure(benchmark: str, input_file: str, workdir: str, repeat: int) -> dict:
+    """
+    Runs one benchmark in this process and reports its best time.
+
+    Called in a fresh process per benchmark, so the peak RSS belongs to
+    that benchmark alone (plus the interpreter and imported libraries).
+    """
+    times = []
+    for _ in range(repeat):
+        if benchmark == PIPELINE:
+            outputs = {name: os.path.join(workdir, os.path.basename(path))
+                       for name, path in OUTPUT_FILES.items()}
+            run = lambda: run_pipeline(input_file, outputs)
+        else:
+            outputs = {benchmark: os.path.join(workdir, f"{benchmark}.csv")}
+            run = lambda: STAGES[benchmark](input_file, outputs[benchmark])
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    return {
+        'seconds'       : min(times),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'output_bytes'  : sum(os.path.getsize(path) for path in outputs.values()),
+    }
+
+
+def run_benchmarks(rows_list, seed: int = 6, cardinality: dict = None,
+                   repeat: int = 1, benchmarks=None) -> dict:
+    """
+    Benchmarks the stages and the whole pipeline at each size.
+
+    Args:
+        rows_list   (list): Row counts to generate and benchmark.
+        seed        (int) : Seed of the synthetic data.
+        cardinality (dict): Distinct values per text column (see datagen).
+        repeat      (int) : Runs per benchmark; the fastest is kept.
+        benchmarks  (list): Stage names and/or "run_pipeline". None runs all.
+
+    Returns:
+        dict: {'meta': environment and settings, 'results': one entry per
+        (benchmark, rows) with seconds, rows_per_s, peak_rss_bytes and
+        output_bytes}
+    """
+    benchmarks = list(benchmarks or list(STAGES) + [PIPELINE])
+    cardinality = resolve_cardinality(cardinality)
+    spawn = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="group6_bench_") as tmp:
+        for rows in rows_list:
+            input_file = write_synthetic_csv(os.path.join(tmp, f"input_{rows}.csv"),
+                                             rows, seed, cardinality)
+            for benchmark in benchmarks:
+                workdir = tempfile.mkdtemp(dir=tmp)
+                with spawn.Pool(1) as pool:
+                    measured = pool.apply(_measure, (benchmark, input_file, workdir, repeat))
+                measured['rows_per_s'] = rows / measured['seconds'] if measured['seconds'] else 0.0
+                results.append({'benchmark': benchmark, 'rows': rows, **measured})
+                rss = measured['peak_rss_bytes']
+                rss_mb = f"{rss / 1024 ** 2:.1f}" if rss is not None else "n/a"
+                print(f"{benchmark:<32}{rows:>12,}{measured['rows_per_s']:>14,.0f}{rss_mb:>12}"
+                      f"{measured['output_bytes'] / 1024 ** 2:>12.1f}")
+    return {
+        'meta': {
+            'version'    : RESULTS_VERSION,
+            'created'    : datetime.datetime.now().isoformat(timespec="seconds"),
+            'python'     : platform.python_version(),
+            'pandas'     : pd.__version__,
+            'numpy'      : np.__version__,
+            'platform'   : platform.platform(),
+            'cpu_count'  : os.cpu_count(),
+            'seed'       : seed,
+            'cardinality': cardinality,
+            'repeat'     : repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Finds benchmarks that got slower or bigger than a baseline.
+
+    Only (benchmark, rows) pairs present in both result sets are compared.
+
+    Args:
+        baseline  (dict) : Results saved by an earlier run.
+        current   (dict) : Results of this run.
+        tolerance (float): Relative change allowed, e.g. 0.10 for 10%.
+
+    Returns:
+        list: One dict per regression with the benchmark, rows, metric,
+        baseline and current values and the relative change.
+    """
+    before = {(r['benchmark'], r['rows']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = before.get((result['benchmark'], result['rows']))
+        if old is None:
+            continue
+        slower = result['rows_per_s'] < old['rows_per_s'] * (1 - tolerance)
+        # Peak RSS is None where the platform cannot report it
+        bigger = (None not in (result['peak_rss_bytes'], old['peak_rss_bytes'])
+                  and result['peak_rss_bytes'] > old['peak_rss_bytes'] * (1 + tolerance))
+        for metric, regressed in (('rows_per_s', slower), ('peak_rss_bytes', bigger)):
+            if regressed:
+                regressions.append({
+                    'benchmark': result['benchmark'],
+                    'rows'     : result['rows'],
+                    'metric'   : metric,
+                    'baseline' : old[metric],
+                    'current'  : result[metric],
+                    'change'   : result[metric] / old[metric] - 1 if old[metric] else float('inf'),
+                })
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--seed", type=int, default=6)
+    parser.add_argument("--cardinality", nargs="*", default=[], metavar="COLUMN=COUNT",
+                        help=f"distinct values per column (default: {DEFAULT_CARDINALITY})")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=list(STAGES) + [PIPELINE],
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--output", default="benchmarks/results/latest.json",
+                        help="where to save the JSON results")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="JSON results to compare against; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    print(f"{'benchmark':<32}{'rows':>12}{'rows/s':>14}{'peak MB':>12}{'output MB':>12}")
+    current = run_benchmarks(args.rows, args.seed, parse_cardinality(args.cardinality),
+                             args.repeat, args.only)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for setting in ('seed', 'cardinality', 'cpu_count'):
+            if baseline['meta'].get(setting) != current['meta'][setting]:
+                print(f"⚠️  Baseline was run with a different {setting}: "
+                      f"{baseline['meta'].get(setting)} vs {current['meta'][setting]}")
+        regressions = compare_results(baseline, current, args.tolerance)
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+            return 0
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} against {args.compare}:")
+        for r in regressions:
+            print(f"   • {r['benchmark']} @ {r['rows']:,} rows: {r['metric']} "
+                  f"{r['baseline']:,.0f} → {r['current']:,.0f} ({r['change']:+.1%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_service.py - Latency and throughput of the warm transform service
+Starts service.py on a free local port, sends single records and
+micro-batches over one keep-alive HTTP connection and reports the p50/p99
+round-trip latency and requests per second of each batch size, next to the
+in-process cost of the fast path and of the batch functions.
+Run with: python benchmarks/bench_service.py --requests 2000 --batch 1 8 64 256
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datagen import synthetic_frame
+from service import OnlineTransformer, fit_service_state, make_server
+
+
+def latency_report(latencies: list, seconds: float) -> tuple:
+    """(p50 ms, p99 ms, requests per second) of a list of request latencies."""
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    return float(p50), float(p99), len(latencies) / seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, default=100_000, help="training rows")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 8, 64, 256])
+    args = parser.parse_args(argv)
+
+    df = synthetic_frame(args.rows)
+    transformer = OnlineTransformer(fit_service_state(df))
+    records = json.loads(df.head(max(args.batch) * 16).to_json(orient='records'))
+
+    server = make_server(transformer, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    connection.connect()
+    # http.client sends headers and body separately, like the server
+    connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    print(f"{args.requests:,} requests per batch size, state fitted on {args.rows:,} rows\n")
+    print(f"{'batch':>6}{'path':>7}{'p50 (ms)':>11}{'p99 (ms)':>11}{'req/s':>10}"
+          f"{'records/s':>12}{'in-process (ms)':>17}{'batch fns (ms)':>16}")
+    try:
+        for size in args.batch:
+            batches = [records[i:i + size] for i in range(0, len(records) - size + 1, size)]
+            bodies = [json.dumps({'records': batch}).encode() for batch in batches]
+            latencies = []
+            start = time.perf_counter()
+            for i in range(args.requests):
+                sent = time.perf_counter()
+                connection.request("POST", "/transform", bodies[i % len(bodies)],
+                                   {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                latencies.append(time.perf_counter() - sent)
+            p50, p99, rps = latency_report(latencies, time.perf_counter() - start)
+
+            in_process = [transformer.transform, transformer.transform_frame]
+            costs = []
+            for transform in in_process:
+                runs = 200 if transform is transformer.transform else 20
+                begin = time.perf_counter()
+                for i in range(runs):
+                    transform(batches[i % len(batches)])
+                costs.append((time.perf_counter() - begin) / runs * 1000)
+            path = "fast" if transformer.fast_path_applies(batches[0]) else "frame"
+            print(f"{size:>6}{path:>7}{p50:>11.3f}{p99:>11.3f}{rps:>10,.0f}{rps * size:>12,.0f}"
+                  f"{costs[0]:>17.3f}{costs[1]:>16.3f}")
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_sharding.py - Scaling of a sharded run from 1 to N worker processes
+Splits seeded synthetic rows over many CSV shards, runs run_pipeline on the
+shard folder with a growing number of workers and reports the wall-clock
+time, the speed-up over one worker and the parallel efficiency.
+Run with: python benchmarks/bench_sharding.py --rows 2000000 --shards 32 --jobs 1 2 4 8
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_feature_spec import best_time
+from datagen            import write_synthetic_shards
+from main               import OUTPUT_FILES, run_pipeline
+
+
+def _default_jobs() -> list:
+    """1, 2, 4, ... up to the CPUs available."""
+    cpus = os.cpu_count() or 1
+    jobs = [1]
+    while jobs[-1] * 2 <= cpus:
+        jobs.append(jobs[-1] * 2)
+    return jobs + ([cpus] if jobs[-1] != cpus else [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--jobs", type=int, nargs="+", default=None,
+                        help="worker counts to compare (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+    jobs_list = args.jobs or _default_jobs()
+
+    with tempfile.TemporaryDirectory(prefix="group6_bench_") as tmp:
+        folder = os.path.join(tmp, "shards")
+        write_synthetic_shards(folder, args.rows, args.shards)
+        outputs = {name: os.path.join(tmp, "output", os.path.basename(path))
+                   for name, path in OUTPUT_FILES.items()}
+
+        def run(jobs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_pipeline(folder, outputs, jobs=jobs)
+
+        print(f"{args.rows:,} rows in {args.shards} shards, {os.cpu_count()} CPUs\n")
+        print(f"{'workers':>8}{'wall (s)':>12}{'rows/s':>14}{'speed-up':>10}{'efficiency':>12}")
+        baseline = None
+        for jobs in jobs_list:
+            seconds = best_time(lambda: run(jobs), args.repeat)
+            # Relative to the first (smallest) worker count
+            baseline = baseline or seconds
+            speedup = baseline / seconds
+            efficiency = speedup * jobs_list[0] / jobs
+            print(f"{jobs:>8}{seconds:>12.3f}{args.rows / seconds:>14,.0f}"
+                  f"{speedup:>9.2f}x{efficiency:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
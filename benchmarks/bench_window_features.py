@@ -0,0 +1,101 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/bench_window_features.py - Pairwise vs. sorted-index trailing-window counts
+Times the hires-in-the-last-N-days count per department three ways as the rows
+grow: comparing every row with every other row of its department (only up
+to --pairwise-rows), a pandas groupby().rolling() over a date index, and
+window_features, which sorts once and uses searchsorted. The last one is also
+streamed in chunks over a date-sorted input. All of them give the same counts.
+Run with: python benchmarks/bench_window_features.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_feature_spec import best_time
+from datagen            import synthetic_frame
+from window_features    import WindowState, window_features
+
+DAYS = 90
+
+
+def pairwise_counts(df: pd.DataFrame) -> np.ndarray:
+    """Each row compared with every row of its department: O(n^2) per department."""
+    counts = np.zeros(len(df), dtype=np.int64)
+    days = df['join_date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+    for rows in df.groupby('department', sort=False).indices.values():
+        group = days[rows]
+        for i, day in zip(rows, group):
+            counts[i] = np.count_nonzero((group >= day - DAYS) & (group < day))
+    return counts
+
+
+def rolling_counts(df: pd.DataFrame) -> np.ndarray:
+    """pandas time-based rolling windows per department (ties need a second pass)."""
+    ordered = df.sort_values('join_date', kind='stable')
+    per_day = ordered.groupby(['department', 'join_date'], sort=True).size()
+    frame = per_day.rename('hires').reset_index().set_index('join_date')
+    # Windows closed on the left hold days d-N to d-1, like window_features
+    rolled = frame.groupby('department')['hires'].rolling(f"{DAYS}D", closed='left').sum()
+    lookup = rolled.fillna(0).astype(np.int64)
+    keys = pd.MultiIndex.from_frame(df[['department', 'join_date']])
+    return lookup.reindex(keys).to_numpy()
+
+
+def sorted_counts(df: pd.DataFrame) -> np.ndarray:
+    """window_features: one sort, then searchsorted per distinct (department, day)."""
+    return window_features(df, [DAYS], 'department')[f'hires_{DAYS}d'].to_numpy()
+
+
+def streamed_counts(df: pd.DataFrame, chunksize: int) -> np.ndarray:
+    """window_features over a date-sorted input, one chunk at a time."""
+    state = WindowState()
+    parts = [state.features(df.iloc[start:start + chunksize], [DAYS], 'department')
+             for start in range(0, len(df), chunksize)]
+    return pd.concat(parts)[f'hires_{DAYS}d'].to_numpy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--pairwise-rows", type=int, default=20_000,
+                        help="largest input the O(n^2) comparison is timed on")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print(f"hires in the last {DAYS} days per department, {args.departments} departments\n")
+    print(f"{'rows':>10}  {'method':<22}{'seconds':>10}{'speed-up':>10}")
+    for rows in args.rows:
+        df = synthetic_frame(rows, cardinality={'department': args.departments})
+        df['join_date'] = pd.to_datetime(df['join_date'])
+        df = df.sort_values('join_date', kind='stable', ignore_index=True)
+        expected = sorted_counts(df)
+
+        methods = {
+            'rolling (pandas)' : lambda: rolling_counts(df),
+            'sorted searchsorted': lambda: sorted_counts(df),
+            f'streamed x{args.chunksize:,}': lambda: streamed_counts(df, args.chunksize),
+        }
+        if rows <= args.pairwise_rows:
+            methods = {'pairwise': lambda: pairwise_counts(df), **methods}
+
+        baseline = None
+        for method, run in methods.items():
+            if not np.array_equal(run(), expected):
+                raise AssertionError(f"{method} counts differ from window_features")
+            seconds = best_time(run, args.repeat)
+            baseline = baseline or seconds
+            print(f"{rows:>10,}  {method:<22}{seconds:>10.3f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Group 6 - Feature Engineering
+benchmarks/datagen.py - Seeded synthetic data with the input/data.csv schema
+Generates id,name,age,salary,department,join_date,score,category rows at any
+size, with a configurable number of distinct values per text column. Large
+files are written chunk by chunk, so 50M rows never sit in memory at once.
+Run with: python benchmarks/datagen.py --rows 1000000 --output input/big.csv
+      or: python benchmarks/datagen.py --rows 1000000 --shards 16 --output input/shards
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Distinct values per text column (join_date counts distinct days)
+DEFAULT_CARDINALITY = {
+    'name'      : 5,
+    'department': 3,
+    'join_date' : 7000,
+    'category'  : 3,
+}
+
+# Rows generated (and written) at a time by write_synthetic_csv
+GENERATE_CHUNKSIZE = 1_000_000
+
+_BASE_VALUES = {
+    'name'      : ['Alice', 'Bob', 'Charlie', 'Diana', 'Eve'],
+    'department': ['HR', 'IT', 'Finance'],
+    'category'  : ['A', 'B', 'C'],
+}
+_FIRST_JOIN_DATE = pd.Timestamp("2005-01-01")
+
+
+def _vocabulary(column: str, size: int) -> np.ndarray:
+    """The first `size` values of a text column: the real ones, then numbered extras."""
+    base = _BASE_VALUES[column]
+    extra = [f"{base[0]}{i}" for i in range(size - len(base))]
+    return np.array((base + extra)[:size], dtype=object)
+
+
+def resolve_cardinality(cardinality: dict = None) -> dict:
+    """Fills unspecified columns with DEFAULT_CARDINALITY and validates the counts."""
+    resolved = dict(DEFAULT_CARDINALITY)
+    for column, size in (cardinality or {}).items():
+        if column not in DEFAULT_CARDINALITY:
+            raise ValueError(f"Unknown column {column!r}; expected one of {sorted(DEFAULT_CARDINALITY)}")
+        if size < 1:
+            raise ValueError(f"Cardinality of {column!r} must be a positive integer")
+        resolved[column] = size
+    return resolved
+
+
+def synthetic_frame(rows: int, seed: int = 6, cardinality: dict = None,
+                    first_id: int = 1) -> pd.DataFrame:
+    """
+    Builds a dataframe with the input/data.csv schema and `rows` rows.
+
+    Args:
+        rows        (int) : Number of rows.
+        seed        (int) : Random seed; the same seed gives the same rows.
+        cardinality (dict): Column -> distinct values, overriding DEFAULT_CARDINALITY.
+        first_id    (int) : Value of the first `id`.
+
+    Returns:
+        pd.DataFrame: The generated rows.
+    """
+    sizes = resolve_cardinality(cardinality)
+    rng = np.random.default_rng(seed)
+    join_days = _FIRST_JOIN_DATE + pd.to_timedelta(rng.integers(0, sizes['join_date'], rows), unit="D")
+    return pd.DataFrame({
+        'id'        : np.arange(first_id, first_id + rows),
+        'name'      : rng.choice(_vocabulary('name', sizes['name']), rows),
+        'age'       : rng.integers(18, 70, rows),
+        'salary'    : rng.integers(20_000, 200_000, rows),
+        'department': rng.choice(_vocabulary('department', sizes['department']), rows),
+        'join_date' : join_days.strftime('%Y-%m-%d'),
+        'score'     : rng.integers(1, 100, rows),
+        'category'  : rng.choice(_vocabulary('category', sizes['category']), rows),
+    })
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 6, cardinality: dict = None,
+                        chunksize: int = GENERATE_CHUNKSIZE) -> str:
+    """
+    Writes a synthetic CSV chunk by chunk.
+
+    Chunk i is generated from the seed sequence (seed, i), so a file is
+    reproducible for a given seed and chunksize.
+
+    Returns:
+        str: path
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        for i, start in enumerate(range(0, max(rows, 1), chunksize)):
+            size = min(chunksize, rows - start)
+            chunk = synthetic_frame(size, [seed, i], cardinality, first_id=start + 1)
+            chunk.to_csv(f, index=False, header=(i == 0))
+    return path
+
+
+def write_synthetic_shards(folder: str, rows: int, shards: int, seed: int = 6,
+                           cardinality: dict = None) -> list:
+    """
+    Writes `rows` synthetic rows split evenly over `shards` CSV files.
+
+    Shard i is generated from the seed sequence (seed, i) and ids continue
+    across shards, so together they form one reproducible dataset.
+
+    Returns:
+        list: Paths of the shards (part-00000.csv, part-00001.csv, ...).
+    """
+    os.makedirs(folder, exist_ok=True)
+    bounds = np.linspace(0, rows, shards + 1).astype(int)
+    paths = []
+    for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        path = os.path.join(folder, f"part-{i:05d}.csv")
+        synthetic_frame(stop - start, [seed, i], cardinality, first_id=start + 1) \
+            .to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def parse_cardinality(pairs: list) -> dict:
+    """Parses command-line `column=count` pairs."""
+    cardinality = {}
+    for pair in pairs or []:
+        column, _, count = pair.partition("=")
+        if not count.isdigit():
+            raise ValueError(f"Expected column=count, got {pair!r}")
+        cardinality[column] = int(count)
+    return resolve_cardinality(cardinality)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=6)
+    parser.add_argument("--cardinality", nargs="*", default=[], metavar="COLUMN=COUNT",
+                        help=f"distinct values per column (default: {DEFAULT_CARDINALITY})")
+    parser.add_argument("--output", default="input/synthetic.csv")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="split the rows over this many CSV files in the --output folder")
+    args = parser.parse_args(argv)
+    cardinality = parse_cardinality(args.cardinality)
+    if args.shards:
+        write_synthetic_shards(args.output, args.rows, args.shards, args.seed, cardinality)
+        print(f"Wrote {args.rows:,} rows in {args.shards} shards to {args.output}/")
+        return
+    write_synthetic_csv(args.output, args.rows, args.seed, cardinality)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
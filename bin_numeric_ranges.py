@@ -4,11 +4,223 @@ Function 3: bin_numeric_ranges
 Bins continuous numeric columns into labeled categorical range groups.
 """
 
-import pandas as pd
+import json
 import os
 
+import numpy as np
+import pandas as pd
+
+from pipeline_io  import load_input, save_output
+from feature_spec import load_spec
+from sketches     import QuantileSketch
+
+# Columns this function reads, and the dtypes they are loaded with
+INPUT_COLUMNS = ['age', 'salary', 'score']
+INPUT_DTYPES  = {}
+
+# Bump when this function's output changes, so cached outputs are recomputed
+STAGE_VERSION = 1
+
+# Output column -> bin spec. A spec bins one source `column` either at fixed
+# `edges` or at `quantiles` of the data learned by fit_bins (e.g.
+# [0, 0.25, 0.5, 0.75, 1] for quartiles). Buckets are (e0, e1], (e1, e2], ...
+# with right=True, [e0, e1), ... with right=False; include_lowest also puts
+# values equal to the first edge in the first bucket (the default for
+# quantile edges, so the minimum is binned).
+BIN_SPECS = {
+    'age_group'   : {'column': 'age', 'edges': [0, 25, 35, 45, 100],
+                     'labels': ['Young', 'Adult', 'Mid-Age', 'Senior']},
+    'salary_range': {'column': 'salary', 'edges': [0, 50000, 80000, 120000, float('inf')],
+                     'labels': ['Entry', 'Mid', 'Senior', 'Executive']},
+    'score_grade' : {'column': 'score', 'edges': [0, 49, 70, 85, 100],
+                     'labels': ['Fail', 'Pass', 'Good', 'Excellent']},
+}
+
+BINS_VERSION = 1
+
+# Label dictionary saved next to an output written as integer codes
+LABELS_SUFFIX = ".labels.json"
+
+
+def _check_spec(name: str, spec: dict) -> None:
+    """Raises ValueError when a bin spec is incomplete or inconsistent."""
+    if ('edges' in spec) == ('quantiles' in spec):
+        raise ValueError(f"Bin spec {name!r} needs exactly one of 'edges' or 'quantiles'")
+    bounds = spec.get('edges', spec.get('quantiles'))
+    if len(spec['labels']) != len(bounds) - 1:
+        raise ValueError(f"Bin spec {name!r} has {len(bounds) - 1} buckets "
+                         f"but {len(spec['labels'])} labels")
+    if len(spec['labels']) > np.iinfo(np.int8).max:
+        raise ValueError(f"Bin spec {name!r} has more buckets than int8 codes can hold")
+    if not _increasing(bounds):
+        kind = 'edges' if 'edges' in spec else 'quantiles'
+        raise ValueError(f"Bin spec {name!r} needs strictly increasing {kind}, got {list(bounds)}")
+
+
+def _increasing(edges) -> bool:
+    """Whether edges are strictly increasing (so every bucket is non-empty)."""
+    edges = np.asarray(edges, dtype=float)
+    return bool((edges[1:] > edges[:-1]).all())
+
+
+def fit_bins(input_file: str | list | pd.DataFrame, specs: dict | str | None = None,
+             artifact_file: str | None = None, chunksize: int | None = None) -> dict:
+    """
+    Resolves bin specs into fixed edges, learning quantile edges from the data.
+
+    Args:
+        input_file    (str | list | pd.DataFrame): Path to the input file, a
+                       list of paths (e.g. input shards), or an already
+                       loaded dataframe.
+        specs         (dict | str | None): Output column -> bin spec (see
+                       BIN_SPECS), or a YAML/JSON file holding them.
+                       None uses BIN_SPECS.
+        artifact_file (str | None): Where to save the fitted bins as JSON.
+                       None only returns them.
+        chunksize     (int | None): Read CSV paths in chunks of this many rows,
+                       so files larger than memory can be fitted. Every
+                       chunk or shard updates one quantile sketch per column.
+
+    Returns:
+        dict: The fitted bins: output column -> {'column', 'edges', 'labels',
+        'right', 'include_lowest'}. The labels are the code -> label
+        dictionary of integer-coded output.
+    """
+    specs = load_spec(specs) if isinstance(specs, str) else (specs or BIN_SPECS)
+    for name, spec in specs.items():
+        _check_spec(name, spec)
+    learned = {name: spec for name, spec in specs.items() if 'quantiles' in spec}
+
+    edges = {}
+    if learned:
+        columns = sorted({spec['column'] for spec in learned.values()})
+        sketches = {col: QuantileSketch() for col in columns}
+        sources = input_file if isinstance(input_file, list) else [input_file]
+        if chunksize:
+            frames = (chunk for path in sources
+                      for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize))
+        else:
+            frames = (load_input(source, columns, INPUT_DTYPES) for source in sources)
+        for frame in frames:
+            for col, sketch in sketches.items():
+                sketch.update(frame[col].to_numpy())
+        for name, spec in learned.items():
+            sketch = sketches[spec['column']]
+            edges[name] = [float(sketch.quantile(q)) for q in spec['quantiles']]
+            # A column with few distinct values (or none) gives repeated edges
+            if not _increasing(edges[name]):
+                raise ValueError(f"Bin spec {name!r} learned repeated quantile edges "
+                                 f"{edges[name]} from column {spec['column']!r}; "
+                                 f"use fewer quantiles or fixed edges")
+
+    bins = {
+        'version': BINS_VERSION,
+        'bins': {
+            name: {
+                'column'        : spec['column'],
+                'edges'         : [float(edge) for edge in edges.get(name, spec.get('edges'))],
+                'labels'        : list(spec['labels']),
+                'right'         : spec.get('right', True),
+                'include_lowest': spec.get('include_lowest', 'quantiles' in spec),
+            }
+            for name, spec in specs.items()
+        },
+    }
+    if artifact_file is not None:
+        save_bins(bins, artifact_file)
+    return bins
+
+
+def save_bins(bins: dict, artifact_file: str) -> None:
+    """Saves fitted bins (and so their label dictionary) as a small JSON artifact."""
+    os.makedirs(os.path.dirname(artifact_file) or ".", exist_ok=True)
+    with open(artifact_file, "w") as f:
+        json.dump(bins, f, indent=2)
+
+
+def load_bins(artifact_file: str) -> dict:
+    """Loads bins saved by fit_bins / save_bins."""
+    with open(artifact_file) as f:
+        bins = json.load(f)
+    if bins.get('version') != BINS_VERSION:
+        raise ValueError(f"Unsupported bins artifact version in {artifact_file}: "
+                         f"{bins.get('version')!r}")
+    return bins
+
 
-def bin_numeric_ranges(input_file: str, output_file: str) -> pd.DataFrame:
+def bin_codes(values, edges, right: bool = True, include_lowest: bool = False) -> np.ndarray:
+    """
+    Bucket of each value as int8 codes, -1 for missing or out-of-range values.
+
+    One np.searchsorted over the sorted edges; the buckets match pd.cut.
+    Raises ValueError when the edges are not strictly increasing.
+    """
+    values = np.asarray(values, dtype=float)
+    edges = np.asarray(edges, dtype=float)
+    if len(edges) < 2 or not _increasing(edges):
+        raise ValueError(f"Bin edges must be at least two strictly increasing values, "
+                         f"got {edges.tolist()}")
+    codes = np.searchsorted(edges, values, side='left' if right else 'right') - 1
+    if include_lowest:
+        codes[values == edges[0]] = 0
+    # NaN sorts after every edge, so it lands past the last bucket as well
+    codes[(codes < 0) | (codes >= len(edges) - 1)] = -1
+    return codes.astype(np.int8)
+
+
+def _resolve_bins(bins: dict | str | None) -> dict:
+    """Fitted bins from a dict, a saved artifact, or the fixed BIN_SPECS for None."""
+    if bins is None:
+        return fit_bins(pd.DataFrame(), BIN_SPECS)
+    return load_bins(bins) if isinstance(bins, str) else bins
+
+
+def label_dictionary(bins: dict) -> dict:
+    """Output column -> {code: label} of integer-coded bins."""
+    return {name: dict(enumerate(spec['labels'])) for name, spec in bins['bins'].items()}
+
+
+def save_label_dictionary(bins: dict | str | None, output_file: str) -> str:
+    """
+    Saves the label dictionary of integer-coded output next to it.
+
+    Returns:
+        str: The dictionary's path, <output_file>.labels.json.
+    """
+    path = output_file + LABELS_SUFFIX
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(label_dictionary(_resolve_bins(bins)), f, indent=2)
+    return path
+
+
+def apply_bins(df: pd.DataFrame, bins: dict, codes: bool = False) -> pd.DataFrame:
+    """
+    Adds one bin column per fitted spec.
+
+    Args:
+        df    (pd.DataFrame): The data to bin (modified in place).
+        bins  (dict)        : Fitted bins from fit_bins.
+        codes (bool)        : Add int8 codes (-1 = not binned) instead of
+                              ordered categoricals of the labels.
+
+    Returns:
+        pd.DataFrame: The same dataframe with the bin columns added.
+    """
+    for name, spec in bins['bins'].items():
+        column_codes = bin_codes(df[spec['column']], spec['edges'], spec['right'],
+                                 spec['include_lowest'])
+        if codes:
+            df[name] = column_codes
+        else:
+            df[name] = pd.Categorical.from_codes(column_codes, categories=spec['labels'],
+                                                 ordered=True)
+    return df
+
+
+def bin_numeric_ranges(input_file: str | pd.DataFrame, output_file: str | None,
+                       *, project: bool = False, bins: dict | str | None = None,
+                       codes: bool = False) -> pd.DataFrame:
     """
     Bins numeric columns into labeled range groups (categorical buckets).
 
@@ -18,43 +230,34 @@ def bin_numeric_ranges(input_file: str, output_file: str) -> pd.DataFrame:
     - score_grade  : Fail (<50), Pass (50-70), Good (70-85), Excellent (85+)
 
     Args:
-        input_file  (str): Path to the input CSV file.
-        output_file (str): Path where the processed CSV will be saved.
+        input_file  (str | pd.DataFrame): Path to the input CSV file, or an
+                     already loaded dataframe (it is never modified).
+        output_file (str | None): Path where the processed CSV will be saved.
+                     None keeps the result in memory only.
+        project     (bool): Read and keep only `id` and the binned columns, so
+                     the output holds the key, the used columns and the new ones.
+        bins        (dict | str | None): Fitted bins, or the path of a saved
+                     artifact. None fits BIN_SPECS on this input.
+        codes       (bool): Write int8 bucket codes (-1 = not binned) instead
+                     of labels; the code -> label dictionary is saved next to
+                     the output as <output>.labels.json.
 
     Returns:
         pd.DataFrame: The processed dataframe with new bin columns.
     """
-    # Load the CSV
-    df = pd.read_csv(input_file)
-
-    # Bin age into labeled groups
-    df['age_group'] = pd.cut(
-        df['age'],
-        bins=[0, 25, 35, 45, 100],
-        labels=['Young', 'Adult', 'Mid-Age', 'Senior'],
-        right=True
-    )
+    bins = _resolve_bins(bins)
 
-    # Bin salary into pay grade ranges
-    df['salary_range'] = pd.cut(
-        df['salary'],
-        bins=[0, 50000, 80000, 120000, float('inf')],
-        labels=['Entry', 'Mid', 'Senior', 'Executive'],
-        right=True
-    )
+    # Load the CSV (or take the shared in-memory dataframe)
+    columns = list(dict.fromkeys(spec['column'] for spec in bins['bins'].values()))
+    df = load_input(input_file, columns if project else None, INPUT_DTYPES)
 
-    # Bin score into performance grades
-    df['score_grade'] = pd.cut(
-        df['score'],
-        bins=[0, 49, 70, 85, 100],
-        labels=['Fail', 'Pass', 'Good', 'Excellent'],
-        right=True
-    )
+    # Bin every configured column with one searchsorted each
+    df = apply_bins(df, bins, codes)
 
-    # Save output
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_csv(output_file, index=False)
-    print(f"[bin_numeric_ranges] ✅ Saved to: {output_file}")
+    # Save output, with the label dictionary of integer codes next to it
+    save_output(df, output_file, "bin_numeric_ranges")
+    if codes and output_file is not None:
+        save_label_dictionary(bins, output_file)
     return df
 
 
@@ -0,0 +1,181 @@
+"""
+Group 6 - Feature Engineering
+date_parsing.py - Fast, memoized parsing of repetitive date columns
+Parses each distinct date string once, with a fixed format instead of
+per-value format inference, and remembers the results in a bounded LRU cache
+shared by every chunk and every run in the same process.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Formats tried, in order, when no date format is given. Month-first comes
+# before day-first, like pandas, so '03/04/2021' is March 4th either way
+DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%Y%m%d',
+)
+
+# Distinct values sampled when detecting the format. factorize_dates falls
+# back to pandas' own inference when a value outside the sample does not fit
+FORMAT_SAMPLE_SIZE = 100
+
+# Parsed values remembered by the shared cache
+DEFAULT_CACHE_SIZE = 100_000
+
+
+def detect_date_format(values) -> str | None:
+    """
+    Finds a fixed format that parses a sample of the given date strings.
+
+    Args:
+        values: Distinct date strings (missing values are ignored).
+
+    Returns:
+        str | None: The first of DATE_FORMATS that parses every sampled value,
+        or None when none does (pandas then infers the format).
+    """
+    sample = pd.Series(values, dtype=object).dropna()[:FORMAT_SAMPLE_SIZE]
+    if not len(sample):
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            pd.to_datetime(sample, format=fmt)
+        except (ValueError, TypeError):
+            continue
+        return fmt
+    return None
+
+
+class DateCache:
+    """
+    Bounded LRU cache of parsed dates, keyed by (format, date string).
+
+    Only values that are not cached yet reach pd.to_datetime, so a column
+    made of a few thousand distinct days costs one parse per day for the
+    whole process, however many rows, chunks or runs it is spread over.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self) -> None:
+        """Forgets every cached value and resets the counters."""
+        self._values.clear()
+        self.hits = self.misses = 0
+
+    def parse(self, strings, fmt: str | None) -> pd.DatetimeIndex:
+        """
+        Parses distinct date strings, using cached values where possible.
+
+        Args:
+            strings: Distinct, non-missing date strings.
+            fmt (str | None): strptime format, or None to let pandas infer it.
+
+        Returns:
+            pd.DatetimeIndex: One parsed date per string, in the same order.
+        """
+        strings = np.asarray(strings, dtype=object)
+        if len(strings) > self.maxsize:
+            # Would only evict itself; parse directly and leave the cache alone
+            self.misses += len(strings)
+            return pd.DatetimeIndex(pd.to_datetime(strings, format=fmt))
+
+        parsed = [None] * len(strings)
+        todo = []
+        for i, value in enumerate(strings):
+            key = (fmt, value)
+            if key in self._values:
+                self._values.move_to_end(key)
+                parsed[i] = self._values[key]
+            else:
+                todo.append(i)
+        self.hits += len(strings) - len(todo)
+        self.misses += len(todo)
+
+        if todo:
+            fresh = pd.to_datetime(strings[todo], format=fmt).to_numpy()
+            for i, value in zip(todo, fresh):
+                parsed[i] = value
+                self._values[(fmt, strings[i])] = value
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return pd.DatetimeIndex(np.array(parsed))
+
+
+# Cache used when no other is given, shared by every caller in this process
+DATE_CACHE = DateCache()
+
+
+def factorize_dates(series: pd.Series, fmt: str | None = None,
+                    cache: DateCache | None = None) -> tuple:
+    """
+    Splits a date column into integer codes and its parsed distinct values.
+
+    Each distinct string is parsed once (through the cache); features can be
+    computed on the distinct dates and broadcast back with the codes.
+
+    Args:
+        series (pd.Series)  : Date strings, as text, category or datetimes.
+        fmt    (str | None) : strptime format. None detects one of DATE_FORMATS,
+                              or lets pandas infer it when none fits every value.
+        cache  (DateCache)  : Cache to use. Defaults to the shared DATE_CACHE.
+
+    Returns:
+        tuple: (codes, dates) where codes is an int array with -1 for missing
+        values and dates is a DatetimeIndex, so row i is dates[codes[i]].
+    """
+    cache = DATE_CACHE if cache is None else cache
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy().astype(np.intp)
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    if pd.api.types.is_datetime64_any_dtype(uniques):
+        return codes, pd.DatetimeIndex(uniques)
+
+    strings = np.asarray(uniques, dtype=object)
+    if fmt is None:
+        detected = detect_date_format(strings)
+        if detected is not None:
+            try:
+                return codes, cache.parse(strings, detected)
+            except (ValueError, TypeError):
+                pass  # A value outside the sample has another format
+    return codes, cache.parse(strings, fmt)
+
+
+def broadcast(values, codes: np.ndarray, missing=np.nan) -> np.ndarray:
+    """
+    Expands per-distinct-date values to one value per row.
+
+    Args:
+        values  : One value per distinct date.
+        codes   (np.ndarray): Row -> distinct date position, -1 when missing.
+        missing : Value given to rows whose date is missing.
+
+    Returns:
+        np.ndarray: values[codes], with `missing` where the code is -1. The
+        dtype of `values` is kept when no row is missing.
+    """
+    values = np.asarray(values)
+    if (codes >= 0).all():
+        return values[codes]
+    # code -1 picks the trailing missing value
+    return np.append(values, missing)[codes]
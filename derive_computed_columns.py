@@ -5,10 +5,24 @@ Adds new computed/derived columns from existing numeric data.
 """
 
 import pandas as pd
-import os
 
+from feature_spec import STAGE_SPECS, compile_spec
+from pipeline_io  import load_input, save_output
 
-def derive_computed_columns(input_file: str, output_file: str) -> pd.DataFrame:
+# Columns this function reads, and the dtypes they are loaded with
+INPUT_COLUMNS = ['age', 'salary', 'score']
+INPUT_DTYPES  = {}
+
+# Bump when this function's output changes, so cached outputs are recomputed
+STAGE_VERSION = 1
+
+# The new columns, compiled once into whole-column NumPy kernels (arithmetic,
+# np.where and np.select; see feature_spec.STAGE_SPECS), so no Python runs per row
+COMPILED_SPEC = compile_spec(STAGE_SPECS["derived_computed_columns"])
+
+
+def derive_computed_columns(input_file: str | pd.DataFrame, output_file: str | None,
+                            *, project: bool = False) -> pd.DataFrame:
     """
     Derives new computed columns from existing data in a CSV file.
 
@@ -20,28 +34,25 @@ def derive_computed_columns(input_file: str, output_file: str) -> pd.DataFrame:
     - score_rank         : normalized score out of 10
 
     Args:
-        input_file  (str): Path to the input CSV file.
-        output_file (str): Path where the processed CSV will be saved.
+        input_file  (str | pd.DataFrame): Path to the input CSV file, or an
+                     already loaded dataframe (it is never modified).
+        output_file (str | None): Path where the processed CSV will be saved.
+                     None keeps the result in memory only.
+        project     (bool): Read and keep only `id` and INPUT_COLUMNS, so the
+                     output holds the key, the used columns and the new ones.
 
     Returns:
         pd.DataFrame: The processed dataframe with new columns.
     """
-    # Load the CSV
-    df = pd.read_csv(input_file)
-
-    # Derived columns
-    df['salary_per_age'] = (df['salary'] / df['age']).round(2)
-    df['annual_bonus']   = (df['salary'] * 0.10).round(2)
-    df['is_senior']      = df['age'].apply(lambda x: 1 if x >= 40 else 0)
-    df['salary_level']   = df['salary'].apply(
-        lambda x: 'High' if x > 90000 else ('Mid' if x > 55000 else 'Low')
-    )
-    df['score_rank'] = (df['score'] / 10).round(1)
+    # Load the CSV (or take the shared in-memory dataframe)
+    df = load_input(input_file, INPUT_COLUMNS if project else None, INPUT_DTYPES)
+
+    # Derived columns: salary_per_age, annual_bonus, is_senior (age >= 40),
+    # salary_level (High > 90000 >= Mid > 55000 >= Low) and score_rank
+    df = COMPILED_SPEC.transform(df)
 
     # Save output
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_csv(output_file, index=False)
-    print(f"[derive_computed_columns] ✅ Saved to: {output_file}")
+    save_output(df, output_file, "derive_computed_columns")
     return df
 
 
@@ -4,43 +4,358 @@ Function 2: encode_categorical_features
 Encodes categorical/text columns into numeric representations.
 """
 
-import pandas as pd
+import json
 import os
 
+import numpy as np
+import pandas as pd
+
+from pipeline_config import ONE_HOT_COLUMNS
+from pipeline_io     import load_input, save_output, sparse_one_hot
+
+# Columns this function reads, and the dtypes they are loaded with
+INPUT_COLUMNS = ['department', 'category']
+INPUT_DTYPES  = {'department': 'category'}
+
+# Bump when this function's output changes, so cached outputs are recomputed
+STAGE_VERSION = 2
+
+# ONE_HOT_COLUMNS (column -> prefix of its one-hot columns) comes from
+# pipeline_config, so main.py can check --hash-buckets without this module
+
+# Columns label encoded as <column>_encoded, with their fixed codes. A fitted
+# encoder keeps these and numbers any other values it sees after them, in
+# sorted order, so a code never depends on which values a batch happens to hold
+LABEL_CODES = {'category': {'A': 1, 'B': 2, 'C': 3}}
+LABEL_COLUMNS = list(LABEL_CODES)
+
+# Suffix of the one-hot column that catches values missing from the vocabulary;
+# label encoding uses UNKNOWN_CODE for them. Only fitted encoders add it: the
+# default encoding keeps the original layout, with NaN for unmapped labels
+UNKNOWN_SUFFIX = '_unknown'
+UNKNOWN_CODE   = 0
+
+ENCODER_VERSION = 1
+
+# dtype of sparse one-hot columns: int8 values, only the 1s are stored
+SPARSE_ONE_HOT_DTYPE = pd.SparseDtype(np.int8, 0)
+
+
+def fit_categorical_encoder(input_file: str | pd.DataFrame, artifact_file: str | None = None,
+                            chunksize: int | None = None,
+                            hash_buckets: dict | None = None) -> dict:
+    """
+    Learns the vocabularies used to encode the categorical columns.
+
+    Args:
+        input_file    (str | pd.DataFrame): Path to the input file, or an
+                       already loaded dataframe.
+        artifact_file (str | None): Where to save the vocabularies as JSON.
+                       None only returns them.
+        chunksize     (int | None): Read a CSV path in chunks of this many
+                       rows, so files larger than memory can be fitted.
+        hash_buckets  (dict | None): One-hot column -> number of buckets, e.g.
+                       {'department': 1024}. These columns are hashed into
+                       a fixed number of one-hot columns instead of getting
+                       one per value, and need no vocabulary.
+
+    Returns:
+        dict: The encoder: sorted one-hot values per column, a
+        value -> code label map per column and the hashed columns.
+    """
+    hashed = _hash_specs(hash_buckets)
+    columns = [col for col in ONE_HOT_COLUMNS if col not in hashed] + LABEL_COLUMNS
+    if isinstance(input_file, pd.DataFrame) or chunksize is None:
+        frames = [load_input(input_file, columns, INPUT_DTYPES)]
+    else:
+        frames = pd.read_csv(input_file, usecols=columns, chunksize=chunksize)
+
+    seen = {col: set() for col in columns}
+    for frame in frames:
+        for col in columns:
+            seen[col].update(_as_text(frame[col]).dropna().unique().tolist())
+
+    encoder = _encoder_from_vocabularies(seen, hashed)
+    if artifact_file is not None:
+        save_encoder(encoder, artifact_file)
+    return encoder
 
-def encode_categorical_features(input_file: str, output_file: str) -> pd.DataFrame:
+
+def _hash_specs(hash_buckets: dict | None) -> dict:
+    """Validated {column: {'prefix', 'buckets'}} of the hashed one-hot columns."""
+    hash_buckets = hash_buckets or {}
+    unknown = set(hash_buckets) - set(ONE_HOT_COLUMNS)
+    if unknown:
+        raise ValueError(f"Only one-hot columns can be hashed ({list(ONE_HOT_COLUMNS)}), "
+                         f"got {sorted(unknown)}")
+    for col, buckets in hash_buckets.items():
+        if not isinstance(buckets, int) or buckets < 1:
+            raise ValueError(f"Hash buckets of {col!r} must be a positive integer, got {buckets!r}")
+    return {col: {'prefix': ONE_HOT_COLUMNS[col], 'buckets': buckets}
+            for col, buckets in hash_buckets.items()}
+
+
+def _encoder_from_vocabularies(seen: dict, hashed: dict = None) -> dict:
+    """Builds the encoder from the set of values seen per column."""
+    encoder = {
+        'version': ENCODER_VERSION,
+        'one_hot': {
+            col: {'prefix': prefix, 'values': sorted(seen[col])}
+            for col, prefix in ONE_HOT_COLUMNS.items() if col not in (hashed or {})
+        },
+        'label': {col: _label_codes(col, seen[col]) for col in LABEL_COLUMNS},
+    }
+    if hashed:
+        encoder['hash'] = hashed
+    return encoder
+
+
+def _label_codes(col: str, seen) -> dict:
+    """LABEL_CODES of a column, followed by the other seen values in sorted order."""
+    codes = dict(LABEL_CODES[col])
+    extra = sorted(set(seen) - set(codes))
+    codes.update({value: code for code, value in enumerate(extra, start=max(codes.values()) + 1)})
+    return codes
+
+
+def default_layout(encoder: dict) -> dict:
+    """
+    A fitted encoder switched to the default (original) layout.
+
+    The one-hot vocabularies (or hashing) are kept, but labels use
+    LABEL_CODES with NaN for other values, the one-hot columns are int64 and
+    there is no unknown column, like pd.get_dummies and the original mapping.
+    """
+    return {**encoder, 'label': {col: dict(codes) for col, codes in LABEL_CODES.items()},
+            'unknown': False}
+
+
+def batch_encoder(df: pd.DataFrame, hash_buckets: dict | None = None) -> dict:
+    """The default encoder: default_layout of the vocabularies of this batch."""
+    return default_layout(fit_categorical_encoder(df, hash_buckets=hash_buckets))
+
+
+def merge_encoders(encoders: list) -> dict:
+    """
+    Combines encoders fitted on separate parts of the input (e.g. shards).
+
+    The result equals fitting on all parts at once: the vocabularies are the
+    sorted union of the parts' vocabularies. The parts must hash the same
+    columns into the same number of buckets.
+    """
+    hashed = encoders[0].get('hash', {}) if encoders else {}
+    if any(encoder.get('hash', {}) != hashed for encoder in encoders):
+        raise ValueError("Encoders that hash different columns or bucket counts cannot be merged")
+    seen = {col: set() for col in list(ONE_HOT_COLUMNS) + LABEL_COLUMNS}
+    for encoder in encoders:
+        for col, spec in encoder['one_hot'].items():
+            seen[col].update(spec['values'])
+        for col, mapping in encoder['label'].items():
+            seen[col].update(mapping)
+    return _encoder_from_vocabularies(seen, hashed)
+
+
+def save_encoder(encoder: dict, artifact_file: str) -> None:
+    """Saves fitted vocabularies as a small JSON artifact."""
+    os.makedirs(os.path.dirname(artifact_file) or ".", exist_ok=True)
+    with open(artifact_file, "w") as f:
+        json.dump(encoder, f, indent=2, sort_keys=True)
+
+
+def load_encoder(artifact_file: str) -> dict:
+    """Loads vocabularies saved by fit_categorical_encoder / save_encoder."""
+    with open(artifact_file) as f:
+        encoder = json.load(f)
+    if encoder.get('version') != ENCODER_VERSION:
+        raise ValueError(f"Unsupported encoder artifact version in {artifact_file}: "
+                         f"{encoder.get('version')!r}")
+    return encoder
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """
+    Returns the values as text, so vocabularies survive a JSON round trip.
+
+    Category columns only convert their distinct values.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if pd.api.types.is_string_dtype(series.cat.categories) or \
+                pd.api.types.is_object_dtype(series.cat.categories):
+            return series
+        return series.cat.rename_categories(series.cat.categories.astype(str))
+    if pd.api.types.is_string_dtype(series) or pd.api.types.is_object_dtype(series):
+        return series
+    return series.astype(str).where(series.notna())
+
+
+def _codes(series: pd.Series, values: list) -> np.ndarray:
+    """
+    Integer position of each value in `values`, or -1 when it is not in it.
+
+    Category columns only look up their distinct values.
+    """
+    index = pd.Index(values, dtype=object)
+    series = _as_text(series)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # code -1 (missing) picks the trailing -1
+        lookup = np.append(index.get_indexer(series.cat.categories.astype(object)), -1)
+        return lookup[series.cat.codes.to_numpy()]
+    return index.get_indexer(series.astype(object))
+
+
+def hash_codes(series: pd.Series, buckets: int) -> np.ndarray:
+    """
+    Hash bucket (0 .. buckets - 1) of each value, or -1 when it is missing.
+
+    pd.util.hash_array uses a fixed key, so a value lands in the same bucket
+    in every run, process and shard. Category columns only hash their
+    distinct values.
+    """
+    series = _as_text(series)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(object).to_numpy()
+        lookup = np.append((pd.util.hash_array(categories) % buckets).astype(np.int64), -1)
+        return lookup[series.cat.codes.to_numpy()]
+    values = series.astype(object).to_numpy()
+    codes = (pd.util.hash_array(values) % buckets).astype(np.int64)
+    codes[pd.isna(values)] = -1
+    return codes
+
+
+def _one_hot_names(spec: dict, unknown: bool = True) -> list:
+    """One-hot column names of one vocabulary (or hash buckets); the unknown bucket comes last."""
+    if 'buckets' in spec:
+        names = [f"{spec['prefix']}_h{bucket}" for bucket in range(spec['buckets'])]
+    else:
+        names = [f"{spec['prefix']}_{value}" for value in spec['values']]
+    return names + [f"{spec['prefix']}_{UNKNOWN_SUFFIX}"] * unknown
+
+
+def _one_hot_specs(encoder: dict) -> dict:
+    """Column -> vocabulary or hash spec of every one-hot column, in output order."""
+    return {**encoder['one_hot'], **encoder.get('hash', {})}
+
+
+def encoded_columns(encoder: dict) -> list:
+    """Returns the fixed list of columns an encoder adds, in output order."""
+    columns = []
+    for spec in _one_hot_specs(encoder).values():
+        columns += _one_hot_names(spec, encoder.get('unknown', True))
+    columns += [f"{col}_encoded" for col in encoder['label']]
+    return columns
+
+
+def _sparse_one_hot(codes: np.ndarray, names: list) -> dict:
+    """Name -> sparse int8 column of one-hot codes (0 .. len(names) - 1, -1 = no 1)."""
+    return dict(zip(names, sparse_one_hot(codes, len(names), SPARSE_ONE_HOT_DTYPE)))
+
+
+def apply_categorical_encoder(df: pd.DataFrame, encoder: dict,
+                              sparse: bool = False) -> pd.DataFrame:
+    """
+    Encodes a dataframe with fitted vocabularies.
+
+    The layout depends only on the encoder, never on the data: every
+    vocabulary value (or hash bucket) gets an int8 one-hot column, plus a
+    <prefix>__unknown column for values the vocabulary has not seen (and
+    missing values). Label encoded values it has not seen get UNKNOWN_CODE.
+    A batch_encoder instead gives int64 columns, leaves the one-hot columns
+    of unseen values all 0 and maps unseen labels to NaN.
+
+    Args:
+        df      (pd.DataFrame): The data to encode.
+        encoder (dict)        : Vocabularies from fit_categorical_encoder.
+        sparse  (bool)        : Make the one-hot columns SPARSE_ONE_HOT_DTYPE,
+                                storing only the position of each 1 instead
+                                of a rows x values int8 matrix.
+
+    Returns:
+        pd.DataFrame: df without the one-hot source columns, followed by the
+        encoded columns.
+    """
+    unknown = encoder.get('unknown', True)
+    new_columns = {}
+    for col, spec in _one_hot_specs(encoder).items():
+        names = _one_hot_names(spec, unknown)
+        if 'buckets' in spec:
+            codes = hash_codes(df[col], spec['buckets'])
+        else:
+            codes = _codes(df[col], spec['values'])
+        if unknown:
+            codes[codes < 0] = len(names) - 1  # unknown bucket is the last column
+        if sparse:
+            new_columns.update(_sparse_one_hot(codes, names))
+            continue
+        dense = np.zeros((len(df), len(names)), dtype=np.int8 if unknown else np.int64)
+        rows = np.flatnonzero(codes >= 0)
+        dense[rows, codes[rows]] = 1
+        new_columns.update({name: dense[:, i] for i, name in enumerate(names)})
+
+    for col, mapping in encoder['label'].items():
+        codes = _codes(df[col], list(mapping))
+        if unknown:
+            lookup = np.array(list(mapping.values()) + [UNKNOWN_CODE], dtype=np.int64)
+        elif (codes < 0).any():
+            lookup = np.array(list(mapping.values()) + [np.nan], dtype=float)
+        else:
+            lookup = np.array(list(mapping.values()), dtype=np.int64)
+        new_columns[f"{col}_encoded"] = lookup[codes]
+
+    df = df.drop(columns=list(_one_hot_specs(encoder)))
+    encoded = pd.DataFrame(new_columns, index=df.index)
+    return pd.concat([df, encoded], axis=1)
+
+
+def encode_categorical_features(input_file: str | pd.DataFrame, output_file: str | None,
+                                *, project: bool = False,
+                                encoder: dict | str | None = None,
+                                hash_buckets: dict | None = None,
+                                sparse: bool = False) -> pd.DataFrame:
     """
     Encodes categorical features in a CSV file into numeric values.
 
     Transformations applied:
-    - department : One-hot encoded into separate binary columns (dept_HR, dept_IT, etc.)
-    - category   : Label encoded using a mapping (A=1, B=2, C=3)
+    - department : One-hot encoded into separate binary columns (dept_HR, dept_IT, etc.),
+                   or into hash buckets (dept_h0, dept_h1, ...) when hashed
+    - category   : Label encoded using a mapping (A=1, B=2, C=3; others NaN)
+
+    A fitted encoder fixes the one-hot columns to its vocabulary, adds
+    dept__unknown for departments outside it and gives unseen categories
+    UNKNOWN_CODE (0).
 
     Args:
-        input_file  (str): Path to the input CSV file.
-        output_file (str): Path where the processed CSV will be saved.
+        input_file  (str | pd.DataFrame): Path to the input CSV file, or an
+                     already loaded dataframe (it is never modified).
+        output_file (str | None): Path where the processed CSV will be saved.
+                     None keeps the result in memory only.
+        project     (bool): Read and keep only `id` and INPUT_COLUMNS, so the
+                     output holds the key, the used columns and the new ones.
+        encoder     (dict | str | None): Fitted vocabularies, or the path of
+                     a saved artifact. None uses batch_encoder.
+        hash_buckets (dict | None): Column -> hash buckets of the default
+                     encoding (see fit_categorical_encoder). A given encoder
+                     keeps the hashing it was fitted with.
+        sparse      (bool): Sparse one-hot columns. save_output writes them
+                     to <output>.sparse.npz (CSR arrays) next to the other
+                     columns instead of as dense text.
 
     Returns:
         pd.DataFrame: The processed dataframe with encoded columns.
     """
-    # Load the CSV
-    df = pd.read_csv(input_file)
-
-    # One-hot encode 'department' column
-    df = pd.get_dummies(df, columns=['department'], prefix='dept')
+    # Load the CSV (or take the shared in-memory dataframe)
+    df = load_input(input_file, INPUT_COLUMNS if project else None, INPUT_DTYPES)
 
-    # Convert boolean columns (True/False) to int (1/0)
-    bool_cols = df.select_dtypes(include='bool').columns
-    df[bool_cols] = df[bool_cols].astype(int)
+    # The original encoding unless fitted vocabularies were given
+    if encoder is None:
+        encoder = batch_encoder(df, hash_buckets)
+    elif isinstance(encoder, str):
+        encoder = load_encoder(encoder)
 
-    # Label encode 'category' column
-    category_map = {'A': 1, 'B': 2, 'C': 3}
-    df['category_encoded'] = df['category'].map(category_map)
+    # One-hot encode 'department' and label encode 'category' from integer codes
+    df = apply_categorical_encoder(df, encoder, sparse)
 
     # Save output
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_csv(output_file, index=False)
-    print(f"[encode_categorical_features] ✅ Saved to: {output_file}")
+    save_output(df, output_file, "encode_categorical_features")
     return df
 
 
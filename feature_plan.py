@@ -0,0 +1,254 @@
+"""
+Group 6 - Feature Engineering
+feature_plan.py - Computes only the requested feature columns
+Every column of the feature specs (feature_spec.STAGE_SPECS) is registered
+with the columns it reads, which makes the five stages one dependency graph.
+For a request such as ['is_anomaly', 'age_group'] the planner keeps only the
+features the request needs (is_recent_hire pulls in join_year and the parsed
+join_date, not the other time features), computes features that have the
+same definition once, and reads only the input columns they use.
+"""
+
+import ast
+import json
+import sys
+
+import pandas as pd
+
+from feature_spec    import STAGE_SPECS, compile_spec
+from pipeline_config import STAGES
+from pipeline_io     import KEY_COLUMN, load_input, save_output
+
+# Spec entry keys holding an expression, and keys naming the column they read
+EXPRESSION_KEYS = ('expr', 'where')
+COLUMN_KEYS     = ('cut', 'map', 'one_hot')
+
+
+def build_registry(specs: dict = None) -> dict:
+    """
+    Registers every column of a set of feature specs.
+
+    Args:
+        specs (dict): Stage name -> feature spec. None uses STAGE_SPECS; pass
+                      {**STAGE_SPECS, 'mine': {...}} to add features.
+
+    Returns:
+        dict: Feature -> (stage name, spec entry), in spec order.
+    """
+    registry = {}
+    for stage, spec in (STAGE_SPECS if specs is None else specs).items():
+        for name, entry in spec.items():
+            if name in registry:
+                raise ValueError(f"Feature {name!r} is defined by both {registry[name][0]!r} "
+                                 f"and {stage!r}")
+            registry[name] = (stage, entry)
+    return registry
+
+
+# Feature -> (stage, spec entry) of the built-in stages
+FEATURE_REGISTRY = build_registry()
+
+
+# ─── Rewriting entries ────────────────────────────────────────────────────────
+
+def _rewrite_expression(expr, rename):
+    """Returns the expression with every column name passed through rename()."""
+    if not isinstance(expr, str):
+        return expr
+    tree = ast.parse(expr, mode='eval')
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            node.id = rename(node.id)
+    return ast.unparse(tree)
+
+
+def _rewrite_entry(entry: dict, rename) -> dict:
+    """A copy of a spec entry reading the renamed columns (and never dropping any)."""
+    entry = {key: value for key, value in entry.items() if key != 'drop'}
+    for key in EXPRESSION_KEYS:
+        if key in entry:
+            entry[key] = _rewrite_expression(entry[key], rename)
+    if 'select' in entry:
+        entry['select'] = [[_rewrite_expression(cond, rename), label]
+                           for cond, label in entry['select']]
+    for key in COLUMN_KEYS:
+        if key in entry:
+            entry[key] = rename(entry[key])
+    return entry
+
+
+# ─── Planning ─────────────────────────────────────────────────────────────────
+
+class FeaturePlan:
+    """
+    The work needed to compute a set of feature columns.
+
+    A name in a spec entry refers to the registered feature of that name,
+    except in the feature's own entry, where it is the input column (the
+    parsed join_date reads the raw join_date). Two features whose entries
+    read the same columns in the same way share one computation.
+
+    Attributes:
+        features (list): The requested features, in request order.
+        steps    (list): Features computed, dependencies first.
+        inputs   (list): Input columns read, besides the `id` key.
+        shared   (dict): Feature -> the feature with the same definition
+                         computed in its place, for the features involved.
+        spec     (dict): The pruned feature spec that computes the steps.
+    """
+
+    def __init__(self, features: list, registry: dict = None):
+        self._registry = FEATURE_REGISTRY if registry is None else registry
+        self.features = list(dict.fromkeys(features))
+        unknown = [name for name in self.features if name not in self._registry]
+        if unknown:
+            raise ValueError(f"Unknown features {unknown}; expected some of {list(self._registry)}")
+        if not self.features:
+            raise ValueError("features must name at least one feature")
+
+        # Columns each entry mentions; compiling also rejects malformed entries
+        self._refs = {name: compile_spec({name: entry}).inputs
+                      for name, (_, entry) in self._registry.items()}
+        self._representative = {}
+        by_definition = {}
+        for name in self._registry:
+            self._find_representative(name, by_definition, [])
+
+        self.steps = []
+        for name in self.features:
+            self._add_step(self._representative[name])
+        self.inputs = list(dict.fromkeys(
+            ref for step in self.steps for ref in sorted(self._refs[step])
+            if not self._is_feature(ref, step)
+        ))
+        needed = set(self.features) | self._needed_names()
+        self.shared = {name: self._representative[name] for name in self._registry
+                       if name in needed and self._representative[name] != name}
+        self.spec = {step: _rewrite_entry(self._registry[step][1], self._renamer(step))
+                     for step in self.steps}
+
+    def _is_feature(self, ref: str, owner: str) -> bool:
+        """True when `ref` in the entry of `owner` means a feature, not an input column."""
+        return ref in self._registry and ref != owner
+
+    def _renamer(self, owner: str):
+        """Maps the names in owner's entry to the features computed in their place."""
+        return lambda ref: self._representative[ref] if self._is_feature(ref, owner) else ref
+
+    def _find_representative(self, name: str, by_definition: dict, visiting: list) -> str:
+        """The first feature with the same definition as `name` (often itself)."""
+        if name in self._representative:
+            return self._representative[name]
+        if name in visiting:
+            cycle = " -> ".join([*visiting[visiting.index(name):], name])
+            raise ValueError(f"Features depend on themselves: {cycle}")
+        visiting.append(name)
+
+        def canonical(ref):
+            if self._is_feature(ref, name):
+                return "feature:" + self._find_representative(ref, by_definition, visiting)
+            return "input:" + ref
+
+        entry = _rewrite_entry(self._registry[name][1], canonical)
+        # One-hot columns are named after the feature, so those never merge
+        owner = name if 'one_hot' in entry else None
+        definition = json.dumps([owner, entry], sort_keys=True, default=str)
+        visiting.pop()
+        self._representative[name] = by_definition.setdefault(definition, name)
+        return self._representative[name]
+
+    def _dependencies(self, name: str) -> list:
+        """Features computed for name's entry, in registry order."""
+        return [self._representative[ref] for ref in self._registry
+                if ref in self._refs[name] and self._is_feature(ref, name)]
+
+    def _add_step(self, name: str) -> None:
+        """Adds name after everything it depends on."""
+        if name in self.steps:
+            return
+        for dependency in self._dependencies(name):
+            self._add_step(dependency)
+        self.steps.append(name)
+
+    def _needed_names(self) -> set:
+        """Features named by the entries of the steps."""
+        return {ref for step in self.steps for ref in self._refs[step]
+                if self._is_feature(ref, step)}
+
+    def input_dtypes(self) -> dict:
+        """Dtypes the stages of the steps declare for the input columns read."""
+        dtypes = {}
+        for step in self.steps:
+            stage = self._registry[step][0]
+            if stage in STAGES:
+                dtypes.update(sys.modules[STAGES[stage].__module__].INPUT_DTYPES)
+        return {col: dtype for col, dtype in dtypes.items() if col in self.inputs}
+
+    def output_columns(self, name: str, columns) -> list:
+        """The columns of `columns` that hold feature `name` (one per value for one-hot)."""
+        step = self._representative[name]
+        if 'one_hot' not in self._registry[step][1]:
+            return [name]
+        return [col for col in columns if col.startswith(f"{step}_") and col not in self._registry]
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes the requested features.
+
+        Args:
+            df (pd.DataFrame): Input with at least the plan's input columns
+                               (it is never modified).
+
+        Returns:
+            pd.DataFrame: `id` (when the input has it) and the requested
+            features, in request order.
+        """
+        source = load_input(df, self.inputs)
+        out = compile_spec(self.spec).transform(source)
+        columns = [KEY_COLUMN] if KEY_COLUMN in source.columns else []
+        created = [col for col in out.columns if col not in source.columns or col in self.steps]
+        for name in self.features:
+            if name != self._representative[name]:
+                out[name] = out[self._representative[name]]
+            columns += self.output_columns(name, created)
+        return out[columns]
+
+    def summary(self) -> dict:
+        """Sizes of the plan, for metrics and the console."""
+        return {
+            'requested': len(self.features),
+            'computed' : len(self.steps),
+            'pruned'   : len({self._representative[name] for name in self._registry})
+                         - len(self.steps),
+            'shared'   : len(self.shared),
+            'inputs'   : list(self.inputs),
+        }
+
+
+def plan_features(features: list, registry: dict = None) -> FeaturePlan:
+    """Plans the computation of `features`. Raises ValueError for unknown features."""
+    return FeaturePlan(features, registry)
+
+
+def compute_features(source: str | pd.DataFrame, output_file: str | None, features: list,
+                     registry: dict = None) -> pd.DataFrame:
+    """
+    Reads only the input columns `features` need, computes them and saves them.
+
+    Args:
+        source      (str | pd.DataFrame): Path to the input file, or a parsed
+                                          input (it is never modified).
+        output_file (str | None)        : Where to save the features (CSV,
+                                          Parquet or Feather by extension).
+                                          None keeps them in memory only.
+        features    (list)              : Feature names, e.g. ['is_anomaly', 'age_group'].
+        registry    (dict)              : See build_registry. None uses FEATURE_REGISTRY.
+
+    Returns:
+        pd.DataFrame: `id` and the requested features.
+    """
+    plan = plan_features(features, registry)
+    df = load_input(source, plan.inputs, plan.input_dtypes())
+    table = plan.transform(df)
+    save_output(table, output_file, "compute_features")
+    return table
@@ -0,0 +1,385 @@
+"""
+Group 6 - Feature Engineering
+feature_spec.py - Declarative feature specs compiled to vectorized NumPy
+Describes derived columns, thresholds and conditional labels as plain data
+(a dict, or a YAML/JSON file) and compiles them into whole-column kernels:
+arithmetic on arrays, np.where, np.select and np.searchsorted. No Python code
+runs per row.
+"""
+
+import ast
+import json
+import operator
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; JSON specs always work
+    yaml = None
+
+
+# ─── Spec format ──────────────────────────────────────────────────────────────
+# A spec maps each output column to one entry. Entries run in order, so later
+# entries may use columns created by earlier ones.
+#
+#   {'expr': 'salary / age', 'round': 2}                 arithmetic expression
+#   {'where': 'age >= 40', 'then': 1, 'else': 0}         two-way label
+#   {'select': [['salary > 90000', 'High'], ...],        first matching label
+#    'default': 'Low'}
+#   {'cut': 'age', 'bins': [...], 'labels': [...]}       labeled range buckets
+#   {'map': 'category', 'mapping': {'A': 1, ...},        value lookup, with an
+#    'default': 0}                                       optional unknown value
+#   {'one_hot': 'department', 'drop': True,              <key>_<value> 0/1 columns
+#    'values': [...], 'unknown': True}                   (+ <key>__unknown bucket)
+#
+# Expressions support + - * / // % **, comparisons, & | ~ and these functions:
+FUNCTIONS = {
+    'abs'           : np.abs,
+    'round'         : lambda x, n=0: np.round(x, int(n)),
+    'to_datetime'   : lambda x: pd.to_datetime(x).to_numpy(),
+    'year'          : lambda x: pd.DatetimeIndex(x).year.to_numpy(),
+    'month'         : lambda x: pd.DatetimeIndex(x).month.to_numpy(),
+    'quarter'       : lambda x: pd.DatetimeIndex(x).quarter.to_numpy(),
+    'dayofweek'     : lambda x: pd.DatetimeIndex(x).dayofweek.to_numpy(),
+    'days_since'    : lambda x: _days_since_today(x),
+    'mean'          : lambda x: np.nanmean(x),
+    'std'           : lambda x: np.nanstd(x, ddof=1),
+    'quantile'      : lambda x, q: np.nanquantile(x, q),
+    'iqr_outlier'   : lambda x, k=1.5: _iqr_outlier(x, k),
+    'zscore_outlier': lambda x, k=2: _zscore_outlier(x, k),
+}
+
+_BINARY_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.BitAnd: np.logical_and, ast.BitOr: np.logical_or,
+}
+_COMPARE_OPS = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+    ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_UNARY_OPS = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Invert: np.logical_not}
+
+
+def _days_since_today(dates) -> np.ndarray:
+    """Whole days between each date and today (NaN for missing dates)."""
+    today = pd.Timestamp(datetime.today().date())
+    return (today - pd.DatetimeIndex(dates)).days.to_numpy()
+
+
+def _iqr_outlier(x, k) -> np.ndarray:
+    """True where x lies more than k IQRs outside the quartiles."""
+    q1, q3 = np.nanquantile(x, 0.25), np.nanquantile(x, 0.75)
+    iqr = q3 - q1
+    return (x < q1 - k * iqr) | (x > q3 + k * iqr)
+
+
+def _zscore_outlier(x, k) -> np.ndarray:
+    """True where x lies more than k sample standard deviations from the mean."""
+    mean, std = np.nanmean(x), np.nanstd(x, ddof=1)
+    return (x < mean - k * std) | (x > mean + k * std)
+
+
+# ─── Specs for the 5 processing functions ─────────────────────────────────────
+# Keyed like main.OUTPUT_FILES. Each one reproduces its function's output.
+STAGE_SPECS = {
+    "derived_computed_columns": {
+        'salary_per_age': {'expr': 'salary / age', 'round': 2},
+        'annual_bonus'  : {'expr': 'salary * 0.10', 'round': 2},
+        'is_senior'     : {'where': 'age >= 40', 'then': 1, 'else': 0},
+        'salary_level'  : {'select': [['salary > 90000', 'High'],
+                                      ['salary > 55000', 'Mid']], 'default': 'Low'},
+        'score_rank'    : {'expr': 'score / 10', 'round': 1},
+    },
+    "encoded_categorical_features": {
+        'dept'            : {'one_hot': 'department', 'drop': True},
+        'category_encoded': {'map': 'category', 'mapping': {'A': 1, 'B': 2, 'C': 3}},
+    },
+    "binned_numeric_ranges": {
+        'age_group'   : {'cut': 'age', 'bins': [0, 25, 35, 45, 100],
+                         'labels': ['Young', 'Adult', 'Mid-Age', 'Senior']},
+        'salary_range': {'cut': 'salary', 'bins': [0, 50000, 80000, 120000, float('inf')],
+                         'labels': ['Entry', 'Mid', 'Senior', 'Executive']},
+        'score_grade' : {'cut': 'score', 'bins': [0, 49, 70, 85, 100],
+                         'labels': ['Fail', 'Pass', 'Good', 'Excellent']},
+    },
+    "time_based_features": {
+        'join_date'       : {'expr': 'to_datetime(join_date)'},
+        'join_year'       : {'expr': 'year(join_date)'},
+        'join_month'      : {'expr': 'month(join_date)'},
+        'join_quarter'    : {'expr': 'quarter(join_date)'},
+        'join_day_of_week': {'expr': 'dayofweek(join_date)'},
+        'years_in_company': {'expr': 'days_since(join_date) / 365', 'round': 1},
+        'is_recent_hire'  : {'where': 'join_year >= 2021', 'then': 1, 'else': 0},
+    },
+    "flagged_anomalies": {
+        'salary_anomaly': {'where': 'iqr_outlier(salary, 1.5)', 'then': 1, 'else': 0},
+        'score_anomaly' : {'where': 'zscore_outlier(score, 2)', 'then': 1, 'else': 0},
+        'age_anomaly'   : {'where': 'iqr_outlier(age, 1.5)', 'then': 1, 'else': 0},
+        'is_anomaly'    : {'where': '(salary_anomaly == 1) | (score_anomaly == 1) | (age_anomaly == 1)',
+                           'then': 1, 'else': 0},
+    },
+}
+
+
+# ─── Expression compiler ──────────────────────────────────────────────────────
+
+def _compile_node(node, names: set):
+    """
+    Compiles one expression AST node into a function of the column arrays.
+
+    Every column referenced is added to `names`.
+    """
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, names)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        value = node.value
+        return lambda cols: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        names.add(name)
+        return lambda cols: cols[name]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        left, right = _compile_node(node.left, names), _compile_node(node.right, names)
+        return lambda cols: op(left(cols), right(cols))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op = _UNARY_OPS[type(node.op)]
+        operand = _compile_node(node.operand, names)
+        return lambda cols: op(operand(cols))
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPS for op in node.ops):
+        # a < b < c  ->  (a < b) & (b < c)
+        parts = [_compile_node(n, names) for n in [node.left, *node.comparators]]
+        ops = [_COMPARE_OPS[type(op)] for op in node.ops]
+
+        def compare(cols):
+            values = [part(cols) for part in parts]
+            result = ops[0](values[0], values[1])
+            for i in range(1, len(ops)):
+                result = np.logical_and(result, ops[i](values[i], values[i + 1]))
+            return result
+        return compare
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+            and node.func.id in FUNCTIONS and not node.keywords:
+        func = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, names) for arg in node.args]
+        return lambda cols: func(*[arg(cols) for arg in args])
+    raise ValueError(f"Unsupported expression element: {ast.dump(node)}")
+
+
+def compile_expression(expr) -> tuple:
+    """
+    Compiles an expression string (or a plain number) into a column kernel.
+
+    Args:
+        expr (str | int | float): e.g. 'salary / age' or 'age >= 40'.
+
+    Returns:
+        tuple: (kernel, input names). The kernel takes a dict of column
+        arrays and returns a whole-column result.
+    """
+    if isinstance(expr, (int, float)):
+        return (lambda cols: expr), set()
+    names = set()
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid expression {expr!r}: {exc.msg}") from None
+    return _compile_node(tree, names), names
+
+
+# ─── Spec compiler ────────────────────────────────────────────────────────────
+
+def _compile_entry(name: str, entry: dict) -> tuple:
+    """
+    Compiles one spec entry.
+
+    Returns:
+        tuple: (kernel, input names, columns to drop). The kernel takes the
+        dict of column arrays and returns {output column: array}.
+    """
+    if 'expr' in entry:
+        kernel, names = compile_expression(entry['expr'])
+        decimals = entry.get('round')
+        if decimals is None:
+            return (lambda cols: {name: kernel(cols)}), names, []
+        return (lambda cols: {name: np.round(kernel(cols), decimals)}), names, []
+
+    if 'where' in entry:
+        cond, names = compile_expression(entry['where'])
+        then, other = entry.get('then', 1), entry.get('else', 0)
+        return (lambda cols: {name: np.where(cond(cols), then, other)}), names, []
+
+    if 'select' in entry:
+        compiled = [compile_expression(cond) for cond, _ in entry['select']]
+        conds = [kernel for kernel, _ in compiled]
+        names = set().union(*(n for _, n in compiled))
+        # Select an integer position, then take the labels in one gather
+        choices = np.array([label for _, label in entry['select']] + [entry.get('default')],
+                           dtype=object)
+        positions = list(range(len(conds)))
+
+        def select(cols):
+            picked = np.select([c(cols) for c in conds], positions, default=len(conds))
+            return {name: choices[picked]}
+        return select, names, []
+
+    if 'cut' in entry:
+        column = entry['cut']
+        bins = np.asarray(entry['bins'], dtype=float)
+        labels = entry['labels']
+        side = 'left' if entry.get('right', True) else 'right'
+
+        def cut(cols):
+            # Same buckets as pd.cut: (b0, b1], (b1, b2], ... for right=True
+            values = np.asarray(cols[column], dtype=float)
+            codes = np.searchsorted(bins, values, side=side) - 1
+            codes[(codes < 0) | (codes >= len(labels)) | np.isnan(values)] = -1
+            return {name: pd.Categorical.from_codes(codes, categories=labels, ordered=True)}
+        return cut, {column}, []
+
+    if 'map' in entry:
+        column = entry['map']
+        mapping = entry['mapping']
+        default = entry.get('default')
+
+        def lookup(cols):
+            values = pd.Series(cols[column]).map(mapping).to_numpy()
+            if default is not None:
+                dtype = np.result_type(default, *mapping.values())
+                values = np.where(pd.isna(values), default, values).astype(dtype)
+            return {name: values}
+        return lookup, {column}, []
+
+    if 'one_hot' in entry:
+        column = entry['one_hot']
+        drop = [column] if entry.get('drop', False) else []
+        fixed_values = entry.get('values')
+        unknown = entry.get('unknown', False)
+
+        def one_hot(cols):
+            if fixed_values is None:
+                codes, uniques = pd.factorize(cols[column], sort=True)
+            else:
+                uniques = fixed_values
+                codes = pd.Index(uniques, dtype=object).get_indexer(
+                    pd.Series(cols[column]).astype(object))
+            width = len(uniques) + unknown
+            if unknown:
+                codes[codes < 0] = len(uniques)
+            dense = np.zeros((len(codes), width), dtype=np.int8 if unknown else int)
+            rows = np.flatnonzero(codes >= 0)
+            dense[rows, codes[rows]] = 1
+            names = [f"{name}_{value}" for value in uniques] + [f"{name}__unknown"] * unknown
+            return {col: dense[:, i] for i, col in enumerate(names)}
+        return one_hot, {column}, drop
+
+    raise ValueError(f"Spec entry for {name!r} has no known operation: {sorted(entry)}")
+
+
+class CompiledSpec:
+    """
+    A feature spec compiled into whole-column kernels.
+
+    Call `transform(df)` to add every spec column to a dataframe. `inputs`
+    lists the input columns the spec reads (columns it creates itself are
+    not included).
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self._steps = []
+        self.inputs = set()
+        created = set()
+        for name, entry in spec.items():
+            kernel, names, drop = _compile_entry(name, entry)
+            self._steps.append((kernel, names, drop))
+            self.inputs |= names - created
+            created.add(name)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns a new dataframe with the spec's columns added.
+
+        Args:
+            df (pd.DataFrame): The input data (never modified).
+
+        Returns:
+            pd.DataFrame: The input columns plus every spec column, in order.
+        """
+        out = df.copy(deep=False)
+        arrays = _ColumnArrays(out)
+        for kernel, _, drop in self._steps:
+            new_columns = kernel(arrays)
+            if drop:
+                out = out.drop(columns=drop)
+            for col, values in new_columns.items():
+                out[col] = values
+                arrays[col] = values
+        return out
+
+    def evaluate(self, columns: dict) -> dict:
+        """
+        Computes the spec's columns from plain column arrays, without a dataframe.
+
+        Args:
+            columns (dict): Input column -> array, e.g. a few records' values.
+
+        Returns:
+            dict: Spec column -> array, in spec order.
+        """
+        arrays, new = dict(columns), {}
+        for kernel, _, _ in self._steps:
+            for col, values in kernel(arrays).items():
+                arrays[col] = new[col] = values
+        return new
+
+
+class _ColumnArrays(dict):
+    """
+    Column name -> column values, fetched from the dataframe on first use.
+
+    Numeric and datetime columns become NumPy arrays; other columns keep
+    their pandas array so string columns are not converted to Python objects.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        super().__init__()
+        self._df = df
+
+    def __missing__(self, name):
+        if name not in self._df.columns:
+            raise KeyError(f"Spec references unknown column {name!r}")
+        column = self._df[name]
+        if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_dtype(column):
+            values = column.to_numpy()
+        else:
+            values = column.array
+        self[name] = values
+        return values
+
+
+def compile_spec(spec: dict) -> CompiledSpec:
+    """Compiles a feature spec dict. Raises ValueError for unsupported entries."""
+    return CompiledSpec(spec)
+
+
+def load_spec(path: str) -> dict:
+    """
+    Loads a feature spec from a YAML (.yaml/.yml, needs PyYAML) or JSON file.
+
+    Args:
+        path (str): Path to the spec file.
+
+    Returns:
+        dict: The spec, ready for compile_spec.
+    """
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ImportError("Reading YAML specs requires PyYAML: pip install pyyaml")
+            return yaml.safe_load(f)
+        return json.load(f)
@@ -0,0 +1,89 @@
+"""
+Group 6 - Feature Engineering
+feature_table.py - One wide feature table instead of five separate outputs
+Runs the processing functions on the same in-memory input, keeps only the
+columns each one adds and places them side by side with the input columns,
+so the input is written once and nothing has to be joined back on `id`.
+"""
+
+import pandas as pd
+
+from pipeline_io     import KEY_COLUMN, save_output
+from pipeline_config import GROUP_STAGES, INPUT_GROUP, STAGES
+
+# Column group -> the processing function that produces it, in table order
+FEATURE_GROUPS = {group: STAGES[name] for group, name in GROUP_STAGES.items()}
+
+
+def new_columns(source: pd.DataFrame, result: pd.DataFrame) -> list:
+    """Returns the columns a processing function added to its input, in output order."""
+    existing = set(source.columns)
+    return [col for col in result.columns if col not in existing]
+
+
+def build_feature_table(df: pd.DataFrame, groups: list = None,
+                        stage_options: dict = None) -> tuple:
+    """
+    Computes the selected column groups and joins them column-wise.
+
+    Every function sees the same rows in the same order, so the new columns
+    are placed side by side without any row-wise join.
+
+    Args:
+        df            (pd.DataFrame): The parsed input (it is never modified).
+        groups        (list): Groups to include, from 'input' and FEATURE_GROUPS.
+                              None includes all of them. `id` is always kept.
+        stage_options (dict): Group -> keyword options for its function,
+                              e.g. {'encoded': {'encoder': 'encoder.json'}}.
+
+    Returns:
+        tuple: (the wide table, group -> list of its columns)
+    """
+    groups = [INPUT_GROUP, *FEATURE_GROUPS] if groups is None else list(groups)
+    unknown = set(groups) - set(FEATURE_GROUPS) - {INPUT_GROUP}
+    if unknown:
+        raise ValueError(f"Unknown column groups {sorted(unknown)}; "
+                         f"expected some of {[INPUT_GROUP, *FEATURE_GROUPS]}")
+
+    stage_options = stage_options or {}
+    columns = {}
+    if INPUT_GROUP in groups:
+        columns[INPUT_GROUP] = list(df.columns)
+    elif KEY_COLUMN in df.columns:
+        columns[INPUT_GROUP] = [KEY_COLUMN]
+    parts = [df[columns[INPUT_GROUP]]] if INPUT_GROUP in columns else []
+
+    taken = set(columns.get(INPUT_GROUP, []))
+    for group, stage in FEATURE_GROUPS.items():
+        if group not in groups:
+            continue
+        result = stage(df, None, **stage_options.get(group, {}))
+        added = new_columns(df, result)
+        clashes = taken.intersection(added)
+        if clashes:
+            raise ValueError(f"Column group {group!r} repeats columns {sorted(clashes)}")
+        taken.update(added)
+        columns[group] = added
+        parts.append(result[added])
+
+    return pd.concat(parts, axis=1), columns
+
+
+def write_feature_table(df: pd.DataFrame, output_file: str | None, groups: list = None,
+                        stage_options: dict = None) -> tuple:
+    """
+    Builds the wide feature table and saves it as one file.
+
+    Args:
+        df            (pd.DataFrame): The parsed input.
+        output_file   (str | None)  : Where to save it (CSV, Parquet or Feather
+                                      by extension). None keeps it in memory.
+        groups        (list)        : Column groups to include (see build_feature_table).
+        stage_options (dict)        : Group -> keyword options for its function.
+
+    Returns:
+        tuple: (the wide table, group -> list of its columns)
+    """
+    table, columns = build_feature_table(df, groups, stage_options)
+    save_output(table, output_file, "feature_table")
+    return table, columns
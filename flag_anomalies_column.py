@@ -4,67 +4,290 @@ Function 5: flag_anomalies_column
 Detects and flags statistical outliers/anomalies in numeric columns.
 """
 
+import warnings
+
+import numpy as np
 import pandas as pd
-import os
+
+from pipeline_io     import load_input, save_output
+from pipeline_config import ANOMALY_DETECTORS, ANOMALY_METHODS
+
+# Columns this function reads, and the dtypes they are loaded with
+INPUT_COLUMNS = ['salary', 'score', 'age']
+INPUT_DTYPES  = {}
+
+# Bump when this function's output changes, so cached outputs are recomputed
+STAGE_VERSION = 1
+
+
+# ANOMALY_METHODS (column -> detection method, in the order the flag columns
+# are added) and the detection methods a column can use are defined in
+# pipeline_config, so the command line can list them without importing pandas
+METHODS = ANOMALY_DETECTORS
+
+IQR_MULTIPLIER = 1.5   # flag values beyond 1.5x IQR outside Q1/Q3
+ZSCORE_LIMIT   = 2     # flag values beyond ±2 standard deviations
+MAD_LIMIT      = 3.5   # flag values whose modified z-score is beyond ±3.5
+
+# Turns a median absolute deviation into a standard deviation for normal data
+MAD_SCALE = 0.6745
+
+# Levels of the single multi-quantile call: Q1, median, Q3
+_QUANTILES = [0.25, 0.5, 0.75]
+
+
+def iqr_bounds(q1: float, q3: float) -> tuple:
+    """Returns the (low, high) limits of the 1.5x IQR rule."""
+    iqr = q3 - q1
+    return (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+
+
+def zscore_bounds(mean: float, std: float) -> tuple:
+    """Returns the (low, high) limits of the ±2 standard deviation rule."""
+    return (mean - ZSCORE_LIMIT * std, mean + ZSCORE_LIMIT * std)
+
+
+def mad_bounds(median: float, mad: float) -> tuple:
+    """Returns the (low, high) limits of the ±3.5 modified z-score rule."""
+    spread = MAD_LIMIT * mad / MAD_SCALE
+    return (median - spread, median + spread)
+
+
+# ─── Statistics ───────────────────────────────────────────────────────────────
+
+def _statistics(values: np.ndarray, methods: list) -> dict:
+    """
+    Statistics of every column of a 2-D (columns, rows) array in one pass per
+    kind: one multi-quantile call, one mean/std and (for MAD) one median of
+    the absolute deviations. Each column is contiguous, so sums are
+    accumulated pairwise exactly as pandas does for a single column.
+
+    Returns:
+        dict: 'quantiles' (3, columns) and, when a method needs them, 'mean',
+        'std' and 'mad' (columns,) arrays.
+    """
+    if values.shape[1] == 0:
+        # No rows: every statistic is undefined, so nothing gets flagged
+        empty = np.full(values.shape[0], np.nan)
+        return {'quantiles': np.tile(empty, (len(_QUANTILES), 1)),
+                'mean': empty, 'std': empty, 'mad': empty}
+
+    # The NaN-aware variants copy the data, so only use them when needed
+    nan = np.isnan(values).any()
+    quantile, median = (np.nanquantile, np.nanmedian) if nan else (np.quantile, np.median)
+    with warnings.catch_warnings():
+        # Undefined statistics (one value, an all-missing column) are NaN, as in pandas
+        warnings.simplefilter("ignore", RuntimeWarning)
+        stats = {'quantiles': quantile(values, _QUANTILES, axis=1)}
+        if 'zscore' in methods:
+            stats['mean'] = (np.nanmean if nan else np.mean)(values, axis=1)
+            stats['std'] = (np.nanstd if nan else np.std)(values, axis=1, ddof=1)
+        if 'mad' in methods:
+            stats['mad'] = median(np.abs(values - stats['quantiles'][1][:, None]), axis=1)
+    return stats
+
+
+def _grouped_statistics(values: np.ndarray, codes: np.ndarray, groups: int,
+                        methods: list) -> dict:
+    """
+    Like _statistics, per group: one groupby aggregation per kind instead of
+    a loop over groups. Rows with code -1 (missing group key) are left out.
+
+    Returns:
+        dict: The same keys as _statistics with a groups axis before the
+        columns axis: 'quantiles' (3, groups, columns), others (groups, columns).
+    """
+    keep = codes >= 0
+    values, codes = values[:, keep].T, codes[keep]
+    grouped = pd.DataFrame(values).groupby(codes, sort=True)
+    quantiles = grouped.quantile(_QUANTILES).to_numpy()
+    stats = {'quantiles': quantiles.reshape(groups, len(_QUANTILES), values.shape[1]).transpose(1, 0, 2)}
+    if 'zscore' in methods:
+        stats['mean'] = grouped.mean().to_numpy()
+        stats['std'] = grouped.std().to_numpy()
+    if 'mad' in methods:
+        deviations = np.abs(values - stats['quantiles'][1][codes])
+        stats['mad'] = pd.DataFrame(deviations).groupby(codes, sort=True).median().to_numpy()
+    return stats
+
+
+def _limits(stats: dict, methods: list) -> tuple:
+    """
+    Turns statistics into limits, each column using its own method.
+
+    Returns:
+        tuple: (low, high) arrays shaped like stats['mean'] / the median.
+    """
+    q1, median, q3 = stats['quantiles']
+    rules = {
+        'iqr'   : lambda: iqr_bounds(q1, q3),
+        'zscore': lambda: zscore_bounds(stats['mean'], stats['std']),
+        'mad'   : lambda: mad_bounds(median, stats['mad']),
+    }
+    column_methods = np.array(methods)
+    low, high = np.full_like(median, np.nan), np.full_like(median, np.nan)
+    for method in set(methods):
+        method_low, method_high = rules[method]()
+        low = np.where(column_methods == method, method_low, low)
+        high = np.where(column_methods == method, method_high, high)
+    return low, high
 
 
-def flag_anomalies_column(input_file: str, output_file: str) -> pd.DataFrame:
+# ─── Groups ───────────────────────────────────────────────────────────────────
+
+def _group_columns(by) -> list:
+    """The grouping columns as a list (`by` may be a single column name)."""
+    return [by] if isinstance(by, str) else list(by)
+
+
+def _plain_index(keys: pd.Index) -> pd.Index:
+    """Group keys as a plain (not categorical) Index or MultiIndex."""
+    if isinstance(keys, pd.MultiIndex):
+        return pd.MultiIndex.from_tuples(keys.tolist(), names=keys.names)
+    return pd.Index(keys.tolist(), name=keys.name)
+
+
+def _group_codes(df: pd.DataFrame, by, keys: pd.Index) -> np.ndarray:
+    """
+    Position of each row's group in `keys`, or -1 for a group without limits.
+
+    Category columns only look up their distinct values.
+    """
+    columns = _group_columns(by)
+    if isinstance(keys, pd.MultiIndex):
+        return keys.get_indexer(pd.MultiIndex.from_frame(df[columns].astype(object)))
+    values = df[columns[0]]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # code -1 (missing) picks the trailing -1
+        lookup = np.append(keys.get_indexer(values.cat.categories), -1)
+        return lookup[values.cat.codes.to_numpy()]
+    return keys.get_indexer(values)
+
+
+def compute_anomaly_bounds(df: pd.DataFrame, methods: dict = None, by=None) -> dict:
     """
-    Flags anomalies/outliers in numeric columns using IQR and Z-score methods.
+    Computes the anomaly limits of the checked columns over a whole dataframe.
+
+    The columns are stacked into one 2-D array and each kind of statistic is
+    computed for all of them (and all groups) at once, so the cost grows with
+    the rows, not with columns x groups x methods.
+
+    Args:
+        df      (pd.DataFrame): The fully loaded input data.
+        methods (dict): Column -> 'iqr', 'zscore' or 'mad'. Defaults to
+                        ANOMALY_METHODS.
+        by      (str | list): Column(s) whose groups get their own limits,
+                        e.g. 'department'. None uses one set of limits.
+
+    Returns:
+        dict: Column name -> (low, high) limits, in `methods` order. With
+        `by` the limits are pd.Series indexed by the group keys.
+    """
+    methods = ANOMALY_METHODS if methods is None else methods
+    unknown = set(methods.values()) - set(METHODS)
+    if unknown:
+        raise ValueError(f"Unknown anomaly methods {sorted(unknown)}; expected some of {list(METHODS)}")
+    columns, column_methods = list(methods), list(methods.values())
+    values = np.vstack([df[col].to_numpy(dtype=float) for col in columns])
+
+    if by is None:
+        low, high = _limits(_statistics(values, column_methods), column_methods)
+        return {col: (low[i], high[i]) for i, col in enumerate(columns)}
+
+    grouper = df.groupby(_group_columns(by), sort=True, observed=True)
+    keys = _plain_index(grouper.size().index)
+    codes = _group_codes(df, by, keys)
+    stats = _grouped_statistics(values, codes, len(keys), column_methods)
+    low, high = _limits(stats, column_methods)
+    return {col: (pd.Series(low[:, i], index=keys), pd.Series(high[:, i], index=keys))
+            for i, col in enumerate(columns)}
 
-    Detection methods:
+
+def apply_anomaly_flags(df: pd.DataFrame, bounds: dict, by=None) -> pd.DataFrame:
+    """
+    Adds the <column>_anomaly flags and the combined is_anomaly flag.
+
+    Rows are flagged independently of each other, so this also works on one
+    chunk at a time once the bounds are known. Per-group limits are
+    broadcast to the rows through integer group codes; rows whose group has
+    no limits are not flagged.
+
+    Args:
+        df     (pd.DataFrame): The data to flag (modified in place).
+        bounds (dict)        : Column name -> (low, high) limits, as pd.Series
+                               indexed by group key when `by` is given.
+        by     (str | list)  : The grouping column(s) the limits were computed for.
+
+    Returns:
+        pd.DataFrame: The same dataframe with the flag columns added.
+    """
+    columns = list(bounds)
+    values = df[columns].to_numpy(dtype=float)
+    if by is None:
+        low = np.array([bounds[col][0] for col in columns], dtype=float)
+        high = np.array([bounds[col][1] for col in columns], dtype=float)
+    else:
+        keys = bounds[columns[0]][0].index
+        missing = np.full((1, len(columns)), np.nan)
+        codes = _group_codes(df, by, keys)
+        low = np.vstack([np.column_stack([bounds[col][0].reindex(keys) for col in columns]),
+                         missing])[codes]
+        high = np.vstack([np.column_stack([bounds[col][1].reindex(keys) for col in columns]),
+                          missing])[codes]
+    flags = (values < low) | (values > high)
+
+    for i, col in enumerate(columns):
+        df[f'{col}_anomaly'] = flags[:, i].astype(int)
+
+    # --- Combined anomaly flag ---
+    df['is_anomaly'] = flags.any(axis=1).astype(int)
+    return df
+
+
+def flag_anomalies_column(input_file: str | pd.DataFrame, output_file: str | None,
+                          *, project: bool = False, bounds: dict | None = None,
+                          methods: dict | None = None, by=None) -> pd.DataFrame:
+    """
+    Flags anomalies/outliers in numeric columns using IQR, Z-score and MAD methods.
+
+    Detection methods (default columns):
     - salary_anomaly : IQR method (1.5x IQR rule) applied to 'salary'
     - score_anomaly  : Z-score method (±2 standard deviations) applied to 'score'
     - age_anomaly    : IQR method applied to 'age'
     - is_anomaly     : 1 if ANY of the above flags are triggered, else 0
+    The MAD method flags values more than 3.5 scaled median absolute
+    deviations from the median.
 
     Args:
-        input_file  (str): Path to the input CSV file.
-        output_file (str): Path where the processed CSV will be saved.
+        input_file  (str | pd.DataFrame): Path to the input CSV file, or an
+                     already loaded dataframe (it is never modified).
+        output_file (str | None): Path where the processed CSV will be saved.
+                     None keeps the result in memory only.
+        project     (bool): Read and keep only `id` and the used columns, so
+                     the output holds the key, the used columns and the new ones.
+        bounds      (dict | None): Column -> (low, high) limits computed
+                     elsewhere, e.g. over every shard of a sharded input.
+                     None computes them on this input.
+        methods     (dict | None): Column -> 'iqr', 'zscore' or 'mad'.
+                     None uses ANOMALY_METHODS.
+        by          (str | list | None): Column(s) whose groups get their own
+                     limits, e.g. 'department'.
 
     Returns:
         pd.DataFrame: The processed dataframe with anomaly flag columns.
     """
-    # Load the CSV
-    df = pd.read_csv(input_file)
-
-    # --- Salary anomaly: IQR Method ---
-    Q1_sal = df['salary'].quantile(0.25)
-    Q3_sal = df['salary'].quantile(0.75)
-    IQR_sal = Q3_sal - Q1_sal
-    df['salary_anomaly'] = (
-        (df['salary'] < Q1_sal - 1.5 * IQR_sal) |
-        (df['salary'] > Q3_sal + 1.5 * IQR_sal)
-    ).astype(int)
-
-    # --- Score anomaly: Z-score Method ---
-    score_mean = df['score'].mean()
-    score_std  = df['score'].std()
-    df['score_anomaly'] = (
-        (df['score'] < score_mean - 2 * score_std) |
-        (df['score'] > score_mean + 2 * score_std)
-    ).astype(int)
-
-    # --- Age anomaly: IQR Method ---
-    Q1_age = df['age'].quantile(0.25)
-    Q3_age = df['age'].quantile(0.75)
-    IQR_age = Q3_age - Q1_age
-    df['age_anomaly'] = (
-        (df['age'] < Q1_age - 1.5 * IQR_age) |
-        (df['age'] > Q3_age + 1.5 * IQR_age)
-    ).astype(int)
+    # Load the CSV (or take the shared in-memory dataframe)
+    methods = ANOMALY_METHODS if methods is None else methods
+    columns = list(methods) + (_group_columns(by) if by is not None else [])
+    df = load_input(input_file, columns if project else None, INPUT_DTYPES)
 
-    # --- Combined anomaly flag ---
-    df['is_anomaly'] = (
-        (df['salary_anomaly'] == 1) |
-        (df['score_anomaly']  == 1) |
-        (df['age_anomaly']    == 1)
-    ).astype(int)
+    # Salary and age use the IQR method, score uses the Z-score method
+    if bounds is None:
+        bounds = compute_anomaly_bounds(df, methods, by)
+    df = apply_anomaly_flags(df, bounds, by)
 
     # Save output
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_csv(output_file, index=False)
-    print(f"[flag_anomalies_column] ✅ Saved to: {output_file}")
+    save_output(df, output_file, "flag_anomalies_column")
     return df
 
 
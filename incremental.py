@@ -0,0 +1,336 @@
+"""
+Group 6 - Feature Engineering
+incremental.py - Incremental runs over an input file that only grows
+Keeps a checkpoint of how far the input has been processed (byte offset and
+row count) together with the state of the stateful stages, so a later run
+parses only the rows appended since and appends their results to the
+existing outputs.
+
+Stateful stages:
+- encode_categorical_features keeps the vocabulary fitted on the first run
+  (or the given encoder artifact), so every appended batch has the same
+  columns; departments first seen later get no one-hot column set (the
+  unknown bucket of an encoder artifact), new categories NaN (its 0).
+- flag_anomalies_column keeps its running statistics (quantile sketches and
+  mean/variance) and updates them with every batch, so the limits always
+  cover every row processed so far. The anomaly policy decides what happens
+  to rows flagged earlier: 'keep' leaves their flags as they were (each row
+  is flagged against the limits known when it arrived), 'recompute' rewrites
+  the flags of every row with the updated limits, which matches a full run.
+- bin_numeric_ranges keeps the bins fitted on the first run.
+The row-local stages need no state; years_in_company of earlier rows keeps
+the value of the day they were processed. The checkpoint also records the
+column dtypes of each output's first batch, and later batches are cast to
+them, so a missing value does not change how a column is written.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from derive_computed_columns       import derive_computed_columns
+from encode_categorical_features   import (
+    default_layout, encode_categorical_features, fit_categorical_encoder, load_encoder,
+)
+from bin_numeric_ranges            import bin_numeric_ranges, load_bins
+from time_based_feature_extraction import time_based_feature_extraction
+from flag_anomalies_column         import apply_anomaly_flags
+from pipeline_io                   import output_format
+from pipeline_config               import ANOMALY_POLICIES
+from streaming                     import (
+    DEFAULT_CHUNKSIZE, anomaly_bounds_from_statistics, new_anomaly_statistics,
+)
+
+# Bump when the checkpoint layout changes, so old checkpoints are rejected
+CHECKPOINT_VERSION = 1
+
+# Bytes before the checkpoint offset that must be unchanged for the input to
+# count as appended to, rather than rewritten
+VERIFY_BYTES = 64 * 1024
+
+# Output key -> function applied to each new batch, in STAGES order
+INCREMENTAL_STAGES = {
+    "derived_computed_columns"     : derive_computed_columns,
+    "encoded_categorical_features" : encode_categorical_features,
+    "binned_numeric_ranges"        : bin_numeric_ranges,
+    "time_based_features"          : time_based_feature_extraction,
+    "flagged_anomalies"            : None,   # flagged with the running statistics
+}
+
+
+# ─── Checkpoint ───────────────────────────────────────────────────────────────
+
+def _state_file(checkpoint_file: str, rows: int) -> str:
+    """Where the pickled stage state of the checkpoint after `rows` rows is kept."""
+    return f"{checkpoint_file}.{rows}.state.pkl"
+
+
+def _window_digest(path: str, offset: int, header_bytes: int) -> str:
+    """SHA-256 of the header and of the VERIFY_BYTES just before `offset`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(header_bytes))
+        start = max(header_bytes, offset - VERIFY_BYTES)
+        f.seek(start)
+        digest.update(f.read(offset - start))
+    return digest.hexdigest()
+
+
+def load_checkpoint(checkpoint_file: str) -> tuple:
+    """
+    Loads a checkpoint saved by save_checkpoint.
+
+    Returns:
+        tuple: (checkpoint dict, stage state dict), or (None, None) when
+        there is no checkpoint yet.
+    """
+    if not os.path.exists(checkpoint_file):
+        return None, None
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {checkpoint_file}: "
+                         f"{checkpoint.get('version')!r}")
+    with open(_state_file(checkpoint_file, checkpoint['rows']), "rb") as f:
+        state = pickle.load(f)
+    return checkpoint, state
+
+
+def save_checkpoint(checkpoint: dict, state: dict, checkpoint_file: str,
+                    previous_rows: int = None) -> None:
+    """
+    Saves a checkpoint and its stage state.
+
+    The state is saved under the checkpoint's row count, then the checkpoint
+    is renamed into place; until that rename a crash leaves the previous
+    checkpoint and its state in effect. The previous state is removed after.
+    """
+    os.makedirs(os.path.dirname(checkpoint_file) or ".", exist_ok=True)
+    with open(_state_file(checkpoint_file, checkpoint['rows']), "wb") as f:
+        pickle.dump(state, f)
+    with open(checkpoint_file + ".tmp", "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(checkpoint_file + ".tmp", checkpoint_file)
+    if previous_rows is not None and previous_rows != checkpoint['rows']:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(_state_file(checkpoint_file, previous_rows))
+
+
+def _check_appended(input_file: str, checkpoint: dict) -> None:
+    """Raises ValueError when the input was not only appended to since the checkpoint."""
+    offset, header_bytes = checkpoint['offset'], checkpoint['header_bytes']
+    if os.path.getsize(input_file) < offset or \
+            _window_digest(input_file, offset, header_bytes) != checkpoint['digest']:
+        raise ValueError(f"{input_file} changed before the checkpointed offset {offset}; "
+                         "it must only grow by appended rows (delete the checkpoint "
+                         "to reprocess it from scratch)")
+
+
+# ─── Reading new rows ─────────────────────────────────────────────────────────
+
+def read_new_rows(input_file: str, offset: int, header: bytes) -> tuple:
+    """
+    Parses the complete rows appended after `offset`.
+
+    A last line without its newline may still be being written, so it is
+    left for the next run.
+
+    Returns:
+        tuple: (the new rows as a dataframe, the offset after them)
+    """
+    with open(input_file, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    df = pd.read_csv(io.BytesIO(header + data[:end]))
+    return df, offset + end
+
+
+# ─── Appending outputs ────────────────────────────────────────────────────────
+
+def _dtype_names(df: pd.DataFrame) -> dict:
+    """Column -> dtype name, as recorded in the checkpoint for each output."""
+    return {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+
+def _cast_to_dtypes(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Casts numeric columns back to the dtypes recorded for an output.
+
+    Each batch is parsed on its own, so a missing value turns an integer
+    column into floats ('42.0') in that batch only, and a batch without one
+    turns a float column into integers. Recorded integer columns holding
+    missing values become the nullable integer dtype of the same width, so
+    they are written as '42' and ''. Columns that cannot be cast (e.g.
+    fractional values in a recorded integer column) are left as they are.
+    """
+    for col, recorded in dtypes.items():
+        if col not in df.columns or str(df[col].dtype) == recorded:
+            continue
+        target = pd.api.types.pandas_dtype(recorded)
+        if target.kind not in "iuf" or not pd.api.types.is_numeric_dtype(df[col].dtype):
+            continue
+        if target.kind in "iu" and df[col].isna().any():
+            target = f"{'U' if target.kind == 'u' else ''}Int{target.itemsize * 8}"
+        with contextlib.suppress(TypeError, ValueError):
+            df[col] = df[col].astype(target)
+    return df
+
+
+def _append_csv(df: pd.DataFrame, output_file: str, dtypes: dict = None) -> None:
+    """
+    Appends rows to a CSV output, writing the header only for a new file.
+
+    dtypes are the column dtypes recorded for the output on its first batch;
+    the rows are cast to them (see _cast_to_dtypes) so every batch is
+    formatted alike.
+    """
+    if dtypes:
+        df = _cast_to_dtypes(df, dtypes)
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    new = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    with open(output_file, "a", newline="") as f:
+        df.to_csv(f, index=False, header=new)
+
+
+def _rollback(output_files: dict, sizes: dict) -> None:
+    """Cuts outputs back to their checkpointed sizes, dropping rows of an interrupted run."""
+    for name, path in output_files.items():
+        size = sizes.get(name, 0)
+        if not os.path.exists(path) or os.path.getsize(path) < size:
+            raise ValueError(f"Output {path} is missing rows recorded in the checkpoint; "
+                             "delete the checkpoint to rebuild the outputs")
+        if os.path.getsize(path) > size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+
+
+def recompute_flags(output_file: str, bounds: dict,
+                    chunksize: int = DEFAULT_CHUNKSIZE, dtypes: dict = None) -> None:
+    """
+    Rewrites every flag of the flagged output with the given limits.
+
+    The output already holds the checked columns, so it is re-flagged
+    chunk by chunk without running the stage again, and swapped in once
+    complete. Each chunk is cast to the recorded dtypes, as appended
+    batches are.
+    """
+    rewritten = output_file + ".tmp"
+    with open(rewritten, "w", newline="") as f:
+        for i, chunk in enumerate(pd.read_csv(output_file, chunksize=chunksize)):
+            chunk = _cast_to_dtypes(apply_anomaly_flags(chunk, bounds), dtypes or {})
+            chunk.to_csv(f, index=False, header=(i == 0))
+    os.replace(rewritten, output_file)
+
+
+# ─── Incremental run ──────────────────────────────────────────────────────────
+
+def run_incremental(input_file: str, output_files: dict, checkpoint_file: str,
+                    anomaly_policy: str = 'keep', stage_options: dict = None) -> dict:
+    """
+    Processes the rows appended to input_file since the last checkpoint.
+
+    The first run (no checkpoint) processes every row and fits the stage
+    state; later runs parse only the new rows, append each stage's result to
+    its output and update the checkpoint. Outputs grown by an interrupted
+    run are cut back to their checkpointed size first.
+
+    Args:
+        input_file      (str) : Path to the input CSV, which only grows.
+        output_files    (dict): Output key -> plain CSV output path.
+        checkpoint_file (str) : Where the checkpoint (JSON) is kept; the stage
+                                state goes next to it (<checkpoint>.<rows>.state.pkl).
+        anomaly_policy  (str) : 'keep' or 'recompute' the flags of rows
+                                processed earlier (see the module docstring).
+        stage_options   (dict): Output key -> keyword options of the stage,
+                                e.g. a fixed encoder or bin specs.
+
+    Returns:
+        dict: {'rows': new rows processed, 'total_rows': rows processed so
+        far, 'offset': bytes of input processed, 'bounds': anomaly limits}
+    """
+    if anomaly_policy not in ANOMALY_POLICIES:
+        raise ValueError(f"anomaly_policy must be one of {list(ANOMALY_POLICIES)}")
+    not_csv = [path for path in output_files.values()
+               if output_format(path) != 'csv' or path.lower().endswith(('.gz', '.bz2', '.xz'))]
+    if not_csv:
+        raise ValueError(f"Incremental runs append to plain CSV outputs, got {', '.join(not_csv)}")
+    stage_options = dict(stage_options or {})
+
+    checkpoint, state = load_checkpoint(checkpoint_file)
+    if checkpoint is None:
+        with open(input_file, "rb") as f:
+            header = f.readline()
+        for path in output_files.values():
+            if os.path.exists(path):
+                os.remove(path)
+        checkpoint = {'version': CHECKPOINT_VERSION, 'input': input_file, 'offset': len(header),
+                      'header_bytes': len(header), 'rows': 0, 'outputs': {}}
+        state = {'stats': new_anomaly_statistics()}
+    else:
+        _check_appended(input_file, checkpoint)
+        _rollback(output_files, checkpoint['outputs'])
+        with open(input_file, "rb") as f:
+            header = f.read(checkpoint['header_bytes'])
+
+    df, offset = read_new_rows(input_file, checkpoint['offset'], header)
+    if len(df) == 0:
+        print(f"♻️  No new rows in {input_file} since row {checkpoint['rows']}")
+        return {'rows': 0, 'total_rows': checkpoint['rows'], 'offset': offset,
+                'bounds': anomaly_bounds_from_statistics(state['stats'])}
+
+    # Freeze the state fitted on the first batch: the vocabulary and bins
+    if 'encoder' not in state:
+        encoder = stage_options.get("encoded_categorical_features", {}).get("encoder")
+        if isinstance(encoder, str):
+            encoder = load_encoder(encoder)
+        if encoder is None:
+            encoder = default_layout(fit_categorical_encoder(df))
+        state['encoder'] = encoder
+    binned = stage_options.get("binned_numeric_ranges", {})
+    if 'bins' not in state and binned.get("bins") is not None:
+        bins = binned["bins"]
+        state['bins'] = load_bins(bins) if isinstance(bins, str) else bins
+    stage_options["encoded_categorical_features"] = {"encoder": state['encoder']}
+    if 'bins' in state:
+        stage_options["binned_numeric_ranges"] = {**binned, "bins": state['bins']}
+
+    # Row-local and fitted stages: append the new rows' results, in the
+    # column dtypes of each output's first batch
+    dtypes = checkpoint.setdefault('dtypes', {})
+    for name, stage in INCREMENTAL_STAGES.items():
+        if stage is not None:
+            result = stage(df, None, **stage_options.get(name, {}))
+            _append_csv(result, output_files[name], dtypes.setdefault(name, _dtype_names(result)))
+
+    # Anomaly flags: limits over every row so far
+    for col, stat in state['stats'].items():
+        stat.update(df[col].to_numpy())
+    bounds = anomaly_bounds_from_statistics(state['stats'])
+    flagged = output_files["flagged_anomalies"]
+    result = apply_anomaly_flags(df.copy(deep=False), bounds)
+    flagged_dtypes = dtypes.setdefault("flagged_anomalies", _dtype_names(result))
+    _append_csv(result, flagged, flagged_dtypes)
+    recomputed = anomaly_policy == 'recompute' and checkpoint['rows'] > 0
+    if recomputed:
+        recompute_flags(flagged, bounds, dtypes=flagged_dtypes)
+
+    previous_rows = checkpoint['rows']
+    checkpoint.update({
+        'offset' : offset,
+        'rows'   : checkpoint['rows'] + len(df),
+        'digest' : _window_digest(input_file, offset, checkpoint['header_bytes']),
+        'outputs': {name: os.path.getsize(path) for name, path in output_files.items()},
+    })
+    save_checkpoint(checkpoint, state, checkpoint_file, previous_rows)
+
+    print(f"➕ Appended {len(df)} new rows (rows {checkpoint['rows'] - len(df) + 1}–"
+          f"{checkpoint['rows']}) to every output; checkpoint at byte {offset}")
+    if recomputed:
+        print("   • anomaly flags of every row recomputed with the updated limits")
+    return {'rows': len(df), 'total_rows': checkpoint['rows'], 'offset': offset, 'bounds': bounds}
@@ -0,0 +1,213 @@
+"""
+Group 6 - Feature Engineering
+input_cache.py - Memory-mapped binary sidecar of a parsed input file
+The first parse of a CSV saves every column as a NumPy .npy file in a
+sidecar folder next to it (input/data.csv -> input/data.csv.parsed/). Later
+reads memory-map those files instead of parsing text: numeric columns are
+used in place without copying, and separate processes share the same pages
+through the OS page cache. The manifest only holds the source's size,
+modification time and hash and the schema, so checking whether a sidecar is
+current stays cheap; the distinct values of text and category columns are
+kept in one JSON file per column, read only when that column is loaded.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from stage_cache import file_digest
+
+# Sidecar folder of input/data.csv is input/data.csv.parsed
+SIDECAR_SUFFIX = ".parsed"
+
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the sidecar layout changes, so old sidecars are rebuilt
+SIDECAR_VERSION = 2
+
+
+def sidecar_path(path: str) -> str:
+    """Returns the sidecar folder of an input file."""
+    return path + SIDECAR_SUFFIX
+
+
+def _source_signature(path: str) -> dict:
+    """Size and modification time of the source file."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _dtype_name(dtype) -> str:
+    """A dtype name that pandas turns back into the same dtype."""
+    if isinstance(dtype, pd.StringDtype) and dtype.na_value is not np.nan:
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+def _encode_column(series: pd.Series) -> tuple:
+    """
+    Splits a column into .npy arrays, its distinct values and JSON metadata.
+
+    Returns:
+        tuple: (metadata dict, {file suffix: array}, distinct values or None)
+        or None when the column cannot be stored (e.g. mixed-type text).
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = dtype.categories
+        return ({'kind': 'category', 'categories_dtype': _dtype_name(categories.dtype),
+                 'ordered': bool(dtype.ordered)},
+                {'codes': series.cat.codes.to_numpy()}, categories.tolist())
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+        return {'kind': 'array'}, {'values': series.to_numpy()}, None
+    if pd.api.types.is_string_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
+        codes, uniques = pd.factorize(series)
+        values = list(uniques)
+        if not all(isinstance(value, str) for value in values):
+            return None
+        return {'kind': 'text', 'dtype': _dtype_name(dtype)}, {'codes': codes.astype(np.int32)}, values
+    return None
+
+
+def _write_json(path: str, data) -> None:
+    """Writes JSON through a temporary file and os.replace, so readers never see half of it."""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def write_sidecar(df: pd.DataFrame, path: str) -> bool:
+    """
+    Saves a freshly parsed input as the sidecar of its source file.
+
+    Args:
+        df   (pd.DataFrame): The input as parsed from `path`.
+        path (str)         : The source file.
+
+    Returns:
+        bool: True when the sidecar was written, False when a column type
+        cannot be stored (reads then keep parsing the source).
+    """
+    columns, arrays, vocabularies = [], {}, {}
+    for position, col in enumerate(df.columns):
+        encoded = _encode_column(df[col])
+        if encoded is None:
+            return False
+        meta, parts, values = encoded
+        columns.append({'name': col, **meta})
+        for suffix, array in parts.items():
+            arrays[f"{position}.{suffix}.npy"] = array
+        if values is not None:
+            vocabularies[f"{position}.values.json"] = values
+
+    manifest = {
+        'version': SIDECAR_VERSION,
+        'source' : {**_source_signature(path), 'sha256': file_digest(path)},
+        'rows'   : len(df),
+        'columns': columns,
+    }
+
+    # Build in a temporary folder and swap it in, so readers never see half a sidecar
+    target = sidecar_path(path)
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, name), array, allow_pickle=False)
+    for name, values in vocabularies.items():
+        with open(os.path.join(tmp, name), "w") as f:
+            json.dump(values, f)
+    with open(os.path.join(tmp, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return True
+
+
+def _read_manifest(path: str, verify_hash: bool) -> dict | None:
+    """Returns the sidecar manifest of `path` if it still matches the source, else None."""
+    manifest_file = os.path.join(sidecar_path(path), MANIFEST_FILE)
+    try:
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != SIDECAR_VERSION:
+        return None
+
+    source = manifest['source']
+    current = _source_signature(path)
+    if current['size'] != source['size']:
+        return None
+    if verify_hash or current['mtime_ns'] != source['mtime_ns']:
+        # Same size but touched (or asked to verify): trust only an identical hash
+        if file_digest(path) != source['sha256']:
+            return None
+        if current['mtime_ns'] != source['mtime_ns']:
+            source['mtime_ns'] = current['mtime_ns']
+            _write_json(manifest_file, manifest)
+    return manifest
+
+
+def sidecar_is_current(path: str) -> bool:
+    """True when `path` has a sidecar that still matches it."""
+    return _read_manifest(path, verify_hash=False) is not None
+
+
+def load_sidecar(path: str, columns: list = None, verify_hash: bool = False) -> pd.DataFrame | None:
+    """
+    Memory-maps the sidecar of an input file.
+
+    The sidecar is used only when the source still has the size recorded at
+    parse time and either the same modification time or, when that changed
+    (or verify_hash is set), the same SHA-256 hash.
+
+    Args:
+        path        (str) : The source file.
+        columns     (list): Only load these columns (None loads all of them).
+        verify_hash (bool): Always compare the source's hash, not just its
+                            size and modification time.
+
+    Returns:
+        pd.DataFrame | None: The parsed input, with numeric columns backed by
+        read-only memory maps, or None when there is no valid sidecar.
+    """
+    manifest = _read_manifest(path, verify_hash)
+    if manifest is None:
+        return None
+    folder = sidecar_path(path)
+    wanted = None if columns is None else set(columns)
+
+    def mapped(position: int, part: str) -> np.ndarray:
+        # A plain ndarray view of the memory map, so it behaves like parsed data
+        array = np.load(os.path.join(folder, f"{position}.{part}.npy"), mmap_mode='r')
+        return array.view(np.ndarray)
+
+    def distinct(position: int) -> list:
+        with open(os.path.join(folder, f"{position}.values.json")) as f:
+            return json.load(f)
+
+    data = {}
+    for position, meta in enumerate(manifest['columns']):
+        name = meta['name']
+        if wanted is not None and name not in wanted:
+            continue
+        if meta['kind'] == 'array':
+            data[name] = mapped(position, 'values')
+            continue
+        codes = mapped(position, 'codes')
+        if meta['kind'] == 'category':
+            categories = pd.Index(distinct(position), dtype=meta['categories_dtype'])
+            data[name] = pd.Categorical.from_codes(codes, categories, ordered=meta['ordered'])
+        else:
+            data[name] = pd.array(distinct(position), dtype=meta['dtype']).take(codes, allow_fill=True)
+    return pd.DataFrame(data, copy=False)
+
+
+def remove_sidecar(path: str) -> None:
+    """Deletes the sidecar of an input file, if any."""
+    shutil.rmtree(sidecar_path(path), ignore_errors=True)
@@ -2,20 +2,35 @@
 Group 6 - Feature Engineering
 main.py - Orchestrates all 5 CSV processing functions
 Run this file to process the input CSV through all feature engineering steps.
+Modules that load pandas are imported inside the functions that use them,
+and each stage's module only when the stage runs, so --help, argument
+errors and single-stage runs (--stages) start fast.
 """
 
+import argparse
+import contextlib
+import dataclasses
+import io
 import os
 import sys
+import tempfile
+import time
 
-from derive_computed_columns      import derive_computed_columns
-from encode_categorical_features  import encode_categorical_features
-from bin_numeric_ranges           import bin_numeric_ranges
-from time_based_feature_extraction import time_based_feature_extraction
-from flag_anomalies_column        import flag_anomalies_column
+from pipeline_config              import (
+    ANOMALY_DETECTORS, ANOMALY_METHODS, ANOMALY_POLICIES, GROUP_STAGES, INPUT_GROUP,
+    ONE_HOT_COLUMNS, OUTPUT_FORMATS, OVERLAP_BY_DEFAULT, STAGES, PipelineOptions,
+    check_options, is_sharded,
+)
+from stage_cache                  import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, StageCache, file_digest
+from metrics                      import (
+    DEFAULT_PROFILE_DIR, PROFILERS, measure_stage, phase, write_metrics,
+)
 
 # ─── Configuration ────────────────────────────────────────────────────────────
 INPUT_FILE = "input/data.csv"
 
+OUTPUT_DIR = "output"
+
 OUTPUT_FILES = {
     "derived_computed_columns"     : "output/derived_computed_columns.csv",
     "encoded_categorical_features" : "output/encoded_categorical_features.csv",
@@ -23,59 +38,1012 @@ OUTPUT_FILES = {
     "time_based_features"          : "output/time_based_features.csv",
     "flagged_anomalies"            : "output/flagged_anomalies.csv",
 }
+
+# STAGES (output key -> processing function, in the order the pipeline runs
+# them) comes from pipeline_config, which imports each function on first use
+
+# Stages whose output depends on statistics of the whole input (vocabularies,
+# anomaly limits). Sharded runs reduce those over every shard before running them.
+GLOBAL_STAGES = ("encoded_categorical_features", "flagged_anomalies")
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-def run_pipeline():
+def _format_bytes(n: float) -> str:
+    """Formats a byte count as a short human-readable string."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def stage_inputs(name: str) -> tuple:
+    """Returns the (INPUT_COLUMNS, INPUT_DTYPES) declared by a stage's module."""
+    module = sys.modules[STAGES[name].__module__]
+    return module.INPUT_COLUMNS, module.INPUT_DTYPES
+
+
+def stage_cache_key(name: str, input_digest: str, output_file: str,
+                    options: dict, chunksize: int | None) -> str:
+    """
+    Returns the stage cache key of one stage run.
+
+    The key covers the input contents, the stage's STAGE_VERSION, its
+    keyword options (files such as the encoder artifact by content), the
+    output format and codec, the chunk size when streamed, and whatever the
+    stage's cache_context() reports (e.g. today's date for tenure).
+    """
+    from pipeline_io import output_codec
+
+    module = sys.modules[STAGES[name].__module__]
+    params = {
+        "output"     : os.path.basename(output_file).split(".", 1)[-1].lower(),
+        "compression": output_codec(output_file),
+        "chunksize"  : chunksize,
+        "options"    : {
+            key: file_digest(value) if isinstance(value, str) and os.path.isfile(value) else value
+            for key, value in options.items()
+        },
+        "context"    : getattr(module, "cache_context", dict)(),
+    }
+    return StageCache.key(name, input_digest, module.STAGE_VERSION, params)
+
+
+def stage_files(output_file: str, options: dict | None) -> list:
+    """Files a stage run writes: its output, and the sparse columns saved next to it."""
+    from pipeline_io import SPARSE_SUFFIX
+
+    return [output_file] + ([output_file + SPARSE_SUFFIX] if (options or {}).get("sparse") else [])
+
+
+def shared_input_dtypes(names: list = None) -> dict:
+    """Merges the dtypes the named stages (default: all) declare, for the shared single parse."""
+    dtypes = {}
+    for name in STAGES if names is None else names:
+        dtypes.update(stage_inputs(name)[1])
+    return dtypes
+
+
+def print_memory_report(input_file: str, names: list = None) -> None:
+    """Prints each stage's input memory footprint before and after compaction."""
+    from pipeline_io import memory_footprint
+
+    print(f"\n🧠 Input memory per stage ({input_file}):")
+    print(f"   {'stage':<30}{'default':>11}{'compact':>11}{'projected':>11}")
+    for name in STAGES if names is None else names:
+        columns, dtypes = stage_inputs(name)
+        sizes = memory_footprint(input_file, columns, dtypes)
+        print(f"   {name:<30}{_format_bytes(sizes['default']):>11}"
+              f"{_format_bytes(sizes['compact']):>11}{_format_bytes(sizes['projected']):>11}")
+
+
+# Per-process state of pool workers, set up by _init_worker
+_WORKER_STATE = {}
+
+
+def _init_worker(frame_cache: str, compression: dict, sidecar_input: str = None) -> None:
+    """Remembers where the parent saved the parsed input and applies its write options."""
+    from pipeline_io import set_output_compression
+
+    _WORKER_STATE['frame_cache'] = frame_cache
+    _WORKER_STATE['sidecar_input'] = sidecar_input
+    for fmt, codec in compression.items():
+        set_output_compression(fmt, codec)
+
+
+def _worker_frame():
+    """
+    Loads the parent's parsed input once per worker: memory-mapped from the
+    input's sidecar when there is one (pages shared with the other workers),
+    otherwise from the pickled copy.
+    """
+    import pandas as pd
+
+    from pipeline_io import read_input, sidecar_reads
+
+    if 'df' not in _WORKER_STATE:
+        if _WORKER_STATE['sidecar_input'] is not None:
+            with sidecar_reads():
+                _WORKER_STATE['df'] = read_input(_WORKER_STATE['sidecar_input'],
+                                                 dtypes=shared_input_dtypes())
+        else:
+            _WORKER_STATE['df'] = pd.read_pickle(_WORKER_STATE['frame_cache'])
+    return _WORKER_STATE['df']
+
+
+def run_stage(name: str, source, output_file: str, chunksize: int = None,
+              options: dict = None, profiler: str = None,
+              profile_dir: str = DEFAULT_PROFILE_DIR,
+              overlap: bool = OVERLAP_BY_DEFAULT) -> dict:
+    """
+    Runs one stage and measures it.
+
+    Args:
+        name        (str) : Output key of the stage in STAGES.
+        source            : The shared input dataframe, or the input path.
+        output_file (str) : Path where the stage writes its output.
+        chunksize   (int) : When set, stream `source` (a path) in chunks.
+        options     (dict): Keyword options for the stage function.
+        profiler    (str) : Profiler from metrics.PROFILERS to attach, or None.
+        profile_dir (str) : Where the profiler report is written.
+        overlap     (bool): When streaming, read and write chunks on
+                            background threads while transforming.
+
+    Returns:
+        dict: The stage's metrics record (see metrics.StageMetrics).
+    """
+    stage = STAGES[name]
+    with measure_stage(stage.__name__, profiler, profile_dir) as metrics:
+        if chunksize:
+            from streaming import stream_stage
+            metrics.rows = stream_stage(stage, source, output_file, chunksize, overlap, options)
+        else:
+            metrics.rows = len(stage(source, output_file, **(options or {})))
+    metrics.bytes_written = os.path.getsize(output_file) if os.path.exists(output_file) else 0
+    return {**metrics.as_record(), 'output': name, 'streamed': bool(chunksize), 'cached': False}
+
+
+def _run_stage_in_worker(name: str, input_file: str, output_file: str, chunksize: int,
+                         streamed: bool, options: dict, profiler: str,
+                         profile_dir: str, overlap: bool) -> tuple:
+    """
+    Runs one stage inside a pool worker.
+
+    Console output is captured so the parent can print it in stage order.
+
+    Returns:
+        tuple: (captured console output, the stage's metrics record)
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        source = input_file if streamed else _worker_frame()
+        record = run_stage(name, source, output_file, chunksize if streamed else None,
+                           options, profiler, profile_dir, overlap)
+    return buffer.getvalue(), record
+
+
+def _run_stages_parallel(df, input_file: str, output_files: dict, chunksize: int,
+                         streamed: list, jobs: int, compression: dict,
+                         stage_options: dict, names: list, profilers: dict,
+                         profile_dir: str, overlap: bool = OVERLAP_BY_DEFAULT) -> list:
+    """
+    Runs the named stages at the same time in a pool of worker processes.
+
+    Workers never re-parse the CSV: they memory-map the input's binary
+    sidecar when it is current, otherwise the parsed input is pickled once
+    to a temporary cache that every worker loads. Results are collected in
+    STAGES order, so the console output matches a sequential run.
+
+    Returns:
+        list: The metrics record of each stage, in STAGES order.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from input_cache import sidecar_is_current
+
+    records = []
+    with tempfile.TemporaryDirectory(prefix="group6_") as tmp:
+        frame_cache = sidecar_input = None
+        if df is not None and sidecar_is_current(input_file):
+            sidecar_input = input_file
+        elif df is not None:
+            frame_cache = os.path.join(tmp, "input.pkl")
+            df.to_pickle(frame_cache)
+
+        workers = min(jobs, len(names))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(frame_cache, compression, sidecar_input)) as pool:
+            futures = [
+                pool.submit(_run_stage_in_worker, name, input_file, output_files[name],
+                            chunksize, name in streamed, stage_options.get(name, {}),
+                            profilers.get(name), profile_dir, overlap)
+                for name in names
+            ]
+            for future in futures:
+                output, record = future.result()
+                print(output, end="")
+                records.append(record)
+    return records
+
+
+def prepare_encoder(encoder_file: str, source, hash_buckets: dict = None) -> str:
+    """
+    Makes sure a categorical encoder artifact exists at encoder_file.
+
+    An existing artifact is reused as is, so every batch is encoded with the
+    same columns; otherwise the vocabularies are fitted on `source` (a path
+    or an already parsed dataframe) and saved there. hash_buckets (column ->
+    buckets) hashes those columns; a reused artifact must hash the same way.
+
+    Returns:
+        str: encoder_file, to hand to encode_categorical_features.
+    """
+    from encode_categorical_features import fit_categorical_encoder, load_encoder
+
+    if os.path.exists(encoder_file):
+        hashed = {col: spec['buckets']
+                  for col, spec in load_encoder(encoder_file).get('hash', {}).items()}
+        if hash_buckets is not None and hashed != hash_buckets:
+            raise ValueError(f"Encoder artifact {encoder_file} hashes {hashed or 'no columns'}, "
+                             f"not {hash_buckets}; remove it to refit")
+        print(f"🔤 Encoder : {encoder_file} (reused)")
+    else:
+        fit_categorical_encoder(source, encoder_file, hash_buckets=hash_buckets)
+        print(f"🔤 Encoder : {encoder_file} (fitted on this input)")
+    return encoder_file
+
+
+def prepare_bins(bins_file: str | None, bin_spec: str | None, source,
+                 chunksize: int = None) -> dict | str:
+    """
+    Makes sure the bins of bin_numeric_ranges are fitted.
+
+    An existing artifact at bins_file is reused as is, so every batch gets
+    the same edges; otherwise the specs (bin_spec, or the built-in
+    BIN_SPECS) are fitted on `source` - a path, a list of shards or a
+    parsed dataframe - and saved to bins_file when given.
+
+    Returns:
+        dict | str: The fitted bins, or bins_file, to hand to bin_numeric_ranges.
+    """
+    from bin_numeric_ranges import fit_bins
+
+    if bins_file is not None and os.path.exists(bins_file):
+        print(f"📏 Bins    : {bins_file} (reused)")
+        return bins_file
+    bins = fit_bins(source, bin_spec, bins_file, chunksize)
+    if bins_file is not None:
+        print(f"📏 Bins    : {bins_file} (fitted on this input)")
+        return bins_file
+    return bins
+
+
+def _run_feature_table(input_file: str, output_file: str, groups: list,
+                       stage_options: dict, metrics_file: str) -> None:
+    """Parses the input once and writes the consolidated feature table."""
+    from feature_table import write_feature_table
+    from pipeline_io import read_input
+
+    options = {group: stage_options.get(name, {}) for group, name in GROUP_STAGES.items()}
+    with measure_stage("read_input") as parse_metrics, phase("read"):
+        df = read_input(input_file, dtypes=shared_input_dtypes())
+    parse_metrics.rows = len(df)
+    with measure_stage("feature_table") as metrics:
+        table, columns = write_feature_table(df, output_file, groups, options)
+    metrics.rows = len(table)
+    metrics.bytes_written = os.path.getsize(output_file)
+    write_metrics([
+        {**parse_metrics.as_record(), 'event': 'parse'},
+        {**metrics.as_record(), 'output': output_file, 'columns': len(table.columns),
+         'groups': {group: len(cols) for group, cols in columns.items()}},
+    ], metrics_file)
+
+    print("\n" + "=" * 55)
+    print("  ✅ Pipeline complete! Feature table saved.")
+    print("=" * 55)
+    print(f"\n📄 {output_file}  ({metrics.bytes_written} bytes, {len(table)} rows, "
+          f"{len(table.columns)} columns, written in {metrics.phases['write']:.3f}s)")
+    for group, cols in columns.items():
+        print(f"   • {group:<10} {', '.join(cols)}")
+
+
+def _run_feature_plan(input_file: str, output_file: str, features: list,
+                      metrics_file: str) -> None:
+    """Reads only the input columns the requested features need and writes those features."""
+    from feature_plan import plan_features
+    from pipeline_io import load_input, save_output
+
+    plan = plan_features(features)
+    with measure_stage("read_input") as parse_metrics:
+        df = load_input(input_file, plan.inputs, plan.input_dtypes())
+    parse_metrics.rows = len(df)
+    with measure_stage("feature_plan") as metrics:
+        with phase("compute"):
+            table = plan.transform(df)
+        save_output(table, output_file, "feature_plan")
+    metrics.rows = len(table)
+    metrics.bytes_written = os.path.getsize(output_file)
+    summary = plan.summary()
+    write_metrics([
+        {**parse_metrics.as_record(), 'event': 'parse', 'columns': len(df.columns)},
+        {**metrics.as_record(), 'output': output_file, 'columns': len(table.columns), **summary},
+    ], metrics_file)
+
+    print("\n" + "=" * 55)
+    print("  ✅ Pipeline complete! Requested features saved.")
+    print("=" * 55)
+    print(f"\n🧭 Plan   : {summary['computed']} features computed for {summary['requested']} "
+          f"requested ({summary['pruned']} pruned, {summary['shared']} shared)")
+    print(f"📥 Read   : {', '.join(summary['inputs'])}")
+    print(f"\n📄 {output_file}  ({metrics.bytes_written} bytes, {len(table)} rows, "
+          f"{len(table.columns)} columns: {', '.join(table.columns)})")
+
+
+def _run_shard(index: int, shard: str, output_files: dict, names: list, stage_options: dict,
+               input_cache: bool, gather: bool, fit_encoder: bool,
+               hash_buckets: dict = None) -> dict:
+    """
+    Runs the named stages on one input shard (in a pool worker or inline).
+
+    The shard is parsed once and shared by the stages; their console output
+    is dropped, the parent reports per stage instead.
+
+    Args:
+        gather      (bool): Also gather the shard's anomaly statistics.
+        fit_encoder (bool): Also fit the categorical vocabularies of the shard.
+        hash_buckets (dict): Columns the fitted encoder hashes instead.
+
+    Returns:
+        dict: 'record' (metrics of the shard), 'stats' and 'encoder' (None
+        unless gathered / fitted).
+    """
+    from encode_categorical_features import fit_categorical_encoder
+    from pipeline_io import read_input, sidecar_reads
+    from sharding import anomaly_statistics, shard_output_path
+
+    result = {'stats': None, 'encoder': None}
+    with contextlib.redirect_stdout(io.StringIO()), sidecar_reads(input_cache), \
+            measure_stage("shard") as metrics:
+        with phase("read"):
+            df = read_input(shard, dtypes=shared_input_dtypes())
+        for name in names:
+            STAGES[name](df, shard_output_path(output_files[name], index, shard),
+                         **stage_options.get(name, {}))
+        if gather:
+            result['stats'] = anomaly_statistics(df)
+        if fit_encoder:
+            result['encoder'] = fit_categorical_encoder(df, hash_buckets=hash_buckets)
+    metrics.rows = len(df)
+    result['record'] = {**metrics.as_record(), 'event': 'shard', 'shard': shard,
+                        'stages': list(names)}
+    return result
+
+
+def _map_shards(shards: list, jobs: int, codecs: dict, *args) -> list:
+    """Runs _run_shard(index, shard, *args) for every shard; results come back in shard order."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    indexes = range(len(shards))
+    if jobs == 1:
+        return [_run_shard(index, shard, *args) for index, shard in zip(indexes, shards)]
+    repeated = [[arg] * len(shards) for arg in args]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(shards)), initializer=_init_worker,
+                             initargs=(None, codecs)) as pool:
+        return list(pool.map(_run_shard, indexes, shards, *repeated))
+
+
+def _run_sharded(shards: list, output_files: dict, jobs: int, codecs: dict,
+                 encoder_file: str | None, input_cache: bool, metrics_file: str | None,
+                 local_options: dict = None, names: list = None,
+                 encode_options: dict = None) -> None:
+    """
+    Runs every stage over an input split into shards, as map / reduce / map.
+
+    Pass 1 runs the row-local stages on each shard and gathers its anomaly
+    statistics and categorical vocabularies. These are merged into global
+    anomaly limits and one vocabulary, so pass 2 (encoding and anomaly
+    flags) gives every shard the same columns and flags the same rows as a
+    run on the concatenated input would. Shards run in parallel on `jobs`
+    worker processes; each output is a folder with one file per input
+    shard, in input order (see sharding.shard_output_path). local_options
+    are the pass 1 stage options, e.g. bins fitted over every shard. names
+    limits the run to some stages (default: all); statistics are only
+    gathered for the global stages among them. encode_options may hash
+    columns ('hash_buckets', used when fitting) and make the one-hot
+    columns 'sparse'.
+    """
+    from encode_categorical_features import (
+        default_layout, load_encoder, merge_encoders, save_encoder,
+    )
+    from pipeline_io import output_compression
+    from sharding import global_anomaly_bounds, shard_output_path
+
+    names = list(STAGES) if names is None else names
+    local = [name for name in names if name not in GLOBAL_STAGES]
+    applied_stages = [name for name in GLOBAL_STAGES if name in names]
+    gather = "flagged_anomalies" in names
+    encoding = "encoded_categorical_features" in names
+    fit_encoder = encoding and (encoder_file is None or not os.path.exists(encoder_file))
+    encode_options = dict(encode_options or {})
+    hash_buckets = encode_options.pop("hash_buckets", None)
+
+    start = time.perf_counter()
+    with output_compression(codecs):
+        mapped = _map_shards(shards, jobs, codecs, output_files, local, local_options or {},
+                             input_cache, gather, fit_encoder, hash_buckets)
+        map_seconds = time.perf_counter() - start
+
+        # Reduce: global anomaly limits and one vocabulary for every shard
+        bounds, stats = {}, {}
+        if gather:
+            bounds, stats = global_anomaly_bounds([result['stats'] for result in mapped])
+        options = {"flagged_anomalies": {"bounds": bounds}}
+        if fit_encoder:
+            encoder = merge_encoders([result['encoder'] for result in mapped])
+            if encoder_file is not None:
+                save_encoder(encoder, encoder_file)
+                print(f"🔤 Encoder : {encoder_file} (fitted on all {len(shards)} shards)")
+            else:
+                # Same columns as encoding the whole input in one go
+                encoder = default_layout(encoder)
+            options["encoded_categorical_features"] = {**encode_options, "encoder": encoder}
+        elif encoding:
+            # The artifact exists; this checks it hashes as asked and reports it
+            prepare_encoder(encoder_file, None, hash_buckets)
+            options["encoded_categorical_features"] = {**encode_options,
+                                                       "encoder": load_encoder(encoder_file)}
+
+        applied = []
+        if applied_stages:
+            applied = _map_shards(shards, jobs, codecs, output_files, applied_stages, options,
+                                  input_cache, False, False)
+    wall_seconds = time.perf_counter() - start
+
+    records = [result['record'] for result in mapped + applied]
+    shard_seconds = sum(record['total_s'] for record in records)
+    rows = sum(result['record']['rows'] for result in mapped)
+    outputs = {name: [shard_output_path(output_files[name], index, shard)
+                      for index, shard in enumerate(shards)] for name in names}
+    output_bytes = {name: sum(os.path.getsize(path) for path in paths)
+                    for name, paths in outputs.items()}
+    records.append({
+        'event'        : 'pipeline',
+        'input'        : shards,
+        'shards'       : len(shards),
+        'jobs'         : jobs,
+        'rows'         : rows,
+        'map_s'        : round(map_seconds, 6),
+        'wall_s'       : round(wall_seconds, 6),
+        'shard_s'      : round(shard_seconds, 6),
+        'bytes_written': sum(output_bytes.values()),
+    })
+    write_metrics(records, metrics_file)
+
+    for name in names:
+        folder = os.path.dirname(outputs[name][0])
+        print(f"[{STAGES[name].__name__}] ✅ Saved {len(shards)} shards to: {folder}/")
+
+    print("\n" + "=" * 55)
+    print("  ✅ Pipeline complete! All output shards saved.")
+    print("=" * 55)
+
+    for col, (low, high) in bounds.items():
+        mode = "exact" if getattr(stats[col], 'is_exact', True) else "sketch"
+        print(f"   • {col} limits over all shards: [{low:g}, {high:g}] ({mode})")
+    workers = min(jobs, len(shards))
+    print(f"\n⚡ {rows} rows in {len(shards)} shards ran on {workers} "
+          f"worker{'s' if workers > 1 else ''} in {wall_seconds:.3f}s wall-clock "
+          f"({shard_seconds:.3f}s summed across shards)")
+    if metrics_file is not None:
+        print(f"📊 Shard metrics appended to {metrics_file}")
+
+    print("\n📄 Output folders generated:")
+    for name, paths in outputs.items():
+        print(f"   • {os.path.dirname(paths[0])}/  ({len(paths)} files, {output_bytes[name]} bytes)")
+
+
+def run_pipeline(input_file: str = INPUT_FILE, output_files: dict = None,
+                 options: PipelineOptions = None, **overrides):
+    """
+    Runs all 5 feature engineering functions (or the selected `stages`) on one input CSV.
+
+    The input is parsed once and the same dataframe is handed to every
+    stage; each stage works on a shallow copy, so the original column data
+    is shared instead of being re-parsed and duplicated five times.
+
+    A directory or glob pattern as input_file runs the stages on every shard
+    it holds, `jobs` shards at a time (see _run_sharded). The stage cache is
+    not used for sharded input.
+
+    Args:
+        input_file   (str) : Path to the input CSV file, or a directory /
+                             glob pattern of input shards.
+        output_files (dict): Output key -> output path. Defaults to OUTPUT_FILES.
+        options      (PipelineOptions): How the input is processed (see
+                             pipeline_config.PipelineOptions). None uses the
+                             defaults.
+        **overrides        : Single options by name, set on top of `options`,
+                             e.g. run_pipeline(path, jobs=2, chunksize=10_000).
+
+    Raises:
+        ValueError: For options that cannot be combined (see
+        pipeline_config.check_options).
+    """
+    from pipeline_io import csv_write_jobs, output_compression, output_format, sidecar_reads
+
+    options = dataclasses.replace(options or PipelineOptions(), **overrides)
+    check_options(input_file, options)
+
+    output_files = output_files or OUTPUT_FILES
+    names = [name for name in STAGES if options.stages is None or name in options.stages]
+    custom_anomalies = options.anomaly_methods is not None or options.anomaly_by is not None
+    sharded = is_sharded(input_file)
+
+    # Compression applies to the formats actually written
+    written = ([options.feature_table_file] if options.feature_table_file is not None
+               else [output_files[name] for name in names])
+    codecs = {}
+    if options.compression != "default":
+        codecs = {output_format(path): options.compression for path in written}
+
     print("=" * 55)
     print("  Group 6 — Feature Engineering CSV Pipeline")
     print("=" * 55)
 
     # Validate input file exists
-    if not os.path.exists(INPUT_FILE):
-        print(f"\n❌ ERROR: Input file '{INPUT_FILE}' not found!")
+    shards = None
+    if sharded:
+        from sharding import resolve_shards
+        try:
+            shards = resolve_shards(input_file)
+        except FileNotFoundError:
+            shards = []
+    if shards == [] or not (sharded or os.path.exists(input_file)):
+        print(f"\n❌ ERROR: Input file '{input_file}' not found!")
         print("   Please place your CSV file in the 'input/' folder.")
         sys.exit(1)
 
-    print(f"\n📂 Input  : {INPUT_FILE}")
-    print(f"📁 Output : output/\n")
+    print(f"\n📂 Input  : {input_file}" + (f" ({len(shards)} shards)" if sharded else ""))
+    folders = dict.fromkeys(
+        os.path.dirname(options.feature_table_file or output_files[name]) or "." for name in names)
+    print(f"📁 Output : {', '.join(folder + '/' for folder in folders)}\n")
 
-    # Run all 5 feature engineering functions
-    derive_computed_columns(
-        INPUT_FILE,
-        OUTPUT_FILES["derived_computed_columns"]
-    )
+    # Fit configured bins once, over the whole input, before any stage runs
+    binning = "binned_numeric_ranges" in names
+    bin_options = {}
+    if binning and (options.bins_file is not None or options.bin_spec is not None):
+        bin_options["bins"] = prepare_bins(options.bins_file, options.bin_spec,
+                                           shards or input_file, options.chunksize)
+    if binning and options.bin_codes:
+        bin_options["codes"] = True
 
-    encode_categorical_features(
-        INPUT_FILE,
-        OUTPUT_FILES["encoded_categorical_features"]
-    )
+    if options.checkpoint_file is not None:
+        from bin_numeric_ranges import save_label_dictionary
+        from incremental import run_incremental
 
-    bin_numeric_ranges(
-        INPUT_FILE,
-        OUTPUT_FILES["binned_numeric_ranges"]
-    )
+        stage_options = {"binned_numeric_ranges": bin_options} if bin_options else {}
+        if options.encoder_file is not None:
+            stage_options["encoded_categorical_features"] = {
+                "encoder": prepare_encoder(options.encoder_file, input_file, options.hash_buckets)}
+        if options.bin_codes:
+            save_label_dictionary(bin_options.get("bins"), output_files["binned_numeric_ranges"])
+        with measure_stage("incremental") as metrics:
+            result = run_incremental(input_file, output_files, options.checkpoint_file,
+                                     options.anomaly_policy, stage_options)
+        metrics.rows = result['rows']
+        write_metrics([{**metrics.as_record(), 'event': 'incremental',
+                        'total_rows': result['total_rows'], 'offset': result['offset'],
+                        'anomaly_policy': options.anomaly_policy}], options.metrics_file)
+        return
 
-    time_based_feature_extraction(
-        INPUT_FILE,
-        OUTPUT_FILES["time_based_features"]
-    )
+    # Hashing (applied when the encoder is fitted) and sparse one-hot columns
+    encode_options = {}
+    if options.hash_buckets is not None:
+        encode_options["hash_buckets"] = options.hash_buckets
+    if options.sparse_one_hot:
+        encode_options["sparse"] = True
 
-    flag_anomalies_column(
-        INPUT_FILE,
-        OUTPUT_FILES["flagged_anomalies"]
-    )
+    if sharded:
+        local_options = {"binned_numeric_ranges": bin_options} if bin_options else {}
+        with csv_write_jobs(options.write_jobs):
+            _run_sharded(shards, output_files, options.jobs, codecs, options.encoder_file,
+                         options.input_cache, options.metrics_file, local_options, names,
+                         encode_options)
+        return
+
+    streamed = []
+    if options.chunksize:
+        from streaming import STREAMABLE_STAGES
+        streamed = [name for name in names if STAGES[name] in STREAMABLE_STAGES]
+
+    # Keyword options handed to individual stages
+    stage_options = {}
+    encoding = "encoded_categorical_features" in names
+    if encoding and (options.encoder_file is not None or encode_options):
+        stage_options["encoded_categorical_features"] = dict(encode_options)
+        if options.encoder_file is not None:
+            stage_options["encoded_categorical_features"]["encoder"] = \
+                prepare_encoder(options.encoder_file, input_file, options.hash_buckets)
+    if custom_anomalies and "flagged_anomalies" in names:
+        stage_options["flagged_anomalies"] = {"methods": options.anomaly_methods,
+                                              "by": options.anomaly_by}
+    if bin_options:
+        stage_options["binned_numeric_ranges"] = bin_options
+    if options.windows is not None and "time_based_features" in names:
+        stage_options["time_based_features"] = {
+            "windows": list(options.windows), "window_by": options.window_by,
+            "window_means": options.window_means}
+    if binning and options.bin_codes:
+        from bin_numeric_ranges import save_label_dictionary
+        # Streamed and cached runs never write it themselves
+        labels_of = options.feature_table_file or output_files["binned_numeric_ranges"]
+        save_label_dictionary(bin_options.get("bins"), labels_of)
+
+    if options.feature_table_file is not None:
+        with output_compression(codecs), sidecar_reads(options.input_cache), \
+                csv_write_jobs(options.write_jobs):
+            if options.features is not None:
+                _run_feature_plan(input_file, options.feature_table_file, options.features,
+                                  options.metrics_file)
+                return
+            _run_feature_table(input_file, options.feature_table_file, options.groups,
+                               stage_options, options.metrics_file)
+        return
+
+    from input_cache import sidecar_is_current
+    from pipeline_io import read_input
+
+    pipeline_start = time.perf_counter()
+    with output_compression(codecs), sidecar_reads(options.input_cache), \
+            csv_write_jobs(options.write_jobs):
+        # Serve stages whose inputs and parameters have not changed
+        pending = list(names)
+        cache_keys = {}
+        records = []
+        if options.cache is not None:
+            input_digest = file_digest(input_file)
+            cache_keys = {
+                name: stage_cache_key(name, input_digest, output_files[name],
+                                      stage_options.get(name, {}),
+                                      options.chunksize if name in streamed else None)
+                for name in names
+            }
+            if not options.force:
+                pending = []
+                for name in names:
+                    files = stage_files(output_files[name], stage_options.get(name))
+                    if all(options.cache.fetch(cache_keys[name], path) for path in files):
+                        print(f"[{STAGES[name].__name__}] ♻️  Served from cache: {output_files[name]}")
+                        records.append({
+                            'event': 'stage', 'stage': STAGES[name].__name__, 'output': name,
+                            'cached': True, 'bytes_written': os.path.getsize(output_files[name]),
+                        })
+                    else:
+                        pending.append(name)
+        in_memory = [name for name in pending if name not in streamed]
+
+        # Parse the input once and share it across all in-memory stages
+        df = None
+        from_sidecar = options.input_cache and sidecar_is_current(input_file)
+        if in_memory:
+            start = time.perf_counter()
+            with measure_stage("read_input") as parse_metrics, phase("read"):
+                df = read_input(input_file, dtypes=shared_input_dtypes(in_memory))
+            parse_seconds = time.perf_counter() - start
+            parse_metrics.rows = len(df)
+            records.append({**parse_metrics.as_record(), 'event': 'parse',
+                            'sidecar': bool(from_sidecar)})
+            frame_bytes = df.memory_usage(deep=True).sum()
+
+        # Run the feature engineering functions that still need to, in order
+        profilers = {options.profile: options.profiler} if options.profile else {}
+        if options.jobs > 1 and pending:
+            stage_records = _run_stages_parallel(df, input_file, output_files, options.chunksize,
+                                                 streamed, options.jobs, codecs, stage_options,
+                                                 pending, profilers, options.profile_dir,
+                                                 options.overlap)
+        else:
+            stage_records = [
+                run_stage(name, input_file if name in streamed else df, output_files[name],
+                          options.chunksize if name in streamed else None, stage_options.get(name),
+                          profilers.get(name), options.profile_dir, options.overlap)
+                for name in pending
+            ]
+        records += stage_records
+
+        for name in pending:
+            if name in cache_keys:
+                for path in stage_files(output_files[name], stage_options.get(name)):
+                    options.cache.store(cache_keys[name], path)
+    wall_seconds = time.perf_counter() - pipeline_start
+    stage_seconds = sum(record['total_s'] for record in stage_records)
+    records.append({
+        'event'        : 'pipeline',
+        'input'        : input_file,
+        'jobs'         : options.jobs,
+        'chunksize'    : options.chunksize,
+        'stages_run'   : len(pending),
+        'stages_cached': len(names) - len(pending),
+        'wall_s'       : round(wall_seconds, 6),
+        'stage_s'      : round(stage_seconds, 6),
+        'bytes_written': sum(record['bytes_written'] for record in records if 'output' in record),
+    })
+    write_metrics(records, options.metrics_file)
 
     print("\n" + "=" * 55)
     print("  ✅ Pipeline complete! All output files saved.")
     print("=" * 55)
 
+    # Report what parsing once saved compared to one parse per stage
+    if len(in_memory) > 1:
+        extra_parses = len(in_memory) - 1
+        how = "memory-mapped from its sidecar" if from_sidecar else "parsed once"
+        print(f"\n⏱️  Input {how} in {parse_seconds:.3f}s "
+              f"(~{parse_seconds * extra_parses:.3f}s of re-parsing avoided)")
+        print(f"🧠 Shared input frame: {_format_bytes(frame_bytes)} "
+              f"(~{_format_bytes(frame_bytes * extra_parses)} of duplicate copies avoided)")
+
+    if options.cache is not None:
+        print(f"♻️  Stage cache: {len(names) - len(pending)} of {len(names)} outputs served "
+              f"from {options.cache.cache_dir} ({_format_bytes(options.cache.size())} cached)")
+
+    if options.jobs > 1 and pending:
+        print(f"⚡ Stages ran on {min(options.jobs, len(pending))} workers in {wall_seconds:.3f}s "
+              f"wall-clock ({stage_seconds:.3f}s summed across stages)")
+
+    if options.profile in pending:
+        report = next(r for r in stage_records if r['output'] == options.profile)['profile']
+        print(f"🔬 {options.profiler} report for {options.profile}: {report}")
+    if options.metrics_file is not None:
+        print(f"📊 Stage metrics appended to {options.metrics_file}")
+
     # Print summary of output files
     print("\n📄 Output files generated:")
-    for name, path in OUTPUT_FILES.items():
+    for path in (output_files[name] for name in names):
         size = os.path.getsize(path) if os.path.exists(path) else 0
         print(f"   • {path}  ({size} bytes)")
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parses the command-line options of main.py."""
+    parser = argparse.ArgumentParser(
+        description="Run the Group 6 feature engineering pipeline on a CSV file."
+    )
+    parser.add_argument(
+        "--input", default=INPUT_FILE, metavar="PATH",
+        help="input CSV file, or a directory / quoted glob pattern of input shards "
+             f"(default: {INPUT_FILE})",
+    )
+    parser.add_argument(
+        "--stages", nargs="+", choices=[*STAGES, *GROUP_STAGES], default=None, metavar="STAGE",
+        help="run only these stages, by output key or feature group name "
+             f"({', '.join(GROUP_STAGES)}); the others are not even imported (default: all)",
+    )
+    parser.add_argument(
+        "--output-dir", default=OUTPUT_DIR, metavar="DIR",
+        help=f"folder the outputs are written to (default: {OUTPUT_DIR})",
+    )
+    parser.add_argument(
+        "--output", nargs="+", default=None, metavar="STAGE=PATH",
+        help="write a stage's output to PATH instead, e.g. time_based_features=out/time.parquet "
+             "(the extension picks the format)",
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=None,
+        help="stream the input through the stages in chunks of this many rows "
+             "(keeps memory flat for files larger than RAM)",
+    )
+    parser.add_argument(
+        "--overlap", action=argparse.BooleanOptionalAction, default=OVERLAP_BY_DEFAULT,
+        help="with --chunksize, parse the next chunk and write the previous one on "
+             "background threads while the current chunk is transformed "
+             "(default: on when more than one CPU is available)",
+    )
+    parser.add_argument(
+        "--format", choices=sorted(OUTPUT_FORMATS), default="csv",
+        help="output file format; parquet and feather keep dtypes and need pyarrow (default: csv)",
+    )
+    parser.add_argument(
+        "--compression", default="default",
+        help="compression codec for the outputs, e.g. gzip (csv), snappy/zstd (parquet), "
+             "lz4/zstd (feather), or 'none'",
+    )
+    parser.add_argument(
+        "--write-jobs", type=int, default=1,
+        help="worker processes formatting and compressing each large CSV output in "
+             "blocks (gzip/bz2/xz members, or multi-threaded zstd); the decoded bytes "
+             "are unchanged (default: 1)",
+    )
+    parser.add_argument(
+        "--memory-report", action="store_true",
+        help="print each stage's input memory with default, compact and projected "
+             "dtypes, then exit",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="number of worker processes running stages (or input shards) at the same "
+             "time (default: 1)",
+    )
+    parser.add_argument(
+        "--encoder", default=None, metavar="PATH",
+        help="categorical encoder artifact (JSON): reused when it exists, otherwise "
+             "fitted on this input and saved, so later batches get the same columns",
+    )
+    parser.add_argument(
+        "--hash-buckets", nargs="+", default=None, metavar="COLUMN=N",
+        help="one-hot encode these columns into N hash buckets instead of one column per "
+             "value, e.g. department=1024 for tens of thousands of codes",
+    )
+    parser.add_argument(
+        "--sparse-one-hot", action="store_true",
+        help="keep one-hot columns sparse and write them as CSR arrays to "
+             "<output>.sparse.npz next to the encoded output",
+    )
+    parser.add_argument(
+        "--anomaly", nargs="+", default=None, metavar="COLUMN=METHOD",
+        help=f"numeric columns flag_anomalies_column checks, each with one of "
+             f"{', '.join(ANOMALY_DETECTORS)} (default: "
+             f"{' '.join(f'{col}={method}' for col, method in ANOMALY_METHODS.items())})",
+    )
+    parser.add_argument(
+        "--anomaly-by", nargs="+", default=None, metavar="COLUMN",
+        help="compute separate anomaly limits for each group of these columns, "
+             "e.g. department",
+    )
+    parser.add_argument(
+        "--windows", nargs="+", type=int, default=None, metavar="DAYS",
+        help="add trailing-window cohort features to the time features: hires in the "
+             "DAYS before each hire (e.g. 90 365) and the join-month rank; with "
+             "--chunksize the input must be sorted by join_date",
+    )
+    parser.add_argument(
+        "--window-by", nargs="+", default=None, metavar="COLUMN",
+        help="with --windows, count the hires of each group of these columns apart, "
+             "e.g. department",
+    )
+    parser.add_argument(
+        "--window-means", nargs="+", default=None, metavar="COLUMN",
+        help="with --windows, average these numeric columns over each window, e.g. salary",
+    )
+    parser.add_argument(
+        "--bins", default=None, metavar="PATH",
+        help="fitted bins artifact (JSON) of bin_numeric_ranges: reused when it exists, "
+             "otherwise fitted on this input and saved, so later batches get the same edges",
+    )
+    parser.add_argument(
+        "--bin-spec", default=None, metavar="PATH",
+        help="YAML/JSON bin specs: output column -> source column with fixed 'edges' "
+             "or data-driven 'quantiles', and 'labels'",
+    )
+    parser.add_argument(
+        "--bin-codes", action="store_true",
+        help="write bins as compact int8 codes (-1 = not binned) with a "
+             "<output>.labels.json label dictionary",
+    )
+    parser.add_argument(
+        "--incremental", default=None, metavar="CHECKPOINT",
+        help="process only the rows appended to the input since this checkpoint (JSON) "
+             "and append them to the outputs; the first run processes everything",
+    )
+    parser.add_argument(
+        "--anomaly-policy", choices=ANOMALY_POLICIES, default="keep",
+        help="with --incremental, keep the flags of earlier rows or recompute them "
+             "with the updated anomaly limits (default: keep)",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="recompute every stage even when its cached output is up to date",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="neither serve nor store stage outputs in the stage cache",
+    )
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR,
+        help=f"where stage outputs are cached (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2, metavar="MB",
+        help="evict the least recently used cached outputs beyond this many MB "
+             f"(default: {DEFAULT_MAX_BYTES // 1024 ** 2})",
+    )
+    parser.add_argument(
+        "--metrics", default=None, metavar="PATH",
+        help="append per-stage metrics (read/compute/write seconds, rows, bytes, "
+             "peak memory growth) to this JSON-lines file",
+    )
+    parser.add_argument(
+        "--profile", choices=list(STAGES), default=None, metavar="STAGE",
+        help=f"attach a profiler to one stage: {', '.join(STAGES)}",
+    )
+    parser.add_argument(
+        "--profiler", choices=sorted(PROFILERS), default="cprofile",
+        help="profiler used by --profile (default: cprofile)",
+    )
+    parser.add_argument(
+        "--profile-dir", default=DEFAULT_PROFILE_DIR,
+        help=f"where profiler reports are written (default: {DEFAULT_PROFILE_DIR})",
+    )
+    parser.add_argument(
+        "--feature-table", default=None, metavar="PATH",
+        help="write one wide table with the input columns and all new feature columns "
+             "instead of the five separate outputs",
+    )
+    parser.add_argument(
+        "--groups", nargs="+", choices=[INPUT_GROUP, *GROUP_STAGES], default=None,
+        help="column groups of --feature-table (default: all)",
+    )
+    parser.add_argument(
+        "--features", nargs="+", default=None, metavar="FEATURE",
+        help="write only these feature columns to --feature-table, computing only what "
+             "they depend on, e.g. --features is_anomaly age_group",
+    )
+    parser.add_argument(
+        "--no-input-cache", action="store_true",
+        help="parse the input CSV every run instead of memory-mapping its binary "
+             "sidecar (<input>.parsed/)",
+    )
+    args = parser.parse_args(argv)
+    if args.stages is not None:
+        selected = {GROUP_STAGES.get(name, name) for name in args.stages}
+        args.stages = [name for name in STAGES if name in selected]
+    if args.hash_buckets is not None:
+        pairs = [pair.partition("=")[::2] for pair in args.hash_buckets]
+        if not all(col and buckets.isdigit() and int(buckets) > 0 for col, buckets in pairs):
+            parser.error("--hash-buckets needs COLUMN=N pairs with a positive N")
+        unknown = {col for col, _ in pairs} - set(ONE_HOT_COLUMNS)
+        if unknown:
+            parser.error(f"--hash-buckets columns must be some of {', '.join(ONE_HOT_COLUMNS)}, "
+                         f"got {', '.join(sorted(unknown))}")
+        args.hash_buckets = {col: int(buckets) for col, buckets in pairs}
+    if args.anomaly is not None:
+        args.anomaly = dict(pair.partition("=")[::2] for pair in args.anomaly)
+    if args.output is not None:
+        args.output = dict(pair.partition("=")[::2] for pair in args.output)
+        unknown = set(args.output) - set(STAGES)
+        if unknown:
+            parser.error(f"--output stages must be some of {', '.join(STAGES)}, "
+                         f"got {', '.join(sorted(unknown))}")
+        if not all(args.output.values()):
+            parser.error("--output needs STAGE=PATH pairs")
+    if args.compression.lower() == "none":
+        args.compression = None
+    if args.cache_size < 0:
+        parser.error("--cache-size must not be negative")
+    if args.incremental and args.format != "csv":
+        parser.error("--incremental appends to CSV outputs; --format must be csv")
+
+    # The rules run_pipeline applies, named by their flags
+    try:
+        check_options(args.input, pipeline_options(args), flags=True)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.features is not None:
+        from feature_plan import FEATURE_REGISTRY
+
+        unknown = [name for name in args.features if name not in FEATURE_REGISTRY]
+        if unknown:
+            parser.error(f"--features must be some of {', '.join(FEATURE_REGISTRY)}, "
+                         f"got {', '.join(unknown)}")
+    return args
+
+
+def pipeline_options(args: argparse.Namespace) -> PipelineOptions:
+    """The PipelineOptions of parsed command-line arguments (without the stage cache)."""
+    return PipelineOptions(
+        stages=args.stages, chunksize=args.chunksize, jobs=args.jobs, overlap=args.overlap,
+        input_cache=not args.no_input_cache, compression=args.compression,
+        write_jobs=args.write_jobs, feature_table_file=args.feature_table, groups=args.groups,
+        features=args.features, force=args.force, metrics_file=args.metrics,
+        profile=args.profile, profiler=args.profiler, profile_dir=args.profile_dir,
+        encoder_file=args.encoder, hash_buckets=args.hash_buckets,
+        sparse_one_hot=args.sparse_one_hot, bins_file=args.bins, bin_spec=args.bin_spec,
+        bin_codes=args.bin_codes, anomaly_methods=args.anomaly, anomaly_by=args.anomaly_by,
+        checkpoint_file=args.incremental, anomaly_policy=args.anomaly_policy,
+        windows=args.windows, window_by=args.window_by, window_means=args.window_means,
+    )
+
+
+def main(argv=None) -> None:
+    """Command-line entry point: parses the options, then runs the pipeline."""
+    args = parse_args(argv)
+    if args.memory_report:
+        from sharding import resolve_shards
+        print_memory_report(resolve_shards(args.input)[0], args.stages)
+        sys.exit(0)
+
+    from pipeline_io import with_format
+
+    outputs = {name: with_format(os.path.join(args.output_dir, os.path.basename(path)), args.format)
+               for name, path in OUTPUT_FILES.items()}
+    outputs.update(args.output or {})
+    cache = None if args.no_cache else StageCache(args.cache_dir, args.cache_size * 1024 ** 2)
+    feature_table = args.feature_table
+    if feature_table and not os.path.splitext(feature_table)[1]:
+        # --format only picks the extension of a path given without one
+        feature_table = with_format(feature_table, args.format)
+    run_pipeline(args.input, outputs, pipeline_options(args), cache=cache,
+                 feature_table_file=feature_table)
+
+
 if __name__ == "__main__":
-    run_pipeline()
+    main()
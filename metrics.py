@@ -0,0 +1,243 @@
+"""
+Group 6 - Feature Engineering
+metrics.py - Structured per-stage metrics and profiling hooks
+Splits each stage's time into reading, computing and writing, records rows,
+bytes written and memory (the stage's own allocation peak while tracemalloc
+is tracing, and the process's peak RSS), and writes one JSON line per stage.
+A profiler (cProfile or tracemalloc) can be attached to a single stage.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import datetime
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module; peak RSS is then not reported
+    resource = None
+
+# Where profiler output is written by default
+DEFAULT_PROFILE_DIR = "profiles"
+
+# Allocation sites listed in a tracemalloc report
+TRACEMALLOC_TOP = 25
+
+# Metrics of the stage running in the current thread / process, if any
+_ACTIVE = contextvars.ContextVar("stage_metrics", default=None)
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Peak resident set size of this process so far, or None where the resource
+    module is missing (ru_maxrss is KB on Linux, bytes on macOS).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMetrics:
+    """
+    Timings and counters of one stage run.
+
+    Read and write time is added by the I/O helpers in pipeline_io and
+    streaming through phase(). Compute time is whatever remains of the total,
+    unless the stage measured it as its own phase: overlapped streaming reads
+    and writes on other threads, so the phases add up to more than the total.
+
+    peak_alloc_bytes is the stage's own figure: the highest traced memory
+    during the stage minus what was allocated when it started. It needs
+    tracemalloc to be tracing (PYTHONTRACEMALLOC=1 or the tracemalloc
+    profiler) and is None otherwise. process_peak_rss_bytes is the high-water
+    mark of the whole process when the stage ended, so every stage after the
+    largest one reports the same value; it is not a per-stage delta.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.phases = {'read': 0.0, 'write': 0.0}
+        self.total_s = 0.0
+        self.rows = None
+        self.bytes_written = 0
+        self.peak_alloc_bytes = None
+        self.process_peak_rss_bytes = None
+        self.extra = {}
+        # Highest absolute traced memory seen by nested stages (see _trace_peak)
+        self._nested_peak = 0
+
+    @property
+    def compute_s(self) -> float:
+        """Time spent transforming (measured, or not spent reading or writing)."""
+        if 'compute' in self.phases:
+            return self.phases['compute']
+        return max(self.total_s - self.phases['read'] - self.phases['write'], 0.0)
+
+    def as_record(self) -> dict:
+        """Returns the metrics as a JSON-serializable dict."""
+        return {
+            'event'                 : 'stage',
+            'stage'                 : self.stage,
+            'read_s'                : round(self.phases['read'], 6),
+            'compute_s'             : round(self.compute_s, 6),
+            'write_s'               : round(self.phases['write'], 6),
+            'total_s'               : round(self.total_s, 6),
+            'rows'                  : self.rows,
+            'bytes_written'         : self.bytes_written,
+            'peak_alloc_bytes'      : self.peak_alloc_bytes,
+            'process_peak_rss_bytes': self.process_peak_rss_bytes,
+            'pid'                   : os.getpid(),
+            **self.extra,
+        }
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """
+    Adds the time spent in the block to a phase ('read', 'compute' or
+    'write') of the stage being measured. Does nothing when no stage is being measured.
+    """
+    metrics = _ACTIVE.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[name] = metrics.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+# ─── Profiler hooks ───────────────────────────────────────────────────────────
+
+@contextlib.contextmanager
+def _cprofile_hook(metrics: StageMetrics, profile_dir: str):
+    """Profiles the stage with cProfile; load the .prof file with pstats or snakeviz."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{metrics.stage}.prof")
+        profiler.dump_stats(path)
+        metrics.extra['profile'] = path
+
+
+@contextlib.contextmanager
+def _tracemalloc_hook(metrics: StageMetrics, profile_dir: str):
+    """Traces Python allocations of the stage and lists the largest allocation sites."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        metrics.extra['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        if not already_tracing:
+            tracemalloc.stop()
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{metrics.stage}.tracemalloc.txt")
+        with open(path, "w") as f:
+            for stat in snapshot.statistics("lineno")[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
+        metrics.extra['profile'] = path
+
+
+# Profiler name -> hook: a context manager taking (metrics, profile_dir)
+PROFILERS = {
+    'cprofile'   : _cprofile_hook,
+    'tracemalloc': _tracemalloc_hook,
+}
+
+
+def register_profiler(name: str, hook) -> None:
+    """
+    Makes another profiler available to measure_stage / --profiler.
+
+    Args:
+        name (str)     : Name used to select it.
+        hook (callable): Context manager factory taking (metrics, profile_dir);
+                         it may add entries to metrics.extra.
+    """
+    PROFILERS[name] = hook
+
+
+@contextlib.contextmanager
+def _trace_peak(metrics: StageMetrics, parent: StageMetrics | None):
+    """
+    Sets metrics.peak_alloc_bytes from tracemalloc, when it is tracing.
+
+    reset_peak() is process-wide, so the peak an enclosing stage had reached
+    is handed to it first and the nested stage's peak afterwards; the outer
+    figure therefore still covers everything it contains.
+    """
+    if not tracemalloc.is_tracing():
+        yield
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    if parent is not None:
+        parent._nested_peak = max(parent._nested_peak, peak)
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        if tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], metrics._nested_peak)
+            metrics.peak_alloc_bytes = max(peak - current, 0)
+            if parent is not None:
+                parent._nested_peak = max(parent._nested_peak, peak)
+
+
+@contextlib.contextmanager
+def measure_stage(stage: str, profiler: str | None = None,
+                  profile_dir: str = DEFAULT_PROFILE_DIR):
+    """
+    Measures one stage run; the caller fills in rows and bytes_written.
+
+    Args:
+        stage       (str)       : Name of the stage.
+        profiler    (str | None): Key of PROFILERS to attach, or None.
+        profile_dir (str)       : Where the profiler writes its report.
+
+    Yields:
+        StageMetrics: The metrics being collected.
+    """
+    if profiler is not None and profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r}; expected one of {sorted(PROFILERS)}")
+    metrics = StageMetrics(stage)
+    parent = _ACTIVE.get()
+    token = _ACTIVE.set(metrics)
+    hook = PROFILERS[profiler](metrics, profile_dir) if profiler else contextlib.nullcontext()
+    start = time.perf_counter()
+    try:
+        with hook, _trace_peak(metrics, parent):
+            yield metrics
+    finally:
+        metrics.total_s = time.perf_counter() - start
+        metrics.process_peak_rss_bytes = peak_rss_bytes()
+        _ACTIVE.reset(token)
+
+
+def write_metrics(records: list, metrics_file: str | None) -> None:
+    """
+    Appends records to a JSON-lines file, one object per line.
+
+    Every record gets a UTC timestamp. None skips writing.
+    """
+    if metrics_file is None:
+        return
+    os.makedirs(os.path.dirname(metrics_file) or ".", exist_ok=True)
+    timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds")
+    with open(metrics_file, "a") as f:
+        for record in records:
+            f.write(json.dumps({'timestamp': timestamp, **record}) + "\n")
@@ -0,0 +1,187 @@
+"""
+Group 6 - Feature Engineering
+parallel_csv.py - CSV writer that formats and compresses row blocks in worker processes
+DataFrame.to_csv formats every value and compresses the result on one core.
+This writer splits the frame into blocks of rows; worker processes turn each
+block into CSV text and compress it as a complete gzip member (or bz2 / xz
+stream), and the parent appends the members to the file in order. Readers
+decompress concatenated members as one stream, so the file decodes to
+exactly the bytes to_csv would have written. zstd output is one frame,
+compressed on several threads by zstandard (optional: pip install zstandard).
+
+Most dtypes are formatted value by value, so a block formats the same way
+on its own. Naive datetimes with a time of day, timedeltas and categories of
+either are formatted with one layout chosen for the whole column, so those
+columns are turned into text once, up front (see prepare_frame).
+"""
+
+import bz2
+import gzip
+import lzma
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from pandas.io.common import infer_compression
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; gzip, bz2 and xz always work
+    zstandard = None
+
+# Rows formatted and compressed per block
+DEFAULT_BLOCK_ROWS = 50_000
+
+# Codec -> compresses one block into a self-contained member (level None = default)
+MEMBER_CODECS = {
+    None  : lambda data, level: data,
+    'gzip': lambda data, level: gzip.compress(data, 9 if level is None else level, mtime=0),
+    'bz2' : lambda data, level: bz2.compress(data, 9 if level is None else level),
+    'xz'  : lambda data, level: lzma.compress(data, preset=level),
+}
+
+# Codecs this writer supports; anything else (zip, tar) is left to to_csv
+PARALLEL_CODECS = (*MEMBER_CODECS, 'zstd')
+
+# Frames smaller than this are not worth starting workers for
+PARALLEL_MIN_ROWS = 2 * DEFAULT_BLOCK_ROWS
+
+# Blocks each worker may have queued or finished ahead of the writer
+BLOCKS_AHEAD = 2
+
+# Per-process state of writer workers, set up by _init_worker
+_WORKER_STATE = {}
+
+
+def csv_codec(output_file: str, compression='infer') -> str | None:
+    """Returns the codec of a CSV write, inferred from the extension as to_csv does."""
+    return infer_compression(output_file, compression)
+
+
+# ─── Column formatting ────────────────────────────────────────────────────────
+
+def _formatted_per_column(values) -> bool:
+    """True when to_csv picks one layout for the whole column (see module docstring)."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _formatted_per_column(dtype.categories)
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return True
+    if pd.api.types.is_datetime64_dtype(dtype):
+        dates = pd.DatetimeIndex(values)
+        return not ((dates == dates.normalize()) | dates.isna()).all()
+    return False
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Formats the columns to_csv lays out per column as text, over the whole column.
+
+    Returns:
+        pd.DataFrame: df itself when no column needs it, otherwise a shallow
+        copy with those columns replaced by their CSV text.
+    """
+    columns = [col for col in df.columns if _formatted_per_column(df[col])]
+    if not columns:
+        return df
+    df = df.copy(deep=False)
+    for col in columns:
+        text = df[[col]].to_csv(index=False, header=False, lineterminator="\n")
+        # A lone empty field is written as "" (and never needs quoting otherwise)
+        values = ["" if value == '""' else value for value in text.split("\n")[:-1]]
+        df[col] = pd.Series(values, index=df.index, dtype=object)
+    return df
+
+
+# ─── Workers ──────────────────────────────────────────────────────────────────
+
+def _init_worker(df: pd.DataFrame, codec: str | None, level: int | None) -> None:
+    """Keeps the frame and codec of a write in the worker (inherited, not copied, on fork)."""
+    _WORKER_STATE.update(df=df, codec=codec, level=level)
+
+
+def _format_block(start: int, stop: int) -> bytes:
+    """CSV text of rows [start, stop), compressed as one member unless the codec is zstd."""
+    df, codec = _WORKER_STATE['df'], _WORKER_STATE['codec']
+    text = df.iloc[start:stop].to_csv(index=False, header=(start == 0)).encode("utf-8")
+    if codec == 'zstd':
+        return text
+    return MEMBER_CODECS[codec](text, _WORKER_STATE['level'])
+
+
+def _pool_context():
+    """Fork where available, so workers share the parent's frame instead of unpickling it."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+# ─── Writing ──────────────────────────────────────────────────────────────────
+
+def write_csv_parallel(df: pd.DataFrame, output_file: str, jobs: int = None,
+                       compression='infer', block_rows: int = DEFAULT_BLOCK_ROWS,
+                       level: int = None) -> int:
+    """
+    Writes df like df.to_csv(output_file, index=False), formatting blocks in parallel.
+
+    Args:
+        df          (pd.DataFrame): The frame to write.
+        output_file (str)         : Destination; with compression 'infer'
+                                    its extension (.gz, .bz2, .xz, .zst)
+                                    selects the codec.
+        jobs        (int)         : Worker processes; None uses every CPU.
+                                    1 formats the blocks in this process.
+        compression (str | None)  : 'infer', None, 'gzip', 'bz2', 'xz' or 'zstd'
+                                    (see PARALLEL_CODECS).
+        block_rows  (int)         : Rows per block (and per compressed member).
+        level       (int)         : Compression level; None keeps each
+                                    codec's default (gzip and bz2 use 9, like
+                                    to_csv).
+
+    Returns:
+        int: Number of blocks written.
+    """
+    if block_rows < 1:
+        raise ValueError("block_rows must be a positive integer")
+    codec = csv_codec(output_file, compression)
+    if codec not in PARALLEL_CODECS:
+        raise ValueError(f"Parallel CSV output does not support {codec!r} compression; "
+                         f"use one of {[c for c in PARALLEL_CODECS if c]}")
+    if codec == 'zstd' and zstandard is None:
+        raise ImportError(f"Writing '{output_file}' with zstd requires zstandard: "
+                          "pip install zstandard")
+    jobs = jobs or os.cpu_count() or 1
+    df = prepare_frame(df)
+    starts = list(range(0, len(df), block_rows)) or [0]
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, "wb") as raw:
+        sink = raw
+        if codec == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=3 if level is None else level,
+                                                  threads=jobs if jobs > 1 else 0)
+            sink = compressor.stream_writer(raw, closefd=False)
+        if jobs == 1:
+            _init_worker(df, codec, level)
+            try:
+                for start in starts:
+                    sink.write(_format_block(start, start + block_rows))
+            finally:
+                _WORKER_STATE.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(starts)),
+                                     mp_context=_pool_context(), initializer=_init_worker,
+                                     initargs=(df, codec, level)) as pool:
+                # Keep a bounded window of blocks in flight; write them in order
+                pending = deque()
+                for start in starts:
+                    pending.append(pool.submit(_format_block, start, start + block_rows))
+                    if len(pending) >= jobs * BLOCKS_AHEAD:
+                        sink.write(pending.popleft().result())
+                while pending:
+                    sink.write(pending.popleft().result())
+        if sink is not raw:
+            sink.close()
+    return len(starts)
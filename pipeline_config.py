@@ -0,0 +1,351 @@
+"""
+Group 6 - Feature Engineering
+pipeline_config.py - Stage registry and options shared by the command line and the stages
+Imports nothing heavier than the standard library, so main.py can print
+--help and validate its arguments without loading pandas. Each stage's
+module is imported the first time the stage is looked up in STAGES; a run
+of one stage never imports the other four. PipelineOptions holds the
+options of a pipeline run, and check_options the rules for which of them
+can be combined, for run_pipeline and the command line alike.
+"""
+
+import dataclasses
+import importlib
+import os
+from collections.abc import Mapping
+
+from metrics import DEFAULT_PROFILE_DIR
+
+# Output key -> "module:function" of the processing function, in the order
+# the pipeline runs them
+STAGE_FUNCTIONS = {
+    "derived_computed_columns"     : "derive_computed_columns:derive_computed_columns",
+    "encoded_categorical_features" : "encode_categorical_features:encode_categorical_features",
+    "binned_numeric_ranges"        : "bin_numeric_ranges:bin_numeric_ranges",
+    "time_based_features"          : "time_based_feature_extraction:time_based_feature_extraction",
+    "flagged_anomalies"            : "flag_anomalies_column:flag_anomalies_column",
+}
+
+# Feature table column group -> output key of the stage that produces it, in table order
+GROUP_STAGES = {
+    'derived'  : "derived_computed_columns",
+    'encoded'  : "encoded_categorical_features",
+    'binned'   : "binned_numeric_ranges",
+    'time'     : "time_based_features",
+    'anomalies': "flagged_anomalies",
+}
+
+# Feature table group holding the original input columns (the `id` key is always kept)
+INPUT_GROUP = 'input'
+
+# Output format -> file extensions that select it (anything else is CSV)
+OUTPUT_FORMATS = {
+    'csv'    : ('.csv',),
+    'parquet': ('.parquet', '.pq'),
+    'feather': ('.feather', '.arrow', '.ipc'),
+}
+
+# Column -> anomaly detection method of flag_anomalies_column, in the order
+# the flag columns are added
+ANOMALY_METHODS = {
+    'salary': 'iqr',
+    'score' : 'zscore',
+    'age'   : 'iqr',
+}
+
+# Column -> prefix of its one-hot columns in encode_categorical_features
+ONE_HOT_COLUMNS = {'department': 'dept'}
+
+# Anomaly detection methods a column can use
+ANOMALY_DETECTORS = ('iqr', 'zscore', 'mad')
+
+# What an incremental run does with the flags of rows processed by earlier runs
+ANOMALY_POLICIES = ('keep', 'recompute')
+
+
+def _usable_cpus() -> int:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Whether streamed runs overlap reading, transforming and writing chunks by
+# default. On a single CPU the threads only take turns (parsing and CSV
+# formatting hold the GIL), so it is switched on only when there is a second one
+OVERLAP_BY_DEFAULT = _usable_cpus() > 1
+
+
+# Characters that make an input path a glob pattern
+GLOB_CHARACTERS = "*?["
+
+
+def is_pattern(source: str) -> bool:
+    """True when the path is a glob pattern (holds one of GLOB_CHARACTERS)."""
+    return any(char in source for char in GLOB_CHARACTERS)
+
+
+def is_sharded(source: str) -> bool:
+    """True when the input is a directory or a glob pattern rather than one file."""
+    return os.path.isdir(source) or is_pattern(source)
+
+
+class LazyStages(Mapping):
+    """
+    Output key -> processing function, importing each stage's module on first lookup.
+
+    Iterating over the keys, `in` and len() never import anything, so the
+    stage names can be listed and validated for free.
+    """
+
+    def __init__(self, functions: dict):
+        self._functions = dict(functions)
+        self._loaded = {}
+
+    def __getitem__(self, name: str):
+        if name not in self._loaded:
+            module, function = self._functions[name].split(":")
+            self._loaded[name] = getattr(importlib.import_module(module), function)
+        return self._loaded[name]
+
+    def __iter__(self):
+        return iter(self._functions)
+
+    def __len__(self) -> int:
+        return len(self._functions)
+
+    def __contains__(self, name) -> bool:
+        return name in self._functions
+
+    def loaded(self) -> list:
+        """Output keys of the stages imported so far."""
+        return [name for name in self._functions if name in self._loaded]
+
+
+STAGES = LazyStages(STAGE_FUNCTIONS)
+
+
+# ─── Pipeline run options ─────────────────────────────────────────────────────
+
+@dataclasses.dataclass
+class PipelineOptions:
+    """
+    How run_pipeline processes its input, besides the input and output paths.
+
+    Attributes:
+        stages       (list): Output keys of the stages to run, e.g.
+                             ['time_based_features']; the modules of the
+                             others are never imported. None runs all 5.
+        chunksize    (int) : When set, streamable stages read the input in
+                             chunks of this many rows instead of loading it.
+        jobs         (int) : Number of worker processes. Above 1 the stages
+                             (or input shards) run at the same time; outputs
+                             are unchanged.
+        overlap      (bool): With chunksize, parse the next chunk and write
+                             the previous one on background threads while
+                             the current chunk is transformed.
+        input_cache  (bool): Memory-map the input from its binary sidecar
+                             instead of parsing it, saving the sidecar on the
+                             first run (see input_cache.py).
+        compression  (str) : Codec for every output file ('gzip', 'zstd',
+                             'snappy', 'lz4', ... or None for uncompressed).
+                             "default" keeps each format's default codec.
+        write_jobs   (int) : Worker processes formatting and compressing each
+                             large CSV output written by this process (see
+                             parallel_csv.py). Outputs are unchanged.
+        feature_table_file (str): Write one wide table with the input columns
+                             and every stage's new columns to this path,
+                             instead of the five separate outputs.
+        groups       (list): Column groups of the feature table, from 'input'
+                             and feature_table.FEATURE_GROUPS. None keeps all.
+        features     (list): Write only these feature columns (and `id`) to
+                             feature_table_file, e.g. ['is_anomaly', 'age_group'].
+                             Only the features they depend on are computed and
+                             only the input columns those read are loaded
+                             (see feature_plan.py).
+        cache        (StageCache): Serve stages whose input, version and
+                             parameters are unchanged from this cache, and
+                             store freshly computed outputs in it. None
+                             always recomputes.
+        force        (bool): Recompute every stage even on a cache hit (the
+                             cache is still refreshed).
+        metrics_file (str) : Append one JSON line per stage (read / compute /
+                             write seconds, rows, bytes written, peak memory)
+                             and one for the whole run. None skips it.
+        profile      (str) : Output key of a stage to attach `profiler` to.
+        profiler     (str) : 'cprofile' or 'tracemalloc' (see metrics.PROFILERS).
+        profile_dir  (str) : Where the profiler report is written.
+        encoder_file (str) : Categorical encoder artifact. Reused when it
+                             exists, otherwise fitted on this input and
+                             saved. None fits a fresh encoder every run.
+        hash_buckets (dict): One-hot column -> number of hash buckets, e.g.
+                             {'department': 1024}, for columns with too many
+                             values for one column each. Applies when the
+                             encoder is fitted; a reused encoder_file must
+                             hash the same way.
+        sparse_one_hot (bool): Keep the one-hot columns sparse and write them
+                             as CSR arrays to <output>.sparse.npz next to
+                             the encoded output (see pipeline_io.write_sparse_columns).
+        bins_file    (str) : Fitted bins artifact of bin_numeric_ranges.
+                             Reused when it exists, otherwise fitted on this
+                             input (all shards) and saved.
+        bin_spec     (str) : YAML/JSON file of bin specs, fixed or quantile
+                             edges (see bin_numeric_ranges.BIN_SPECS). None
+                             uses the built-in specs.
+        bin_codes    (bool): Write the bins as int8 codes, with the label
+                             dictionary next to the output.
+        anomaly_methods (dict): Column -> 'iqr', 'zscore' or 'mad' checked by
+                             flag_anomalies_column. None keeps its defaults.
+        anomaly_by   (list): Columns whose groups get their own anomaly
+                             limits, e.g. ['department'].
+        checkpoint_file (str): Run incrementally: process only the rows
+                             appended since this checkpoint and append them
+                             to the outputs (see incremental.py).
+        anomaly_policy (str): With checkpoint_file, 'keep' the flags of rows
+                             processed earlier or 'recompute' them with the
+                             updated limits.
+        windows      (list): Add trailing-window cohort features over join_date
+                             to the time features: hires in each of these
+                             windows (in days, e.g. [90, 365]) and the
+                             join-month rank (see window_features.py). With
+                             chunksize the input must be sorted by join_date.
+        window_by    (list): Columns whose groups are counted apart, e.g.
+                             ['department'].
+        window_means (list): Numeric columns averaged over each window,
+                             e.g. ['salary'].
+    """
+    # Which stages run, and how the input is read
+    stages: list = None
+    chunksize: int = None
+    jobs: int = 1
+    overlap: bool = OVERLAP_BY_DEFAULT
+    input_cache: bool = False
+    # How the outputs are written
+    compression: str = "default"
+    write_jobs: int = 1
+    feature_table_file: str = None
+    groups: list = None
+    features: list = None
+    # Stage cache, metrics and profiling
+    cache: object = None
+    force: bool = False
+    metrics_file: str = None
+    profile: str = None
+    profiler: str = "cprofile"
+    profile_dir: str = DEFAULT_PROFILE_DIR
+    # Stage settings
+    encoder_file: str = None
+    hash_buckets: dict = None
+    sparse_one_hot: bool = False
+    bins_file: str = None
+    bin_spec: str = None
+    bin_codes: bool = False
+    anomaly_methods: dict = None
+    anomaly_by: list = None
+    checkpoint_file: str = None
+    anomaly_policy: str = "keep"
+    windows: list = None
+    window_by: list = None
+    window_means: list = None
+
+
+# Option -> its command-line flag, where the two names differ
+OPTION_FLAGS = {
+    'sharded'           : 'sharded --input',
+    'feature_table_file': '--feature-table',
+    'encoder_file'      : '--encoder',
+    'bins_file'         : '--bins',
+    'anomaly_methods'   : '--anomaly',
+    'checkpoint_file'   : '--incremental',
+    'metrics_file'      : '--metrics',
+}
+
+# Option -> (options it cannot be combined with, why). 'sharded' stands for a
+# directory or glob pattern as input
+OPTION_CONFLICTS = {
+    'feature_table_file': (('chunksize',), "the feature table is built in memory"),
+    'sharded'           : (('chunksize', 'feature_table_file'),
+                           "sharded input is processed one whole shard at a time"),
+    'anomaly_methods'   : (('chunksize', 'sharded'),
+                           "custom anomaly limits need the whole input in memory"),
+    'anomaly_by'        : (('chunksize', 'sharded'),
+                           "per-group anomaly limits need the whole input in memory"),
+    'checkpoint_file'   : (('sharded', 'chunksize', 'feature_table_file', 'stages',
+                            'anomaly_methods', 'anomaly_by', 'sparse_one_hot', 'windows'),
+                           "incremental runs append the CSV rows of every stage to the "
+                           "five outputs of one growing file"),
+    'features'          : (('encoder_file', 'hash_buckets', 'sparse_one_hot',
+                            'bins_file', 'bin_spec', 'bin_codes', 'anomaly_methods',
+                            'anomaly_by', 'windows'),
+                           "features are computed from the built-in feature specs"),
+    'windows'           : (('sharded',), "window features look back at earlier rows of "
+                                         "the whole input"),
+    'groups'            : (('features',), "features select the feature table columns"),
+    'stages'            : (('feature_table_file',), "the feature table covers every stage; "
+                                                    "select its columns with groups"),
+    'write_jobs'        : (('jobs',), "write_jobs splits the outputs written by the "
+                                      "main process"),
+}
+
+# Option -> the option it needs
+OPTION_REQUIRES = {
+    'groups'      : 'feature_table_file',
+    'features'    : 'feature_table_file',
+    'window_by'   : 'windows',
+    'window_means': 'windows',
+}
+
+
+def check_options(input_file: str, options: PipelineOptions, flags: bool = False) -> None:
+    """
+    Raises ValueError when options hold invalid values or cannot be combined.
+
+    The one set of rules behind run_pipeline and main.parse_args.
+
+    Args:
+        input_file (str)            : The input path, a file or shards.
+        options    (PipelineOptions): The options of the run.
+        flags      (bool)           : Name the options by their command-line
+                                      flags (see OPTION_FLAGS) in the message.
+    """
+    def name(option: str) -> str:
+        if not flags:
+            return "sharded input" if option == 'sharded' else option
+        return OPTION_FLAGS.get(option, "--" + option.replace("_", "-"))
+
+    for option in ('chunksize', 'jobs', 'write_jobs'):
+        value = getattr(options, option)
+        if value is not None and value < 1:
+            raise ValueError(f"{name(option)} must be a positive integer")
+    if options.windows is not None and any(days < 1 for days in options.windows):
+        raise ValueError(f"{name('windows')} must be positive numbers of days")
+    if options.stages is not None:
+        unknown = set(options.stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages {sorted(unknown)}; expected some of {list(STAGES)}")
+        if not options.stages:
+            raise ValueError(f"{name('stages')} must name at least one stage")
+    if options.anomaly_methods is not None:
+        unknown = set(options.anomaly_methods.values()) - set(ANOMALY_DETECTORS)
+        if unknown:
+            raise ValueError(f"{name('anomaly_methods')} methods must be one of "
+                             f"{', '.join(ANOMALY_DETECTORS)}, got {', '.join(sorted(unknown))}")
+    if options.anomaly_policy not in ANOMALY_POLICIES:
+        raise ValueError(f"{name('anomaly_policy')} must be one of {', '.join(ANOMALY_POLICIES)}")
+
+    given = {field.name: getattr(options, field.name) is not None
+             and getattr(options, field.name) is not False
+             for field in dataclasses.fields(options)}
+    given.update(sharded=is_sharded(input_file), jobs=options.jobs > 1,
+                 write_jobs=options.write_jobs > 1)
+    for option, required in OPTION_REQUIRES.items():
+        if given[option] and not given[required]:
+            raise ValueError(f"{name(option)} needs {name(required)}")
+    for option, (others, reason) in OPTION_CONFLICTS.items():
+        combined = [other for other in others if given[other]]
+        if given[option] and combined:
+            raise ValueError(f"{name(option)} cannot be combined with {name(combined[0])}: "
+                             f"{reason}")
+    if given['checkpoint_file'] and given['hash_buckets'] and not given['encoder_file']:
+        raise ValueError(f"{name('checkpoint_file')} keeps its first encoder, so "
+                         f"{name('hash_buckets')} needs {name('encoder_file')}")
@@ -0,0 +1,557 @@
+"""
+Group 6 - Feature Engineering
+pipeline_io.py - Shared input/output helpers used by all 5 processing functions
+Lets every stage take either a file path or an already loaded DataFrame, and
+write CSV, Parquet or Feather (Arrow IPC) output chosen by file extension.
+"""
+
+import bz2
+import contextlib
+import gzip
+import lzma
+import os
+
+import numpy as np
+import pandas as pd
+
+from input_cache     import load_sidecar, write_sidecar
+from metrics         import phase
+from parallel_csv    import PARALLEL_CODECS, PARALLEL_MIN_ROWS, csv_codec, write_csv_parallel
+from pipeline_config import OUTPUT_FORMATS
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; CSV always works
+    pa = None
+
+# Compression used when none is requested. CSV compression is inferred by
+# pandas from extensions such as .csv.gz.
+DEFAULT_COMPRESSION = {
+    'csv'    : 'infer',
+    'parquet': 'snappy',
+    'feather': 'lz4',
+}
+
+# Per-format compression chosen for this process (see set_output_compression)
+_OUTPUT_COMPRESSION = {}
+
+# Worker processes formatting large CSV outputs (see set_csv_write_jobs)
+_CSV_WRITE_JOBS = {'jobs': 1}
+
+# Sparse columns of an output are saved next to it, as CSR arrays in this file
+SPARSE_SUFFIX = ".sparse.npz"
+
+# Up to this many sparse one-hot columns are built one dense scan each; more
+# come from a single pass of pd.get_dummies over the rows (see sparse_one_hot)
+ONE_HOT_SCAN_COLUMNS = 512
+
+
+def output_format(path: str) -> str:
+    """
+    Returns the format selected by a file's extension: 'csv', 'parquet' or 'feather'.
+
+    Unknown extensions (and compressed CSV such as .csv.gz) are treated as CSV.
+    """
+    lower = path.lower()
+    for fmt, extensions in OUTPUT_FORMATS.items():
+        if lower.endswith(extensions):
+            return fmt
+    return 'csv'
+
+
+def with_format(path: str, fmt: str) -> str:
+    """Returns path with its extension replaced by the main one of `fmt`."""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {sorted(OUTPUT_FORMATS)}")
+    root, _ = os.path.splitext(path)
+    return root + OUTPUT_FORMATS[fmt][0]
+
+
+def set_output_compression(fmt: str, compression) -> None:
+    """
+    Sets the compression codec used for every later write of one format.
+
+    Args:
+        fmt         (str)       : 'csv', 'parquet' or 'feather'.
+        compression (str | None): e.g. 'gzip' for CSV, 'zstd'/'snappy' for
+                                  Parquet, 'zstd'/'lz4' for Feather. None
+                                  writes uncompressed files.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {sorted(OUTPUT_FORMATS)}")
+    _OUTPUT_COMPRESSION[fmt] = compression
+
+
+@contextlib.contextmanager
+def output_compression(codecs: dict):
+    """
+    Temporarily sets per-format compression codecs (see set_output_compression).
+
+    Args:
+        codecs (dict): Format -> codec, e.g. {'parquet': 'zstd'}.
+    """
+    previous = dict(_OUTPUT_COMPRESSION)
+    try:
+        for fmt, codec in codecs.items():
+            set_output_compression(fmt, codec)
+        yield
+    finally:
+        _OUTPUT_COMPRESSION.clear()
+        _OUTPUT_COMPRESSION.update(previous)
+
+
+def set_csv_write_jobs(jobs: int) -> None:
+    """
+    Sets how many worker processes format and compress every later large CSV write.
+
+    Above 1, CSV outputs of at least parallel_csv.PARALLEL_MIN_ROWS rows are
+    written by parallel_csv.write_csv_parallel; their contents are unchanged.
+    """
+    if jobs < 1:
+        raise ValueError("CSV write jobs must be a positive integer")
+    _CSV_WRITE_JOBS['jobs'] = jobs
+
+
+@contextlib.contextmanager
+def csv_write_jobs(jobs: int):
+    """Temporarily sets the CSV write workers (see set_csv_write_jobs)."""
+    previous = _CSV_WRITE_JOBS['jobs']
+    try:
+        set_csv_write_jobs(jobs)
+        yield
+    finally:
+        _CSV_WRITE_JOBS['jobs'] = previous
+
+
+def _compression(fmt: str):
+    """Returns the compression codec to use for a format."""
+    codec = _OUTPUT_COMPRESSION.get(fmt, DEFAULT_COMPRESSION[fmt])
+    if fmt == 'feather' and codec is None:
+        return 'uncompressed'
+    return codec
+
+
+def output_codec(path: str):
+    """Returns the compression codec a write to this path would use."""
+    return _compression(output_format(path))
+
+
+def _require_pyarrow(path: str) -> None:
+    """Raises a helpful ImportError when a columnar format needs pyarrow."""
+    if pa is None:
+        raise ImportError(f"Reading or writing '{path}' requires pyarrow: pip install pyarrow")
+
+
+def _to_arrow(df: pd.DataFrame):
+    """Converts a dataframe to an Arrow table, keeping pandas dtypes in the metadata."""
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# Column kept in projected outputs so they can be joined back on it
+KEY_COLUMN = 'id'
+
+# Pass-through text columns with at most this share of distinct values are
+# loaded as category (one small integer code per row instead of a string)
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrinks a freshly read dataframe in place and returns it.
+
+    - integer columns are downcast to the smallest type that holds their values
+    - repetitive text columns become category
+    - other text columns become Arrow-backed strings when pyarrow is available,
+      instead of one Python object per value
+    """
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            if len(series) and series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                df[col] = series.astype('category')
+            elif pa is not None and pd.api.types.is_object_dtype(series):
+                df[col] = series.astype('string[pyarrow]')
+    return df
+
+
+# Whether CSV reads go through the memory-mapped sidecar (see sidecar_reads)
+_SIDECAR_READS = {'enabled': False, 'verify_hash': False}
+
+
+@contextlib.contextmanager
+def sidecar_reads(enabled: bool = True, verify_hash: bool = False):
+    """
+    Temporarily routes compact CSV reads through the binary input sidecar.
+
+    The first full read of a CSV saves a sidecar next to it (input_cache);
+    later reads memory-map it instead of parsing the text again.
+
+    Args:
+        enabled     (bool): Use the sidecar.
+        verify_hash (bool): Check the source's hash on every read, not only
+                            its size and modification time.
+    """
+    previous = dict(_SIDECAR_READS)
+    _SIDECAR_READS.update(enabled=enabled, verify_hash=verify_hash)
+    try:
+        yield
+    finally:
+        _SIDECAR_READS.update(previous)
+
+
+def _apply_dtypes(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Casts the columns whose dtype differs from the requested one."""
+    changed = {col: dtype for col, dtype in (dtypes or {}).items()
+               if col in df.columns and df[col].dtype != dtype}
+    return df.astype(changed) if changed else df
+
+
+def read_input(path: str, columns: list = None, dtypes: dict = None,
+               compact: bool = True) -> pd.DataFrame:
+    """
+    Reads an input file with column projection and compact dtypes.
+
+    Inside sidecar_reads(), CSV files are memory-mapped from their binary
+    sidecar when it is up to date, and a full read saves one when it is not.
+
+    Args:
+        path    (str) : Path to a CSV, Parquet or Feather file.
+        columns (list): Only read these columns (None reads all of them).
+        dtypes  (dict): Column -> dtype to load with, e.g. {'department': 'category'}.
+        compact (bool): Pass the result through compact_dtypes.
+
+    Returns:
+        pd.DataFrame: The data that was read.
+    """
+    fmt = output_format(path)
+    use_sidecar = fmt == 'csv' and compact and _SIDECAR_READS['enabled']
+    if use_sidecar:
+        df = load_sidecar(path, columns, _SIDECAR_READS['verify_hash'])
+        if df is not None:
+            return _apply_dtypes(df, dtypes)
+    if fmt == 'csv':
+        df = pd.read_csv(path, usecols=columns, dtype=dtypes)
+        if use_sidecar and columns is None:
+            compact_dtypes(df)
+            write_sidecar(df, path)
+            return df
+    else:
+        _require_pyarrow(path)
+        reader = pd.read_parquet if fmt == 'parquet' else pd.read_feather
+        df = reader(path, columns=columns)
+        if dtypes:
+            df = df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+    return compact_dtypes(df) if compact else df
+
+
+def projected_columns(df_columns, columns: list) -> list:
+    """Returns the key column (when present) followed by `columns`, in file order."""
+    wanted = set(columns) | {KEY_COLUMN}
+    return [col for col in df_columns if col in wanted]
+
+
+def load_input(source: str | pd.DataFrame, columns: list = None,
+               dtypes: dict = None) -> pd.DataFrame:
+    """
+    Returns the working dataframe for a processing stage.
+
+    Args:
+        source  (str | pd.DataFrame): Path to the input file (CSV, Parquet or
+            Feather, chosen by extension), or a dataframe that was already
+            parsed by the caller.
+        columns (list): Project to these columns plus the `id` key.
+                        None keeps every column.
+        dtypes  (dict): Column -> dtype used when reading from a path.
+
+    Returns:
+        pd.DataFrame: A freshly read, compact dataframe for a path. For a
+        dataframe, a shallow copy: the column data is shared with the
+        caller, but columns the stage adds or replaces never leak back into it.
+    """
+    if isinstance(source, pd.DataFrame):
+        if columns is not None:
+            source = source[projected_columns(source.columns, columns)]
+        return source.copy(deep=False)
+    with phase('read'):
+        if columns is not None:
+            header = read_columns(source)
+            columns = projected_columns(header, columns)
+        return read_input(source, columns=columns, dtypes=dtypes)
+
+
+def read_columns(path: str) -> list:
+    """Returns the column names of an input file without reading its rows."""
+    fmt = output_format(path)
+    if fmt == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+    _require_pyarrow(path)
+    if fmt == 'parquet':
+        return list(pq.read_schema(path).names)
+    with pa.memory_map(path) as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+
+def memory_footprint(path: str, columns: list = None, dtypes: dict = None) -> dict:
+    """
+    Measures how much memory one stage's input takes before and after compaction.
+
+    Args:
+        path    (str) : Path to the input file.
+        columns (list): The columns the stage uses.
+        dtypes  (dict): The compact dtypes the stage declares.
+
+    Returns:
+        dict: Deep memory usage in bytes of the default read ('default'), the
+        compact read of every column ('compact') and the compact read of only
+        the key and used columns ('projected').
+    """
+    default = read_input(path, compact=False)
+    compact = load_input(path, dtypes=dtypes)
+    projected = load_input(path, columns=columns, dtypes=dtypes)
+    return {
+        'default'  : int(default.memory_usage(deep=True).sum()),
+        'compact'  : int(compact.memory_usage(deep=True).sum()),
+        'projected': int(projected.memory_usage(deep=True).sum()),
+    }
+
+
+# ─── Sparse columns ───────────────────────────────────────────────────────────
+
+def sparse_array(length: int, rows: np.ndarray, values: np.ndarray,
+                 dtype: pd.SparseDtype) -> pd.arrays.SparseArray:
+    """
+    A sparse column of `length` rows holding `values` at the positions `rows`.
+
+    Built by the public SparseArray constructor from a dense buffer, so it
+    takes O(length) time and temporary memory.
+    """
+    dense = np.zeros(length, dtype=dtype.subtype)
+    dense[rows] = values
+    return pd.arrays.SparseArray(dense, dtype=dtype)
+
+
+def sparse_one_hot(codes: np.ndarray, width: int, dtype: pd.SparseDtype) -> list:
+    """
+    `width` sparse 0/1 columns; column j is 1 in the rows whose code is j (-1: none).
+
+    Up to ONE_HOT_SCAN_COLUMNS columns are scanned from one reused dense
+    buffer, each in O(rows). Wider layouts use pd.get_dummies(sparse=True),
+    one pass over the rows whatever the width, so the time stays O(rows +
+    columns) and no rows x columns matrix is ever built.
+    """
+    if width > ONE_HOT_SCAN_COLUMNS:
+        dummies = pd.get_dummies(pd.Categorical.from_codes(codes, categories=range(width)),
+                                 sparse=True, dtype=dtype.subtype)
+        return [dummies[j].array for j in range(width)]
+    present = np.flatnonzero(codes >= 0)
+    rows = present[np.argsort(codes[present], kind='stable')]
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[present], minlength=width))])
+    buffer = np.zeros(len(codes), dtype=dtype.subtype)
+    columns = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        buffer[rows[start:stop]] = 1
+        columns.append(pd.arrays.SparseArray(buffer, dtype=dtype))  # copies the 1s out
+        buffer[rows[start:stop]] = 0
+    return columns
+
+
+def sparse_columns(df: pd.DataFrame) -> list:
+    """Columns of df that are sparse with a fill value of 0 (e.g. sparse one-hot columns)."""
+    return [col for col in df.columns
+            if isinstance(df[col].dtype, pd.SparseDtype) and df[col].dtype.fill_value == 0]
+
+
+def write_sparse_columns(df: pd.DataFrame, output_file: str) -> str:
+    """
+    Saves the sparse columns of df as CSR arrays in <output_file>.sparse.npz.
+
+    The file holds `indptr`, `indices` and `data` (row i has data[indptr[i]:
+    indptr[i + 1]] in the columns indices[indptr[i]:indptr[i + 1]]), the
+    `shape`, the `columns` and, when df has it, the `id` of every row;
+    scipy.sparse.csr_matrix((data, indices, indptr), shape) loads it as is.
+
+    Returns:
+        str: The path written.
+    """
+    columns = sparse_columns(df)
+    arrays = [df[col].array for col in columns]
+    rows = np.concatenate([a.sp_index.to_int_index().indices for a in arrays] or [[]])
+    data = np.concatenate([a.sp_values for a in arrays] or [[]])
+    counts = [a.sp_index.npoints for a in arrays]
+    indices = np.repeat(np.arange(len(columns)), counts)
+    order = np.argsort(rows, kind='stable')
+    index_dtype = np.int32 if max(len(df), len(columns), len(rows)) < 2 ** 31 else np.int64
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows.astype(np.int64),
+                                                        minlength=len(df)))])
+    extra = {KEY_COLUMN: df[KEY_COLUMN].to_numpy()} if KEY_COLUMN in df.columns else {}
+
+    path = output_file + SPARSE_SUFFIX
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, indptr=indptr.astype(index_dtype),
+                            indices=indices[order].astype(index_dtype), data=data[order],
+                            shape=np.array([len(df), len(columns)]),
+                            columns=np.array(columns, dtype=str), **extra)
+    return path
+
+
+def read_sparse_columns(path: str) -> pd.DataFrame:
+    """
+    Loads a file written by write_sparse_columns.
+
+    Returns:
+        pd.DataFrame: `id` (when saved) followed by the sparse columns.
+    """
+    with np.load(path, allow_pickle=False) as saved:
+        indptr, indices, data = saved['indptr'], saved['indices'], saved['data']
+        length, width = saved['shape']
+        columns = saved['columns'].tolist()
+        frame = {KEY_COLUMN: saved[KEY_COLUMN]} if KEY_COLUMN in saved else {}
+    rows = np.repeat(np.arange(length, dtype=np.int32), np.diff(indptr))
+    dtype = pd.SparseDtype(data.dtype, 0)
+    if (data == 1).all() and (np.diff(indptr) <= 1).all():
+        # One-hot columns: at most one 1 per row, i.e. one column code per row
+        codes = np.full(length, -1, dtype=np.int64)
+        codes[rows] = indices
+        frame.update(zip(columns, sparse_one_hot(codes, width, dtype)))
+        return pd.DataFrame(frame)
+    # Regroup the entries by column; a stable sort keeps each column's rows in order
+    order = np.argsort(indices, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(indices, minlength=width))])
+    for col, start, stop in zip(columns, bounds[:-1], bounds[1:]):
+        picked = order[start:stop]
+        frame[col] = sparse_array(length, rows[picked], data[picked], dtype)
+    return pd.DataFrame(frame)
+
+
+def write_frame(df: pd.DataFrame, output_file: str) -> None:
+    """
+    Writes a dataframe in the format chosen by the file's extension.
+
+    Parquet and Feather keep dtypes such as category, datetime and int8.
+    Large CSV outputs are formatted on several processes when
+    set_csv_write_jobs asked for more than one. Sparse columns go to
+    <output_file>.sparse.npz (see write_sparse_columns) instead of being
+    written out value by value.
+    """
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    fmt = output_format(output_file)
+    with phase('write'):
+        sparse = sparse_columns(df)
+        if sparse:
+            write_sparse_columns(df, output_file)
+            df = df.drop(columns=sparse)
+        if fmt == 'parquet':
+            _require_pyarrow(output_file)
+            pq.write_table(_to_arrow(df), output_file, compression=_compression(fmt))
+        elif fmt == 'feather':
+            _require_pyarrow(output_file)
+            feather.write_feather(_to_arrow(df), output_file, compression=_compression(fmt))
+        elif _CSV_WRITE_JOBS['jobs'] > 1 and len(df) >= PARALLEL_MIN_ROWS and \
+                csv_codec(output_file, _compression(fmt)) in PARALLEL_CODECS:
+            write_csv_parallel(df, output_file, _CSV_WRITE_JOBS['jobs'], _compression(fmt))
+        else:
+            df.to_csv(output_file, index=False, compression=_compression(fmt))
+
+
+def save_output(df: pd.DataFrame, output_file: str | None, stage_name: str) -> None:
+    """
+    Saves a processed dataframe, or does nothing when no path is given.
+
+    Args:
+        df          (pd.DataFrame): The processed dataframe.
+        output_file (str | None)  : Path where the output will be saved; the
+                                    extension picks CSV, Parquet or Feather.
+                                    None skips the write entirely.
+        stage_name  (str)         : Name used in the console message.
+    """
+    if output_file is None:
+        return
+    write_frame(df, output_file)
+    print(f"[{stage_name}] ✅ Saved to: {output_file}")
+
+
+# CSV compression -> opener of a writable text stream, for chunked writes
+_CSV_OPENERS = {
+    None   : open,
+    'gzip' : gzip.open,
+    'bz2'  : bz2.open,
+    'xz'   : lzma.open,
+}
+_CSV_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+
+def _open_csv_text(path: str, compression):
+    """Opens a (possibly compressed) CSV file for appending text chunks."""
+    if compression == 'infer':
+        compression = _CSV_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if compression not in _CSV_OPENERS:
+        raise ValueError(f"Chunked CSV output does not support {compression!r} compression; "
+                         f"use one of {[c for c in _CSV_OPENERS if c]}")
+    return _CSV_OPENERS[compression](path, "wt", newline="")
+
+
+class ChunkWriter:
+    """
+    Appends dataframe chunks to one output file in any supported format.
+
+    CSV chunks are appended as text with a single header. Parquet chunks
+    become row groups and Feather chunks become record batches, all using
+    the schema of the first chunk.
+    """
+
+    def __init__(self, output_file: str):
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        self.output_file = output_file
+        self.format = output_format(output_file)
+        self.chunks = 0
+        self._writer = None
+        self._schema = None
+        if self.format == 'csv':
+            self._file = _open_csv_text(output_file, _compression('csv'))
+        else:
+            _require_pyarrow(output_file)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Appends one chunk."""
+        with phase('write'):
+            self._write(df)
+        self.chunks += 1
+
+    def _write(self, df: pd.DataFrame) -> None:
+        if self.format == 'csv':
+            df.to_csv(self._file, index=False, header=(self.chunks == 0))
+        else:
+            table = _to_arrow(df)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.format == 'parquet':
+                    self._writer = pq.ParquetWriter(self.output_file, self._schema,
+                                                    compression=_compression('parquet'))
+                else:
+                    codec = _compression('feather')
+                    options = pa.ipc.IpcWriteOptions(
+                        compression=None if codec == 'uncompressed' else codec
+                    )
+                    self._writer = pa.ipc.new_file(self.output_file, self._schema, options=options)
+            self._writer.write_table(table.cast(self._schema))
+
+    def close(self) -> None:
+        """Finishes the file."""
+        with phase('write'):
+            if self.format == 'csv':
+                self._file.close()
+            elif self._writer is not None:
+                self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,424 @@
+"""
+Group 6 - Feature Engineering
+service.py - Warm, low-latency transform service for single records and micro-batches
+Loads the fitted state of the processing functions once (categorical
+vocabularies, bin edges, anomaly limits and the date format) and serves
+POST /transform over HTTP, returning the feature table columns of every
+record. Small batches of well-formed records take a fast path that never
+builds a DataFrame: it evaluates the same compiled specs, bin codes and date
+features as the batch functions on plain arrays of the batch. Anything else
+goes through the batch functions. GET /stats reports p50/p99 latency and requests per second.
+Run with: python service.py --input input/data.csv --port 8765
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import time_based_feature_extraction as time_features
+from derive_computed_columns     import COMPILED_SPEC as DERIVED_SPEC
+from encode_categorical_features import (
+    UNKNOWN_CODE, UNKNOWN_SUFFIX, fit_categorical_encoder, load_encoder,
+)
+from bin_numeric_ranges          import BIN_SPECS, bin_codes, fit_bins, load_bins
+from flag_anomalies_column       import ANOMALY_METHODS, compute_anomaly_bounds
+from date_parsing                import DATE_CACHE, detect_date_format
+from feature_table               import build_feature_table
+from pipeline_io                 import read_input
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Bump when the state layout changes, so old state files are rejected
+SERVICE_STATE_VERSION = 1
+
+# Batches up to this many records take the fast path (it costs ~120µs per
+# call plus ~15µs per record, the batch functions ~40ms per call)
+FAST_PATH_LIMIT = 1000
+
+# Latencies kept for the p50/p99 report
+LATENCY_WINDOW = 10_000
+
+# join_date strings whose time features the fast path remembers
+DATE_MEMO_SIZE = 10_000
+
+# Fields the fast path needs, and the types it accepts for them
+_NUMERIC_FIELDS = ('age', 'salary', 'score')
+_TEXT_FIELDS = ('department', 'category', 'join_date')
+
+
+# ─── Fitted state ─────────────────────────────────────────────────────────────
+
+def fit_service_state(input_file: str | pd.DataFrame, encoder: dict | str | None = None,
+                      bins: dict | str | None = None, date_format: str | None = None) -> dict:
+    """
+    Fits everything the service keeps warm on a training input.
+
+    Args:
+        input_file  (str | pd.DataFrame): The training data.
+        encoder     (dict | str | None): Fitted vocabularies or their artifact.
+                     None fits them on the training data.
+        bins        (dict | str | None): Fitted bins or their artifact. None
+                     fits BIN_SPECS on the training data.
+        date_format (str | None): strptime format of join_date. None detects
+                     it from the training data.
+
+    Returns:
+        dict: The JSON-serializable service state.
+    """
+    df = read_input(input_file) if isinstance(input_file, str) else input_file
+    if encoder is None:
+        encoder = fit_categorical_encoder(df)
+    elif isinstance(encoder, str):
+        encoder = load_encoder(encoder)
+    if bins is None:
+        bins = fit_bins(df, BIN_SPECS)
+    elif isinstance(bins, str):
+        bins = load_bins(bins)
+    if date_format is None:
+        date_format = detect_date_format(pd.unique(df['join_date'].astype(object)))
+    bounds = compute_anomaly_bounds(df)
+    return {
+        'version'       : SERVICE_STATE_VERSION,
+        'encoder'       : encoder,
+        'bins'          : bins,
+        'anomaly_bounds': {col: [float(low), float(high)] for col, (low, high) in bounds.items()},
+        'date_format'   : date_format,
+    }
+
+
+def save_service_state(state: dict, state_file: str) -> None:
+    """Saves the service state as JSON."""
+    with open(state_file, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def load_service_state(state_file: str) -> dict:
+    """Loads a state saved by save_service_state."""
+    with open(state_file) as f:
+        state = json.load(f)
+    if state.get('version') != SERVICE_STATE_VERSION:
+        raise ValueError(f"Unsupported service state version in {state_file}: "
+                         f"{state.get('version')!r}")
+    return state
+
+
+# ─── Transforming records ─────────────────────────────────────────────────────
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class OnlineTransformer:
+    """
+    Transforms records with fitted state, matching build_feature_table.
+
+    transform() returns one dict per record: the record's own fields,
+    followed by the new columns of every processing function in feature
+    table order. Batches of at most FAST_PATH_LIMIT well-formed records
+    (numeric age/salary/score with a non-zero age, text department,
+    category and join_date) are computed column by column on NumPy arrays,
+    with the kernels of the batch functions; other batches, and every batch
+    of an encoder with hashed columns, run the batch functions on a DataFrame.
+    """
+
+    def __init__(self, state: dict):
+        self.state = state
+        self.encoder = state['encoder']
+        self.bins = state['bins']
+        self.bounds = {col: tuple(limits) for col, limits in state['anomaly_bounds'].items()}
+        self.date_format = state['date_format']
+        self._dates = OrderedDict()
+        self._lock = threading.Lock()
+        self._one_hot = [
+            (col, spec['prefix'], {value: f"{spec['prefix']}_{value}" for value in spec['values']},
+             [f"{spec['prefix']}_{value}" for value in spec['values']]
+             + [f"{spec['prefix']}_{UNKNOWN_SUFFIX}"])
+            for col, spec in self.encoder['one_hot'].items()
+        ]
+        self._bin_specs = [
+            (name, spec['column'], np.asarray(spec['edges'], dtype=float), spec['right'],
+             spec['include_lowest'], spec['labels'])
+            for name, spec in self.bins['bins'].items()
+        ]
+
+    # --- Fast path ---
+
+    def fast_path_applies(self, records: list) -> bool:
+        """True when every record can be transformed without a DataFrame."""
+        if len(records) > FAST_PATH_LIMIT or self.encoder.get('hash'):
+            return False
+        for record in records:
+            if not all(_is_number(record.get(field)) for field in _NUMERIC_FIELDS):
+                return False
+            if not all(isinstance(record.get(field), str) for field in _TEXT_FIELDS):
+                return False
+            if record['age'] == 0:
+                return False
+        return True
+
+    def _date_features(self, text: str, today: pd.Timestamp) -> dict | None:
+        """
+        The time features of one join_date (see time_features.date_features),
+        memoized until the day changes; None when it does not parse with the
+        fitted format.
+        """
+        with self._lock:
+            memo = self._dates.get(text)
+            if memo is not None and memo[0] == today:
+                self._dates.move_to_end(text)
+                return memo[1]
+        try:
+            dates = DATE_CACHE.parse([text], self.date_format)
+        except (ValueError, TypeError):
+            return None
+        features = {col: np.asarray(values).tolist()[0]
+                    for col, values in time_features.date_features(dates, today).items()}
+        with self._lock:
+            self._dates[text] = (today, features)
+            while len(self._dates) > DATE_MEMO_SIZE:
+                self._dates.popitem(last=False)
+        return features
+
+    def transform_fast(self, records: list) -> list | None:
+        """The fast path; None when a join_date does not parse with the fitted format."""
+        today = time_features._today()
+        dates = {}
+        for record in records:
+            features = self._date_features(record['join_date'], today)
+            if features is None:
+                return None
+            dates[record['join_date']] = features
+
+        # Whole-batch columns for the compiled derived spec and the bin codes
+        arrays = {}
+
+        def column(name: str) -> np.ndarray:
+            if name not in arrays:
+                arrays[name] = np.array([record[name] for record in records], dtype=float)
+            return arrays[name]
+
+        derived = {col: values.tolist()
+                   for col, values in DERIVED_SPEC.evaluate(
+                       {name: column(name) for name in DERIVED_SPEC.inputs}).items()}
+        binned = [(name, labels, bin_codes(column(col), edges, right, include_lowest).tolist())
+                  for name, col, edges, right, include_lowest, labels in self._bin_specs]
+
+        result = []
+        for i, record in enumerate(records):
+            out = dict(record)
+
+            # derive_computed_columns
+            for col, values in derived.items():
+                out[col] = values[i]
+
+            # encode_categorical_features
+            for col, _, names, columns in self._one_hot:
+                hot = names.get(record[col], columns[-1])
+                for name in columns:
+                    out[name] = 1 if name == hot else 0
+            for col, mapping in self.encoder['label'].items():
+                out[f"{col}_encoded"] = mapping.get(record[col], UNKNOWN_CODE)
+
+            # bin_numeric_ranges (code -1: not binned)
+            for name, labels, codes in binned:
+                out[name] = labels[codes[i]] if codes[i] >= 0 else None
+
+            # time_based_feature_extraction
+            out.update(dates[record['join_date']])
+
+            # flag_anomalies_column
+            any_flag = 0
+            for col in ANOMALY_METHODS:
+                low, high = self.bounds[col]
+                flag = 1 if (record[col] < low or record[col] > high) else 0
+                out[f"{col}_anomaly"] = flag
+                any_flag |= flag
+            out['is_anomaly'] = any_flag
+            result.append(out)
+        return result
+
+    # --- Batch path ---
+
+    def transform_frame(self, records: list) -> list:
+        """
+        Runs the batch functions (as the feature table) on a DataFrame of the records.
+
+        join_date is parsed with the fitted format, or, when a record uses
+        another one, with the format detected from the records themselves.
+        """
+        df = pd.DataFrame.from_records(records)
+        options = {
+            'encoded'  : {'encoder': self.encoder},
+            'binned'   : {'bins': self.bins},
+            'time'     : {'date_format': self.date_format},
+            'anomalies': {'bounds': self.bounds},
+        }
+        try:
+            table, _ = build_feature_table(df, None, options)
+        except ValueError:
+            if self.date_format is None:
+                raise
+            table, _ = build_feature_table(df, None, {**options, 'time': {'date_format': None}})
+        table = table.astype(object).where(table.notna(), None)
+        return table.to_dict('records')
+
+    def transform(self, records: list) -> list:
+        """Transforms a list of records (dicts of input fields)."""
+        if self.fast_path_applies(records):
+            result = self.transform_fast(records)
+            if result is not None:
+                return result
+        return self.transform_frame(records)
+
+
+# ─── Latency statistics ───────────────────────────────────────────────────────
+
+class LatencyStats:
+    """Request counts and a sliding window of latencies, safe to update from many threads."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.records = 0
+
+    def record(self, seconds: float, records: int) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self.requests += 1
+            self.records += records
+
+    def snapshot(self) -> dict:
+        """Requests and records served, p50/p99 latency (ms) and requests per second."""
+        with self._lock:
+            latencies = np.array(self._latencies)
+            requests, records = self.requests, self.records
+        elapsed = time.perf_counter() - self.started
+        p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if len(latencies) else (None, None)
+        return {
+            'requests'       : requests,
+            'records'        : records,
+            'p50_ms'         : None if p50 is None else round(float(p50), 4),
+            'p99_ms'         : None if p99 is None else round(float(p99), 4),
+            'requests_per_s' : round(requests / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+# ─── HTTP service ─────────────────────────────────────────────────────────────
+
+def _parse_records(body: bytes) -> list:
+    """Records of a request body: one record, a list of them, or {"records": [...]}."""
+    payload = json.loads(body)
+    if isinstance(payload, dict) and 'records' in payload:
+        payload = payload['records']
+    records = [payload] if isinstance(payload, dict) else payload
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("expected a JSON record, a list of records or {\"records\": [...]}")
+    return records
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """POST /transform, GET /stats and GET /health, on keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this every response
+    # waits for the client's delayed ACK (~40ms)
+    disable_nagle_algorithm = True
+
+    def _reply(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/transform":
+            self._reply(404, {'error': f"unknown path {self.path}"})
+            return
+        try:
+            records = _parse_records(body)
+            result = self.server.transformer.transform(records)
+        except (ValueError, KeyError, TypeError) as error:
+            self._reply(400, {'error': str(error)})
+            return
+        self._reply(200, {'records': result})
+        self.server.stats.record(time.perf_counter() - start, len(records))
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply(200, self.server.stats.snapshot())
+        elif self.path == "/health":
+            self._reply(200, {'status': 'ok'})
+        else:
+            self._reply(404, {'error': f"unknown path {self.path}"})
+
+    def log_message(self, *args):
+        # One line per request would dominate the latency
+        pass
+
+
+def make_server(transformer: OnlineTransformer, host: str = DEFAULT_HOST,
+                port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Creates the HTTP server (one thread per connection); call serve_forever() on it.
+
+    Port 0 picks a free port, available as server.server_address[1].
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.transformer = transformer
+    server.stats = LatencyStats()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--input", default="input/data.csv",
+                        help="training data the state is fitted on (default: input/data.csv)")
+    parser.add_argument("--state", default=None, metavar="PATH",
+                        help="service state (JSON): loaded when it exists, otherwise fitted "
+                             "on --input and saved")
+    parser.add_argument("--encoder", default=None, metavar="PATH",
+                        help="categorical encoder artifact to use instead of fitting one")
+    parser.add_argument("--bins", default=None, metavar="PATH",
+                        help="fitted bins artifact to use instead of the built-in bins")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    try:
+        state = load_service_state(args.state) if args.state else None
+    except FileNotFoundError:
+        state = None
+    if state is None:
+        state = fit_service_state(args.input, args.encoder, args.bins)
+        if args.state:
+            save_service_state(state, args.state)
+
+    server = make_server(OnlineTransformer(state), args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"🚀 Serving POST http://{host}:{port}/transform (GET /stats for p50/p99 latency)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 {json.dumps(server.stats.snapshot())}")
+
+
+if __name__ == "__main__":
+    main()
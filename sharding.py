@@ -0,0 +1,110 @@
+"""
+Group 6 - Feature Engineering
+sharding.py - Inputs split over many files (shards)
+Resolves a directory or glob pattern to an ordered list of shards, names the
+matching output shards, and combines per-shard statistics into the global
+ones that stages such as flag_anomalies_column need, so a sharded run flags
+the same rows as a run on the concatenated input.
+"""
+
+import glob
+import os
+import re
+
+import pandas as pd
+
+from pipeline_config             import OUTPUT_FORMATS, is_pattern, is_sharded
+from streaming                   import anomaly_bounds_from_statistics, new_anomaly_statistics
+from sketches                    import DEFAULT_EXACT_LIMIT, DEFAULT_SKETCH_K
+
+# Files picked up when the input is a directory (CSV may be compressed)
+SHARD_SUFFIXES = tuple(
+    ext for extensions in OUTPUT_FORMATS.values() for ext in extensions
+) + ('.csv.gz', '.csv.bz2', '.csv.xz')
+
+
+def _natural_key(path: str) -> list:
+    """Sort key that puts part-2 before part-10."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
+def resolve_shards(source: str) -> list:
+    """
+    Returns the input files of a single path, a directory or a glob pattern.
+
+    A directory contributes every file ending in SHARD_SUFFIXES. The shards
+    are sorted by path with numbers compared by value (part-2 before
+    part-10), so every run processes them in the same order.
+
+    Args:
+        source (str): A file, a directory or a pattern such as "input/part-*.csv".
+
+    Returns:
+        list: Paths of the shards, in processing order.
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)
+                 if name.lower().endswith(SHARD_SUFFIXES)]
+    elif is_pattern(source):
+        paths = glob.glob(source)
+    else:
+        paths = [source]
+    shards = sorted((path for path in paths if os.path.isfile(path)), key=_natural_key)
+    if not shards:
+        raise FileNotFoundError(f"No input files match '{source}'")
+    return shards
+
+
+def shard_output_path(output_file: str, index: int, shard: str) -> str:
+    """
+    Returns where one shard's output is written.
+
+    Outputs go to a folder named after the output file, one file per input
+    shard, prefixed with the shard's position so they sort in input order:
+    output/derived.csv + input/part-7.csv (3rd shard) -> output/derived/00002-part-7.csv
+
+    Args:
+        output_file (str): Output path of the stage for a single-file input.
+        index       (int): Position of the shard in resolve_shards order.
+        shard       (str): Path of the input shard.
+    """
+    folder, name = os.path.split(output_file)
+    stem, _, extension = name.partition(".")
+    shard_stem = os.path.basename(shard).split(".", 1)[0]
+    return os.path.join(folder, stem, f"{index:05d}-{shard_stem}.{extension}")
+
+
+def anomaly_statistics(df: pd.DataFrame, exact_limit: int = DEFAULT_EXACT_LIMIT,
+                       sketch_k: int = DEFAULT_SKETCH_K) -> dict:
+    """
+    Gathers the statistics behind the anomaly limits over one shard.
+
+    Returns:
+        dict: Column name -> QuantileSketch or RunningMoments (see
+        streaming.new_anomaly_statistics).
+    """
+    stats = new_anomaly_statistics(exact_limit, sketch_k)
+    for col, stat in stats.items():
+        stat.update(df[col].to_numpy())
+    return stats
+
+
+def global_anomaly_bounds(shard_stats: list) -> tuple:
+    """
+    Merges per-shard statistics into the anomaly limits of the whole input.
+
+    Quantile sketches stay exact while the merged column holds at most
+    `exact_limit` values, in which case the limits equal those of the
+    concatenated input.
+
+    Args:
+        shard_stats (list): One anomaly_statistics result per shard.
+
+    Returns:
+        tuple: (column -> (low, high) limits, column -> merged statistic)
+    """
+    merged = dict(shard_stats[0])
+    for stats in shard_stats[1:]:
+        for col, stat in stats.items():
+            merged[col].merge(stat)
+    return anomaly_bounds_from_statistics(merged), merged
@@ -0,0 +1,188 @@
+"""
+Group 6 - Feature Engineering
+sketches.py - Mergeable running statistics for out-of-core processing
+Lets statistics such as mean, standard deviation and quantiles be gathered
+chunk by chunk without ever holding the whole column in memory.
+"""
+
+import numpy as np
+
+# Up to this many values a QuantileSketch keeps everything and is exact
+DEFAULT_EXACT_LIMIT = 1_000_000
+
+# Buffer size per sketch level once the exact limit is exceeded
+DEFAULT_SKETCH_K = 8192
+
+
+def _clean(values) -> np.ndarray:
+    """Returns the values as a float array with missing values dropped."""
+    values = np.asarray(values, dtype=float)
+    return values[~np.isnan(values)]
+
+
+class RunningMoments:
+    """
+    Running count, mean and variance of a numeric column.
+
+    Each chunk is reduced with vectorized NumPy, then folded into the running
+    totals with the Welford / Chan et al. update, which stays numerically
+    stable across billions of rows. Two instances can be merged, e.g. when
+    chunks or shards were processed separately.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+
+    def update(self, values) -> "RunningMoments":
+        """Adds a chunk of values (missing values are skipped)."""
+        values = _clean(values)
+        if len(values):
+            chunk = RunningMoments()
+            chunk.count = len(values)
+            chunk.mean = float(values.mean())
+            chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+            self.merge(chunk)
+        return self
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Folds another set of running moments into this one."""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        """Variance with pandas' default ddof=1 (NaN when undefined)."""
+        if self.count - ddof <= 0:
+            return float('nan')
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> float:
+        """Standard deviation with pandas' default ddof=1."""
+        return float(np.sqrt(self.variance(ddof)))
+
+
+class QuantileSketch:
+    """
+    Bounded-memory quantile estimator with an exact mode for small inputs.
+
+    While at most `exact_limit` values have been seen, every value is kept
+    and quantiles match `Series.quantile` (linear interpolation) exactly.
+    Past that, values flow into a compactor sketch: level h holds items that
+    each stand for 2**h original values, and a full level is sorted and
+    halved into the next one. Memory stays at about k * log2(n / k) values.
+
+    Every compaction at level h can shift the rank of any value by at most
+    2**h, so the sketch tracks a guaranteed bound on the rank error of any
+    quantile it returns (`rank_error`, or `error_bound` as a fraction of n).
+    """
+
+    def __init__(self, exact_limit: int = DEFAULT_EXACT_LIMIT, k: int = DEFAULT_SKETCH_K):
+        if k < 2:
+            raise ValueError("k must be at least 2")
+        self.exact_limit = exact_limit
+        self.k = k
+        self.count = 0
+        self.rank_error = 0
+        self._exact = []      # chunks kept verbatim while in exact mode
+        self._levels = None   # per-level item arrays once in sketch mode
+        self._offsets = []    # alternates which half each level keeps
+
+    @property
+    def is_exact(self) -> bool:
+        """True while every value seen so far is still kept."""
+        return self._levels is None
+
+    @property
+    def error_bound(self) -> float:
+        """Worst-case rank error as a fraction of the values seen (0 when exact)."""
+        return self.rank_error / self.count if self.count else 0.0
+
+    def update(self, values) -> "QuantileSketch":
+        """Adds a chunk of values (missing values are skipped)."""
+        values = _clean(values)
+        if not len(values):
+            return self
+        self.count += len(values)
+        if self.is_exact:
+            self._exact.append(values)
+            if self.count > self.exact_limit:
+                buffered = np.concatenate(self._exact)
+                self._exact = []
+                self._levels = []
+                self._add(0, buffered)
+        else:
+            self._add(0, values)
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Folds another sketch into this one, e.g. from a separate shard."""
+        if other.is_exact:
+            for values in other._exact:
+                self.update(values)
+            return self
+        if self.is_exact:
+            buffered = self._exact
+            self._exact = []
+            self._levels = []
+            for values in buffered:
+                self._add(0, values)
+        self.count += other.count
+        self.rank_error += other.rank_error
+        for level, items in enumerate(other._levels):
+            self._add(level, items)
+        return self
+
+    def _add(self, level: int, items: np.ndarray) -> None:
+        """Appends items to a level, compacting it upward while it is full."""
+        while len(self._levels) <= level:
+            self._levels.append(np.empty(0))
+            self._offsets.append(0)
+        self._levels[level] = np.concatenate([self._levels[level], items])
+        while len(self._levels[level]) >= self.k:
+            items = np.sort(self._levels[level])
+            # Compact an even number of items; an odd one out stays behind
+            keep_back = len(items) % 2
+            promoted = items[:len(items) - keep_back]
+            self._levels[level] = items[len(items) - keep_back:]
+            offset = self._offsets[level]
+            self._offsets[level] ^= 1
+            self.rank_error += 2 ** level
+            self._add(level + 1, promoted[offset::2])
+
+    def _weighted_items(self):
+        """Returns the sorted retained items and the weight of each."""
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(items), 2.0 ** level) for level, items in enumerate(self._levels)
+        ])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the q-th quantile (0 <= q <= 1) of the values seen.
+
+        Args:
+            q (float): The quantile to estimate.
+
+        Returns:
+            float: The exact quantile in exact mode, otherwise an estimate
+            whose rank is within `rank_error` of the true quantile's rank.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return float('nan')
+        if self.is_exact:
+            return float(np.quantile(np.concatenate(self._exact), q))
+        values, weights = self._weighted_items()
+        # Each item covers `weight` consecutive ranks; use its centre rank
+        centre_ranks = np.cumsum(weights) - weights / 2 - 0.5
+        return float(np.interp(q * (self.count - 1), centre_ranks, values))
@@ -0,0 +1,139 @@
+"""
+Group 6 - Feature Engineering
+stage_cache.py - Content-addressed cache of stage outputs
+A stage's output is stored under a hash of everything it depends on: the
+input file's contents, the stage's version and its parameters. When none of
+those changed, the pipeline copies the cached output instead of recomputing it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Where cached outputs are kept by default
+DEFAULT_CACHE_DIR = ".cache/stages"
+
+# Total size of cached outputs kept before the least recently used are evicted
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+# Bump when the key layout changes, so old entries are never matched
+CACHE_FORMAT_VERSION = 1
+
+# Bytes read at a time when hashing a file
+DIGEST_BLOCK_SIZE = 1024 ** 2
+
+
+def file_digest(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(DIGEST_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _suffixes(path: str) -> str:
+    """Returns every extension of a file name, e.g. '.csv.gz'."""
+    name = os.path.basename(path)
+    return name[name.find("."):].lower() if "." in name else ""
+
+
+class StageCache:
+    """
+    Size-capped, least-recently-used store of stage output files.
+
+    Entries are plain copies of output files named after their key. Serving
+    an entry refreshes its modification time, and storing one evicts the
+    entries used longest ago until the cache fits in `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(stage: str, input_digest: str, version: int, params: dict) -> str:
+        """
+        Builds the cache key of one stage run.
+
+        Args:
+            stage        (str) : Name of the stage.
+            input_digest (str) : file_digest of the input file.
+            version      (int) : The stage's STAGE_VERSION.
+            params       (dict): Anything else the output depends on, e.g. the
+                                 output format, codec or today's date. Must be
+                                 JSON serializable.
+
+        Returns:
+            str: A SHA-256 hex digest.
+        """
+        payload = json.dumps(
+            [CACHE_FORMAT_VERSION, stage, input_digest, version, params],
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry(self, key: str, output_file: str) -> str:
+        return os.path.join(self.cache_dir, key + _suffixes(output_file))
+
+    def fetch(self, key: str, output_file: str) -> bool:
+        """
+        Copies a cached output to output_file.
+
+        Returns:
+            bool: True on a cache hit, False when the key is not cached.
+        """
+        entry = self._entry(key, output_file)
+        if not os.path.exists(entry):
+            return False
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        shutil.copyfile(entry, output_file)
+        os.utime(entry)
+        return True
+
+    def store(self, key: str, output_file: str) -> None:
+        """Saves a freshly written output under its key, then enforces the size cap."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(output_file, tmp)
+        os.replace(tmp, self._entry(key, output_file))
+        self.evict()
+
+    def entries(self) -> list:
+        """Returns (path, bytes, last used) of every entry, least recently used first."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isfile(path) and not name.endswith(".tmp"):
+                stat = os.stat(path)
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self) -> int:
+        """Returns the total bytes of cached outputs."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> list:
+        """
+        Deletes the least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            list: Paths of the deleted entries.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed.append(path)
+        return removed
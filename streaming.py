@@ -0,0 +1,357 @@
+"""
+Group 6 - Feature Engineering
+streaming.py - Chunked streaming mode for the processing functions
+Reads the input in fixed-size chunks, transforms each chunk and appends it to
+the output, so memory use stays flat no matter how large the input file is.
+Reading, transforming and writing overlap: a reader thread parses the next
+chunk and a writer thread writes the previous one while the current chunk is
+transformed, with bounded queues between them.
+"""
+
+import contextlib
+import contextvars
+import queue
+import threading
+
+import pandas as pd
+
+from metrics                       import phase
+from pipeline_io                   import ChunkWriter
+from pipeline_config               import OVERLAP_BY_DEFAULT
+from derive_computed_columns       import derive_computed_columns
+from bin_numeric_ranges            import bin_numeric_ranges
+from time_based_feature_extraction import time_based_feature_extraction
+from flag_anomalies_column         import (
+    ANOMALY_METHODS, apply_anomaly_flags, flag_anomalies_column, iqr_bounds, zscore_bounds,
+)
+from sketches                      import (
+    DEFAULT_EXACT_LIMIT, DEFAULT_SKETCH_K, QuantileSketch, RunningMoments,
+)
+from window_features               import WindowState
+
+# Functions whose new columns depend only on the values in the same row.
+# Any of them can run on one chunk at a time without changing its output
+# (the optional window features of time_based_feature_extraction look back
+# at earlier rows, which stream_stage carries between chunks).
+ROW_LOCAL_STAGES = (
+    derive_computed_columns,
+    bin_numeric_ranges,
+    time_based_feature_extraction,
+)
+
+# Functions that can stream with extra passes over the input
+STREAMABLE_STAGES = ROW_LOCAL_STAGES + (flag_anomalies_column,)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Chunks that may wait between the reader, the transform and the writer.
+# At most about 2 * QUEUE_DEPTH + 3 chunks are in memory at once.
+QUEUE_DEPTH = 2
+
+# Marks the end of a queue
+_DONE = object()
+
+
+def read_chunks(input_file: str, chunksize: int, **read_csv_options):
+    """Yields the input CSV in chunks, counting the parsing as read time."""
+    reader = iter(pd.read_csv(input_file, chunksize=chunksize, **read_csv_options))
+    while True:
+        with phase('read'):
+            chunk = next(reader, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def _start_thread(target, name: str) -> threading.Thread:
+    """Starts a daemon thread that shares the caller's context (and so its stage metrics)."""
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target,),
+                              name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def prefetch(items, depth: int = QUEUE_DEPTH):
+    """
+    Yields the items of an iterable, producing them on a background thread.
+
+    The thread runs at most `depth` items ahead of the consumer. Errors
+    raised while producing are re-raised in the consumer, and the thread is
+    stopped when the consumer stops early.
+
+    Args:
+        items (iterable): E.g. read_chunks(...); it is iterated on the thread.
+        depth (int)     : Items buffered ahead of the consumer.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Waits for room, but gives up once the consumer is gone
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as error:
+            put(error)
+
+    thread = _start_thread(produce, "chunk-reader")
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class BackgroundWriter:
+    """
+    Hands chunks to a ChunkWriter running on a background thread.
+
+    write() returns as soon as the chunk is queued and blocks only while
+    `depth` chunks are already waiting. A failed write is re-raised by the
+    next write() or by close(); the chunks queued after it are discarded.
+    """
+
+    def __init__(self, writer: ChunkWriter, depth: int = QUEUE_DEPTH):
+        self.writer = writer
+        self.error = None
+        self._queue = queue.Queue(maxsize=depth)
+        self._thread = _start_thread(self._drain, "chunk-writer")
+
+    def _drain(self) -> None:
+        while True:
+            df = self._queue.get()
+            if df is _DONE:
+                return
+            # Keep draining after a failure, so write() never blocks forever
+            if self.error is None:
+                try:
+                    self.writer.write(df)
+                except BaseException as error:
+                    self.error = error
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Queues one chunk for writing."""
+        if self.error is not None:
+            raise self.error
+        self._queue.put(df)
+
+    def close(self) -> None:
+        """Waits until every queued chunk is written."""
+        if self._thread.is_alive():
+            self._queue.put(_DONE)
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        try:
+            self.close()
+        except BaseException:
+            # Do not hide the error that ended the with-block
+            if exc_type is None:
+                raise
+
+
+def _write_chunks(transform, input_file: str, output_file: str, chunksize: int,
+                  overlap: bool = OVERLAP_BY_DEFAULT) -> tuple:
+    """
+    Applies transform to each chunk of the input and appends it to the output.
+
+    With overlap the next chunk is parsed and the previous one written on
+    background threads while transform runs, so a stage takes about as long
+    as its slowest part instead of the sum of all three.
+
+    Returns:
+        tuple: (rows written, chunks processed)
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+
+    rows = 0
+    with ChunkWriter(output_file) as writer:
+        chunks = read_chunks(input_file, chunksize)
+        if overlap:
+            chunks = prefetch(chunks)
+        sink = BackgroundWriter(writer) if overlap else contextlib.nullcontext(writer)
+        with contextlib.closing(chunks), sink as target:
+            for chunk in chunks:
+                with phase('compute'):
+                    result = transform(chunk)
+                target.write(result)
+                rows += len(result)
+
+        # An input with a header but no rows still gets the output header
+        chunks = writer.chunks
+        if chunks == 0:
+            writer.write(transform(pd.read_csv(input_file)))
+    return rows, chunks
+
+
+def stream_stage(stage, input_file: str, output_file: str,
+                 chunksize: int = DEFAULT_CHUNKSIZE,
+                 overlap: bool = OVERLAP_BY_DEFAULT, options: dict = None) -> int:
+    """
+    Runs a processing function over a CSV file chunk by chunk.
+
+    Each chunk is handed to the function as an in-memory dataframe with
+    output_file=None, and the result is appended to the output CSV. Only one
+    chunk is held in memory at a time, and the written bytes match the
+    full-load result of the same function. flag_anomalies_column needs
+    statistics over the whole file and runs as stream_flag_anomalies.
+    time_based_feature_extraction with `windows` carries the earlier rows
+    its windows reach from chunk to chunk (see window_features.WindowState),
+    which needs an input sorted by join_date; an unsorted one raises ValueError.
+
+    Note: pandas infers dtypes per chunk. A column whose inferred dtype
+    changes between chunks (e.g. an integer column with missing values in
+    only some chunks) can format differently than in a full load.
+
+    Args:
+        stage       (callable): One of STREAMABLE_STAGES.
+        input_file  (str)     : Path to the input CSV file.
+        output_file (str)     : Path where the processed CSV will be saved.
+        chunksize   (int)     : Number of rows per chunk.
+        overlap     (bool)    : Read and write on background threads while
+                                the current chunk is transformed.
+        options     (dict)    : Keyword options handed to a row-local stage
+                                with every chunk, e.g. fitted bins.
+
+    Returns:
+        int: The number of rows written.
+    """
+    if stage is flag_anomalies_column:
+        return stream_flag_anomalies(input_file, output_file, chunksize, overlap=overlap)['rows']
+    if stage not in ROW_LOCAL_STAGES:
+        raise ValueError(f"{stage.__name__} is not row-local and cannot be streamed")
+
+    options = dict(options or {})
+    if stage is time_based_feature_extraction and options.get('windows'):
+        options['window_state'] = WindowState()
+    rows, chunks = _write_chunks(lambda chunk: stage(chunk, None, **options), input_file, output_file,
+                                 chunksize, overlap)
+    print(f"[{stage.__name__}] ✅ Saved to: {output_file} "
+          f"(streamed {rows} rows in {chunks} chunks)")
+    return rows
+
+
+def new_anomaly_statistics(exact_limit: int = DEFAULT_EXACT_LIMIT,
+                           sketch_k: int = DEFAULT_SKETCH_K) -> dict:
+    """
+    Empty statistics behind the anomaly limits: a QuantileSketch per IQR
+    column and RunningMoments per Z-score column.
+    """
+    return {
+        col: QuantileSketch(exact_limit, sketch_k) if method == 'iqr' else RunningMoments()
+        for col, method in ANOMALY_METHODS.items()
+    }
+
+
+def gather_anomaly_statistics(input_file: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                              exact_limit: int = DEFAULT_EXACT_LIMIT,
+                              sketch_k: int = DEFAULT_SKETCH_K,
+                              overlap: bool = OVERLAP_BY_DEFAULT) -> dict:
+    """
+    First streaming pass: gathers the statistics behind the anomaly limits.
+
+    See new_anomaly_statistics for what is gathered. Only the checked
+    columns are read; with overlap the next chunk is parsed while the
+    current one is added to the statistics.
+
+    Returns:
+        dict: Column name -> QuantileSketch or RunningMoments.
+    """
+    stats = new_anomaly_statistics(exact_limit, sketch_k)
+    chunks = read_chunks(input_file, chunksize, usecols=list(stats))
+    if overlap:
+        chunks = prefetch(chunks)
+    with contextlib.closing(chunks):
+        for chunk in chunks:
+            with phase('compute'):
+                for col, stat in stats.items():
+                    stat.update(chunk[col].to_numpy())
+    return stats
+
+
+def anomaly_bounds_from_statistics(stats: dict) -> dict:
+    """
+    Turns gathered statistics into the (low, high) limits used for flagging.
+
+    Args:
+        stats (dict): Column name -> QuantileSketch or RunningMoments.
+
+    Returns:
+        dict: Column name -> (low, high) limits, in ANOMALY_METHODS order.
+    """
+    bounds = {}
+    for col, stat in stats.items():
+        if isinstance(stat, QuantileSketch):
+            bounds[col] = iqr_bounds(stat.quantile(0.25), stat.quantile(0.75))
+        else:
+            bounds[col] = zscore_bounds(stat.mean, stat.std())
+    return bounds
+
+
+def stream_flag_anomalies(input_file: str, output_file: str,
+                          chunksize: int = DEFAULT_CHUNKSIZE,
+                          exact_limit: int = DEFAULT_EXACT_LIMIT,
+                          sketch_k: int = DEFAULT_SKETCH_K,
+                          overlap: bool = OVERLAP_BY_DEFAULT) -> dict:
+    """
+    Two-pass streaming version of flag_anomalies_column.
+
+    Pass 1 gathers quantile sketches and running mean/variance over the
+    chunks; pass 2 flags each chunk against the resulting limits. With at
+    most `exact_limit` values per column the quantiles are exact and the
+    flags match the in-memory function; beyond that the reported error
+    bound says how far (in rank) each quantile may be off.
+
+    Args:
+        input_file  (str): Path to the input CSV file.
+        output_file (str): Path where the processed CSV will be saved.
+        chunksize   (int): Number of rows per chunk.
+        exact_limit (int): Values per column kept exactly before sketching.
+        sketch_k    (int): Buffer size per sketch level (larger = more accurate).
+        overlap     (bool): Read and write on background threads (see _write_chunks).
+
+    Returns:
+        dict: {'rows': rows written, 'bounds': column -> (low, high),
+               'error_bounds': IQR column -> worst-case rank error (fraction)}
+    """
+    stats = gather_anomaly_statistics(input_file, chunksize, exact_limit, sketch_k, overlap)
+    bounds = anomaly_bounds_from_statistics(stats)
+    rows, chunks = _write_chunks(
+        lambda chunk: apply_anomaly_flags(chunk, bounds), input_file, output_file, chunksize,
+        overlap,
+    )
+
+    error_bounds = {
+        col: stat.error_bound for col, stat in stats.items() if isinstance(stat, QuantileSketch)
+    }
+    print(f"[flag_anomalies_column] ✅ Saved to: {output_file} "
+          f"(streamed {rows} rows in {chunks} chunks, 2 passes)")
+    for col, stat in stats.items():
+        if isinstance(stat, QuantileSketch):
+            mode = "exact" if stat.is_exact else "sketch"
+            print(f"   • {col} quartiles: {mode}, rank error ≤ {stat.error_bound:.4%} "
+                  f"(±{stat.rank_error} rows)")
+    return {'rows': rows, 'bounds': bounds, 'error_bounds': error_bounds}
@@ -0,0 +1,83 @@
+"""
+Group 6 - Feature Engineering
+tests/test_benchmarks.py — PyTest test cases for the synthetic data generator and benchmark comparison
+Run with: pytest tests/test_benchmarks.py -v
+"""
+
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add the benchmarks folder to the path so its modules import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from datagen        import (
+    resolve_cardinality, synthetic_frame, write_synthetic_csv, write_synthetic_shards,
+)
+from bench_pipeline import compare_results
+
+
+def results(rows_per_s, peak_rss_bytes):
+    return {'results': [{'benchmark': 'run_pipeline', 'rows': 1000,
+                         'rows_per_s': rows_per_s, 'peak_rss_bytes': peak_rss_bytes}]}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Synthetic data generator
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSyntheticData:
+
+    def test_schema_matches_input(self):
+        assert list(synthetic_frame(10).columns) == list(pd.read_csv("input/data.csv").columns)
+
+    def test_same_seed_same_rows(self):
+        pd.testing.assert_frame_equal(synthetic_frame(500, seed=3), synthetic_frame(500, seed=3))
+        assert not synthetic_frame(500, seed=3).equals(synthetic_frame(500, seed=4))
+
+    def test_cardinality_settings(self):
+        df = synthetic_frame(20_000, cardinality={'department': 40, 'join_date': 30})
+        assert df['department'].nunique() == 40
+        assert df['join_date'].nunique() == 30
+        assert df['category'].nunique() == 3
+
+    def test_rejects_unknown_column(self):
+        with pytest.raises(ValueError):
+            resolve_cardinality({'salary': 10})
+
+    def test_chunked_csv_is_reproducible(self, tmp_path):
+        first = write_synthetic_csv(str(tmp_path / "a.csv"), 2_500, chunksize=1_000)
+        second = write_synthetic_csv(str(tmp_path / "b.csv"), 2_500, chunksize=1_000)
+        df = pd.read_csv(first)
+        assert df['id'].tolist() == list(range(1, 2_501))
+        assert open(first).read() == open(second).read()
+
+    def test_shards_split_rows_with_continuous_ids(self, tmp_path):
+        paths = write_synthetic_shards(str(tmp_path), 1_001, 4)
+        assert [os.path.basename(path) for path in paths] == \
+            ["part-00000.csv", "part-00001.csv", "part-00002.csv", "part-00003.csv"]
+        df = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+        assert df['id'].tolist() == list(range(1, 1_002))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Regression comparison
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCompareResults:
+
+    def test_within_tolerance(self):
+        assert compare_results(results(1000, 100), results(950, 105), tolerance=0.10) == []
+
+    def test_flags_slower_and_bigger(self):
+        regressions = compare_results(results(1000, 100), results(800, 150), tolerance=0.10)
+        assert {r['metric'] for r in regressions} == {'rows_per_s', 'peak_rss_bytes'}
+        assert regressions[0]['change'] == pytest.approx(-0.2)
+
+    def test_skips_unreported_peak_rss(self):
+        regressions = compare_results(results(1000, None), results(800, 150), tolerance=0.10)
+        assert [r['metric'] for r in regressions] == ['rows_per_s']
+
+    def test_ignores_benchmarks_missing_from_baseline(self):
+        assert compare_results({'results': []}, results(1, 1)) == []
@@ -0,0 +1,103 @@
+"""
+Group 6 - Feature Engineering
+tests/test_date_parsing.py — PyTest test cases for the memoized date parsing in date_parsing.py
+Run with: pytest tests/test_date_parsing.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from date_parsing import DateCache, broadcast, detect_date_format, factorize_dates
+
+DATES = pd.Series(['2021-03-15', '2019-07-22', None, '2021-03-15', '2018-01-01'])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Format detection
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestDetectDateFormat:
+
+    @pytest.mark.parametrize("values, expected", [
+        (['2021-03-15', '2019-07-22'], '%Y-%m-%d'),
+        (['15/03/2021', '22/07/2019'], '%d/%m/%Y'),
+        (['03/15/2021', '07/22/2019'], '%m/%d/%Y'),
+        (['03/04/2021', '07/02/2019'], '%m/%d/%Y'),
+        (['03-04-2021', '25-12-2019'], '%d-%m-%Y'),
+        (['not a date'], None),
+        ([None], None),
+    ])
+    def test_detects_fixed_format(self, values, expected):
+        assert detect_date_format(values) == expected
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DateCache and factorize_dates
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestFactorizeDates:
+
+    def test_matches_pandas_parsing(self):
+        codes, dates = factorize_dates(DATES, cache=DateCache())
+        expected = pd.to_datetime(DATES)
+        parsed = broadcast(dates.to_numpy(), codes, np.datetime64('NaT'))
+        pd.testing.assert_series_equal(pd.Series(parsed), expected, check_names=False)
+
+    @pytest.mark.parametrize("values", [
+        ['03/04/2021', '12/01/2020', None],
+        ['03-04-2021', '12-01-2020'],
+    ])
+    def test_ambiguous_dates_are_month_first_like_pandas(self, values):
+        series = pd.Series(values)
+        codes, dates = factorize_dates(series, cache=DateCache())
+        parsed = broadcast(dates.to_numpy(), codes, np.datetime64('NaT'))
+        pd.testing.assert_series_equal(pd.Series(parsed), pd.to_datetime(series))
+
+    def test_values_outside_the_sample_are_checked(self, monkeypatch):
+        import date_parsing
+        monkeypatch.setattr(date_parsing, "FORMAT_SAMPLE_SIZE", 2)
+        series = pd.Series(['03/04/2021', '04/05/2021', '25/12/2021'])
+        assert detect_date_format(series) == '%m/%d/%Y'
+        with pytest.raises(ValueError):
+            pd.to_datetime(series)
+        with pytest.raises(ValueError):
+            factorize_dates(series, cache=DateCache())
+
+    def test_category_input_matches_text_input(self):
+        text = factorize_dates(DATES, cache=DateCache())
+        category = factorize_dates(DATES.astype('category'), cache=DateCache())
+        assert list(text[1][text[0][text[0] >= 0]]) == list(category[1][category[0][category[0] >= 0]])
+
+    def test_each_distinct_value_parsed_once(self):
+        cache = DateCache()
+        factorize_dates(DATES, cache=cache)
+        factorize_dates(DATES.iloc[::-1], cache=cache)
+        assert (cache.misses, cache.hits) == (3, 3)
+
+    def test_cache_is_bounded_lru(self):
+        cache = DateCache(maxsize=2)
+        cache.parse(['2020-01-01', '2020-01-02'], '%Y-%m-%d')
+        cache.parse(['2020-01-01'], '%Y-%m-%d')
+        cache.parse(['2020-01-03'], '%Y-%m-%d')
+        assert len(cache) == 2
+        cache.parse(['2020-01-01'], '%Y-%m-%d')
+        assert cache.hits == 2  # 2020-01-01 survived, 2020-01-02 was evicted
+
+    def test_explicit_format(self):
+        codes, dates = factorize_dates(pd.Series(['15/03/2021']), '%d/%m/%Y', DateCache())
+        assert dates[codes[0]] == pd.Timestamp('2021-03-15')
+
+    def test_invalid_date_raises(self):
+        with pytest.raises(ValueError):
+            factorize_dates(pd.Series(['2021-02-30']), '%Y-%m-%d', DateCache())
+
+    def test_broadcast_missing_rows(self):
+        codes = np.array([1, -1, 0])
+        assert broadcast(np.array([10, 20]), codes, 0).tolist() == [20, 0, 10]
+        assert np.isnan(broadcast(np.array([10, 20]), codes)[1])
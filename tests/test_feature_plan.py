@@ -0,0 +1,139 @@
+"""
+Group 6 - Feature Engineering
+tests/test_feature_plan.py — PyTest test cases for the feature planner in feature_plan.py
+Run with: pytest tests/test_feature_plan.py -v
+"""
+
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pipeline_io
+from feature_plan import FEATURE_REGISTRY, build_registry, compute_features, plan_features
+from feature_spec import STAGE_SPECS
+from main         import STAGES, run_pipeline
+
+# ─── Shared config ────────────────────────────────────────────────────────────
+INPUT = "input/data.csv"
+
+# Extra features; hire_year and over_forty repeat built-in definitions in other words
+EXTRA_SPECS = {**STAGE_SPECS, 'extra': {
+    'hire_year'  : {'expr': 'year( join_date )'},
+    'over_forty' : {'where': '(age >= 40)', 'then': 1, 'else': 0},
+    'senior_pay' : {'expr': 'over_forty * salary'},
+}}
+
+
+def stage_column(column):
+    """A column of the full output of the stage that produces it."""
+    df = pd.read_csv(INPUT)
+    return STAGES[FEATURE_REGISTRY[column][0]](df, None)[column]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Planning
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestPlan:
+
+    def test_registry_covers_every_stage_column(self):
+        assert list(FEATURE_REGISTRY) == [col for spec in STAGE_SPECS.values() for col in spec]
+        with pytest.raises(ValueError, match="age_group"):
+            build_registry({**STAGE_SPECS, 'again': {'age_group': {'expr': 'age'}}})
+
+    def test_prunes_to_the_requested_columns(self):
+        plan = plan_features(['is_anomaly', 'age_group'])
+        assert plan.steps == ['salary_anomaly', 'score_anomaly', 'age_anomaly',
+                              'is_anomaly', 'age_group']
+        assert plan.inputs == ['salary', 'score', 'age']
+        assert plan.summary()['pruned'] == len(FEATURE_REGISTRY) - 5
+
+    def test_dependencies_come_first(self):
+        plan = plan_features(['is_recent_hire'])
+        assert plan.steps == ['join_date', 'join_year', 'is_recent_hire']
+        assert plan.inputs == ['join_date']
+        assert plan.input_dtypes() == {'join_date': 'category'}
+
+    def test_same_definitions_are_computed_once(self):
+        plan = plan_features(['hire_year', 'join_year', 'senior_pay', 'is_senior'],
+                             build_registry(EXTRA_SPECS))
+        assert plan.shared == {'hire_year': 'join_year', 'over_forty': 'is_senior'}
+        assert plan.steps == ['join_date', 'join_year', 'is_senior', 'senior_pay']
+        assert plan.spec['senior_pay'] == {'expr': 'is_senior * salary'}
+
+    def test_own_name_reads_the_input_column(self):
+        registry = build_registry({'s': {'join_date': {'expr': 'to_datetime(join_date)'},
+                                         'parsed'   : {'expr': 'to_datetime(join_date)'}}})
+        plan = plan_features(['join_date', 'parsed'], registry)
+        assert plan.shared == {}
+        assert plan.steps == ['join_date', 'parsed']
+
+    @pytest.mark.parametrize("features", [['bogus'], []])
+    def test_rejects_unknown_or_no_features(self, features):
+        with pytest.raises(ValueError):
+            plan_features(features)
+
+    def test_rejects_cycles(self):
+        registry = build_registry({'s': {'a': {'expr': 'b + 1'}, 'b': {'expr': 'a + 1'}}})
+        with pytest.raises(ValueError, match="a -> b -> a"):
+            plan_features(['a'], registry)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Computing
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCompute:
+
+    @pytest.mark.parametrize("column", list(FEATURE_REGISTRY))
+    def test_matches_stage_output(self, column):
+        table = compute_features(INPUT, None, [column])
+        if column == 'dept':
+            expected = STAGES["encoded_categorical_features"](pd.read_csv(INPUT), None)
+            expected = expected[[col for col in expected if col.startswith('dept_')]]
+            pd.testing.assert_frame_equal(table.drop(columns='id'), expected)
+        else:
+            assert list(table.columns) == ['id', column]
+            pd.testing.assert_series_equal(table[column], stage_column(column))
+
+    def test_reads_only_the_needed_columns(self, monkeypatch):
+        reads = []
+        read_input = pipeline_io.read_input
+
+        def recording(path, columns=None, dtypes=None, **kwargs):
+            reads.append(columns)
+            return read_input(path, columns=columns, dtypes=dtypes, **kwargs)
+
+        monkeypatch.setattr(pipeline_io, "read_input", recording)
+        table = compute_features(INPUT, None, ['age_group', 'is_anomaly'])
+        assert sorted(reads[0]) == ['age', 'id', 'salary', 'score']
+        assert list(table.columns) == ['id', 'age_group', 'is_anomaly']
+
+    def test_shared_features_keep_their_names(self):
+        registry = build_registry(EXTRA_SPECS)
+        df = pd.read_csv(INPUT)
+        before = df.copy()
+        table = plan_features(['hire_year', 'join_year'], registry).transform(df)
+        assert list(table.columns) == ['id', 'hire_year', 'join_year']
+        assert table['hire_year'].equals(table['join_year'])
+        pd.testing.assert_frame_equal(df, before)
+
+    def test_pipeline_writes_requested_features(self, tmp_path):
+        path = str(tmp_path / "features.csv")
+        run_pipeline(INPUT, feature_table_file=path, features=['is_recent_hire', 'dept'])
+        table = pd.read_csv(path)
+        assert list(table.columns) == ['id', 'is_recent_hire', 'dept_Finance', 'dept_HR',
+                                       'dept_IT']
+
+    @pytest.mark.parametrize("kwargs", [
+        {},
+        {'feature_table_file': 'features.csv', 'groups': ['derived']},
+        {'feature_table_file': 'features.csv', 'bin_codes': True},
+    ])
+    def test_pipeline_rejects_incompatible_options(self, kwargs):
+        with pytest.raises(ValueError):
+            run_pipeline(INPUT, features=['is_anomaly'], **kwargs)
@@ -0,0 +1,106 @@
+"""
+Group 6 - Feature Engineering
+tests/test_feature_spec.py — PyTest test cases for the declarative feature specs
+Run with: pytest tests/test_feature_spec.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import json
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from feature_spec import STAGE_SPECS, compile_expression, compile_spec, load_spec
+from main         import STAGES
+
+# ─── Shared config ────────────────────────────────────────────────────────────
+INPUT = "input/data.csv"
+
+
+class TestStageSpecs:
+
+    @pytest.mark.parametrize("name", list(STAGE_SPECS))
+    def test_spec_reproduces_function(self, name):
+        df = pd.read_csv(INPUT)
+        pd.testing.assert_frame_equal(compile_spec(STAGE_SPECS[name]).transform(df),
+                                      STAGES[name](df, None))
+
+    @pytest.mark.parametrize("name", list(STAGE_SPECS))
+    def test_no_per_row_python_calls(self, name, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("per-row apply called")
+        monkeypatch.setattr(pd.Series, "apply", fail)
+        compile_spec(STAGE_SPECS[name]).transform(pd.read_csv(INPUT))
+
+    def test_input_columns_declared(self):
+        assert compile_spec(STAGE_SPECS["flagged_anomalies"]).inputs == {'salary', 'score', 'age'}
+        assert compile_spec(STAGE_SPECS["time_based_features"]).inputs == {'join_date'}
+
+    def test_input_not_modified(self):
+        df = pd.read_csv(INPUT)
+        before = df.copy()
+        compile_spec(STAGE_SPECS["encoded_categorical_features"]).transform(df)
+        pd.testing.assert_frame_equal(df, before)
+
+
+class TestCompiler:
+
+    def test_cut_matches_pd_cut_on_edges_and_missing(self):
+        values = pd.Series([0, 25, 25.5, 35, 45, 46, 100, 101, np.nan, -3])
+        spec = {'g': {'cut': 'x', 'bins': [0, 25, 35, 45, 100], 'labels': list('abcd')}}
+        got = compile_spec(spec).transform(pd.DataFrame({'x': values}))['g']
+        expected = pd.cut(values, bins=[0, 25, 35, 45, 100], labels=list('abcd'))
+        pd.testing.assert_series_equal(got, expected, check_names=False)
+
+    def test_chained_comparison_and_boolean_ops(self):
+        df = pd.DataFrame({'x': [1, 5, 10], 'y': [0, 1, 0]})
+        spec = {'mid': {'where': '(2 < x <= 10) & ~(y == 1)', 'then': 'yes', 'else': 'no'}}
+        assert list(compile_spec(spec).transform(df)['mid']) == ['no', 'no', 'yes']
+
+    def test_later_entries_use_earlier_columns(self):
+        spec = {'double': {'expr': 'x * 2'}, 'quad': {'expr': 'double * 2'}}
+        out = compile_spec(spec).transform(pd.DataFrame({'x': [1, 2]}))
+        assert list(out['quad']) == [4, 8]
+        assert compile_spec(spec).inputs == {'x'}
+
+    def test_evaluate_on_plain_arrays_matches_transform(self):
+        df = pd.read_csv(INPUT)
+        compiled = compile_spec(STAGE_SPECS["derived_computed_columns"])
+        columns = compiled.evaluate({col: df[col].to_numpy(dtype=float) for col in compiled.inputs})
+        expected = compiled.transform(df)
+        assert list(columns) == list(STAGE_SPECS["derived_computed_columns"])
+        for col, values in columns.items():
+            assert list(values) == list(expected[col]), col
+
+    @pytest.mark.parametrize("expr", ["__import__('os')", "x.real", "x if y else z", "x +"])
+    def test_unsupported_expressions_rejected(self, expr):
+        with pytest.raises(ValueError):
+            compile_expression(expr)
+
+    def test_unknown_operation_rejected(self):
+        with pytest.raises(ValueError):
+            compile_spec({'x': {'bogus': 1}})
+
+    def test_unknown_column_reported(self):
+        with pytest.raises(KeyError, match="missing"):
+            compile_spec({'y': {'expr': 'missing + 1'}}).transform(pd.DataFrame({'x': [1]}))
+
+
+class TestLoadSpec:
+
+    def test_json_spec(self, tmp_path):
+        path = tmp_path / "spec.json"
+        path.write_text(json.dumps(STAGE_SPECS["derived_computed_columns"]))
+        assert load_spec(str(path)) == STAGE_SPECS["derived_computed_columns"]
+
+    def test_yaml_spec(self, tmp_path):
+        yaml = pytest.importorskip("yaml")
+        path = tmp_path / "spec.yaml"
+        path.write_text(yaml.safe_dump(STAGE_SPECS["binned_numeric_ranges"]))
+        df = pd.read_csv(INPUT)
+        pd.testing.assert_frame_equal(compile_spec(load_spec(str(path))).transform(df),
+                                      STAGES["binned_numeric_ranges"](df, None))
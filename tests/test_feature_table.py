@@ -0,0 +1,88 @@
+"""
+Group 6 - Feature Engineering
+tests/test_feature_table.py — PyTest test cases for the consolidated feature table in feature_table.py
+Run with: pytest tests/test_feature_table.py -v
+"""
+
+import pytest
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from feature_table import FEATURE_GROUPS, build_feature_table, write_feature_table
+from main          import run_pipeline, parse_args, shared_input_dtypes
+from pipeline_io   import read_input
+
+INPUT = "input/data.csv"
+
+
+@pytest.fixture(scope="module")
+def df():
+    return read_input(INPUT, dtypes=shared_input_dtypes())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# build_feature_table
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestBuildFeatureTable:
+
+    def test_input_written_once_then_new_columns(self, df):
+        table, columns = build_feature_table(df)
+        assert list(table.columns[:len(df.columns)]) == list(df.columns)
+        assert len(table.columns) == len(set(table.columns))
+        assert sum(len(cols) for cols in columns.values()) == len(table.columns)
+
+    @pytest.mark.parametrize("group", list(FEATURE_GROUPS))
+    def test_group_matches_stage_output(self, df, group):
+        table, columns = build_feature_table(df)
+        expected = FEATURE_GROUPS[group](df, None)
+        pd.testing.assert_frame_equal(table[columns[group]], expected[columns[group]])
+
+    def test_selected_groups_keep_id(self, df):
+        table, columns = build_feature_table(df, ['binned', 'time'])
+        assert list(columns) == ['input', 'binned', 'time']
+        assert columns['input'] == ['id']
+        assert table.columns[0] == 'id'
+
+    def test_unknown_group(self, df):
+        with pytest.raises(ValueError, match="Unknown column groups"):
+            build_feature_table(df, ['nope'])
+
+    def test_input_not_modified(self, df):
+        before = df.copy()
+        build_feature_table(df)
+        pd.testing.assert_frame_equal(df, before)
+
+    def test_write_feature_table(self, df, tmp_path):
+        path = str(tmp_path / "features.csv")
+        table, _ = write_feature_table(df, path)
+        assert list(pd.read_csv(path).columns) == list(table.columns)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# run_pipeline feature table mode
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestFeatureTableMode:
+
+    def test_writes_one_file(self, tmp_path, monkeypatch):
+        input_file = os.path.abspath(INPUT)
+        monkeypatch.chdir(tmp_path)
+        run_pipeline(input_file, feature_table_file="features.csv")
+        assert os.listdir(tmp_path) == ["features.csv"]
+        table = pd.read_csv("features.csv")
+        assert len(table) == 10 and 'is_anomaly' in table.columns
+
+    def test_rejects_chunksize(self, tmp_path):
+        with pytest.raises(ValueError):
+            run_pipeline(INPUT, feature_table_file=str(tmp_path / "f.csv"), chunksize=5)
+
+    def test_parse_args(self):
+        args = parse_args(["--feature-table", "out.parquet", "--groups", "input", "time"])
+        assert (args.feature_table, args.groups) == ("out.parquet", ["input", "time"])
+        with pytest.raises(SystemExit):
+            parse_args(["--groups", "time"])
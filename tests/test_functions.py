@@ -5,7 +5,9 @@ Run with: pytest tests/test_functions.py -v
 """
 
 import pytest
+import numpy as np
 import pandas as pd
+import json
 import os
 import sys
 
@@ -13,10 +15,17 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from derive_computed_columns       import derive_computed_columns
-from encode_categorical_features   import encode_categorical_features
-from bin_numeric_ranges            import bin_numeric_ranges
+from encode_categorical_features   import (
+    SPARSE_ONE_HOT_DTYPE, encode_categorical_features, fit_categorical_encoder, hash_codes,
+    load_encoder, encoded_columns, merge_encoders,
+)
+from bin_numeric_ranges            import (
+    BIN_SPECS, bin_codes, bin_numeric_ranges, fit_bins, label_dictionary, load_bins,
+)
 from time_based_feature_extraction import time_based_feature_extraction
-from flag_anomalies_column         import flag_anomalies_column
+from flag_anomalies_column         import (
+    compute_anomaly_bounds, flag_anomalies_column, iqr_bounds, mad_bounds, zscore_bounds,
+)
 
 # ─── Shared config ────────────────────────────────────────────────────────────
 INPUT  = "input/data.csv"
@@ -84,6 +93,18 @@ class TestDeriveComputedColumns:
     def test_salary_level_valid_values(self, df):
         assert set(df['salary_level'].unique()).issubset({'High', 'Mid', 'Low'})
 
+    def test_salary_level_thresholds(self):
+        df = derive_computed_columns(pd.DataFrame({'age': [30] * 5, 'score': [50] * 5,
+                                                   'salary': [90001, 90000, 55001, 55000, 1]}), None)
+        assert df['salary_level'].tolist() == ['High', 'Mid', 'Mid', 'Low', 'Low']
+        assert df['is_senior'].tolist() == [0] * 5
+
+    def test_no_per_row_python_calls(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("per-row apply called")
+        monkeypatch.setattr(pd.Series, "apply", fail)
+        derive_computed_columns(INPUT, None)
+
     def test_no_null_values_in_derived(self, df):
         new_cols = ['salary_per_age', 'annual_bonus', 'is_senior', 'salary_level', 'score_rank']
         assert df[new_cols].isnull().sum().sum() == 0
@@ -135,6 +156,137 @@ class TestEncodeCategoricalFeatures:
         original = pd.read_csv(INPUT)
         assert len(df) == len(original)
 
+    def test_matches_get_dummies_layout(self, df):
+        expected = pd.get_dummies(pd.read_csv(INPUT), columns=['department'], prefix='dept',
+                                  dtype=int)
+        assert list(df.columns) == list(expected.columns) + ['category_encoded']
+        dept_cols = [col for col in df.columns if col.startswith('dept_')]
+        assert (df[dept_cols].dtypes == np.int64).all()
+        assert df['category_encoded'].dtype == np.int64
+
+    def test_category_codes_do_not_depend_on_batch(self):
+        batch = pd.read_csv(INPUT)
+        batch = batch[batch['category'] != 'A']
+        encoded = encode_categorical_features(batch, None)
+        assert (encoded['category_encoded'] == batch['category'].map({'B': 2, 'C': 3})).all()
+
+    def test_unmapped_category_is_nan(self):
+        batch = pd.read_csv(INPUT).head(3)
+        batch['category'] = ['Z', 'A', 'B']
+        encoded = encode_categorical_features(batch, None)
+        assert encoded['category_encoded'].tolist()[1:] == [1, 2]
+        assert np.isnan(encoded['category_encoded'].iloc[0])
+        assert not any(col.endswith('__unknown') for col in encoded.columns)
+
+
+class TestCategoricalEncoder:
+
+    @pytest.fixture(scope="class")
+    def artifact(self, tmp_path_factory):
+        path = str(tmp_path_factory.mktemp("encoder") / "encoder.json")
+        fit_categorical_encoder(INPUT, path)
+        return path
+
+    def test_artifact_round_trip(self, artifact):
+        assert load_encoder(artifact) == fit_categorical_encoder(INPUT)
+
+    def test_chunked_fit_matches_full_fit(self):
+        assert fit_categorical_encoder(INPUT, chunksize=7) == fit_categorical_encoder(INPUT)
+
+    def test_layout_fixed_across_batches(self, artifact):
+        full = pd.read_csv(INPUT)
+        one_dept = full[full['department'] == full['department'].iloc[0]]
+        encoded = encode_categorical_features(one_dept, None, encoder=artifact)
+        expected = encoded_columns(load_encoder(artifact))
+        assert list(encoded.columns[-len(expected):]) == expected
+
+    def test_unseen_values_go_to_unknown(self, artifact):
+        batch = pd.read_csv(INPUT).head(3)
+        batch['department'] = ['Legal', None, batch['department'].iloc[2]]
+        batch['category'] = ['Z', 'A', 'B']
+        encoded = encode_categorical_features(batch, None, encoder=artifact)
+        assert encoded['dept__unknown'].tolist() == [1, 1, 0]
+        assert encoded['category_encoded'].tolist() == [0, 1, 2]
+
+    def test_refitting_same_data_is_identical(self, artifact):
+        from_artifact = encode_categorical_features(INPUT, None, encoder=artifact)
+        refitted = encode_categorical_features(INPUT, None, encoder=fit_categorical_encoder(INPUT))
+        pd.testing.assert_frame_equal(from_artifact, refitted)
+
+    def test_label_codes_keep_fixed_order(self):
+        batch = pd.read_csv(INPUT)
+        batch = batch[batch['category'] != 'A'].assign(
+            category=lambda d: d['category'].replace({'C': 'D'}))
+        codes = fit_categorical_encoder(batch)['label']['category']
+        assert codes == {'A': 1, 'B': 2, 'C': 3, 'D': 4}
+
+    def test_rejects_unknown_artifact_version(self, tmp_path):
+        path = tmp_path / "encoder.json"
+        path.write_text('{"version": 99, "one_hot": {}, "label": {}}')
+        with pytest.raises(ValueError, match="version"):
+            load_encoder(str(path))
+
+
+class TestHighCardinalityEncoding:
+
+    @pytest.fixture(scope="class")
+    def data(self):
+        return pd.read_csv(INPUT)
+
+    def test_sparse_matches_dense(self, data):
+        dense = encode_categorical_features(data, None)
+        sparse = encode_categorical_features(data, None, sparse=True)
+        one_hot = [col for col in dense if col.startswith('dept_')]
+        assert (sparse[one_hot].dtypes == SPARSE_ONE_HOT_DTYPE).all()
+        pd.testing.assert_frame_equal(sparse.astype({col: dense[col].dtype for col in one_hot}),
+                                      dense)
+
+    def test_hashed_layout(self, data):
+        encoder = fit_categorical_encoder(data, hash_buckets={'department': 8})
+        assert encoder['one_hot'] == {}
+        assert encoder['hash'] == {'department': {'prefix': 'dept', 'buckets': 8}}
+        df = encode_categorical_features(data, None, encoder=encoder)
+        hashed = [f"dept_h{bucket}" for bucket in range(8)] + ['dept__unknown']
+        assert list(df.columns[-10:]) == hashed + ['category_encoded']
+        assert (df[hashed].sum(axis=1) == 1).all()
+
+    def test_hash_buckets_stable_across_dtypes_and_batches(self, data):
+        text = hash_codes(data['department'], 1024)
+        assert (hash_codes(data['department'].astype('category'), 1024) == text).all()
+        assert (hash_codes(data['department'].iloc[::-1], 1024) == text[::-1]).all()
+        assert hash_codes(pd.Series(['HR', None]), 1024)[1] == -1
+
+    def test_hashed_sparse_matches_hashed_dense(self, data):
+        dense = encode_categorical_features(data, None, hash_buckets={'department': 16})
+        sparse = encode_categorical_features(data, None, hash_buckets={'department': 16},
+                                             sparse=True)
+        pd.testing.assert_frame_equal(sparse.astype({col: dense[col].dtype for col in sparse
+                                                     if col.startswith('dept_')}), dense)
+
+    def test_missing_values_go_to_unknown(self, data):
+        batch = data.head(3).copy()
+        batch['department'] = [None, 'HR', 'A brand new cost center']
+        encoder = fit_categorical_encoder(batch, hash_buckets={'department': 4})
+        df = encode_categorical_features(batch, None, encoder=encoder, sparse=True)
+        assert df['dept__unknown'].tolist() == [1, 0, 0]
+        assert df.filter(like='dept_h').sum(axis=1).tolist() == [0, 1, 1]
+        default = encode_categorical_features(batch, None, hash_buckets={'department': 4},
+                                              sparse=True)
+        assert 'dept__unknown' not in default
+        assert default.filter(like='dept_h').sum(axis=1).tolist() == [0, 1, 1]
+
+    def test_hashed_encoders_merge(self, data):
+        parts = [fit_categorical_encoder(part, hash_buckets={'department': 8})
+                 for part in (data.head(4), data.tail(6))]
+        assert merge_encoders(parts) == fit_categorical_encoder(data, hash_buckets={'department': 8})
+        with pytest.raises(ValueError):
+            merge_encoders([parts[0], fit_categorical_encoder(data)])
+
+    @pytest.mark.parametrize("hash_buckets", [{'category': 8}, {'department': 0}])
+    def test_rejects_bad_hash_buckets(self, data, hash_buckets):
+        with pytest.raises(ValueError):
+            fit_categorical_encoder(data, hash_buckets=hash_buckets)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # FUNCTION 3: bin_numeric_ranges
@@ -184,6 +336,83 @@ class TestBinNumericRanges:
         assert len(df) == len(original)
 
 
+class TestBinningEngine:
+
+    QUARTILES = {'salary_quartile': {'column': 'salary', 'quantiles': [0, 0.25, 0.5, 0.75, 1],
+                                     'labels': ['Q1', 'Q2', 'Q3', 'Q4']}}
+
+    @pytest.fixture(scope="class")
+    def data(self):
+        return pd.read_csv(INPUT)
+
+    @pytest.mark.parametrize("right", [True, False])
+    def test_codes_match_pd_cut(self, right):
+        values = np.array([-1, 0, 0.5, 25, 25.5, 45, 99, 100, 101, np.nan])
+        edges = [0, 25, 35, 45, 100]
+        expected = pd.cut(values, edges, right=right, labels=False)
+        codes = bin_codes(values, edges, right)
+        assert codes.dtype == np.int8
+        assert codes.tolist() == pd.Series(expected).fillna(-1).astype(int).tolist()
+
+    def test_include_lowest_bins_first_edge(self):
+        assert bin_codes([0, 10], [0, 5, 10], include_lowest=True).tolist() == [0, 1]
+
+    def test_default_bins_match_pd_cut(self, data):
+        df = bin_numeric_ranges(data, None)
+        for name, spec in BIN_SPECS.items():
+            expected = pd.cut(data[spec['column']], bins=spec['edges'], labels=spec['labels'])
+            pd.testing.assert_series_equal(df[name], expected, check_names=False)
+
+    def test_quantile_edges_learned_at_fit(self, data):
+        bins = fit_bins(data, self.QUARTILES)
+        expected = data['salary'].quantile([0, 0.25, 0.5, 0.75, 1]).tolist()
+        assert bins['bins']['salary_quartile']['edges'] == pytest.approx(expected)
+        df = bin_numeric_ranges(data, None, bins=bins)
+        assert df['salary_quartile'].notna().all()
+
+    def test_chunked_fit_matches_full_fit(self):
+        assert fit_bins(INPUT, self.QUARTILES, chunksize=3) == fit_bins(INPUT, self.QUARTILES)
+
+    def test_codes_and_label_dictionary(self, tmp_path):
+        out = str(tmp_path / "binned.csv")
+        df = bin_numeric_ranges(INPUT, out, codes=True)
+        labels = bin_numeric_ranges(INPUT, None)
+        assert df['age_group'].dtype == np.int8
+        with open(out + ".labels.json") as f:
+            dictionary = json.load(f)
+        decoded = df['score_grade'].map(lambda code: dictionary['score_grade'].get(str(code)))
+        assert decoded.tolist() == labels['score_grade'].astype(object).where(
+            labels['score_grade'].notna(), None).tolist()
+
+    def test_artifact_round_trip(self, data, tmp_path):
+        path = str(tmp_path / "bins.json")
+        bins = fit_bins(data, self.QUARTILES, path)
+        assert load_bins(path) == bins
+        assert label_dictionary(bins) == {'salary_quartile': {0: 'Q1', 1: 'Q2', 2: 'Q3', 3: 'Q4'}}
+
+    @pytest.mark.parametrize("spec", [
+        {'column': 'age', 'edges': [0, 10], 'labels': ['a', 'b']},
+        {'column': 'age', 'labels': ['a']},
+        {'column': 'age', 'edges': [0, 1], 'quantiles': [0, 1], 'labels': ['a']},
+        {'column': 'age', 'edges': [0, 10, 5, 20], 'labels': ['a', 'b', 'c']},
+        {'column': 'age', 'edges': [0, 10, 10], 'labels': ['a', 'b']},
+        {'column': 'age', 'quantiles': [0, 0.5, 0.25, 1], 'labels': ['a', 'b', 'c']},
+    ])
+    def test_rejects_bad_specs(self, spec):
+        with pytest.raises(ValueError, match="'bad'"):
+            fit_bins(pd.DataFrame({'age': [1.0, 2.0]}), {'bad': spec})
+
+    def test_constant_column_rejects_repeated_quantile_edges(self):
+        constant = pd.DataFrame({'salary': [50000.0] * 10})
+        with pytest.raises(ValueError, match="'salary_quartile'.*repeated quantile edges"):
+            fit_bins(constant, self.QUARTILES)
+
+    @pytest.mark.parametrize("edges", [[0, 10, 5, 20], [0, 5, 5, 20], [5]])
+    def test_codes_reject_unsorted_edges(self, edges):
+        with pytest.raises(ValueError, match="strictly increasing"):
+            bin_codes(np.array([1., 5., 9.]), np.array(edges, dtype=float))
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # FUNCTION 4: time_based_feature_extraction
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -213,6 +442,19 @@ class TestTimeBasedFeatureExtraction:
     def test_is_recent_hire_column_exists(self, df):
         assert 'is_recent_hire' in df.columns
 
+    def test_missing_join_date_gives_missing_features(self):
+        batch = pd.read_csv(INPUT).head(3)
+        batch.loc[1, 'join_date'] = None
+        out = time_based_feature_extraction(batch, None)
+        assert out['join_year'].isna().tolist() == [False, True, False]
+        assert out['is_recent_hire'].iloc[1] == 0
+
+    def test_explicit_date_format_matches_detected(self, df):
+        batch = pd.read_csv(INPUT)
+        batch['join_date'] = pd.to_datetime(batch['join_date']).dt.strftime('%d/%m/%Y')
+        out = time_based_feature_extraction(batch, None, date_format='%d/%m/%Y')
+        pd.testing.assert_series_equal(out['join_year'], df['join_year'])
+
     def test_join_year_valid_range(self, df):
         import datetime
         current_year = datetime.datetime.today().year
@@ -285,3 +527,61 @@ class TestFlagAnomaliesColumn:
     def test_row_count_preserved(self, df):
         original = pd.read_csv(INPUT)
         assert len(df) == len(original)
+
+
+class TestAnomalyEngine:
+
+    @pytest.fixture(scope="class")
+    def data(self):
+        return pd.read_csv(INPUT)
+
+    def test_default_bounds_match_per_column_pandas(self, data):
+        bounds = compute_anomaly_bounds(data)
+        assert bounds['salary'] == iqr_bounds(data['salary'].quantile(0.25),
+                                              data['salary'].quantile(0.75))
+        assert bounds['score'] == zscore_bounds(data['score'].mean(), data['score'].std())
+
+    def test_mad_method(self, data):
+        bounds = compute_anomaly_bounds(data, {'salary': 'mad'})
+        median = data['salary'].median()
+        mad = (data['salary'] - median).abs().median()
+        assert bounds['salary'] == pytest.approx(mad_bounds(median, mad))
+
+    def test_configured_columns_only(self, data):
+        df = flag_anomalies_column(data, None, methods={'age': 'zscore', 'score': 'mad'})
+        assert list(df.columns[-3:]) == ['age_anomaly', 'score_anomaly', 'is_anomaly']
+        assert 'salary_anomaly' not in df.columns
+
+    def test_rejects_unknown_method(self, data):
+        with pytest.raises(ValueError):
+            compute_anomaly_bounds(data, {'salary': 'percentile'})
+
+    @pytest.mark.parametrize("by", ['department', ['department', 'category']])
+    def test_per_group_bounds_match_loop_over_groups(self, data, by):
+        methods = {'salary': 'iqr', 'score': 'zscore', 'age': 'mad'}
+        bounds = compute_anomaly_bounds(data, methods, by)
+        for key, group in data.groupby(by):
+            expected = compute_anomaly_bounds(group, methods)
+            for col in methods:
+                low, high = bounds[col]
+                assert (low[key], high[key]) == pytest.approx(expected[col], nan_ok=True)
+
+    def test_per_group_flags(self, data):
+        methods = {'salary': 'iqr'}
+        df = flag_anomalies_column(data, None, methods=methods, by='department')
+        for _, group in data.groupby('department'):
+            expected = flag_anomalies_column(group, None, methods=methods)
+            pd.testing.assert_series_equal(df.loc[group.index, 'salary_anomaly'],
+                                           expected['salary_anomaly'])
+
+    def test_rows_without_group_are_not_flagged(self, data):
+        data = data.copy()
+        data['salary'] = data['salary'].astype(float)
+        data.loc[0, ['department', 'salary']] = [None, 1e12]
+        df = flag_anomalies_column(data, None, methods={'salary': 'iqr'}, by='department')
+        assert df.loc[0, 'is_anomaly'] == 0
+
+    def test_project_keeps_group_column(self, tmp_path):
+        df = flag_anomalies_column(INPUT, None, project=True, methods={'age': 'mad'},
+                                   by='department')
+        assert list(df.columns) == ['id', 'age', 'department', 'age_anomaly', 'is_anomaly']
@@ -0,0 +1,195 @@
+"""
+Group 6 - Feature Engineering
+tests/test_incremental.py — PyTest test cases for incremental runs in incremental.py and main.py
+Run with: pytest tests/test_incremental.py -v
+"""
+
+import pytest
+import pandas as pd
+import json
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from incremental import load_checkpoint, run_incremental
+from main        import OUTPUT_FILES, parse_args, run_pipeline
+
+INPUT = "input/data.csv"
+
+
+@pytest.fixture
+def growing(tmp_path):
+    """The sample input repeated 6 times, as lines, plus a helper that writes the first n rows."""
+    base = pd.read_csv(INPUT)
+    df = pd.concat([base] * 6, ignore_index=True)
+    df['id'] = range(1, len(df) + 1)
+    full = tmp_path / "full.csv"
+    df.to_csv(full, index=False)
+    lines = full.read_text().splitlines(keepends=True)
+    path = tmp_path / "growing.csv"
+
+    def grow(rows, partial=""):
+        path.write_text("".join(lines[:rows + 1]) + partial)
+        return str(path)
+
+    return str(full), grow, tmp_path
+
+
+def _outputs(folder):
+    return {name: str(folder / os.path.basename(path)) for name, path in OUTPUT_FILES.items()}
+
+
+def _run(input_file, outputs, checkpoint, **kwargs):
+    return run_incremental(input_file, outputs, str(checkpoint), **kwargs)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Appending new rows
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestIncrementalRuns:
+
+    def test_recompute_policy_matches_full_run(self, growing):
+        full, grow, tmp = growing
+        expected = _outputs(tmp / "full")
+        run_pipeline(full, expected)
+        outputs, checkpoint = _outputs(tmp / "inc"), tmp / "checkpoint.json"
+        for rows in (13, 14, 41, 60):
+            _run(grow(rows), outputs, checkpoint, anomaly_policy='recompute')
+        for name in OUTPUT_FILES:
+            with open(expected[name], "rb") as a, open(outputs[name], "rb") as b:
+                assert a.read() == b.read(), name
+
+    def test_only_new_rows_are_processed(self, growing):
+        _, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), tmp / "checkpoint.json"
+        assert _run(grow(20), outputs, checkpoint)['rows'] == 20
+        result = _run(grow(35), outputs, checkpoint)
+        assert (result['rows'], result['total_rows']) == (15, 35)
+        assert _run(grow(35), outputs, checkpoint)['rows'] == 0
+        assert pd.read_csv(outputs['derived_computed_columns'])['id'].tolist() == list(range(1, 36))
+
+    def test_keep_policy_leaves_earlier_flags(self, growing):
+        _, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), tmp / "checkpoint.json"
+        _run(grow(10), outputs, checkpoint)
+        first = pd.read_csv(outputs['flagged_anomalies'])
+        result = _run(grow(60), outputs, checkpoint)
+        flagged = pd.read_csv(outputs['flagged_anomalies'])
+        pd.testing.assert_frame_equal(flagged.head(10), first)
+        low, high = result['bounds']['salary']
+        rest = flagged.iloc[10:]
+        expected = ((rest['salary'] < low) | (rest['salary'] > high)).astype(int)
+        assert rest['salary_anomaly'].tolist() == expected.tolist()
+
+    def test_encoder_layout_stays_fixed(self, growing):
+        _, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), tmp / "checkpoint.json"
+        _run(grow(10), outputs, checkpoint)
+        path = grow(10, partial="")
+        with open(path, "a") as f:
+            f.write("11,Zed,40,50000,Legal,2020-01-01,70,A\n")
+        _run(path, outputs, checkpoint)
+        encoded = pd.read_csv(outputs['encoded_categorical_features'])
+        assert 'dept_Legal' not in encoded.columns
+        assert encoded.filter(like='dept_').iloc[-1].sum() == 0
+        _, state = load_checkpoint(str(checkpoint))
+        assert state['encoder']['one_hot']['department']['values'] == ["Finance", "HR", "IT"]
+
+    def test_missing_value_keeps_column_format(self, growing):
+        full, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp / "inc"), tmp / "checkpoint.json"
+        path = grow(20)
+        _run(path, outputs, checkpoint)
+        with open(path, "a") as f:
+            f.write("21,Zed,,50000,IT,2020-01-01,70,A\n22,Amy,41,52000,HR,2021-02-03,80,B\n")
+        _run(path, outputs, checkpoint, anomaly_policy='recompute')
+        expected = _outputs(tmp / "full")
+        run_pipeline(path, expected)
+        for name in OUTPUT_FILES:
+            appended = pd.read_csv(outputs[name], dtype=str, keep_default_na=False)
+            assert not appended['age'].str.contains(".", regex=False).any(), name
+            pd.testing.assert_frame_equal(pd.read_csv(outputs[name]), pd.read_csv(expected[name]),
+                                          obj=name)
+
+    def test_partial_last_line_waits_for_next_run(self, growing):
+        full, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), tmp / "checkpoint.json"
+        line = open(full).read().splitlines(keepends=True)[13]
+        assert _run(grow(12, partial=line[:7]), outputs, checkpoint)['rows'] == 12
+        assert _run(grow(13), outputs, checkpoint)['rows'] == 1
+        assert len(pd.read_csv(outputs['time_based_features'])) == 13
+
+    def test_interrupted_append_is_rolled_back(self, growing):
+        _, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), tmp / "checkpoint.json"
+        _run(grow(10), outputs, checkpoint)
+        with open(outputs['binned_numeric_ranges'], "a") as f:
+            f.write("half,written,row\n")
+        _run(grow(20), outputs, checkpoint)
+        assert pd.read_csv(outputs['binned_numeric_ranges'])['id'].tolist() == list(range(1, 21))
+
+    def test_rewritten_input_is_rejected(self, growing):
+        full, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), tmp / "checkpoint.json"
+        path = grow(10)
+        _run(path, outputs, checkpoint)
+        lines = open(full).read().splitlines(keepends=True)
+        with open(path, "w") as f:
+            f.writelines([lines[0]] + lines[2:13])
+        with pytest.raises(ValueError, match="only grow"):
+            _run(path, outputs, checkpoint)
+
+    def test_checkpoint_contents(self, growing):
+        _, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), tmp / "checkpoint.json"
+        path = grow(12)
+        _run(path, outputs, checkpoint)
+        _run(grow(30), outputs, checkpoint)
+        with open(checkpoint) as f:
+            saved = json.load(f)
+        assert (saved['rows'], saved['offset']) == (30, os.path.getsize(path))
+        assert saved['outputs'] == {name: os.path.getsize(p) for name, p in outputs.items()}
+        # Only the current state is kept
+        assert sorted(p.name for p in tmp.glob("checkpoint.json.*")) == ["checkpoint.json.30.state.pkl"]
+
+    def test_rejects_non_csv_outputs(self, growing):
+        _, grow, tmp = growing
+        outputs = {**_outputs(tmp), 'flagged_anomalies': str(tmp / "flags.parquet")}
+        with pytest.raises(ValueError, match="plain CSV"):
+            _run(grow(5), outputs, tmp / "checkpoint.json")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# main.py options
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestIncrementalPipeline:
+
+    def test_run_pipeline_appends(self, growing, capsys):
+        _, grow, tmp = growing
+        outputs, checkpoint = _outputs(tmp), str(tmp / "checkpoint.json")
+        run_pipeline(grow(20), outputs, checkpoint_file=checkpoint)
+        run_pipeline(grow(25), outputs, checkpoint_file=checkpoint, anomaly_policy='recompute')
+        out = capsys.readouterr().out
+        assert "Appended 5 new rows (rows 21–25)" in out
+        assert "recomputed" in out
+        assert len(pd.read_csv(outputs['flagged_anomalies'])) == 25
+
+    def test_run_pipeline_rejects_chunksize(self, growing):
+        _, grow, tmp = growing
+        with pytest.raises(ValueError):
+            run_pipeline(grow(5), _outputs(tmp), chunksize=2,
+                         checkpoint_file=str(tmp / "checkpoint.json"))
+
+    def test_cli_options(self):
+        args = parse_args(["--incremental", "output/checkpoint.json", "--anomaly-policy", "recompute"])
+        assert (args.incremental, args.anomaly_policy) == ("output/checkpoint.json", "recompute")
+        assert parse_args([]).anomaly_policy == "keep"
+        for argv in (["--incremental", "c.json", "--chunksize", "5"],
+                     ["--incremental", "c.json", "--format", "parquet"],
+                     ["--anomaly-policy", "sometimes"]):
+            with pytest.raises(SystemExit):
+                parse_args(argv)
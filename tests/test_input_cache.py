@@ -0,0 +1,156 @@
+"""
+Group 6 - Feature Engineering
+tests/test_input_cache.py — PyTest test cases for the memory-mapped input sidecar in input_cache.py
+Run with: pytest tests/test_input_cache.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import json
+import os
+import shutil
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from input_cache import MANIFEST_FILE, load_sidecar, sidecar_is_current, sidecar_path, write_sidecar
+from main        import run_pipeline, shared_input_dtypes, OUTPUT_FILES
+from pipeline_io import read_input, sidecar_reads
+
+INPUT = "input/data.csv"
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "data.csv")
+    shutil.copy(INPUT, path)
+    return path
+
+
+def parse(path):
+    return read_input(path, dtypes=shared_input_dtypes())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Sidecar files
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSidecar:
+
+    def test_round_trip_matches_parse(self, source):
+        parsed = parse(source)
+        assert write_sidecar(parsed, source)
+        pd.testing.assert_frame_equal(load_sidecar(source), parsed)
+
+    def test_numeric_columns_are_memory_mapped(self, source):
+        write_sidecar(parse(source), source)
+        salary = load_sidecar(source)['salary'].to_numpy()
+        assert not salary.flags.writeable
+        while not isinstance(salary, np.memmap) and salary.base is not None:
+            salary = salary.base
+        assert isinstance(salary, np.memmap)
+
+    def test_projection(self, source):
+        write_sidecar(parse(source), source)
+        assert list(load_sidecar(source, ['salary', 'id']).columns) == ['id', 'salary']
+
+    def test_missing_values(self, tmp_path):
+        path = str(tmp_path / "gaps.csv")
+        pd.DataFrame({'id': [1, 2, 3], 'name': ['a', None, 'c'],
+                      'score': [1.5, None, 2.0]}).to_csv(path, index=False)
+        parsed = read_input(path)
+        write_sidecar(parsed, path)
+        pd.testing.assert_frame_equal(load_sidecar(path), parsed)
+
+    def test_manifest_holds_no_values(self, source):
+        write_sidecar(parse(source), source)
+        with open(os.path.join(sidecar_path(source), MANIFEST_FILE)) as f:
+            text = f.read()
+        assert "Alice" not in text
+        assert set(json.loads(text)) == {'version', 'source', 'rows', 'columns'}
+
+    def test_category_round_trip(self, tmp_path):
+        path = str(tmp_path / "cats.csv")
+        pd.DataFrame({'dept': ['IT', 'HR', 'IT']}).to_csv(path, index=False)
+        parsed = read_input(path, dtypes={'dept': 'category'})
+        write_sidecar(parsed, path)
+        pd.testing.assert_frame_equal(load_sidecar(path), parsed)
+
+    def test_no_sidecar(self, source):
+        assert load_sidecar(source) is None
+
+    def test_changed_contents_invalidate(self, source):
+        write_sidecar(parse(source), source)
+        with open(source, "a") as f:
+            f.write("11,Kim,30,60000,IT,2020-01-01,70,A\n")
+        assert load_sidecar(source) is None
+
+    def test_touched_file_with_same_contents_is_reused(self, source):
+        write_sidecar(parse(source), source)
+        folder = sidecar_path(source)
+        files = sorted(os.listdir(folder))
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_sidecar(source) is not None
+        assert sidecar_is_current(source)
+        assert sorted(os.listdir(folder)) == files  # no temporary files left behind
+
+    def test_touched_manifest_is_replaced_not_rewritten(self, source):
+        write_sidecar(parse(source), source)
+        manifest_file = os.path.join(sidecar_path(source), MANIFEST_FILE)
+        inode = os.stat(manifest_file).st_ino
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert sidecar_is_current(source)
+        assert os.stat(manifest_file).st_ino != inode
+
+    def test_same_size_new_contents_invalidate(self, source):
+        write_sidecar(parse(source), source)
+        text = open(source).read()
+        stat = os.stat(source)
+        with open(source, "w") as f:
+            f.write(text.replace("Alice", "Alina"))
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_sidecar(source) is None
+
+    def test_verify_hash_catches_same_size_and_mtime(self, source):
+        write_sidecar(parse(source), source)
+        text = open(source).read()
+        stat = os.stat(source)
+        with open(source, "w") as f:
+            f.write(text.replace("Alice", "Alina"))
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert load_sidecar(source) is not None  # size and mtime alone are fooled
+        assert load_sidecar(source, verify_hash=True) is None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Reads and pipeline runs through the sidecar
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSidecarReads:
+
+    def test_first_read_writes_sidecar_then_maps_it(self, source, monkeypatch):
+        with sidecar_reads():
+            first = parse(source)
+            assert os.path.isdir(sidecar_path(source))
+            monkeypatch.setattr(pd, "read_csv", lambda *a, **k: pytest.fail("CSV was parsed"))
+            pd.testing.assert_frame_equal(parse(source), first)
+
+    def test_disabled_by_default(self, source):
+        parse(source)
+        assert not os.path.exists(sidecar_path(source))
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_pipeline_outputs_unchanged(self, source, tmp_path, jobs):
+        outputs = {name: str(tmp_path / "plain" / os.path.basename(path))
+                   for name, path in OUTPUT_FILES.items()}
+        cached = {name: str(tmp_path / "cached" / os.path.basename(path))
+                  for name, path in OUTPUT_FILES.items()}
+        run_pipeline(source, outputs)
+        run_pipeline(source, cached, input_cache=True)               # writes the sidecar
+        run_pipeline(source, cached, jobs=jobs, input_cache=True)    # maps it
+        for name in OUTPUT_FILES:
+            assert open(outputs[name], "rb").read() == open(cached[name], "rb").read()
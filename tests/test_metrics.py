@@ -0,0 +1,141 @@
+"""
+Group 6 - Feature Engineering
+tests/test_metrics.py — PyTest test cases for the stage metrics and profiler hooks in metrics.py
+Run with: pytest tests/test_metrics.py -v
+"""
+
+import pytest
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metrics as metrics_module
+from metrics     import (
+    measure_stage, peak_rss_bytes, phase, register_profiler, write_metrics, PROFILERS,
+)
+from pipeline_io import load_input, save_output
+
+INPUT = "input/data.csv"
+
+
+@pytest.fixture
+def tracing():
+    """Traces allocations for one test, unless something already traces them."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    yield
+    if started:
+        tracemalloc.stop()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Phases and records
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestMeasureStage:
+
+    def test_read_compute_write_split(self, tmp_path):
+        with measure_stage("stage") as metrics:
+            df = load_input(INPUT)
+            time.sleep(0.02)
+            save_output(df, str(tmp_path / "out.csv"), "stage")
+        record = metrics.as_record()
+        assert record['read_s'] > 0 and record['write_s'] > 0
+        assert record['compute_s'] >= 0.02
+        assert record['total_s'] == pytest.approx(
+            record['read_s'] + record['compute_s'] + record['write_s'], abs=1e-5)
+
+    def test_process_peak_rss(self):
+        with measure_stage("stage") as metrics:
+            load_input(INPUT)
+        assert metrics.as_record()['process_peak_rss_bytes'] == peak_rss_bytes() > 0
+
+    def test_peak_rss_without_resource_module(self, monkeypatch):
+        monkeypatch.setattr(metrics_module, "resource", None)
+        with measure_stage("stage") as metrics:
+            load_input(INPUT)
+        assert metrics.as_record()['process_peak_rss_bytes'] is None
+
+    def test_peak_alloc_is_per_stage(self, tracing):
+        with measure_stage("big") as big:
+            block = np.ones(8 * 1024 ** 2, dtype=np.int8)
+            del block
+        with measure_stage("small") as small:
+            block = np.ones(1024, dtype=np.int8)
+        assert big.peak_alloc_bytes >= 8 * 1024 ** 2
+        assert small.peak_alloc_bytes < 1024 ** 2
+
+    def test_peak_alloc_of_outer_stage_covers_nested_stages(self, tracing):
+        with measure_stage("outer") as outer:
+            with measure_stage("inner") as inner:
+                block = np.ones(8 * 1024 ** 2, dtype=np.int8)
+                del block
+        assert inner.peak_alloc_bytes >= 8 * 1024 ** 2
+        assert outer.peak_alloc_bytes >= inner.peak_alloc_bytes
+
+    def test_peak_alloc_needs_tracing(self):
+        if tracemalloc.is_tracing():
+            pytest.skip("tracemalloc is already tracing")
+        with measure_stage("stage") as metrics:
+            load_input(INPUT)
+        assert metrics.as_record()['peak_alloc_bytes'] is None
+
+    def test_phase_outside_a_stage_is_a_no_op(self):
+        with phase('read'):
+            pass
+
+    def test_nested_measurement_is_separate(self):
+        with measure_stage("outer") as outer:
+            with measure_stage("inner") as inner:
+                load_input(INPUT)
+        assert inner.phases['read'] > 0
+        assert outer.phases['read'] == 0
+
+    def test_write_metrics_appends_json_lines(self, tmp_path):
+        path = str(tmp_path / "metrics.jsonl")
+        write_metrics([{'event': 'stage', 'stage': 'a'}], path)
+        write_metrics([{'event': 'stage', 'stage': 'b'}], path)
+        lines = [json.loads(line) for line in open(path)]
+        assert [line['stage'] for line in lines] == ['a', 'b']
+        assert all('timestamp' in line for line in lines)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Profiler hooks
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestProfilers:
+
+    @pytest.mark.parametrize("profiler", ["cprofile", "tracemalloc"])
+    def test_profiler_writes_report(self, profiler, tmp_path):
+        with measure_stage("stage", profiler, str(tmp_path)) as metrics:
+            load_input(INPUT)
+        assert os.path.exists(metrics.extra['profile'])
+        if profiler == "tracemalloc":
+            assert metrics.extra['tracemalloc_peak_bytes'] > 0
+
+    def test_custom_profiler(self, monkeypatch, tmp_path):
+        @contextlib.contextmanager
+        def hook(metrics, profile_dir):
+            yield
+            metrics.extra['custom'] = True
+
+        monkeypatch.setitem(PROFILERS, "custom", None)
+        register_profiler("custom", hook)
+        with measure_stage("stage", "custom", str(tmp_path)) as metrics:
+            pass
+        assert metrics.as_record()['custom'] is True
+
+    def test_unknown_profiler(self):
+        with pytest.raises(ValueError):
+            with measure_stage("stage", "nope"):
+                pass
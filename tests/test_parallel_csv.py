@@ -0,0 +1,168 @@
+"""
+Group 6 - Feature Engineering
+tests/test_parallel_csv.py — PyTest test cases for the parallel CSV writer in parallel_csv.py
+Run with: pytest tests/test_parallel_csv.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import bz2
+import gzip
+import lzma
+import os
+import sys
+import zlib
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pipeline_io
+from parallel_csv import prepare_frame, write_csv_parallel
+from pipeline_io  import csv_write_jobs, write_frame
+from main         import OUTPUT_FILES, run_pipeline
+
+INPUT = "input/data.csv"
+
+OPENERS = {".csv": open, ".csv.gz": gzip.open, ".csv.bz2": bz2.open, ".csv.xz": lzma.open}
+
+
+@pytest.fixture(scope="module")
+def frame():
+    """Every dtype the stages write, including the ones to_csv lays out per column."""
+    n = 23
+    times = pd.Series(pd.date_range("2021-01-01", periods=n, freq="7h"))
+    times[3] = pd.NaT
+    return pd.DataFrame({
+        'id'      : range(n),
+        'value'   : np.linspace(0, 1e6, n) / 7,
+        'missing' : [np.nan if i % 4 == 0 else i / 3 for i in range(n)],
+        'text'    : [['a,b', 'say "hi"', 'two\nlines', None, 'plain', ''][i % 6] for i in range(n)],
+        'dept'    : pd.Categorical([['HR', 'IT', None][i % 3] for i in range(n)]),
+        'count'   : pd.array([None if i % 5 == 0 else i for i in range(n)], dtype='Int64'),
+        'flag'    : [i % 2 == 0 for i in range(n)],
+        'code'    : np.arange(n, dtype='int8') % 4 - 1,
+        'date'    : pd.date_range("2020-01-01", periods=n, freq="D"),
+        'moment'  : times,
+        'tenure'  : pd.to_timedelta(np.arange(n), unit="h"),
+        'moments' : pd.Categorical(times.dt.floor("D") + pd.Timedelta(hours=6)),
+    })
+
+
+def _decoded(path, suffix):
+    with OPENERS[suffix](path, "rb") as f:
+        return f.read()
+
+
+def _gzip_members(path):
+    data, members = open(path, "rb").read(), 0
+    while data:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        decompressor.decompress(data)
+        data, members = decompressor.unused_data, members + 1
+    return members
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Writing blocks
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestWriteCsvParallel:
+
+    @pytest.mark.parametrize("suffix", list(OPENERS))
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_decodes_to_to_csv_bytes(self, frame, tmp_path, suffix, jobs):
+        path = str(tmp_path / f"out{suffix}")
+        write_csv_parallel(frame, path, jobs=jobs, block_rows=5)
+        assert _decoded(path, suffix) == frame.to_csv(index=False).encode()
+
+    def test_one_gzip_member_per_block(self, frame, tmp_path):
+        path = str(tmp_path / "out.csv.gz")
+        assert write_csv_parallel(frame, path, jobs=2, block_rows=5) == 5
+        assert _gzip_members(path) == 5
+        assert len(pd.read_csv(path)) == len(frame)
+
+    def test_columns_formatted_per_column(self, frame):
+        prepared = prepare_frame(frame)
+        changed = [col for col in frame if prepared[col].dtype != frame[col].dtype]
+        assert changed == ['moment', 'tenure', 'moments']
+        plain = frame[['id', 'date']]
+        assert prepare_frame(plain) is plain
+        assert prepare_frame(frame[['moment']])['moment'].tolist()[3] == ""
+
+    @pytest.mark.parametrize("columns", [['moment'], ['text'], ['id']])
+    def test_single_column_and_empty_frames(self, frame, tmp_path, columns):
+        for df in (frame[columns], frame[columns].iloc[:0]):
+            path = str(tmp_path / "out.csv")
+            write_csv_parallel(df, path, jobs=2, block_rows=4)
+            assert open(path, "rb").read() == df.to_csv(index=False).encode()
+
+    def test_explicit_compression_and_level(self, frame, tmp_path):
+        path = str(tmp_path / "out.csv")
+        write_csv_parallel(frame, path, jobs=1, compression="gzip", level=1)
+        assert gzip.open(path).read() == frame.to_csv(index=False).encode()
+
+    @pytest.mark.parametrize("kwargs", [{'compression': 'zip'}, {'block_rows': 0}])
+    def test_rejects_unsupported_options(self, frame, tmp_path, kwargs):
+        with pytest.raises(ValueError):
+            write_csv_parallel(frame, str(tmp_path / "out.csv"), **kwargs)
+
+    def test_zstd_is_one_multithreaded_frame(self, frame, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        path = str(tmp_path / "out.csv.zst")
+        write_csv_parallel(frame, path, jobs=2, block_rows=5)
+        with zstandard.open(path, "rb") as f:
+            assert f.read() == frame.to_csv(index=False).encode()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# pipeline_io and main.py
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestPipelineWrites:
+
+    @pytest.fixture
+    def small_threshold(self, monkeypatch):
+        """Sends every CSV write through the parallel writer, recording the paths."""
+        written = []
+
+        def recording(df, output_file, *args, **kwargs):
+            written.append(output_file)
+            return write_csv_parallel(df, output_file, *args, block_rows=3, **kwargs)
+
+        monkeypatch.setattr(pipeline_io, "PARALLEL_MIN_ROWS", 1)
+        monkeypatch.setattr(pipeline_io, "write_csv_parallel", recording)
+        return written
+
+    def test_write_frame_uses_parallel_writer(self, frame, tmp_path, small_threshold):
+        path = str(tmp_path / "out.csv.gz")
+        write_frame(frame, path)
+        assert small_threshold == []
+        with csv_write_jobs(2):
+            write_frame(frame, path)
+        assert small_threshold == [path]
+        assert pipeline_io._CSV_WRITE_JOBS['jobs'] == 1
+        assert gzip.open(path).read() == frame.to_csv(index=False).encode()
+
+    def test_unsupported_codec_falls_back(self, frame, tmp_path, small_threshold):
+        path = str(tmp_path / "out.csv.zip")
+        with csv_write_jobs(2):
+            write_frame(frame, path)
+        assert small_threshold == []
+        assert len(pd.read_csv(path)) == len(frame)
+
+    def test_pipeline_outputs_unchanged(self, tmp_path, small_threshold):
+        expected = {name: str(tmp_path / "one" / os.path.basename(path))
+                    for name, path in OUTPUT_FILES.items()}
+        outputs = {name: str(tmp_path / "many" / os.path.basename(path))
+                   for name, path in OUTPUT_FILES.items()}
+        run_pipeline(INPUT, expected)
+        run_pipeline(INPUT, outputs, write_jobs=2)
+        assert sorted(small_threshold) == sorted(outputs.values())
+        for name in OUTPUT_FILES:
+            assert open(outputs[name], "rb").read() == open(expected[name], "rb").read()
+
+    def test_rejects_non_positive_jobs(self):
+        with pytest.raises(ValueError):
+            with csv_write_jobs(0):
+                pass
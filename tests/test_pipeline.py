@@ -0,0 +1,437 @@
+"""
+Group 6 - Feature Engineering
+tests/test_pipeline.py — PyTest test cases for main.run_pipeline and shared I/O
+Run with: pytest tests/test_pipeline.py -v
+"""
+
+import pytest
+import pandas as pd
+import json
+import os
+import subprocess
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main        import (
+    main, run_pipeline, parse_args, print_memory_report, stage_inputs, STAGES, OUTPUT_FILES,
+)
+from pipeline_io import SPARSE_SUFFIX, read_input, read_sparse_columns, with_format
+from stage_cache import StageCache
+import time_based_feature_extraction
+
+# ─── Shared config ────────────────────────────────────────────────────────────
+INPUT = "input/data.csv"
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Seconds `import main` plus argument parsing may take in a fresh interpreter
+# (about 0.07s here; importing pandas alone takes longer than the budget)
+STARTUP_BUDGET_S = 0.3
+
+
+@pytest.fixture
+def tmp_outputs(tmp_path):
+    """Output paths for every stage, redirected into a temporary folder."""
+    return {name: str(tmp_path / os.path.basename(path)) for name, path in OUTPUT_FILES.items()}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# In-memory input shared across stages
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestInMemoryStages:
+
+    @pytest.mark.parametrize("name", list(STAGES))
+    def test_dataframe_input_matches_file_input(self, name, tmp_path):
+        module = sys.modules[STAGES[name].__module__]
+        from_file = STAGES[name](INPUT, str(tmp_path / "out.csv"))
+        from_frame = STAGES[name](read_input(INPUT, dtypes=module.INPUT_DTYPES), None)
+        pd.testing.assert_frame_equal(from_frame, from_file)
+
+    @pytest.mark.parametrize("name", list(STAGES))
+    def test_shared_input_not_modified(self, name):
+        shared = pd.read_csv(INPUT)
+        before = shared.copy()
+        STAGES[name](shared, None)
+        pd.testing.assert_frame_equal(shared, before)
+
+    @pytest.mark.parametrize("name", list(STAGES))
+    def test_none_output_skips_write(self, name, tmp_path, monkeypatch, capsys):
+        shared = pd.read_csv(INPUT)
+        monkeypatch.chdir(tmp_path)
+        STAGES[name](shared, None)
+        assert os.listdir(tmp_path) == []
+        assert "Saved to" not in capsys.readouterr().out
+
+
+    @pytest.mark.parametrize("name", list(STAGES))
+    def test_projected_run_keeps_key_used_and_new_columns(self, name):
+        columns, _ = stage_inputs(name)
+        full = STAGES[name](INPUT, None)
+        projected = STAGES[name](INPUT, None, project=True)
+        dropped = set(pd.read_csv(INPUT).columns) - set(columns) - {'id'}
+        assert 'id' in projected.columns
+        assert not dropped & set(projected.columns)
+        pd.testing.assert_frame_equal(projected, full[list(projected.columns)])
+
+
+class TestRunPipeline:
+
+    def test_all_outputs_written(self, tmp_outputs):
+        run_pipeline(INPUT, tmp_outputs)
+        for path in tmp_outputs.values():
+            assert os.path.exists(path)
+
+    def test_input_parsed_once(self, tmp_outputs, monkeypatch):
+        calls = []
+        real_read_csv = pd.read_csv
+
+        def counting_read_csv(*args, **kwargs):
+            calls.append(args)
+            return real_read_csv(*args, **kwargs)
+
+        monkeypatch.setattr(pd, "read_csv", counting_read_csv)
+        run_pipeline(INPUT, tmp_outputs)
+        assert len(calls) == 1
+
+    def test_reports_parse_savings(self, tmp_outputs, capsys):
+        run_pipeline(INPUT, tmp_outputs)
+        out = capsys.readouterr().out
+        assert "parsed once" in out
+        assert "duplicate copies avoided" in out
+
+    @pytest.mark.parametrize("overlap", [False, True])
+    def test_chunked_run_matches_in_memory_run(self, tmp_outputs, tmp_path, overlap):
+        run_pipeline(INPUT, tmp_outputs)
+        chunked = {name: path + ".chunked" for name, path in tmp_outputs.items()}
+        run_pipeline(INPUT, chunked, chunksize=3, overlap=overlap)
+        for name in tmp_outputs:
+            with open(tmp_outputs[name], "rb") as a, open(chunked[name], "rb") as b:
+                assert a.read() == b.read()
+
+    def test_anomaly_options_reach_the_stage(self, tmp_outputs):
+        run_pipeline(INPUT, tmp_outputs, anomaly_methods={'age': 'mad'}, anomaly_by=['department'])
+        flagged = pd.read_csv(tmp_outputs['flagged_anomalies'])
+        assert list(flagged.columns[-2:]) == ['age_anomaly', 'is_anomaly']
+        with pytest.raises(ValueError):
+            run_pipeline(INPUT, tmp_outputs, chunksize=5, anomaly_by=['department'])
+
+    @pytest.mark.parametrize("chunksize", [None, 4])
+    def test_bin_options_reach_the_stage(self, tmp_outputs, tmp_path, chunksize):
+        spec = tmp_path / "bin_spec.json"
+        spec.write_text(json.dumps({'age_half': {'column': 'age', 'quantiles': [0, 0.5, 1],
+                                                 'labels': ['low', 'high']}}))
+        bins_file = str(tmp_path / "bins.json")
+        run_pipeline(INPUT, tmp_outputs, chunksize=chunksize, bins_file=bins_file,
+                     bin_spec=str(spec), bin_codes=True)
+        binned = pd.read_csv(tmp_outputs['binned_numeric_ranges'])
+        assert binned['age_half'].isin([0, 1]).all()
+        assert 'age_group' not in binned.columns
+        with open(tmp_outputs['binned_numeric_ranges'] + ".labels.json") as f:
+            assert json.load(f) == {'age_half': {'0': 'low', '1': 'high'}}
+        with open(bins_file) as f:
+            assert json.load(f)['bins']['age_half']['edges'][1] == pd.read_csv(INPUT)['age'].median()
+
+    def test_parallel_run_matches_sequential_run(self, tmp_outputs):
+        run_pipeline(INPUT, tmp_outputs)
+        parallel = {name: path + ".parallel" for name, path in tmp_outputs.items()}
+        run_pipeline(INPUT, parallel, jobs=3)
+        for name in tmp_outputs:
+            with open(tmp_outputs[name], "rb") as a, open(parallel[name], "rb") as b:
+                assert a.read() == b.read()
+
+    def test_parallel_console_output_in_stage_order(self, tmp_outputs, capsys):
+        run_pipeline(INPUT, tmp_outputs, jobs=5)
+        out = capsys.readouterr().out
+        positions = [out.index(f"[{stage.__name__}]") for stage in STAGES.values()]
+        assert positions == sorted(positions)
+        assert "workers" in out
+
+    def test_parallel_chunked_run(self, tmp_outputs):
+        run_pipeline(INPUT, tmp_outputs, chunksize=4, jobs=2)
+        for path in tmp_outputs.values():
+            assert len(pd.read_csv(path)) == len(pd.read_csv(INPUT))
+
+    @pytest.mark.parametrize("chunksize", [None, 4])
+    def test_parquet_outputs_keep_dtypes(self, tmp_outputs, chunksize):
+        pytest.importorskip("pyarrow")
+        outputs = {name: with_format(path, "parquet") for name, path in tmp_outputs.items()}
+        run_pipeline(INPUT, outputs, chunksize=chunksize, compression="zstd")
+        binned = pd.read_parquet(outputs["binned_numeric_ranges"])
+        timed = pd.read_parquet(outputs["time_based_features"])
+        assert isinstance(binned['age_group'].dtype, pd.CategoricalDtype)
+        assert pd.api.types.is_datetime64_any_dtype(timed['join_date'])
+
+    def test_memory_report(self, capsys):
+        print_memory_report(INPUT)
+        out = capsys.readouterr().out
+        for name in STAGES:
+            assert name in out
+
+    def test_encoder_artifact_fitted_then_reused(self, tmp_outputs, tmp_path, capsys):
+        encoder = str(tmp_path / "encoder.json")
+        run_pipeline(INPUT, tmp_outputs, encoder_file=encoder)
+        assert "fitted on this input" in capsys.readouterr().out
+        first = pd.read_csv(tmp_outputs["encoded_categorical_features"])
+        run_pipeline(INPUT, tmp_outputs, jobs=2, encoder_file=encoder)
+        assert "(reused)" in capsys.readouterr().out
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_outputs["encoded_categorical_features"]), first)
+
+    def test_hashed_sparse_encoding(self, tmp_outputs, tmp_path, capsys):
+        encoded = tmp_outputs["encoded_categorical_features"]
+        run_pipeline(INPUT, tmp_outputs)
+        dense = pd.read_csv(encoded)
+        cache = StageCache(str(tmp_path / "cache"))
+        run_pipeline(INPUT, tmp_outputs, cache=cache, sparse_one_hot=True,
+                     stages=["encoded_categorical_features"])
+        sparse = read_sparse_columns(encoded + SPARSE_SUFFIX)
+        assert sparse.drop(columns='id').astype('int64').equals(dense.filter(like='dept_'))
+        assert not pd.read_csv(encoded).columns.str.startswith('dept_').any()
+
+        os.remove(encoded + SPARSE_SUFFIX)
+        run_pipeline(INPUT, tmp_outputs, cache=cache, sparse_one_hot=True,
+                     stages=["encoded_categorical_features"])
+        assert "1 of 1 outputs served" in capsys.readouterr().out
+        pd.testing.assert_frame_equal(read_sparse_columns(encoded + SPARSE_SUFFIX), sparse)
+
+        encoder = str(tmp_path / "encoder.json")
+        run_pipeline(INPUT, tmp_outputs, encoder_file=encoder, hash_buckets={'department': 4})
+        hashed = pd.read_csv(encoded).filter(like='dept_')
+        assert list(hashed) == ['dept_h0', 'dept_h1', 'dept_h2', 'dept_h3', 'dept__unknown']
+        with pytest.raises(ValueError, match="hash"):
+            run_pipeline(INPUT, tmp_outputs, encoder_file=encoder, hash_buckets={'department': 8})
+
+    def test_window_options_reach_the_time_stage(self, tmp_outputs, tmp_path):
+        run_pipeline(INPUT, tmp_outputs, stages=["time_based_features"], windows=[90, 365],
+                     window_by=['department'], window_means=['salary'])
+        df = pd.read_csv(tmp_outputs["time_based_features"])
+        assert list(df.columns[-5:]) == ['hires_90d', 'salary_mean_90d', 'hires_365d',
+                                         'salary_mean_365d', 'join_month_rank']
+        with pytest.raises(ValueError, match="sorted"):
+            run_pipeline(INPUT, tmp_outputs, chunksize=4, windows=[90])
+        with pytest.raises(ValueError):
+            run_pipeline(INPUT, tmp_outputs, window_by=['department'])
+
+    def test_unchanged_stages_served_from_cache(self, tmp_outputs, tmp_path, monkeypatch, capsys):
+        cache = StageCache(str(tmp_path / "cache"))
+        run_pipeline(INPUT, tmp_outputs, cache=cache)
+        first = {name: open(path, "rb").read() for name, path in tmp_outputs.items()}
+        for path in tmp_outputs.values():
+            os.remove(path)
+
+        monkeypatch.setattr(pd, "read_csv", lambda *a, **k: pytest.fail("input was parsed"))
+        run_pipeline(INPUT, tmp_outputs, cache=cache)
+        assert "5 of 5 outputs served" in capsys.readouterr().out
+        assert {name: open(path, "rb").read() for name, path in tmp_outputs.items()} == first
+
+    def test_new_day_recomputes_time_stage(self, tmp_outputs, tmp_path, monkeypatch, capsys):
+        cache = StageCache(str(tmp_path / "cache"))
+        run_pipeline(INPUT, tmp_outputs, cache=cache)
+        capsys.readouterr()
+        monkeypatch.setattr(time_based_feature_extraction, "_today",
+                            lambda: pd.Timestamp("2040-01-01"))
+        run_pipeline(INPUT, tmp_outputs, cache=cache)
+        out = capsys.readouterr().out
+        assert "4 of 5 outputs served" in out
+        assert "[time_based_feature_extraction] ✅ Saved" in out
+
+    def test_force_recomputes(self, tmp_outputs, tmp_path, capsys):
+        cache = StageCache(str(tmp_path / "cache"))
+        run_pipeline(INPUT, tmp_outputs, cache=cache)
+        run_pipeline(INPUT, tmp_outputs, cache=cache, force=True)
+        assert "0 of 5 outputs served" in capsys.readouterr().out.split("Pipeline complete")[-1]
+
+    @pytest.mark.parametrize("jobs, chunksize", [(1, None), (2, 4)])
+    def test_metrics_file(self, tmp_outputs, tmp_path, jobs, chunksize):
+        metrics_file = str(tmp_path / "metrics.jsonl")
+        run_pipeline(INPUT, tmp_outputs, jobs=jobs, chunksize=chunksize,
+                     metrics_file=metrics_file, profile="time_based_features",
+                     profile_dir=str(tmp_path / "profiles"))
+        records = [json.loads(line) for line in open(metrics_file)]
+        stages = [r for r in records if r['event'] == 'stage']
+        assert [r['output'] for r in stages] == list(STAGES)
+        for record in stages:
+            assert record['rows'] == 10
+            assert record['bytes_written'] == os.path.getsize(tmp_outputs[record['output']])
+            assert {'read_s', 'compute_s', 'write_s', 'peak_alloc_bytes',
+                    'process_peak_rss_bytes'} <= set(record)
+        assert os.path.exists(stages[3]['profile'])
+        assert records[-1]['event'] == 'pipeline'
+
+    def test_selected_stages_only(self, tmp_outputs, tmp_path, capsys):
+        expected = {name: str(tmp_path / "all" / os.path.basename(path))
+                    for name, path in tmp_outputs.items()}
+        run_pipeline(INPUT, expected)
+        selected = ["time_based_features", "derived_computed_columns"]
+        cache = StageCache(str(tmp_path / "cache"))
+        run_pipeline(INPUT, tmp_outputs, cache=cache, stages=selected)
+        assert sorted(os.listdir(tmp_path)) == sorted(
+            ["all", "cache", "derived_computed_columns.csv", "time_based_features.csv"])
+        for name in selected:
+            assert open(tmp_outputs[name], "rb").read() == open(expected[name], "rb").read()
+        run_pipeline(INPUT, tmp_outputs, cache=cache, stages=selected)
+        assert "2 of 2 outputs served" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("kwargs", [{'stages': ["nope"]}, {'stages': []},
+                                        {'stages': ["flagged_anomalies"],
+                                         'feature_table_file': "t.csv"}])
+    def test_rejects_bad_stage_selection(self, tmp_outputs, kwargs):
+        with pytest.raises(ValueError):
+            run_pipeline(INPUT, tmp_outputs, **kwargs)
+
+    def test_missing_input_exits(self, tmp_outputs):
+        with pytest.raises(SystemExit):
+            run_pipeline("input/does_not_exist.csv", tmp_outputs)
+
+
+class TestParseArgs:
+
+    def test_defaults(self):
+        args = parse_args([])
+        assert args.jobs == 1
+        assert args.chunksize is None
+
+    def test_jobs_and_chunksize(self):
+        args = parse_args(["--jobs", "4", "--chunksize", "1000"])
+        assert (args.jobs, args.chunksize) == (4, 1000)
+
+    def test_cache_options(self):
+        args = parse_args(["--force", "--cache-dir", "c", "--cache-size", "8"])
+        assert (args.force, args.no_cache, args.cache_dir, args.cache_size) == (True, False, "c", 8)
+
+    def test_anomaly_options(self):
+        args = parse_args(["--anomaly", "salary=mad", "age=iqr", "--anomaly-by", "department"])
+        assert args.anomaly == {'salary': 'mad', 'age': 'iqr'}
+        assert args.anomaly_by == ['department']
+
+    @pytest.mark.parametrize("argv", [["--anomaly", "salary=median"],
+                                      ["--anomaly-by", "department", "--chunksize", "10"]])
+    def test_rejects_bad_anomaly_options(self, argv):
+        with pytest.raises(SystemExit):
+            parse_args(argv)
+
+    def test_bin_options(self):
+        args = parse_args(["--bins", "b.json", "--bin-spec", "spec.yaml", "--bin-codes"])
+        assert (args.bins, args.bin_spec, args.bin_codes) == ("b.json", "spec.yaml", True)
+        assert parse_args([]).bin_codes is False
+
+    def test_overlap_switches(self):
+        assert parse_args(["--overlap"]).overlap is True
+        assert parse_args(["--no-overlap"]).overlap is False
+
+    def test_format_and_compression(self):
+        args = parse_args(["--format", "feather", "--compression", "none"])
+        assert (args.format, args.compression) == ("feather", None)
+
+    @pytest.mark.parametrize("argv", [["--jobs", "0"], ["--chunksize", "0"], ["--format", "xlsx"]])
+    def test_rejects_non_positive_values(self, argv):
+        with pytest.raises(SystemExit):
+            parse_args(argv)
+
+    def test_write_jobs(self):
+        assert parse_args(["--write-jobs", "4"]).write_jobs == 4
+        assert parse_args([]).write_jobs == 1
+        for argv in (["--write-jobs", "0"], ["--write-jobs", "2", "--jobs", "2"]):
+            with pytest.raises(SystemExit):
+                parse_args(argv)
+
+    def test_feature_selection(self):
+        args = parse_args(["--feature-table", "f.csv", "--features", "is_anomaly", "age_group"])
+        assert args.features == ["is_anomaly", "age_group"]
+        for argv in (["--features", "is_anomaly"],
+                     ["--feature-table", "f.csv", "--features", "bogus"],
+                     ["--feature-table", "f.csv", "--features", "dept", "--groups", "encoded"],
+                     ["--feature-table", "f.csv", "--features", "dept", "--bin-codes"]):
+            with pytest.raises(SystemExit):
+                parse_args(argv)
+
+    def test_one_hot_options(self):
+        args = parse_args(["--hash-buckets", "department=64", "--sparse-one-hot"])
+        assert (args.hash_buckets, args.sparse_one_hot) == ({'department': 64}, True)
+        assert (parse_args([]).hash_buckets, parse_args([]).sparse_one_hot) == (None, False)
+        for argv in (["--hash-buckets", "department=0"], ["--hash-buckets", "salary=4"],
+                     ["--hash-buckets", "department"],
+                     ["--incremental", "state", "--sparse-one-hot"]):
+            with pytest.raises(SystemExit):
+                parse_args(argv)
+
+    def test_window_options(self):
+        args = parse_args(["--windows", "90", "365", "--window-by", "department",
+                           "--window-means", "salary"])
+        assert (args.windows, args.window_by, args.window_means) == \
+            ([90, 365], ['department'], ['salary'])
+        for argv in (["--windows", "0"], ["--window-by", "department"],
+                     ["--windows", "90", "--incremental", "state"]):
+            with pytest.raises(SystemExit):
+                parse_args(argv)
+
+    def test_stage_selection(self):
+        args = parse_args(["--stages", "anomalies", "derived_computed_columns", "time"])
+        assert args.stages == ["derived_computed_columns", "time_based_features", "flagged_anomalies"]
+        assert parse_args([]).stages is None
+
+    def test_output_paths(self):
+        args = parse_args(["--output-dir", "out", "--output", "time_based_features=t/time.parquet"])
+        assert (args.output_dir, args.output) == ("out", {"time_based_features": "t/time.parquet"})
+
+    @pytest.mark.parametrize("name, fmt, written", [("table.csv", "parquet", "table.csv"),
+                                                    ("table.csv.gz", "csv", "table.csv.gz"),
+                                                    ("table", "csv", "table.csv")])
+    def test_feature_table_extension(self, tmp_path, name, fmt, written):
+        main(["--input", INPUT, "--feature-table", str(tmp_path / name), "--format", fmt,
+              "--groups", "derived", "--no-cache", "--no-input-cache"])
+        assert os.listdir(tmp_path) == [written]
+        assert list(read_input(str(tmp_path / written)).columns)[:2] == ['id', 'salary_per_age']
+
+    @pytest.mark.parametrize("argv", [["--stages", "everything"],
+                                      ["--stages", "time", "--feature-table", "t.csv"],
+                                      ["--output", "tenure=t.csv"],
+                                      ["--output", "time_based_features"]])
+    def test_rejects_bad_stage_options(self, argv):
+        with pytest.raises(SystemExit):
+            parse_args(argv)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Fast start: heavy modules load only when a stage runs
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _python(code: str) -> str:
+    """Runs code in a fresh interpreter from the project folder and returns its output."""
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    return result.stdout
+
+
+class TestFastStart:
+
+    def test_help_and_validation_skip_pandas(self):
+        out = _python(
+            "import contextlib, io, sys, time\n"
+            "start = time.perf_counter()\n"
+            "import main\n"
+            "main.parse_args(['--stages', 'time', '--output-dir', 'out', '--chunksize', '10'])\n"
+            "with contextlib.suppress(SystemExit), contextlib.redirect_stdout(io.StringIO()):\n"
+            "    main.parse_args(['--help'])\n"
+            "print(time.perf_counter() - start)\n"
+            "print(sorted(m for m in ('pandas', 'numpy', 'pyarrow') if m in sys.modules))\n"
+        )
+        seconds, heavy = out.splitlines()
+        assert heavy == "[]"
+        assert float(seconds) < STARTUP_BUDGET_S
+
+    def test_single_stage_imports_only_its_module(self, tmp_path):
+        out = _python(
+            "import contextlib, io, sys\n"
+            "import main\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            f"    main.main(['--stages', 'derived', '--output-dir', {str(tmp_path)!r}, "
+            "'--no-cache', '--no-input-cache'])\n"
+            "print(main.STAGES.loaded())\n"
+            "print([m for m in ('encode_categorical_features', 'bin_numeric_ranges', "
+            "'time_based_feature_extraction', 'flag_anomalies_column', 'feature_table', "
+            "'incremental', 'streaming') if m in sys.modules])\n"
+        )
+        assert out.splitlines() == ["['derived_computed_columns']", "[]"]
+        assert os.listdir(tmp_path) == ["derived_computed_columns.csv"]
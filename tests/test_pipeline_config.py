@@ -0,0 +1,132 @@
+"""
+Group 6 - Feature Engineering
+tests/test_pipeline_config.py — PyTest test cases for the stage registry in pipeline_config.py
+Run with: pytest tests/test_pipeline_config.py -v
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import flag_anomalies_column
+import incremental
+import pipeline_io
+from pipeline_config import (
+    ANOMALY_METHODS, ANOMALY_POLICIES, GROUP_STAGES, OUTPUT_FORMATS, STAGE_FUNCTIONS, STAGES,
+    LazyStages, PipelineOptions, check_options, is_sharded,
+)
+from feature_table   import FEATURE_GROUPS
+from main            import parse_args, pipeline_options, run_pipeline
+
+INPUT = "input/data.csv"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Lazily imported stages
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestLazyStages:
+
+    def test_names_without_importing(self):
+        stages = LazyStages({"dump": "json:dumps", "load": "json:loads"})
+        assert list(stages) == ["dump", "load"]
+        assert len(stages) == 2 and "dump" in stages and "other" not in stages
+        assert stages.loaded() == []
+
+    def test_imports_on_lookup(self):
+        stages = LazyStages({"dump": "json:dumps", "load": "json:loads"})
+        assert stages["load"] is json.loads
+        assert stages.loaded() == ["load"]
+        assert dict(stages) == {"dump": json.dumps, "load": json.loads}
+
+    def test_unknown_stage(self):
+        with pytest.raises(KeyError):
+            STAGES["tenure"]
+
+    def test_registry_names_the_stage_functions(self):
+        for name, target in STAGE_FUNCTIONS.items():
+            assert STAGES[name].__name__ == target.split(":")[1]
+        assert [FEATURE_GROUPS[group] for group in GROUP_STAGES] == \
+            [STAGES[name] for name in GROUP_STAGES.values()]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Options shared with the stage modules
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSharedOptions:
+
+    def test_stage_modules_use_the_same_definitions(self):
+        assert flag_anomalies_column.ANOMALY_METHODS is ANOMALY_METHODS
+        assert incremental.ANOMALY_POLICIES is ANOMALY_POLICIES
+        assert pipeline_io.OUTPUT_FORMATS is OUTPUT_FORMATS
+
+    def test_is_sharded(self, tmp_path):
+        assert is_sharded(str(tmp_path))
+        assert is_sharded("input/part-*.csv")
+        assert is_sharded("input/part-?.csv") and is_sharded("input/part-[12].csv")
+        assert not is_sharded("input/data.csv")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Run options and the rules for combining them
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCheckOptions:
+
+    # (command line, the same options for run_pipeline)
+    CONFLICTS = [
+        (["--incremental", "c.json", "--chunksize", "5"],
+         {'checkpoint_file': "c.json", 'chunksize': 5}),
+        (["--incremental", "c.json", "--stages", "time"],
+         {'checkpoint_file': "c.json", 'stages': ["time_based_features"]}),
+        (["--groups", "input"], {'groups': ["input"]}),
+        (["--feature-table", "t.csv", "--chunksize", "5"],
+         {'feature_table_file': "t.csv", 'chunksize': 5}),
+        (["--feature-table", "t.csv", "--features", "is_anomaly", "--groups", "input"],
+         {'feature_table_file': "t.csv", 'features': ["is_anomaly"], 'groups': ["input"]}),
+        (["--feature-table", "t.csv", "--features", "is_anomaly", "--bin-codes"],
+         {'feature_table_file': "t.csv", 'features': ["is_anomaly"], 'bin_codes': True}),
+        (["--anomaly-by", "department", "--chunksize", "10"],
+         {'anomaly_by': ["department"], 'chunksize': 10}),
+        (["--window-by", "department"], {'window_by': ["department"]}),
+        (["--write-jobs", "2", "--jobs", "2"], {'write_jobs': 2, 'jobs': 2}),
+        (["--incremental", "c.json", "--hash-buckets", "department=8"],
+         {'checkpoint_file': "c.json", 'hash_buckets': {'department': 8}}),
+        (["--windows", "0"], {'windows': [0]}),
+    ]
+
+    @pytest.mark.parametrize("argv, options", CONFLICTS)
+    def test_both_entry_points_reject(self, argv, options, tmp_path):
+        with pytest.raises(SystemExit):
+            parse_args(argv)
+        with pytest.raises(ValueError):
+            check_options(INPUT, PipelineOptions(**options))
+        with pytest.raises(ValueError):
+            run_pipeline(INPUT, {name: str(tmp_path / name) for name in STAGES}, **options)
+        assert not any(tmp_path.iterdir())
+
+    def test_messages_name_options_or_flags(self):
+        options = PipelineOptions(checkpoint_file="c.json", chunksize=5)
+        with pytest.raises(ValueError, match="^checkpoint_file cannot be combined with chunksize"):
+            check_options(INPUT, options)
+        with pytest.raises(ValueError, match="^--incremental cannot be combined with --chunksize"):
+            check_options(INPUT, options, flags=True)
+        with pytest.raises(ValueError, match="^sharded input cannot be combined with chunksize"):
+            check_options("input/part-*.csv", PipelineOptions(chunksize=5))
+
+    def test_command_line_defaults(self):
+        assert pipeline_options(parse_args([])) == PipelineOptions(input_cache=True)
+
+    def test_options_object_and_overrides(self, tmp_path):
+        outputs = {name: str(tmp_path / f"{name}.csv") for name in STAGES}
+        options = PipelineOptions(stages=["time_based_features"], jobs=2)
+        run_pipeline(INPUT, outputs, options, jobs=1)
+        assert options.jobs == 2  # overrides leave the given options alone
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["time_based_features.csv"]
+        with pytest.raises(TypeError):
+            run_pipeline(INPUT, outputs, bogus=True)
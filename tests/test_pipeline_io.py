@@ -0,0 +1,208 @@
+"""
+Group 6 - Feature Engineering
+tests/test_pipeline_io.py — PyTest test cases for the output writers in pipeline_io.py
+Run with: pytest tests/test_pipeline_io.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import gzip
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pipeline_io
+from pipeline_io import (
+    ChunkWriter, compact_dtypes, load_input, memory_footprint, output_format, read_input, save_output, set_output_compression, with_format,
+    SPARSE_SUFFIX, read_sparse_columns, sparse_array, sparse_one_hot, write_frame,
+)
+
+# ─── Shared config ────────────────────────────────────────────────────────────
+INPUT = "input/data.csv"
+
+
+@pytest.fixture
+def typed_frame():
+    """A frame with the dtypes the columnar formats must keep."""
+    return pd.DataFrame({
+        'id'       : np.arange(6, dtype='int64'),
+        'flag'     : np.array([0, 1, 0, 1, 1, 0], dtype='int8'),
+        'age_group': pd.Categorical(['Young', 'Adult', 'Young', 'Senior', 'Adult', 'Young'],
+                                    categories=['Young', 'Adult', 'Mid-Age', 'Senior'], ordered=True),
+        'joined'   : pd.to_datetime(['2021-03-15', '2019-07-22', '2020-11-01',
+                                     '2015-05-30', '2023-01-10', '2017-08-19']),
+        'name'     : ['a', 'b', 'c', 'd', 'e', 'f'],
+    })
+
+
+@pytest.fixture(autouse=True)
+def reset_compression():
+    """Each test starts from the default codecs."""
+    yield
+    pipeline_io._OUTPUT_COMPRESSION.clear()
+
+
+class TestFormatSelection:
+
+    @pytest.mark.parametrize("path, fmt", [
+        ("out/a.csv", "csv"), ("out/a.csv.gz", "csv"), ("a.parquet", "parquet"),
+        ("a.PQ", "parquet"), ("a.feather", "feather"), ("a.arrow", "feather"), ("a.txt", "csv"),
+    ])
+    def test_output_format_by_extension(self, path, fmt):
+        assert output_format(path) == fmt
+
+    def test_with_format_replaces_extension(self):
+        assert with_format("output/binned.csv", "parquet") == "output/binned.parquet"
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            with_format("a.csv", "xlsx")
+
+
+class TestColumnarWriters:
+
+    @pytest.mark.parametrize("ext", [".parquet", ".feather"])
+    def test_dtypes_preserved(self, ext, typed_frame, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = str(tmp_path / f"out{ext}")
+        save_output(typed_frame, path, "test")
+        pd.testing.assert_frame_equal(read_input(path, compact=False), typed_frame)
+
+    @pytest.mark.parametrize("ext, codec", [(".parquet", "zstd"), (".parquet", None),
+                                            (".feather", "zstd"), (".feather", None)])
+    def test_compression_options(self, ext, codec, typed_frame, tmp_path):
+        pytest.importorskip("pyarrow")
+        set_output_compression(ext.lstrip('.'), codec)
+        path = str(tmp_path / f"out{ext}")
+        save_output(typed_frame, path, "test")
+        pd.testing.assert_frame_equal(read_input(path, compact=False), typed_frame)
+
+    def test_gzip_csv(self, tmp_path):
+        path = str(tmp_path / "out.csv.gz")
+        save_output(pd.read_csv(INPUT), path, "test")
+        with gzip.open(path, "rt") as f:
+            assert f.readline().startswith("id,name,age")
+
+
+class TestChunkWriter:
+
+    @pytest.mark.parametrize("ext", [".csv", ".csv.gz", ".parquet", ".feather"])
+    def test_chunks_equal_single_write(self, ext, typed_frame, tmp_path):
+        if ext in (".parquet", ".feather"):
+            pytest.importorskip("pyarrow")
+        path = str(tmp_path / f"chunked{ext}")
+        with ChunkWriter(path) as writer:
+            for start in range(0, len(typed_frame), 4):
+                writer.write(typed_frame.iloc[start:start + 4])
+        assert writer.chunks == 2
+
+        single = str(tmp_path / f"single{ext}")
+        save_output(typed_frame, single, "test")
+        pd.testing.assert_frame_equal(read_input(path, compact=False), read_input(single, compact=False))
+
+    def test_unsupported_chunked_csv_compression(self, tmp_path):
+        set_output_compression("csv", "zip")
+        with pytest.raises(ValueError):
+            ChunkWriter(str(tmp_path / "out.csv"))
+
+
+class TestCompactRead:
+
+    def test_integers_downcast(self):
+        df = read_input(INPUT)
+        assert df['age'].dtype == np.int8
+        assert df['salary'].dtype == np.int32
+        pd.testing.assert_series_equal(df['salary'].astype('int64'), pd.read_csv(INPUT)['salary'])
+
+    def test_repetitive_text_becomes_category(self):
+        df = compact_dtypes(pd.DataFrame({'dept': ['HR', 'IT'] * 50, 'name': [str(i) for i in range(100)]}))
+        assert isinstance(df['dept'].dtype, pd.CategoricalDtype)
+        assert not isinstance(df['name'].dtype, pd.CategoricalDtype)
+        assert not pd.api.types.is_object_dtype(df['name']) or pipeline_io.pa is None
+
+    def test_declared_dtypes_applied(self):
+        df = read_input(INPUT, dtypes={'name': 'category'})
+        assert isinstance(df['name'].dtype, pd.CategoricalDtype)
+
+    def test_projection_keeps_key_in_file_order(self):
+        df = load_input(INPUT, columns=['score', 'age'])
+        assert list(df.columns) == ['id', 'age', 'score']
+
+    def test_projection_of_in_memory_frame(self):
+        shared = pd.read_csv(INPUT)
+        df = load_input(shared, columns=['salary'])
+        assert list(df.columns) == ['id', 'salary']
+        assert len(shared.columns) == 8
+
+    def test_csv_output_unchanged_by_compaction(self, tmp_path):
+        compact, plain = tmp_path / "compact.csv", tmp_path / "plain.csv"
+        read_input(INPUT).to_csv(compact, index=False)
+        pd.read_csv(INPUT).to_csv(plain, index=False)
+        assert compact.read_bytes() == plain.read_bytes()
+
+    def test_memory_footprint_shrinks(self):
+        sizes = memory_footprint(INPUT, ['age', 'salary'], {})
+        assert sizes['default'] > sizes['compact'] > sizes['projected']
+
+
+class TestSparseColumns:
+
+    @pytest.fixture
+    def sparse_frame(self):
+        dtype = pd.SparseDtype(np.int8, 0)
+        return pd.DataFrame({
+            'id'   : np.arange(5, dtype='int64') + 10,
+            'score': [1.5, 2.0, 3.5, 4.0, 5.5],
+            'dept_a': sparse_array(5, np.array([0, 3]), np.ones(2, dtype=np.int8), dtype),
+            'dept_b': sparse_array(5, np.array([1, 2, 4]), np.ones(3, dtype=np.int8), dtype),
+            'dept_c': sparse_array(5, np.array([], dtype=np.int32), np.ones(0, dtype=np.int8), dtype),
+        })
+
+    @pytest.mark.parametrize("ext", [".csv", ".parquet"])
+    def test_sparse_columns_written_beside_output(self, ext, sparse_frame, tmp_path):
+        if ext == ".parquet":
+            pytest.importorskip("pyarrow")
+        path = str(tmp_path / f"out{ext}")
+        write_frame(sparse_frame, path)
+        assert list(read_input(path).columns) == ['id', 'score']
+        restored = read_sparse_columns(path + SPARSE_SUFFIX)
+        pd.testing.assert_frame_equal(restored, sparse_frame.drop(columns='score'))
+
+    def test_csr_layout(self, sparse_frame, tmp_path):
+        path = str(tmp_path / "out.csv")
+        write_frame(sparse_frame, path)
+        with np.load(path + SPARSE_SUFFIX) as saved:
+            assert saved['indptr'].tolist() == [0, 1, 2, 3, 4, 5]
+            assert saved['indices'].tolist() == [0, 1, 1, 0, 1]
+            assert saved['shape'].tolist() == [5, 3]
+            assert saved['columns'].tolist() == ['dept_a', 'dept_b', 'dept_c']
+            assert saved['id'].tolist() == [10, 11, 12, 13, 14]
+
+    @pytest.mark.parametrize("scan_columns", [0, 512])
+    def test_one_hot_matches_dense(self, monkeypatch, scan_columns):
+        monkeypatch.setattr(pipeline_io, "ONE_HOT_SCAN_COLUMNS", scan_columns)
+        codes = np.array([2, -1, 0, 2, 3, 0])
+        columns = sparse_one_hot(codes, 5, pd.SparseDtype(np.int8, 0))
+        assert all(col.dtype == pd.SparseDtype(np.int8, 0) for col in columns)
+        dense = np.stack([np.asarray(col) for col in columns], axis=1)
+        expected = np.zeros((6, 5), dtype=np.int8)
+        expected[[0, 2, 3, 4, 5], codes[codes >= 0]] = 1
+        assert (dense == expected).all()
+
+    def test_general_sparse_values_round_trip(self, tmp_path):
+        dtype = pd.SparseDtype(np.float64, 0)
+        frame = pd.DataFrame({
+            'a': sparse_array(4, np.array([0, 2]), np.array([1.5, -2.0]), dtype),
+            'b': sparse_array(4, np.array([2, 3]), np.array([1.0, 7.0]), dtype),
+        })
+        path = str(tmp_path / "out.csv")
+        write_frame(frame, path)
+        pd.testing.assert_frame_equal(read_sparse_columns(path + SPARSE_SUFFIX), frame)
+
+    def test_dense_frames_write_no_sidecar(self, typed_frame, tmp_path):
+        path = str(tmp_path / "out.csv")
+        write_frame(typed_frame, path)
+        assert not os.path.exists(path + SPARSE_SUFFIX)
@@ -0,0 +1,190 @@
+"""
+Group 6 - Feature Engineering
+tests/test_service.py — PyTest test cases for the online transform service in service.py
+Run with: pytest tests/test_service.py -v
+"""
+
+import pytest
+import pandas as pd
+import http.client
+import json
+import os
+import sys
+import threading
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time_based_feature_extraction
+from service       import (
+    LatencyStats, OnlineTransformer, fit_service_state, load_service_state, make_server,
+    save_service_state,
+)
+from feature_table import build_feature_table
+
+INPUT = "input/data.csv"
+
+
+@pytest.fixture(scope="module")
+def data():
+    return pd.read_csv(INPUT)
+
+
+@pytest.fixture(scope="module")
+def records(data):
+    return json.loads(data.to_json(orient='records'))
+
+
+@pytest.fixture(scope="module")
+def transformer(data):
+    return OnlineTransformer(fit_service_state(data))
+
+
+@pytest.fixture(scope="module")
+def server(transformer):
+    server = make_server(transformer, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, payload=None):
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    body = None if payload is None else (payload if isinstance(payload, bytes)
+                                         else json.dumps(payload).encode())
+    connection.request(method, path, body)
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Fast path vs. batch functions
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestOnlineTransformer:
+
+    def test_fast_path_matches_batch_functions(self, transformer, records):
+        assert transformer.fast_path_applies(records)
+        assert transformer.transform_fast(records) == transformer.transform_frame(records)
+
+    def test_matches_default_feature_table(self, transformer, data, records):
+        # The service keeps its fitted encoder, with the unknown bucket
+        table, _ = build_feature_table(data, stage_options={
+            'encoded': {'encoder': transformer.encoder}})
+        expected = table.astype(object).where(table.notna(), None).to_dict('records')
+        assert transformer.transform(records) == expected
+
+    def test_fast_path_matches_feature_table_column_by_column(self, transformer, data, records):
+        table, _ = build_feature_table(data, stage_options={
+            'encoded': {'encoder': transformer.encoder}})
+        expected = table.astype(object).where(table.notna(), None)
+        fast = pd.DataFrame(transformer.transform_fast(records), dtype=object)
+        assert list(fast.columns) == list(expected.columns)
+        for col in expected.columns:
+            assert fast[col].tolist() == expected[col].tolist(), col
+
+    @pytest.mark.parametrize("size", [1, 3])
+    def test_single_records_and_micro_batches(self, transformer, records, size):
+        for start in range(0, len(records), size):
+            batch = records[start:start + size]
+            assert transformer.transform_fast(batch) == transformer.transform_frame(batch)
+
+    def test_edge_values_match(self, transformer, records):
+        record = dict(records[0], age=40, salary=120000.5, score=0,
+                      department="Legal", category="Z")
+        fast = transformer.transform_fast([record])
+        assert fast == transformer.transform_frame([record])
+        assert fast[0]['dept__unknown'] == 1 and fast[0]['category_encoded'] == 0
+        assert fast[0]['score_grade'] is None
+
+    def test_tenure_uses_today(self, transformer, records, monkeypatch):
+        monkeypatch.setattr(time_based_feature_extraction, "_today",
+                            lambda: pd.Timestamp("2040-06-30"))
+        batch = records[:4]
+        assert transformer.transform_fast(batch) == transformer.transform_frame(batch)
+
+    @pytest.mark.parametrize("change", [{'age': 0}, {'category': None}, {'department': None}])
+    def test_irregular_records_use_batch_functions(self, transformer, records, change):
+        record = dict(records[0], **change)
+        assert not transformer.fast_path_applies([record])
+        assert transformer.transform([record]) == transformer.transform_frame([record])
+
+    @pytest.mark.parametrize("change, error", [({'salary': None}, TypeError),
+                                               ({'join_date': "not a date"}, ValueError)])
+    def test_records_the_batch_functions_reject(self, transformer, records, change, error):
+        record = dict(records[0], **change)
+        with pytest.raises(error):
+            transformer.transform_frame([record])
+        with pytest.raises(error):
+            transformer.transform([record])
+
+    @pytest.mark.parametrize("text", ["2020/03/15", "March 15, 2020"])
+    def test_other_date_formats_use_detected_format(self, transformer, records, text):
+        record = dict(records[0], join_date=text)
+        assert transformer.transform_fast([record]) is None
+        out = transformer.transform([record])[0]
+        assert (out['join_year'], out['join_month'], out['join_day_of_week']) == (2020, 3, 6)
+
+    def test_state_round_trip(self, data, tmp_path):
+        path = str(tmp_path / "state.json")
+        state = fit_service_state(data)
+        save_service_state(state, path)
+        assert load_service_state(path) == json.loads(json.dumps(state))
+        (tmp_path / "old.json").write_text('{"version": 99}')
+        with pytest.raises(ValueError, match="version"):
+            load_service_state(str(tmp_path / "old.json"))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HTTP service
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestService:
+
+    def test_single_record(self, server, transformer, records):
+        status, payload = _request(server, "POST", "/transform", records[0])
+        assert status == 200
+        assert payload['records'] == transformer.transform([records[0]])
+
+    def test_micro_batch(self, server, transformer, records):
+        status, payload = _request(server, "POST", "/transform", {'records': records[:5]})
+        assert status == 200
+        assert payload['records'] == transformer.transform(records[:5])
+
+    @pytest.mark.parametrize("body", [b"not json", b'"text"', b'{"records": [1, 2]}'])
+    def test_bad_requests(self, server, body):
+        status, payload = _request(server, "POST", "/transform", body)
+        assert status == 400 and 'error' in payload
+
+    def test_rejected_record(self, server, records):
+        status, payload = _request(server, "POST", "/transform", dict(records[0], salary=None))
+        assert status == 400 and 'error' in payload
+
+    def test_record_in_another_date_format(self, server, records):
+        for text in ("2020/03/15", "March 15, 2020"):
+            status, payload = _request(server, "POST", "/transform", dict(records[0], join_date=text))
+            assert status == 200 and payload['records'][0]['join_year'] == 2020
+
+    def test_unknown_path(self, server):
+        assert _request(server, "GET", "/nothing")[0] == 404
+
+    def test_stats_report_latency(self, server, records):
+        _request(server, "POST", "/transform", records[:2])
+        status, stats = _request(server, "GET", "/stats")
+        assert status == 200
+        assert stats['requests'] >= 1 and stats['records'] >= 2
+        assert 0 < stats['p50_ms'] <= stats['p99_ms']
+        assert stats['requests_per_s'] > 0
+
+    def test_latency_percentiles(self):
+        stats = LatencyStats()
+        assert stats.snapshot()['p50_ms'] is None
+        for ms in range(1, 101):
+            stats.record(ms / 1000, 1)
+        snapshot = stats.snapshot()
+        assert snapshot['p50_ms'] == pytest.approx(50.5)
+        assert snapshot['p99_ms'] == pytest.approx(99.01)
+        assert snapshot['requests'] == snapshot['records'] == 100
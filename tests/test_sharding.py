@@ -0,0 +1,200 @@
+"""
+Group 6 - Feature Engineering
+tests/test_sharding.py — PyTest test cases for sharded input in sharding.py and main.py
+Run with: pytest tests/test_sharding.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import glob
+import json
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sharding                    import (
+    anomaly_statistics, global_anomaly_bounds, is_sharded, resolve_shards, shard_output_path,
+)
+from encode_categorical_features import fit_categorical_encoder, merge_encoders
+from flag_anomalies_column       import compute_anomaly_bounds, flag_anomalies_column
+from main                        import OUTPUT_FILES, STAGES, parse_args, run_pipeline
+
+INPUT = "input/data.csv"
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    """The sample input repeated 7 times, split into 5 uneven shards (part-10 sorts last)."""
+    base = pd.read_csv(INPUT)
+    df = pd.concat([base] * 7, ignore_index=True)
+    df['id'] = range(1, len(df) + 1)
+    folder = tmp_path_factory.mktemp("sharding")
+    df.to_csv(folder / "all.csv", index=False)
+    shards = folder / "shards"
+    shards.mkdir()
+    for number, (start, stop) in zip([1, 2, 3, 4, 10], [(0, 9), (9, 30), (30, 31), (31, 50), (50, 70)]):
+        df.iloc[start:stop].to_csv(shards / f"part-{number}.csv", index=False)
+    return df, str(folder / "all.csv"), str(shards)
+
+
+def _outputs(folder):
+    return {name: os.path.join(folder, os.path.basename(path)) for name, path in OUTPUT_FILES.items()}
+
+
+def _shard_frames(output_file):
+    parts = sorted(glob.glob(os.path.join(os.path.splitext(output_file)[0], "*.csv")))
+    return parts, pd.concat([pd.read_csv(path) for path in parts], ignore_index=True)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Resolving shards and naming outputs
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestResolveShards:
+
+    def test_directory_in_natural_order(self, dataset):
+        _, _, shards = dataset
+        names = [os.path.basename(path) for path in resolve_shards(shards)]
+        assert names == ["part-1.csv", "part-2.csv", "part-3.csv", "part-4.csv", "part-10.csv"]
+
+    def test_glob_pattern(self, dataset):
+        _, _, shards = dataset
+        names = [os.path.basename(path) for path in resolve_shards(os.path.join(shards, "part-1*.csv"))]
+        assert names == ["part-1.csv", "part-10.csv"]
+
+    def test_single_file(self):
+        assert resolve_shards(INPUT) == [INPUT]
+        assert not is_sharded(INPUT)
+
+    def test_directory_ignores_other_files(self, tmp_path):
+        (tmp_path / "a.csv").write_text("id\n1\n")
+        (tmp_path / "notes.txt").write_text("x")
+        (tmp_path / "a.csv.parsed").mkdir()
+        assert resolve_shards(str(tmp_path)) == [str(tmp_path / "a.csv")]
+
+    def test_no_match_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            resolve_shards(str(tmp_path / "*.csv"))
+
+    def test_output_path_keeps_order_and_extension(self):
+        path = shard_output_path("output/derived.csv.gz", 2, "input/shards/part-7.csv")
+        assert path == os.path.join("output", "derived", "00002-part-7.csv.gz")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Reducing per-shard statistics
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestGlobalStatistics:
+
+    def test_merged_bounds_match_concatenated_input(self, dataset):
+        df, _, _ = dataset
+        parts = np.array_split(np.arange(len(df)), 4)
+        bounds, _ = global_anomaly_bounds([anomaly_statistics(df.iloc[rows]) for rows in parts])
+        expected = compute_anomaly_bounds(df)
+        for col in expected:
+            assert bounds[col] == pytest.approx(expected[col])
+
+    def test_merged_encoder_matches_fit_on_everything(self, dataset):
+        df, _, _ = dataset
+        parts = [df[df['department'] == value] for value in df['department'].unique()]
+        merged = merge_encoders([fit_categorical_encoder(part) for part in parts])
+        assert merged == fit_categorical_encoder(df)
+
+    def test_flag_function_uses_given_bounds(self, dataset):
+        df, _, _ = dataset
+        bounds = {'salary': (0, 1), 'score': (-1e9, 1e9), 'age': (-1e9, 1e9)}
+        result = flag_anomalies_column(df, None, bounds=bounds)
+        assert result['salary_anomaly'].all()
+        assert not result['score_anomaly'].any()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# run_pipeline on sharded input
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestShardedPipeline:
+
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_outputs_match_single_file_run(self, dataset, tmp_path, jobs):
+        _, single_input, shards = dataset
+        single = _outputs(tmp_path / "single")
+        sharded = _outputs(tmp_path / "sharded")
+        run_pipeline(single_input, single)
+        run_pipeline(shards, sharded, jobs=jobs)
+        for name in STAGES:
+            parts, combined = _shard_frames(sharded[name])
+            assert len(parts) == 5
+            pd.testing.assert_frame_equal(combined, pd.read_csv(single[name]))
+
+    @pytest.mark.parametrize("selected", [["flagged_anomalies"],
+                                          ["binned_numeric_ranges", "encoded_categorical_features"]])
+    def test_selected_stages(self, dataset, tmp_path, selected):
+        _, single_input, shards = dataset
+        single = _outputs(tmp_path / "single")
+        sharded = _outputs(tmp_path / "sharded")
+        run_pipeline(single_input, single)
+        run_pipeline(shards, sharded, stages=selected)
+        assert sorted(os.listdir(tmp_path / "sharded")) == sorted(
+            os.path.basename(os.path.splitext(sharded[name])[0]) for name in selected)
+        for name in selected:
+            pd.testing.assert_frame_equal(_shard_frames(sharded[name])[1], pd.read_csv(single[name]))
+
+    def test_output_shards_follow_input_order(self, dataset, tmp_path):
+        _, _, shards = dataset
+        outputs = _outputs(tmp_path)
+        run_pipeline(shards, outputs)
+        names = [os.path.basename(path) for path in _shard_frames(outputs['flagged_anomalies'])[0]]
+        assert names == ["00000-part-1.csv", "00001-part-2.csv", "00002-part-3.csv",
+                         "00003-part-4.csv", "00004-part-10.csv"]
+
+    def test_shards_share_one_encoder_artifact(self, dataset, tmp_path):
+        _, _, shards = dataset
+        encoder_file = str(tmp_path / "encoder.json")
+        outputs = _outputs(tmp_path)
+        run_pipeline(shards, outputs, encoder_file=encoder_file)
+        with open(encoder_file) as f:
+            assert json.load(f)['one_hot']['department']['values'] == ["Finance", "HR", "IT"]
+        columns = {tuple(pd.read_csv(path).columns)
+                   for path in _shard_frames(outputs['encoded_categorical_features'])[0]}
+        assert len(columns) == 1
+
+    def test_bins_fitted_over_all_shards(self, dataset, tmp_path):
+        df, _, shards = dataset
+        spec = {'score_half': {'column': 'score', 'quantiles': [0, 0.5, 1], 'labels': ['low', 'high']}}
+        spec_file = tmp_path / "bin_spec.json"
+        spec_file.write_text(json.dumps(spec))
+        outputs = _outputs(tmp_path)
+        run_pipeline(shards, outputs, jobs=2, bin_spec=str(spec_file), bin_codes=True)
+        _, binned = _shard_frames(outputs['binned_numeric_ranges'])
+        median = df['score'].median()
+        assert binned['score_half'].tolist() == (df['score'] > median).astype(int).tolist()
+
+    def test_reports_workers_and_writes_metrics(self, dataset, tmp_path, capsys):
+        _, _, shards = dataset
+        metrics_file = str(tmp_path / "metrics.jsonl")
+        run_pipeline(shards, _outputs(tmp_path), jobs=2, metrics_file=metrics_file)
+        assert "5 shards ran on 2 workers" in capsys.readouterr().out
+        with open(metrics_file) as f:
+            records = [json.loads(line) for line in f]
+        assert sum(record['event'] == 'shard' for record in records) == 10
+        assert records[-1]['shards'] == 5 and records[-1]['rows'] == 70
+
+    def test_rejects_chunksize(self, dataset, tmp_path):
+        _, _, shards = dataset
+        with pytest.raises(ValueError):
+            run_pipeline(shards, _outputs(tmp_path), chunksize=10)
+
+    def test_missing_shards_exit(self, tmp_path):
+        with pytest.raises(SystemExit):
+            run_pipeline(str(tmp_path / "*.csv"), _outputs(tmp_path))
+
+    def test_cli_input_option(self, dataset):
+        _, _, shards = dataset
+        assert parse_args(["--input", shards, "--jobs", "4"]).input == shards
+        assert parse_args([]).input == INPUT
+        with pytest.raises(SystemExit):
+            parse_args(["--input", shards, "--chunksize", "10"])
@@ -0,0 +1,100 @@
+"""
+Group 6 - Feature Engineering
+tests/test_sketches.py — PyTest test cases for the running statistics in sketches.py
+Run with: pytest tests/test_sketches.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sketches import QuantileSketch, RunningMoments
+
+
+@pytest.fixture(scope="module")
+def values():
+    rng = np.random.default_rng(6)
+    return rng.lognormal(mean=11, sigma=0.6, size=200_000)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RunningMoments
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestRunningMoments:
+
+    def test_matches_pandas_mean_and_std(self, values):
+        moments = RunningMoments()
+        for chunk in np.array_split(values, 37):
+            moments.update(chunk)
+        assert moments.count == len(values)
+        assert moments.mean == pytest.approx(pd.Series(values).mean(), rel=1e-12)
+        assert moments.std() == pytest.approx(pd.Series(values).std(), rel=1e-12)
+
+    def test_merge_equals_single_pass(self, values):
+        left, right, whole = RunningMoments(), RunningMoments(), RunningMoments()
+        left.update(values[:1234])
+        right.update(values[1234:])
+        whole.update(values)
+        left.merge(right)
+        assert left.mean == pytest.approx(whole.mean, rel=1e-12)
+        assert left.variance() == pytest.approx(whole.variance(), rel=1e-12)
+
+    def test_missing_values_skipped(self):
+        moments = RunningMoments().update([1.0, np.nan, 3.0])
+        assert moments.count == 2
+        assert moments.mean == 2.0
+
+    def test_std_undefined_for_single_value(self):
+        assert np.isnan(RunningMoments().update([5.0]).std())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# QuantileSketch
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestQuantileSketch:
+
+    @pytest.mark.parametrize("q", [0.0, 0.25, 0.5, 0.75, 1.0])
+    def test_exact_mode_matches_pandas(self, values, q):
+        sketch = QuantileSketch(exact_limit=len(values))
+        for chunk in np.array_split(values, 11):
+            sketch.update(chunk)
+        assert sketch.is_exact
+        assert sketch.error_bound == 0
+        assert sketch.quantile(q) == pd.Series(values).quantile(q)
+
+    @pytest.mark.parametrize("q", [0.1, 0.25, 0.5, 0.75, 0.9])
+    def test_sketch_mode_within_reported_bound(self, values, q):
+        sketch = QuantileSketch(exact_limit=1000, k=512)
+        for chunk in np.array_split(values, 50):
+            sketch.update(chunk)
+        assert not sketch.is_exact
+        estimate_rank = (values < sketch.quantile(q)).mean()
+        assert abs(estimate_rank - q) <= sketch.error_bound + 1 / len(values)
+
+    def test_sketch_memory_is_bounded(self, values):
+        sketch = QuantileSketch(exact_limit=1000, k=512)
+        sketch.update(values)
+        retained = sum(len(items) for items in sketch._levels)
+        assert retained < 512 * np.log2(len(values) / 512 + 2)
+
+    def test_merge_of_shards_within_bound(self, values):
+        merged = QuantileSketch(exact_limit=1000, k=512)
+        for shard in np.array_split(values, 4):
+            merged.merge(QuantileSketch(exact_limit=1000, k=512).update(shard))
+        assert merged.count == len(values)
+        estimate_rank = (values < merged.quantile(0.75)).mean()
+        assert abs(estimate_rank - 0.75) <= merged.error_bound + 1 / len(values)
+
+    def test_empty_sketch_returns_nan(self):
+        assert np.isnan(QuantileSketch().quantile(0.5))
+
+    def test_invalid_quantile_rejected(self):
+        with pytest.raises(ValueError):
+            QuantileSketch().update([1.0]).quantile(1.5)
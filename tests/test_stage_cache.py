@@ -0,0 +1,85 @@
+"""
+Group 6 - Feature Engineering
+tests/test_stage_cache.py — PyTest test cases for the stage output cache in stage_cache.py
+Run with: pytest tests/test_stage_cache.py -v
+"""
+
+import pytest
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stage_cache import StageCache, file_digest
+
+
+@pytest.fixture
+def output(tmp_path):
+    path = tmp_path / "out" / "result.csv"
+    path.parent.mkdir()
+    path.write_text("id,value\n1,2\n")
+    return str(path)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Keys
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCacheKey:
+
+    def test_same_inputs_same_key(self):
+        assert StageCache.key("s", "abc", 1, {"a": 1, "b": 2}) == StageCache.key("s", "abc", 1, {"b": 2, "a": 1})
+
+    @pytest.mark.parametrize("changed", [
+        ("t", "abc", 1, {"a": 1}),
+        ("s", "abd", 1, {"a": 1}),
+        ("s", "abc", 2, {"a": 1}),
+        ("s", "abc", 1, {"a": 2}),
+    ])
+    def test_any_change_changes_key(self, changed):
+        assert StageCache.key(*changed) != StageCache.key("s", "abc", 1, {"a": 1})
+
+    def test_file_digest_follows_contents(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a\n1\n")
+        before = file_digest(str(path))
+        path.write_text("a\n2\n")
+        assert file_digest(str(path)) != before
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Store, fetch and eviction
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestStageCache:
+
+    def test_miss_then_hit(self, tmp_path, output):
+        cache = StageCache(str(tmp_path / "cache"))
+        target = str(tmp_path / "served.csv")
+        assert not cache.fetch("k1", target)
+        cache.store("k1", output)
+        assert cache.fetch("k1", target)
+        assert open(target).read() == open(output).read()
+
+    def test_entries_keep_output_extension(self, tmp_path, output):
+        cache = StageCache(str(tmp_path / "cache"))
+        cache.store("k1", output)
+        assert not cache.fetch("k1", str(tmp_path / "served.parquet"))
+
+    def test_evicts_least_recently_used(self, tmp_path, output):
+        cache = StageCache(str(tmp_path / "cache"), max_bytes=2 * os.path.getsize(output))
+        cache.store("old", output)
+        cache.store("used", output)
+        os.utime(cache.entries()[0][0], (0, 0))   # "old" was used long ago
+        os.utime(cache.entries()[1][0], (10, 10))
+        cache.fetch("used", str(tmp_path / "served.csv"))
+        cache.store("new", output)
+        names = {os.path.basename(path) for path, _, _ in cache.entries()}
+        assert names == {"used.csv", "new.csv"}
+        assert cache.size() <= cache.max_bytes
+
+    def test_zero_size_keeps_nothing(self, tmp_path, output):
+        cache = StageCache(str(tmp_path / "cache"), max_bytes=0)
+        cache.store("k1", output)
+        assert cache.entries() == []
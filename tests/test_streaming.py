@@ -0,0 +1,241 @@
+"""
+Group 6 - Feature Engineering
+tests/test_streaming.py — PyTest test cases for the chunked streaming mode
+Run with: pytest tests/test_streaming.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import streaming
+from streaming                   import (
+    ROW_LOCAL_STAGES, BackgroundWriter, prefetch, stream_stage, stream_flag_anomalies,
+)
+from metrics                     import measure_stage
+from pipeline_io                 import ChunkWriter
+from encode_categorical_features import encode_categorical_features
+from flag_anomalies_column       import flag_anomalies_column
+
+# ─── Shared config ────────────────────────────────────────────────────────────
+INPUT = "input/data.csv"
+
+
+@pytest.fixture(scope="module")
+def big_input(tmp_path_factory):
+    """The sample input repeated 37 times, so chunks do not align with its length."""
+    base = pd.read_csv(INPUT)
+    df = pd.concat([base] * 37, ignore_index=True)
+    df['id'] = range(1, len(df) + 1)
+    path = tmp_path_factory.mktemp("streaming") / "big.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class TestStreamStage:
+
+    @pytest.mark.parametrize("stage", ROW_LOCAL_STAGES, ids=lambda s: s.__name__)
+    @pytest.mark.parametrize("chunksize", [3, 100, 10_000])
+    def test_output_byte_identical_to_full_load(self, stage, chunksize, big_input, tmp_path):
+        full = tmp_path / "full.csv"
+        streamed = tmp_path / "streamed.csv"
+        stage(big_input, str(full))
+        stream_stage(stage, big_input, str(streamed), chunksize)
+        assert _read_bytes(streamed) == _read_bytes(full)
+
+    def test_returns_row_count(self, big_input, tmp_path):
+        rows = stream_stage(ROW_LOCAL_STAGES[0], big_input, str(tmp_path / "out.csv"), 50)
+        assert rows == len(pd.read_csv(big_input))
+
+    def test_stage_never_sees_more_than_chunksize_rows(self, big_input, tmp_path, monkeypatch):
+        sizes = []
+
+        def recording_stage(df, output_file):
+            sizes.append(len(df))
+            return ROW_LOCAL_STAGES[0](df, output_file)
+
+        monkeypatch.setattr(streaming, "ROW_LOCAL_STAGES", ROW_LOCAL_STAGES + (recording_stage,))
+        stream_stage(recording_stage, big_input, str(tmp_path / "out.csv"), 25)
+        assert max(sizes) == 25
+        assert sum(sizes) == len(pd.read_csv(big_input))
+
+    def test_header_only_input(self, tmp_path):
+        empty = tmp_path / "empty.csv"
+        pd.read_csv(INPUT).head(0).to_csv(empty, index=False)
+        out = tmp_path / "out.csv"
+        assert stream_stage(ROW_LOCAL_STAGES[0], str(empty), str(out)) == 0
+        assert 'salary_per_age' in pd.read_csv(out).columns
+
+    def test_rejects_non_row_local_stage(self, tmp_path):
+        with pytest.raises(ValueError):
+            stream_stage(encode_categorical_features, INPUT, str(tmp_path / "out.csv"))
+
+    def test_rejects_non_positive_chunksize(self, tmp_path):
+        with pytest.raises(ValueError):
+            stream_stage(ROW_LOCAL_STAGES[0], INPUT, str(tmp_path / "out.csv"), 0)
+
+
+class TestStreamFlagAnomalies:
+
+    def test_exact_mode_byte_identical_to_full_load(self, big_input, tmp_path):
+        full = tmp_path / "full.csv"
+        streamed = tmp_path / "streamed.csv"
+        flag_anomalies_column(big_input, str(full))
+        report = stream_flag_anomalies(big_input, str(streamed), chunksize=13)
+        assert _read_bytes(streamed) == _read_bytes(full)
+        assert report['error_bounds'] == {'salary': 0.0, 'age': 0.0}
+
+    def test_stream_stage_dispatches_two_pass_mode(self, big_input, tmp_path):
+        rows = stream_stage(flag_anomalies_column, big_input, str(tmp_path / "out.csv"), 50)
+        assert rows == len(pd.read_csv(big_input))
+
+    def test_sketch_mode_reports_error_bound(self, tmp_path):
+        rng = np.random.default_rng(3)
+        n = 20_000
+        df = pd.DataFrame({
+            'salary': rng.normal(70000, 15000, n).round(),
+            'score' : rng.integers(0, 100, n),
+            'age'   : rng.integers(20, 65, n),
+        })
+        path = tmp_path / "wide.csv"
+        df.to_csv(path, index=False)
+        report = stream_flag_anomalies(str(path), str(tmp_path / "out.csv"),
+                                       chunksize=1000, exact_limit=500, sketch_k=256)
+        assert 0 < report['error_bounds']['salary'] < 0.1
+
+        streamed = pd.read_csv(tmp_path / "out.csv")
+        in_memory = flag_anomalies_column(df, None)
+        mismatch = (streamed['is_anomaly'] != in_memory['is_anomaly']).mean()
+        assert mismatch <= 2 * report['error_bounds']['salary']
+
+
+class TestOverlappedIO:
+
+    @pytest.mark.parametrize("stage", ROW_LOCAL_STAGES + (flag_anomalies_column,),
+                             ids=lambda s: s.__name__)
+    def test_output_byte_identical_to_sequential(self, stage, big_input, tmp_path):
+        sequential = tmp_path / "sequential.csv"
+        overlapped = tmp_path / "overlapped.csv"
+        rows = stream_stage(stage, big_input, str(sequential), 7, overlap=False)
+        assert stream_stage(stage, big_input, str(overlapped), 7, overlap=True) == rows
+        assert _read_bytes(overlapped) == _read_bytes(sequential)
+
+    def test_header_only_input(self, tmp_path):
+        empty = tmp_path / "empty.csv"
+        pd.read_csv(INPUT).head(0).to_csv(empty, index=False)
+        out = tmp_path / "out.csv"
+        assert stream_stage(ROW_LOCAL_STAGES[0], str(empty), str(out), overlap=True) == 0
+        assert 'salary_per_age' in pd.read_csv(out).columns
+
+    def test_time_approaches_slowest_part_not_sum(self, big_input, tmp_path, monkeypatch):
+        # Blocking reads and writes (like a slow disk) overlap with the transform
+        delay, chunks = 0.03, 12
+
+        def slow(func):
+            def wrapper(*args, **kwargs):
+                time.sleep(delay)
+                return func(*args, **kwargs)
+            return wrapper
+
+        monkeypatch.setattr(ChunkWriter, "_write", slow(ChunkWriter._write))
+        monkeypatch.setattr(streaming, "read_chunks", slow(streaming.read_chunks))
+        monkeypatch.setattr(streaming.pd, "read_csv", slow(pd.read_csv))
+        stage = slow(ROW_LOCAL_STAGES[0])
+        monkeypatch.setattr(streaming, "ROW_LOCAL_STAGES", ROW_LOCAL_STAGES + (stage,))
+        chunksize = -(-len(pd.read_csv(big_input)) // chunks)
+
+        timings = {}
+        for overlap in (False, True):
+            start = time.perf_counter()
+            stream_stage(stage, big_input, str(tmp_path / f"{overlap}.csv"), chunksize, overlap)
+            timings[overlap] = time.perf_counter() - start
+        assert timings[True] < 0.75 * timings[False]
+
+    def test_metrics_measure_compute_separately(self, big_input, tmp_path):
+        with measure_stage("derive") as metrics:
+            stream_stage(ROW_LOCAL_STAGES[0], big_input, str(tmp_path / "out.csv"), 50,
+                         overlap=True)
+        record = metrics.as_record()
+        assert record['read_s'] > 0 and record['write_s'] > 0
+        assert 0 < record['compute_s'] == round(metrics.phases['compute'], 6)
+
+
+class TestPrefetch:
+
+    def test_yields_items_in_order(self):
+        assert list(prefetch(iter(range(100)), depth=3)) == list(range(100))
+
+    def test_producer_stays_bounded(self):
+        produced = []
+
+        def items():
+            for i in range(50):
+                produced.append(i)
+                yield i
+
+        consumer = prefetch(items(), depth=2)
+        assert next(consumer) == 0
+        time.sleep(0.1)
+        # The item handed out, `depth` queued and one waiting to be queued
+        assert len(produced) <= 4
+        consumer.close()
+
+    def test_reraises_producer_error(self):
+        def items():
+            yield 1
+            raise OSError("disk gone")
+
+        consumer = prefetch(items())
+        assert next(consumer) == 1
+        with pytest.raises(OSError, match="disk gone"):
+            next(consumer)
+
+    def test_closing_early_stops_the_thread(self):
+        before = threading.active_count()
+        consumer = prefetch(iter(range(1000)), depth=1)
+        next(consumer)
+        consumer.close()
+        assert threading.active_count() == before
+
+
+class TestBackgroundWriter:
+
+    def test_writes_every_chunk_in_order(self, tmp_path):
+        df = pd.read_csv(INPUT)
+        out = tmp_path / "out.csv"
+        with ChunkWriter(str(out)) as writer, BackgroundWriter(writer, depth=1) as background:
+            for start in range(0, len(df), 4):
+                background.write(df.iloc[start:start + 4])
+        assert _read_bytes(out) == df.to_csv(index=False).encode()
+
+    def test_write_error_is_reraised(self, tmp_path, monkeypatch):
+        def failing_write(self, df):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(ChunkWriter, "_write", failing_write)
+        df = pd.read_csv(INPUT)
+        with pytest.raises(OSError, match="disk full"):
+            with ChunkWriter(str(tmp_path / "out.csv")) as writer, \
+                    BackgroundWriter(writer, depth=1) as background:
+                for _ in range(10):
+                    background.write(df)
+
+    def test_transform_error_wins_over_writer_shutdown(self, big_input, tmp_path):
+        def broken(df, output_file):
+            raise KeyError("salary")
+
+        with pytest.raises(KeyError):
+            streaming._write_chunks(lambda chunk: broken(chunk, None), big_input,
+                                    str(tmp_path / "out.csv"), 10, overlap=True)
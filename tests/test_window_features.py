@@ -0,0 +1,147 @@
+"""
+Group 6 - Feature Engineering
+tests/test_window_features.py — PyTest test cases for the trailing-window features in window_features.py
+Run with: pytest tests/test_window_features.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path so imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from window_features               import WindowState, window_columns, window_features
+from streaming                     import stream_stage
+from time_based_feature_extraction import time_based_feature_extraction
+
+# ─── Shared config ────────────────────────────────────────────────────────────
+INPUT = "input/data.csv"
+
+WINDOW_OPTIONS = {'windows': [30, 365], 'by': 'department', 'means': 'salary'}
+
+
+@pytest.fixture(scope="module")
+def hires():
+    """Hires over four years with repeated dates, missing dates, keys and salaries."""
+    rng = np.random.default_rng(6)
+    n = 1_500
+    df = pd.DataFrame({
+        'id'        : range(n),
+        'join_date' : pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 1_400, n), unit="D"),
+        'department': rng.choice(['HR', 'IT', 'Finance', 'Sales'], n),
+        'salary'    : rng.integers(20_000, 200_000, n).astype(float),
+    })
+    df.loc[[3, 40], 'join_date'] = pd.NaT
+    df.loc[[5, 41], 'department'] = None
+    df.loc[[7, 42], 'salary'] = np.nan
+    return df
+
+
+def _naive(df, days, by='department', mean='salary'):
+    """Pairwise reference: hires, mean and month rank of every row, one row at a time."""
+    counts, means, ranks = [], [], []
+    dates, groups = df['join_date'], df[by]
+    for date, group in zip(dates, groups):
+        if pd.isna(date) or pd.isna(group):
+            counts.append(0), means.append(np.nan), ranks.append(0)
+            continue
+        same = (groups == group) & (dates < date)
+        window = same & (dates >= date - pd.Timedelta(days=days))
+        counts.append(window.sum())
+        means.append(round(df.loc[window, mean].mean(), 2))
+        ranks.append((same & (dates.dt.to_period('M') == date.to_period('M'))).sum() + 1)
+    return np.array(counts), np.array(means), np.array(ranks)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# In memory
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestWindowFeatures:
+
+    def test_matches_pairwise_reference(self, hires):
+        df = hires.head(400)
+        features = window_features(df, **WINDOW_OPTIONS)
+        assert list(features.columns) == window_columns([30, 365], 'salary')
+        for days in (30, 365):
+            counts, means, ranks = _naive(df, days)
+            assert (features[f'hires_{days}d'].to_numpy() == counts).all()
+            np.testing.assert_allclose(features[f'salary_mean_{days}d'], means)
+            assert (features['join_month_rank'].to_numpy() == ranks).all()
+
+    def test_same_day_hires_share_window_and_rank(self):
+        df = pd.DataFrame({'join_date': pd.to_datetime(
+            ['2024-03-01', '2024-03-05', '2024-03-05', '2024-03-31', '2024-04-01'])})
+        features = window_features(df, windows=[4, 30])
+        assert features['hires_4d'].tolist() == [0, 1, 1, 0, 1]
+        assert features['hires_30d'].tolist() == [0, 1, 1, 3, 3]
+        assert features['join_month_rank'].tolist() == [1, 2, 2, 4, 1]
+
+    def test_independent_of_row_order(self, hires):
+        shuffled = hires.sample(frac=1, random_state=6)
+        pd.testing.assert_frame_equal(window_features(shuffled, **WINDOW_OPTIONS).sort_index(),
+                                      window_features(hires, **WINDOW_OPTIONS))
+
+    def test_groups_are_counted_apart(self, hires):
+        grouped = window_features(hires, [90], by='department')
+        overall = window_features(hires, [90])
+        for _, part in hires.groupby('department'):
+            alone = window_features(part, [90])
+            pd.testing.assert_frame_equal(grouped.loc[part.index], alone)
+        assert (grouped['hires_90d'] <= overall['hires_90d']).all()
+
+    @pytest.mark.parametrize("windows", [[], [0], [30.5], [True]])
+    def test_rejects_bad_windows(self, hires, windows):
+        with pytest.raises(ValueError):
+            window_features(hires, windows)
+
+    def test_empty_input(self, hires):
+        features = window_features(hires.head(0), **WINDOW_OPTIONS)
+        assert list(features.columns) == window_columns([30, 365], 'salary')
+        assert len(features) == 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Streaming a date-sorted input
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestWindowState:
+
+    @pytest.mark.parametrize("chunksize", [7, 37, 1_000])
+    def test_chunks_match_whole_input(self, hires, chunksize):
+        ordered = hires.sort_values('join_date', kind='stable', na_position='first')
+        state = WindowState()
+        parts = [state.features(ordered.iloc[start:start + chunksize], **WINDOW_OPTIONS)
+                 for start in range(0, len(ordered), chunksize)]
+        pd.testing.assert_frame_equal(pd.concat(parts), window_features(ordered, **WINDOW_OPTIONS))
+
+    def test_history_stays_bounded(self, hires):
+        ordered = hires.sort_values('join_date', kind='stable').dropna(subset=['join_date'])
+        state = WindowState()
+        for start in range(0, len(ordered), 100):
+            state.features(ordered.iloc[start:start + 100], [30])
+            assert state.history['join_date'].min() >= state.last - pd.Timedelta(days=31)
+
+    def test_rejects_unsorted_input(self, hires):
+        state = WindowState()
+        with pytest.raises(ValueError, match="sorted by join_date"):
+            state.features(hires.head(50), [30])
+
+    def test_stream_stage_matches_full_load(self, hires, tmp_path):
+        # Without missing dates, so join_year is an integer column in every chunk
+        path = tmp_path / "sorted.csv"
+        hires.dropna(subset=['join_date']).sort_values('join_date', kind='stable').to_csv(
+            path, index=False)
+        options = {'windows': [30, 365], 'window_by': 'department', 'window_means': 'salary'}
+        full, streamed = tmp_path / "full.csv", tmp_path / "streamed.csv"
+        time_based_feature_extraction(str(path), str(full), **options)
+        stream_stage(time_based_feature_extraction, str(path), str(streamed), 97, options=options)
+        assert open(streamed, "rb").read() == open(full, "rb").read()
+
+    def test_stream_stage_rejects_unsorted_file(self, tmp_path):
+        with pytest.raises(ValueError, match="sorted by join_date"):
+            stream_stage(time_based_feature_extraction, INPUT, str(tmp_path / "out.csv"), 3,
+                         options={'windows': [90]})
@@ -4,12 +4,65 @@ Function 4: time_based_feature_extraction
 Extracts useful time-based features from date columns.
 """
 
+import numpy as np
 import pandas as pd
-import os
 from datetime import datetime
 
+from date_parsing    import broadcast, factorize_dates
+from pipeline_io     import load_input, save_output
+from window_features import window_features, window_inputs
 
-def time_based_feature_extraction(input_file: str, output_file: str) -> pd.DataFrame:
+# Columns this function reads, and the dtypes they are loaded with
+INPUT_COLUMNS = ['join_date']
+INPUT_DTYPES  = {'join_date': 'category'}
+
+# Bump when this function's output changes, so cached outputs are recomputed
+STAGE_VERSION = 2
+
+# strptime format of join_date; None detects it from the data
+DATE_FORMAT = None
+
+# Hires joined in this year or later are recent (is_recent_hire)
+RECENT_HIRE_YEAR = 2021
+
+
+def _today() -> pd.Timestamp:
+    """The date tenure is measured up to."""
+    return pd.Timestamp(datetime.today().date())
+
+
+def date_features(dates: pd.DatetimeIndex, today: pd.Timestamp) -> dict:
+    """
+    The time features of distinct dates, before they are broadcast to rows.
+
+    Args:
+        dates (pd.DatetimeIndex): Distinct parsed join dates.
+        today (pd.Timestamp)    : The date tenure is measured up to.
+
+    Returns:
+        dict: Feature column -> values aligned with `dates`.
+    """
+    years = np.asarray(dates.year)
+    return {
+        'join_year'       : years,
+        'join_month'      : dates.month,
+        'join_quarter'    : dates.quarter,
+        'join_day_of_week': dates.dayofweek,  # 0 = Monday
+        'years_in_company': ((today - dates).days / 365).round(1),
+        'is_recent_hire'  : np.where(years >= RECENT_HIRE_YEAR, 1, 0),
+    }
+
+
+def cache_context() -> dict:
+    """Values besides the input that the output depends on (part of the stage cache key)."""
+    return {'today': _today().date().isoformat()}
+
+
+def time_based_feature_extraction(input_file: str | pd.DataFrame, output_file: str | None,
+                                  *, project: bool = False,
+                                  date_format: str | None = DATE_FORMAT,
+                                  windows: list | None = None, window_by=None,
+                                  window_means=None, window_state=None) -> pd.DataFrame:
     """
     Extracts time-based features from date columns in a CSV file.
 
@@ -20,37 +73,60 @@ def time_based_feature_extraction(input_file: str, output_file: str) -> pd.DataF
     - join_day_of_week : Day of week (0=Monday, 6=Sunday)
     - years_in_company : Approximate years since joining (rounded to 1 decimal)
     - is_recent_hire   : 1 if joined in 2021 or later, else 0
+    With `windows`, cohort features over join_date are added as well (see
+    window_features.py): hires_<N>d (hires in the N days before), the
+    <column>_mean_<N>d of window_means and join_month_rank.
 
     Args:
-        input_file  (str): Path to the input CSV file.
-        output_file (str): Path where the processed CSV will be saved.
+        input_file  (str | pd.DataFrame): Path to the input CSV file, or an
+                     already loaded dataframe (it is never modified).
+        output_file (str | None): Path where the processed CSV will be saved.
+                     None keeps the result in memory only.
+        project     (bool): Read and keep only `id` and INPUT_COLUMNS, so the
+                     output holds the key, the used columns and the new ones.
+        date_format (str | None): strptime format of join_date, e.g. '%Y-%m-%d'.
+                     None detects a fixed format from the distinct values.
+        windows     (list | None): Trailing window lengths in days, e.g. [90, 365].
+                     None adds no window features.
+        window_by   (str | list | None): Column(s) whose groups are counted
+                     apart, e.g. 'department'.
+        window_means (str | list | None): Numeric columns averaged over each
+                     window, e.g. 'salary'.
+        window_state (WindowState | None): Carries the earlier rows between
+                     the chunks of a date-sorted input (see streaming.py).
+                     None computes the windows over this input alone.
 
     Returns:
         pd.DataFrame: The processed dataframe with new time-based columns.
     """
-    # Load the CSV
-    df = pd.read_csv(input_file)
+    # Load the CSV (or take the shared in-memory dataframe)
+    columns = INPUT_COLUMNS
+    if windows:
+        columns = list(dict.fromkeys(INPUT_COLUMNS + window_inputs(window_by, window_means)))
+    df = load_input(input_file, columns if project else None, INPUT_DTYPES)
 
-    # Parse the date column
-    df['join_date'] = pd.to_datetime(df['join_date'])
-    today = pd.Timestamp(datetime.today().date())
+    # Parse each distinct date once, then derive every feature from the
+    # distinct dates only and broadcast it back to the rows
+    codes, dates = factorize_dates(df['join_date'], date_format)
+    features = date_features(dates, _today())
 
-    # Extract time components
-    df['join_year']        = df['join_date'].dt.year
-    df['join_month']       = df['join_date'].dt.month
-    df['join_quarter']     = df['join_date'].dt.quarter
-    df['join_day_of_week'] = df['join_date'].dt.dayofweek  # 0 = Monday
+    df['join_date'] = pd.Series(broadcast(dates.to_numpy(), codes, np.datetime64('NaT')),
+                                index=df.index)
 
-    # Calculate tenure
-    df['years_in_company'] = ((today - df['join_date']).dt.days / 365).round(1)
+    # Time components, tenure and recent hires (RECENT_HIRE_YEAR onward);
+    # rows without a date are not recent hires
+    for col, values in features.items():
+        df[col] = broadcast(values, codes, 0 if col == 'is_recent_hire' else np.nan)
 
-    # Flag recent hires (2021 onward)
-    df['is_recent_hire'] = df['join_year'].apply(lambda y: 1 if y >= 2021 else 0)
+    # Trailing-window cohort features, sorting by (group, join_date) once
+    if windows:
+        compute = window_features if window_state is None else window_state.features
+        features = compute(df, windows, window_by, window_means)
+        for col in features.columns:
+            df[col] = features[col]
 
     # Save output
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_csv(output_file, index=False)
-    print(f"[time_based_feature_extraction] ✅ Saved to: {output_file}")
+    save_output(df, output_file, "time_based_feature_extraction")
     return df
 
 
@@ -0,0 +1,196 @@
+"""
+Group 6 - Feature Engineering
+window_features.py - Trailing-window cohort features over join_date
+For every row: how many hires joined in the N days before it (within the same
+group, e.g. department, when asked), the mean of chosen columns over those
+hires, and the row's rank within its join-month cohort. The rows are sorted
+by (group, date) once and every window is two searchsorted lookups plus a
+difference of running sums, so the cost is O(n log n) instead of comparing
+every pair of rows. Only hires on earlier days count, so a row never depends
+on rows that come after it in a date-sorted input, which is what lets
+WindowState process such an input one chunk at a time.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Trailing windows, in days
+DEFAULT_WINDOWS = (90, 365)
+
+# Decimals the window means are rounded to
+MEAN_DECIMALS = 2
+
+
+def _as_list(columns) -> list:
+    """Column names as a list (a single name or None are allowed)."""
+    if columns is None:
+        return []
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def window_inputs(by=None, means=None) -> list:
+    """Input columns window_features reads: join_date, the `by` and the `means` columns."""
+    return list(dict.fromkeys(['join_date'] + _as_list(by) + _as_list(means)))
+
+
+def window_columns(windows=DEFAULT_WINDOWS, means=None) -> list:
+    """
+    Names of the columns window_features adds, in order.
+
+    Args:
+        windows (tuple): Window lengths in days, e.g. (90, 365).
+        means   (list) : Columns averaged over each window, e.g. ['salary'].
+
+    Returns:
+        list: hires_<N>d and <column>_mean_<N>d per window, then join_month_rank.
+    """
+    names = []
+    for days in windows:
+        names.append(f"hires_{days}d")
+        names += [f"{col}_mean_{days}d" for col in _as_list(means)]
+    return names + ['join_month_rank']
+
+
+def _check_windows(windows) -> list:
+    """The windows as a list of positive ints; raises ValueError otherwise."""
+    windows = list(windows)
+    if not windows or any(isinstance(days, bool) or not isinstance(days, (int, np.integer))
+                          or days < 1 for days in windows):
+        raise ValueError(f"windows must be positive numbers of days, not {windows}")
+    return windows
+
+
+def _group_codes(df: pd.DataFrame, by: list) -> np.ndarray:
+    """
+    Integer code of each row's group (all 0 without `by`), or -1 when a key is missing.
+
+    Category columns only factorize their distinct values.
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    for col in by:
+        col_codes, uniques = pd.factorize(df[col])
+        codes = np.where((codes < 0) | (col_codes < 0), -1, codes * len(uniques) + col_codes)
+    return codes
+
+
+def window_features(df: pd.DataFrame, windows=DEFAULT_WINDOWS, by=None,
+                    means=None) -> pd.DataFrame:
+    """
+    Computes the trailing-window features of every row.
+
+    For a row that joined on day d, the N-day window holds the hires of its
+    group that joined on days d-N to d-1. The rank is 1 plus the number of
+    hires of its group that joined earlier in the same calendar month, so
+    hires on the same day share a rank. Rows with no join_date, or with a
+    missing group key, get 0 hires, no means and rank 0.
+
+    Args:
+        df      (pd.DataFrame): Rows with a parsed (datetime64) join_date
+                                and the `by` and `means` columns.
+        windows (tuple)       : Window lengths in days.
+        by      (str | list)  : Column(s) whose groups are counted apart,
+                                e.g. 'department'. None counts every hire.
+        means   (str | list)  : Numeric columns averaged over each window,
+                                e.g. 'salary'. Missing values are skipped.
+
+    Returns:
+        pd.DataFrame: The window_columns(windows, means), indexed like df.
+    """
+    windows, by, means = _check_windows(windows), _as_list(by), _as_list(means)
+    dates = df['join_date'].to_numpy(dtype='datetime64[D]')
+    codes = _group_codes(df, by)
+    valid = ~np.isnat(dates) & (codes >= 0)
+    columns = {}
+
+    days = dates[valid].astype(np.int64)
+    first = days.min() if len(days) else 0
+    # Keys of different groups lie further apart than any window reaches
+    span = (days.max() - first if len(days) else 0) + max(windows) + 1
+    keys = codes[valid] * span + (days - first)
+    order = np.argsort(keys, kind='stable')
+    # Everything below runs in sorted order and is scattered back to the rows
+    # at the end. Lookups run once per distinct (group, day) key: `first_row`
+    # is where each key's rows start, so the rows before it joined earlier
+    rows = np.flatnonzero(valid)[order]
+    keys = keys[order]
+    new_key = np.concatenate([[True], keys[1:] != keys[:-1]]) if len(keys) else np.ones(0, bool)
+    distinct = keys[new_key]
+    first_row = np.append(np.flatnonzero(new_key), len(keys))
+    key_of_row = np.cumsum(new_key) - 1
+    earlier = first_row[:-1]
+
+    sums = {}
+    for col in means:
+        values = df[col].to_numpy(dtype=float)[rows]
+        present = ~np.isnan(values)
+        sums[col] = (np.concatenate([[0.0], np.cumsum(np.where(present, values, 0.0))]),
+                     np.concatenate([[0], np.cumsum(present)]))
+
+    def full(values, fill, dtype):
+        column = np.full(len(df), fill, dtype=dtype)
+        column[rows] = values[key_of_row]
+        return column
+
+    for days_back in windows:
+        start = first_row[np.searchsorted(distinct, distinct - days_back, side='left')]
+        columns[f"hires_{days_back}d"] = full(earlier - start, 0, np.int64)
+        for col, (total, count) in sums.items():
+            present = count[earlier] - count[start]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(present > 0, (total[earlier] - total[start]) / present, np.nan)
+            columns[f"{col}_mean_{days_back}d"] = full(mean.round(MEAN_DECIMALS), np.nan, float)
+
+    key_days = dates[rows[earlier]]
+    into_month = (key_days - key_days.astype('datetime64[M]')).astype(np.int64)
+    month_first = first_row[np.searchsorted(distinct, distinct - into_month, side='left')]
+    columns['join_month_rank'] = full(earlier - month_first + 1, 0, np.int64)
+    return pd.DataFrame(columns, index=df.index)
+
+
+class WindowState:
+    """
+    Carries the rows a date-sorted input still needs from one chunk to the next.
+
+    The history holds the rows of the last max(windows) days and of the
+    current month, so each chunk is computed together with the earlier rows
+    its windows reach and the results match window_features over the whole
+    input. A chunk that goes back in time raises ValueError.
+    """
+
+    def __init__(self):
+        self.history = None
+        self.last = None
+
+    def features(self, df: pd.DataFrame, windows=DEFAULT_WINDOWS, by=None,
+                 means=None) -> pd.DataFrame:
+        """
+        Computes window_features for the next chunk of a date-sorted input.
+
+        Args:
+            df (pd.DataFrame): The chunk, with a parsed join_date.
+            See window_features for the other arguments.
+
+        Returns:
+            pd.DataFrame: The window columns of the chunk's rows, indexed like df.
+        """
+        windows = _check_windows(windows)
+        columns = window_inputs(by, means)
+        dates = df['join_date'].dropna()
+        if not dates.is_monotonic_increasing or (
+                self.last is not None and len(dates) and dates.iloc[0] < self.last):
+            raise ValueError("Streaming window features need the input sorted by join_date; "
+                             "sort it or run without chunksize")
+
+        chunk = df[columns].reset_index(drop=True)
+        combined = chunk if self.history is None else pd.concat([self.history, chunk],
+                                                                 ignore_index=True)
+        result = window_features(combined, windows, by, means).iloc[len(combined) - len(df):]
+        result.index = df.index
+
+        if len(dates):
+            self.last = dates.iloc[-1]
+        if self.last is not None:
+            keep_from = min(self.last - pd.Timedelta(days=max(windows)),
+                            self.last.to_period('M').start_time)
+            self.history = combined[combined['join_date'] >= keep_from].reset_index(drop=True)
+        return result